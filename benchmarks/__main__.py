@@ -0,0 +1,68 @@
+import click
+import json
+import os
+import sys
+import tempfile
+from benchmarks.suite import compare, run_suite
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+@click.command(help="Runs the rli benchmark suite against local stand-ins.")
+@click.option(
+    "--baseline",
+    default=BASELINE,
+    type=click.Path(dir_okay=False),
+    help="The baseline results to compare against.",
+)
+@click.option(
+    "--threshold",
+    default=0.25,
+    type=float,
+    help="The relative change that counts as a regression.",
+)
+@click.option(
+    "--update-baseline", is_flag=True, help="Saves the results as the new baseline."
+)
+@click.option("--scale", default=1, type=int, help="Multiplies the iterations.")
+@click.option(
+    "--output",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="Also writes the results to this file.",
+)
+def main(baseline, threshold, update_baseline, scale, output):
+    with tempfile.TemporaryDirectory() as home:
+        results = run_suite(home, scale)
+
+    report = json.dumps(results, indent=2, sort_keys=True)
+    click.echo(report)
+
+    if output:
+        with open(output, "w") as output_file:
+            output_file.write(report + "\n")
+
+    if update_baseline:
+        with open(baseline, "w") as baseline_file:
+            baseline_file.write(report + "\n")
+        click.echo(f"Saved the baseline to {baseline}.")
+        return
+
+    if not os.path.exists(baseline):
+        click.echo(f"There is no baseline at {baseline}.", err=True)
+        return
+
+    with open(baseline, "r") as baseline_file:
+        regressions = compare(results, json.load(baseline_file), threshold)
+
+    for regression in regressions:
+        click.echo(f"REGRESSION {regression}", err=True)
+
+    if regressions:
+        sys.exit(1)
+
+    click.echo(f"No regressions over {threshold:.0%} against {baseline}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+from standins import (
+    MiB,
+    DockerEngineStandIn,
+    GithubStandIn,
+    stats_sample,
+    write_fake_docker,
+)
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SECRETS = {f"SECRET_{i}": f"value-{i}" for i in range(10)}
+LOG_LINES = 200
+STATS_SAMPLES = 59
+IMAGES = 50
+
+
+class Environment:
+    """
+    A temporary home with ~/.rli/config.json pointing at the GitHub stand-in,
+    DOCKER_HOST pointing at the Docker Engine stand-in and fake docker binaries
+    first on PATH.
+    """
+
+    def __init__(self, home):
+        self.home = home
+        self.github = GithubStandIn()
+        self.engine = DockerEngineStandIn(os.path.join(home, "docker.sock"))
+        self.bin_dir = os.path.join(home, "bin")
+        self.tarball = os.path.join(home, "images.tar")
+        self._saved_env = None
+
+    def __enter__(self):
+        self.github.start()
+        self.engine.start()
+        self.add_containers_and_images()
+        write_fake_docker(self.bin_dir)
+
+        # What the fake docker save writes: some incompressible data and a lot
+        # that compresses well, like a real image.
+        with open(self.tarball, "wb") as tarball:
+            tarball.write(os.urandom(MiB) + b"layer" * MiB)
+
+        rli_dir = os.path.join(self.home, ".rli")
+        os.makedirs(rli_dir, exist_ok=True)
+
+        with open(os.path.join(rli_dir, "config.json"), "w") as config:
+            json.dump(
+                {
+                    "github": {
+                        "organization": "bench",
+                        "login": "bench",
+                        "password": "bench",
+                        "url": self.github.url,
+                    },
+                    "docker": {
+                        "registry": "registry.bench",
+                        "login": "bench",
+                        "password": "bench",
+                    },
+                },
+                config,
+            )
+
+        with open(os.path.join(rli_dir, "secrets.json"), "w") as secrets:
+            json.dump(SECRETS, secrets)
+
+        self._saved_env = dict(os.environ)
+        os.environ.update(
+            {
+                "HOME": self.home,
+                "RLI_DIR": rli_dir,
+                "RLI_NO_DAEMON": "1",
+                "PATH": self.bin_dir + os.pathsep + os.environ.get("PATH", ""),
+                "DOCKER_HOST": f"unix://{self.engine.socket_path}",
+                "FAKE_DOCKER_SAVE": self.tarball,
+                "FAKE_DOCKER_LOAD": os.devnull,
+            }
+        )
+        return self
+
+    def __exit__(self, *args):
+        os.environ.clear()
+        os.environ.update(self._saved_env)
+        self.github.stop()
+        self.engine.stop()
+
+    def add_containers_and_images(self):
+        # Every log line and stats sample in one write, like a real engine.
+        self.engine.split_writes = False
+
+        for name in ("api", "worker"):
+            container = self.engine.container(name, project="bench")
+            self.engine.logs[container["Id"]] = [
+                (1 + i % 2, f"{name} line {i}\n".encode("utf-8"))
+                for i in range(LOG_LINES)
+            ]
+            self.engine.stats[container["Id"]] = [
+                stats_sample(second, second * 500, second * MiB)
+                for second in range(1, STATS_SAMPLES + 1)
+            ]
+
+        for i in range(IMAGES):
+            self.engine.image(f"registry.bench/app:sha-{i}", created=i, size=MiB)
+
+
+def measure(function, iterations):
+    """
+    Runs the function once to warm up, then the given number of times.
+
+    :return: The median and p95 wall time in ms and the throughput in ops/s
+    """
+    function()
+
+    timings = []
+    start = time.perf_counter()
+
+    for _ in range(iterations):
+        iteration_start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - iteration_start) * 1000)
+
+    total = time.perf_counter() - start
+    timings.sort()
+
+    return {
+        "iterations": iterations,
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "ops_per_sec": round(iterations / total, 2),
+    }
+
+
+def invoke(argv):
+    """Runs an rli command in-process through the real click entry point."""
+    from rli.cli import cli
+
+    try:
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            cli.main(args=argv, prog_name="rli")
+    except SystemExit as e:
+        if e.code:
+            raise RuntimeError(f"rli {' '.join(argv)} exited with {e.code}.")
+
+
+def run_rli(argv):
+    """Runs an rli command in a new interpreter, as a user would."""
+    subprocess.run(
+        [sys.executable, "-c", "from rli.client import main; main()", *argv],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=True,
+    )
+
+
+def run_suite(home, scale=1):
+    """
+    Runs every benchmark in a temporary environment.
+
+    :param home: An empty folder used as HOME
+    :param scale: Multiplies the number of iterations
+    :return: The results keyed by benchmark name
+    """
+    from rli.docker import RLIDocker
+    from rli.utils.logger import setup_logger
+
+    setup_logger(stream=open(os.devnull, "w"))
+    results = {}
+
+    with Environment(home) as environment:
+        results["startup_help"] = measure(lambda: run_rli(["--help"]), 5 * scale)
+        results["startup_smoke"] = measure(lambda: run_rli(["smoke"]), 5 * scale)
+
+        results["github_add_secrets"] = measure(
+            lambda: invoke(
+                ["github", "add-secrets", "--repo-name", "bench"]
+                + [arg for key in SECRETS for arg in ("-s", key)]
+            ),
+            20 * scale,
+        )
+        results["github_create_repo"] = measure(
+            lambda: invoke(
+                [
+                    "github",
+                    "create-repo",
+                    "--repo-name",
+                    "bench-repo",
+                    "--repo-description",
+                    "Benchmark repo",
+                ]
+            ),
+            20 * scale,
+        )
+        results["github_list_repos"] = measure(
+            lambda: invoke(["github", "list-repos"]), 20 * scale
+        )
+
+        docker = RLIDocker("bench", "bench", "registry.bench")
+
+        def pull_and_tag():
+            docker.pull("image:latest")
+            docker.tag("registry.bench/image:latest", "registry.bench/image:sha-1")
+
+        results["docker_pull_tag"] = measure(pull_and_tag, 100 * scale)
+        results["docker_compose_up"] = measure(
+            lambda: docker.compose_up("docker-compose.yml", {"KEY": "value"}),
+            100 * scale,
+        )
+        results["docker_digest_cached"] = measure(
+            lambda: docker.digest("registry.bench/image:latest"), 200 * scale
+        )
+
+        archive = os.path.join(home, "images.tar.gz")
+        results["docker_export"] = measure(
+            lambda: invoke(["docker", "export", "api", "worker", "-o", archive]),
+            10 * scale,
+        )
+        results["docker_import"] = measure(
+            lambda: invoke(["docker", "import", archive]), 20 * scale
+        )
+        results["docker_logs"] = measure(
+            lambda: invoke(["docker", "logs", "api", "worker"]), 50 * scale
+        )
+        results["docker_stats"] = measure(
+            lambda: invoke(["docker", "stats", "api", "worker"]), 50 * scale
+        )
+        results["docker_prune_dry_run"] = measure(
+            lambda: invoke(["docker", "prune", "--dry-run"]), 20 * scale
+        )
+
+        results["github_requests"] = environment.github.requests
+
+    results["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results["peak_child_rss_kb"] = resource.getrusage(
+        resource.RUSAGE_CHILDREN
+    ).ru_maxrss
+    return results
+
+
+def compare(results, baseline, threshold, min_delta_ms=0.5):
+    """
+    Compares results with a baseline. A benchmark regresses when its median
+    wall time grows by more than the threshold and by more than min_delta_ms,
+    which keeps sub-millisecond noise from failing the comparison. Peak RSS
+    regresses when it grows by more than the threshold.
+
+    :param results: The results of run_suite
+    :param baseline: Earlier results of run_suite
+    :param threshold: The allowed relative change, e.g. 0.2 for 20%
+    :param min_delta_ms: The smallest change in ms that counts as a regression
+    :return: A list of regression messages
+    """
+    regressions = []
+
+    for name, result in results.items():
+        previous = baseline.get(name)
+
+        if isinstance(result, dict) and isinstance(previous, dict):
+            median, previous_median = result["median_ms"], previous["median_ms"]
+
+            if (
+                median > previous_median * (1 + threshold)
+                and median - previous_median > min_delta_ms
+            ):
+                regressions.append(
+                    f"{name}: median {median} ms ({result['ops_per_sec']} ops/s), "
+                    f"baseline {previous_median} ms ({previous['ops_per_sec']} ops/s)"
+                )
+        elif name.endswith("_rss_kb") and isinstance(previous, int):
+            if result > previous * (1 + threshold):
+                regressions.append(f"{name}: {result} KiB, baseline {previous} KiB")
+
+    return regressions
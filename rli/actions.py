@@ -0,0 +1,506 @@
+import hashlib
+import heapq
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import zipfile
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from github import GithubException
+from rli.github import RLIGithub
+from rli.utils.paths import write_atomic
+from rli.utils.trace import tracer
+from rli.utils.zip_stream import ZipStreamExtractor
+
+# Conclusions that do not fail a watch.
+PASSING_CONCLUSIONS = ("success", "neutral", "skipped")
+
+QUEUED_STATUSES = ("queued", "requested", "waiting", "pending")
+
+# Records the artifacts in a download folder, so finished ones are skipped.
+MANIFEST_FILE = ".rli-artifacts.json"
+CHUNK_SIZE = 1024 * 1024
+
+DOWNLOADED = "downloaded"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+
+class RunWatcher:
+    """
+    Watches the latest workflow runs of many repositories until they complete.
+
+    Every run and its jobs are polled with conditional requests, so a poll
+    where nothing changed is answered with 304 Not Modified, which does not
+    count against the rate limit. All repositories are polled from one loop
+    that sleeps until the next poll is due. A run is polled every interval
+    while it is in progress, less often while it is queued, and the interval
+    grows while nothing changes.
+    """
+
+    def __init__(
+        self,
+        config,
+        interval=5,
+        queued_interval=15,
+        max_interval=60,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        """
+        :param config: The GithubConfig of the organization
+        :param interval: Seconds between polls of a run that is in progress
+        :param queued_interval: Seconds between polls of a run that is queued
+        :param max_interval: The longest the interval grows to while nothing
+        changes
+        :param clock: Returns the current time in seconds
+        :param sleep: Sleeps for a number of seconds
+        """
+        self.config = config
+        self.interval = interval
+        self.queued_interval = max(queued_interval, interval)
+        self.max_interval = max(max_interval, self.queued_interval)
+        self.clock = clock
+        self.sleep = sleep
+        self.github = RLIGithub.shared(config)
+        self._responses = {}
+
+    @property
+    def session(self) -> requests.Session:
+        return self.github.session
+
+    def watch(self, repos, run_id=None, branch=None, workflow=None) -> list:
+        """
+        :param repos: The names of the repositories
+        :param run_id: The run to watch. Defaults to the latest run of each
+        repository
+        :param branch: Only watches runs of this branch
+        :param workflow: Only watches runs of this workflow file name or ID
+        :return: A list of results with the name, run_id, status, conclusion,
+        html_url and error of each run
+        """
+        watches = [_Watch(name, run_id, self.interval) for name in repos]
+        queue = [(self.clock(), i, watch) for i, watch in enumerate(watches)]
+
+        while queue:
+            due, i, watch = heapq.heappop(queue)
+            delay = due - self.clock()
+
+            if delay > 0:
+                self.sleep(delay)
+
+            try:
+                done = self._poll(watch, branch, workflow)
+            except _Throttled as e:
+                logging.warning("Rate limited, waiting %.0fs.", e.delay)
+                heapq.heappush(queue, (self.clock() + e.delay, i, watch))
+                continue
+            except requests.RequestException as e:
+                logging.warning("Could not poll %s: %s", watch.name, e)
+                watch.interval = self._backoff(watch.interval)
+                done = False
+            except GithubException as e:
+                logging.error("Could not poll %s: %s", watch.name, e.status)
+                watch.error = str(e.status)
+                done = True
+
+            if not done:
+                heapq.heappush(queue, (self.clock() + watch.interval, i, watch))
+
+        return [watch.result() for watch in watches]
+
+    def _poll(self, watch, branch, workflow):
+        """
+        Polls the run of a watch and its jobs and logs what changed.
+
+        :return: Whether the run completed
+        """
+        base = f"{self.config.url}/repos/{self.config.organization}/{watch.name}"
+
+        if watch.run_id is None:
+            path = "/actions/runs"
+
+            if workflow:
+                path = f"/actions/workflows/{workflow}/runs"
+
+            params = {"per_page": 1}
+
+            if branch:
+                params["branch"] = branch
+
+            runs, _ = self._get(
+                base + path, params, "GET /repos/{owner}/{repo}/actions/runs"
+            )
+
+            if not runs["workflow_runs"]:
+                logging.debug("%s has no runs yet.", watch.name)
+                watch.interval = self._backoff(
+                    max(watch.interval, self.queued_interval)
+                )
+                return False
+
+            watch.run_id = runs["workflow_runs"][0]["id"]
+
+        run_url = f"{base}/actions/runs/{watch.run_id}"
+        run, run_changed = self._get(
+            run_url, None, "GET /repos/{owner}/{repo}/actions/runs/{id}"
+        )
+        jobs, jobs_changed = self._get(
+            f"{run_url}/jobs",
+            {"per_page": 100},
+            "GET /repos/{owner}/{repo}/actions/runs/{id}/jobs",
+        )
+
+        if run_changed and run["status"] != watch.run.get("status"):
+            logging.info("%s: %s is %s.", watch.name, run["name"], _state(run))
+
+        for job in jobs["jobs"]:
+            state = _state(job)
+
+            if watch.jobs.get(job["id"]) != state:
+                watch.jobs[job["id"]] = state
+                logging.info("%s: %s is %s.", watch.name, job["name"], state)
+
+        watch.run = run
+
+        if run["status"] == "completed":
+            return True
+
+        if run["status"] in QUEUED_STATUSES:
+            base_interval = self.queued_interval
+        else:
+            base_interval = self.interval
+
+        if run_changed or jobs_changed:
+            watch.interval = base_interval
+        else:
+            watch.interval = self._backoff(max(watch.interval, base_interval))
+
+        return False
+
+    def _get(self, url, params, span_name):
+        """
+        Sends a conditional GET with the ETag of the last response to the same
+        request.
+
+        :raises GithubException: If Github answers with an error
+        :return: The body and whether it changed since the last request
+        """
+        key = (url, tuple(sorted((params or {}).items())))
+        cached = self._responses.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+
+        with tracer.span(span_name, "http") as span:
+            response = self.session.get(url, params=params, headers=headers)
+            span["status"] = response.status_code
+
+        if response.status_code == 304 and cached:
+            return cached[1], False
+
+        if response.status_code in (403, 429) and _retry_after(response):
+            raise _Throttled(_retry_after(response))
+
+        if not response.ok:
+            raise GithubException(response.status_code, response.json())
+
+        body = response.json()
+
+        if response.headers.get("ETag"):
+            self._responses[key] = (response.headers["ETag"], body)
+
+        return body, True
+
+    def _backoff(self, interval):
+        return min(interval * 1.5, self.max_interval)
+
+
+class ArtifactDownloader:
+    """
+    Downloads the artifacts of a workflow run in parallel. Archives are
+    streamed to disk, or extracted while they are downloaded, in chunks, so
+    memory stays bounded however large they are. Each artifact is checked
+    against its digest, and artifacts already in the folder with the same size
+    and digest are not downloaded again.
+    """
+
+    def __init__(self, config, parallelism=4, chunk_size=CHUNK_SIZE):
+        """
+        :param config: The GithubConfig of the organization
+        :param parallelism: The number of artifacts downloaded at once
+        :param chunk_size: The number of bytes read from the network at once
+        """
+        self.config = config
+        self.parallelism = parallelism
+        self.chunk_size = chunk_size
+        self.github = RLIGithub.shared(config)
+        self._manifest_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """A session for each thread, each with its own connection pool."""
+        return self.github.session
+
+    def latest_run(self, repo, branch=None):
+        """
+        :param repo: The name of the repository
+        :param branch: Only looks at runs of this branch
+        :raises GithubException: If Github answers with an error
+        :return: The ID of the latest completed run, or None
+        """
+        params = {"status": "completed", "per_page": 1}
+
+        if branch:
+            params["branch"] = branch
+
+        runs = self._get_json(
+            f"{self._repo_url(repo)}/actions/runs",
+            params,
+            "GET /repos/{owner}/{repo}/actions/runs",
+        )
+        return runs["workflow_runs"][0]["id"] if runs["workflow_runs"] else None
+
+    def list_artifacts(self, repo, run_id) -> list:
+        """
+        :param repo: The name of the repository
+        :param run_id: The ID of the run
+        :raises GithubException: If Github answers with an error
+        :return: The artifacts of the run
+        """
+        url = f"{self._repo_url(repo)}/actions/runs/{run_id}/artifacts"
+        params = {"per_page": 100}
+        artifacts = []
+
+        while url:
+            with tracer.span(
+                "GET /repos/{owner}/{repo}/actions/runs/{id}/artifacts", "http"
+            ) as span:
+                response = self.session.get(url, params=params)
+                span["status"] = response.status_code
+
+            if not response.ok:
+                raise GithubException(response.status_code, response.json())
+
+            artifacts += response.json()["artifacts"]
+            url = response.links.get("next", {}).get("url")
+            params = None
+
+        return artifacts
+
+    def download(self, artifacts, path, extract=False) -> list:
+        """
+        :param artifacts: The artifacts to download
+        :param path: The folder the artifacts are downloaded into, as
+        <name>.zip, or extracted into, as <name>/
+        :param extract: Extracts the archives instead of storing them
+        :return: A list of results with the name, action, size, duration and
+        error of each artifact
+        """
+        os.makedirs(path, exist_ok=True)
+        manifest_path = os.path.join(path, MANIFEST_FILE)
+
+        try:
+            with open(manifest_path, "r") as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            manifest = {}
+
+        with ThreadPoolExecutor(max_workers=self.parallelism) as executor:
+            results = list(
+                executor.map(
+                    lambda artifact: self.download_artifact(
+                        artifact, path, extract, manifest
+                    ),
+                    artifacts,
+                )
+            )
+
+        write_atomic(
+            manifest_path,
+            json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"),
+        )
+        return results
+
+    def download_artifact(self, artifact, path, extract, manifest):
+        """
+        Downloads one artifact and records it in the manifest if it succeeded.
+
+        :param artifact: The artifact
+        :param path: The download folder
+        :param extract: Extracts the archive instead of storing it
+        :param manifest: The manifest shared by the download
+        :return: The result of the download
+        """
+        name = artifact["name"]
+        target = os.path.join(path, name if extract else f"{name}.zip")
+        partial = f"{target}.part"
+        start = time.perf_counter()
+        entry = {
+            "id": artifact["id"],
+            "digest": artifact.get("digest"),
+            "size": artifact["size_in_bytes"],
+            "extracted": extract,
+        }
+
+        with self._manifest_lock:
+            recorded = manifest.get(name)
+
+        if self._is_current(recorded, entry, target):
+            return _download_result(name, SKIPPED, 0, start)
+
+        if artifact.get("expired"):
+            return _download_result(name, FAILED, 0, start, "The artifact expired.")
+
+        _remove(partial)
+
+        try:
+            size = self._stream(artifact, partial, extract)
+        except (requests.RequestException, GithubException, zipfile.BadZipFile) as e:
+            _remove(partial)
+            logging.error("Could not download %s: %s", name, e)
+            return _download_result(name, FAILED, 0, start, str(e))
+        except BaseException:
+            _remove(partial)
+            raise
+
+        _remove(target)
+        os.replace(partial, target)
+
+        with self._manifest_lock:
+            manifest[name] = entry
+
+        logging.debug("Downloaded %s.", name)
+        return _download_result(name, DOWNLOADED, size, start)
+
+    def _stream(self, artifact, partial, extract):
+        """
+        :raises GithubException: If Github answers with an error
+        :raises zipfile.BadZipFile: If the archive is invalid or does not match
+        its digest
+        :return: The number of bytes downloaded
+        """
+        digest = hashlib.sha256()
+        size = 0
+
+        if extract:
+            sink = ZipStreamExtractor(partial)
+            write = sink.feed
+        else:
+            sink = open(partial, "wb")
+            write = sink.write
+
+        try:
+            with tracer.span(
+                "GET /repos/{owner}/{repo}/actions/artifacts/{id}/zip",
+                "http",
+                artifact=artifact["name"],
+            ) as span:
+                with self.session.get(
+                    artifact["archive_download_url"], stream=True
+                ) as response:
+                    span["status"] = response.status_code
+
+                    if not response.ok:
+                        raise GithubException(response.status_code, None)
+
+                    for chunk in response.iter_content(self.chunk_size):
+                        digest.update(chunk)
+                        size += len(chunk)
+                        write(chunk)
+
+                span["bytes"] = size
+        finally:
+            sink.close()
+
+        expected = artifact.get("digest")
+
+        if expected and expected != f"sha256:{digest.hexdigest()}":
+            raise zipfile.BadZipFile("The archive does not match its digest.")
+
+        return size
+
+    @staticmethod
+    def _is_current(recorded, entry, target):
+        if recorded != entry:
+            return False
+
+        if entry["extracted"]:
+            return os.path.isdir(target)
+
+        return os.path.isfile(target) and os.path.getsize(target) == entry["size"]
+
+    def _get_json(self, url, params, span_name):
+        with tracer.span(span_name, "http") as span:
+            response = self.session.get(url, params=params)
+            span["status"] = response.status_code
+
+        if not response.ok:
+            raise GithubException(response.status_code, response.json())
+
+        return response.json()
+
+    def _repo_url(self, repo):
+        return f"{self.config.url}/repos/{self.config.organization}/{repo}"
+
+
+class _Watch:
+    def __init__(self, name, run_id, interval):
+        self.name = name
+        self.run_id = run_id
+        self.interval = interval
+        self.run = {}
+        self.jobs = {}
+        self.error = None
+
+    def result(self):
+        return {
+            "name": self.name,
+            "run_id": self.run_id,
+            "status": self.run.get("status"),
+            "conclusion": self.run.get("conclusion"),
+            "html_url": self.run.get("html_url"),
+            "error": self.error,
+        }
+
+
+class _Throttled(Exception):
+    def __init__(self, delay):
+        self.delay = delay
+
+
+def _state(run_or_job):
+    if run_or_job["status"] == "completed":
+        return run_or_job["conclusion"]
+
+    return run_or_job["status"].replace("_", " ")
+
+
+def _retry_after(response):
+    """:return: The seconds to wait before the next request, or None"""
+    if response.headers.get("Retry-After"):
+        return float(response.headers["Retry-After"])
+
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        reset = float(response.headers.get("X-RateLimit-Reset") or 0)
+        return max(reset - time.time(), 1)
+
+    return None
+
+
+def _download_result(name, action, size, start, error=None):
+    return {
+        "name": name,
+        "action": action,
+        "size": size,
+        "duration": round(time.perf_counter() - start, 3),
+        "error": error,
+    }
+
+
+def _remove(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
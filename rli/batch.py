@@ -0,0 +1,190 @@
+import io
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from rli.constants import ExitCode
+from rli.utils.logger import log_to
+
+
+class BatchRunner:
+    """
+    Runs a stream of rli operations in one process. Every line of the input is
+    a JSON object like {"id": "one", "argv": ["github", "create-repo", ...]} or
+    just the argv list. A result line is written for every operation as soon as
+    it finishes, so results are in completion order.
+
+    What an operation writes to stdout is captured into its result, and log
+    records are written to stderr during the batch, so the results stay
+    parseable when they are written to stdout too.
+    """
+
+    def __init__(self, dispatch, parallelism=4, validate=None):
+        """
+        :param dispatch: A function that runs an argv and returns its exit code
+        :param parallelism: The number of operations run at the same time
+        :param validate: A function that raises ValueError for an argv that can
+        not be dispatched
+        """
+        self.dispatch = dispatch
+        self.parallelism = max(1, parallelism)
+        self.validate = validate
+        self.output = None
+        self.exit_code = ExitCode.OK
+        self._lock = threading.Lock()
+        self._capture = None
+
+    def run(self, lines, output):
+        """
+        Runs every operation in the lines and writes NDJSON results.
+
+        :param lines: An iterable of JSON lines, read lazily
+        :param output: A text file the results are written to
+        :return: The exit code of the first failed operation, or ExitCode.OK
+        """
+        self.output = output
+        self.exit_code = ExitCode.OK
+        in_flight = threading.BoundedSemaphore(self.parallelism * 2)
+
+        def finished(future):
+            try:
+                self._write_result(future.result())
+            finally:
+                in_flight.release()
+
+        stdout = sys.stdout
+        self._capture = sys.stdout = _OutputCapture(stdout)
+
+        try:
+            with log_to(sys.stderr), ThreadPoolExecutor(
+                max_workers=self.parallelism
+            ) as executor:
+                for number, line in enumerate(lines, start=1):
+                    if not line.strip():
+                        continue
+
+                    in_flight.acquire()
+                    executor.submit(self.run_operation, number, line).add_done_callback(
+                        finished
+                    )
+        finally:
+            sys.stdout = stdout
+            self._capture = None
+
+        return self.exit_code
+
+    def run_operation(self, number, line):
+        """
+        Runs one operation.
+
+        :param number: The line number of the operation, used as its default id
+        :param line: The JSON line of the operation
+        :return: The result as a dict
+        """
+        start = time.perf_counter()
+        result = {"id": number}
+
+        try:
+            result["id"], result["argv"] = self.parse(number, line)
+        except ValueError as e:
+            result["exit_code"] = ExitCode.MISSING_ARG
+            result["error"] = str(e)
+            result["duration"] = round(time.perf_counter() - start, 6)
+            return result
+
+        if self._capture is not None:
+            self._capture.start()
+
+        try:
+            result["exit_code"] = self.dispatch(result["argv"])
+        except Exception as e:
+            logging.exception(f"Operation {result['id']} failed unexpectedly.")
+            result["exit_code"] = ExitCode.UNEXPECTED_ERROR
+            result["error"] = str(e)
+        finally:
+            if self._capture is not None:
+                output = self._capture.stop()
+
+                if output:
+                    result["output"] = output
+
+        result["duration"] = round(time.perf_counter() - start, 6)
+        return result
+
+    def parse(self, number, line):
+        """
+        :param number: The line number of the operation, used as its default id
+        :param line: The JSON line of the operation
+        :raises ValueError: If the operation is invalid
+        :return: A tuple of the id and argv of the operation
+        """
+        operation = json.loads(line)
+        operation_id = number
+
+        if isinstance(operation, dict):
+            operation_id = operation.get("id", number)
+            argv = operation.get("argv")
+        else:
+            argv = operation
+
+        if not isinstance(argv, list) or not argv:
+            raise ValueError("An operation must have a non-empty argv list.")
+
+        argv = [str(arg) for arg in argv]
+
+        if self.validate is not None:
+            self.validate(argv)
+
+        return operation_id, argv
+
+    def _write_result(self, result):
+        with self._lock:
+            self.output.write(json.dumps(result) + "\n")
+            self.output.flush()
+
+            if self.exit_code == ExitCode.OK:
+                self.exit_code = result["exit_code"]
+
+
+class _OutputCapture(io.TextIOBase):
+    """
+    Stands in for sys.stdout during a batch. Each thread that is running an
+    operation writes to a buffer of its own, other threads write through.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    @property
+    def encoding(self):
+        return getattr(self.stream, "encoding", "utf-8")
+
+    @property
+    def errors(self):
+        return getattr(self.stream, "errors", "strict")
+
+    def start(self):
+        self._local.buffer = io.StringIO()
+
+    def stop(self):
+        """:return: What the thread wrote since start"""
+        buffer = self._local.buffer
+        del self._local.buffer
+        return buffer.getvalue()
+
+    def writable(self):
+        return True
+
+    def isatty(self):
+        return False
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        return (self.stream if buffer is None else buffer).write(text)
+
+    def flush(self):
+        if getattr(self._local, "buffer", None) is None:
+            self.stream.flush()
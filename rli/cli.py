@@ -1,7 +1,13 @@
+import importlib
 import os
 import sys
 import click
 import logging
+from click.utils import make_default_short_help
+from rli.registry import registry
+from rli.utils.logger import setup_logger
+from rli.utils.profiler import PROFILE_MODES, profile
+from rli.utils.trace import tracer
 
 CONTEXT_SETTINGS = dict(auto_envvar_prefix="RLI")
 
@@ -10,21 +16,6 @@ def excepthook(type, value, traceback):
     print(value)
 
 
-def setup_logger():
-    root = logging.getLogger()
-    root.setLevel(logging.DEBUG)
-
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(logging.DEBUG)
-    formatter = logging.Formatter(
-        "%(asctime)s | %(name)s | %(levelname)s - %(message)s"
-    )
-    handler.setFormatter(formatter)
-    root.addHandler(handler)
-
-    sys.excepthook = excepthook
-
-
 class Environment(object):
     def __init__(self):
         self.verbose = False
@@ -43,27 +34,51 @@ class Environment(object):
 
 
 pass_environment = click.make_pass_decorator(Environment, ensure=True)
-cmd_folder = os.path.abspath(os.path.join(os.path.dirname(__file__), "commands"))
 
 
 class ComplexCLI(click.MultiCommand):
     def list_commands(self, ctx):
-        rv = []
-        for filename in os.listdir(cmd_folder):
-            if filename.endswith(".py") and filename.startswith("cmd_"):
-                rv.append(filename[4:-3])
-        rv.sort()
-        return rv
+        return registry.names()
 
     def get_command(self, ctx, name):
-        try:
-            if sys.version_info[0] == 2:
-                name = name.encode("ascii", "replace")
-            mod = __import__("rli.commands.cmd_{}".format(name), None, None, ["cli"])
-        except ImportError:
-            return
+        command = registry.get(name)
+
+        if command is None:
+            return None
+
+        mod = importlib.import_module(command["module"])
         return mod.cli
 
+    def format_commands(self, ctx, formatter):
+        """Lists the commands using the help text from the command index, so
+        --help does not import every command module."""
+        names = self.list_commands(ctx)
+
+        if not names:
+            return
+
+        limit = formatter.width - 6 - max(len(name) for name in names)
+        rows = [
+            (name, make_default_short_help(registry.get(name)["help"] or "", limit))
+            for name in names
+        ]
+
+        with formatter.section("Commands"):
+            formatter.write_dl(rows)
+
+    def invoke(self, ctx):
+        with tracer.span(" ".join(["rli"] + ctx.protected_args + ctx.args), "cli"):
+            mode = ctx.params.get("profile")
+
+            if not mode:
+                return super().invoke(ctx)
+
+            name = "-".join(ctx.protected_args[:1]) or "rli"
+            output = ctx.params.get("profile_output") or f"rli-{name}.pstats"
+
+            with profile(mode, output, ctx.params.get("profile_top")):
+                return super().invoke(ctx)
+
 
 @click.command(cls=ComplexCLI, context_settings=CONTEXT_SETTINGS)
 @click.option(
@@ -72,10 +87,36 @@ class ComplexCLI(click.MultiCommand):
     help="Changes the folder to operate on.",
 )
 @click.option("-v", "--verbose", is_flag=True, help="Enables verbose mode.")
+@click.option(
+    "--log-format",
+    type=click.Choice(["text", "json"]),
+    default="text",
+    help="Writes logs as text or as JSON lines.",
+)
+@click.option(
+    "--profile",
+    type=click.Choice(PROFILE_MODES),
+    default=None,
+    help="Profiles the command's CPU time with cProfile or its memory with "
+    "tracemalloc.",
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="The file the CPU profile is saved to. Defaults to rli-COMMAND.pstats.",
+)
+@click.option(
+    "--profile-top",
+    type=click.IntRange(min=1),
+    default=20,
+    help="The number of entries in the profile summary.",
+)
 @pass_environment
-def cli(ctx, verbose, home):
+def cli(ctx, verbose, home, log_format, profile, profile_output, profile_top):
     """A complex command line interface."""
-    setup_logger()
+    setup_logger(verbose, log_format)
+    sys.excepthook = excepthook
     ctx.verbose = verbose
     if home is not None:
         ctx.home = home
@@ -0,0 +1,124 @@
+"""
+The rli entry point. Commands are forwarded to a running `rli serve` daemon,
+which already has the command modules imported, and run in-process when no
+daemon is listening. Nothing heavier than the standard library is imported
+before that check.
+"""
+
+import array
+import json
+import os
+import socket
+import struct
+import sys
+from rli.constants import ExitCode
+
+SOCKET_ENV = "RLI_SOCKET"
+NO_DAEMON_ENV = "RLI_NO_DAEMON"
+
+HEADER = struct.Struct("!I")
+EXIT_CODE = struct.Struct("!i")
+INTERRUPT = b"\x03"
+
+
+def socket_path():
+    return os.environ.get(SOCKET_ENV) or os.path.join(
+        os.environ.get("RLI_DIR") or os.path.join(os.path.expanduser("~"), ".rli"),
+        "rli.sock",
+    )
+
+
+def forward(argv, path=None):
+    """
+    Runs the command in the daemon. The daemon is handed this process's stdin,
+    stdout and stderr, so output is written straight to them.
+
+    :param argv: The arguments to rli
+    :param path: The path of the daemon's socket
+    :return: The exit code of the command, or None if no daemon is listening
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        client.connect(path or socket_path())
+    except OSError:
+        client.close()
+        return None
+
+    with client:
+        payload = json.dumps(
+            {"argv": argv, "cwd": os.getcwd(), "env": dict(os.environ)}
+        ).encode("utf-8")
+        message = HEADER.pack(len(payload)) + payload
+
+        sent = client.sendmsg(
+            [message],
+            [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", [0, 1, 2]))],
+        )
+        client.sendall(message[sent:])
+
+        response = b""
+
+        while len(response) < EXIT_CODE.size:
+            try:
+                chunk = client.recv(EXIT_CODE.size - len(response))
+            except KeyboardInterrupt:
+                client.sendall(INTERRUPT)
+                continue
+
+            if not chunk:
+                return ExitCode.UNEXPECTED_ERROR
+
+            response += chunk
+
+        return EXIT_CODE.unpack(response)[0]
+
+
+def options_with_values():
+    """The global options of rli that take a value, from the command index."""
+    from rli.registry import registry
+
+    return {
+        opt
+        for option in registry.options
+        if not option["is_flag"] and not option["argument"]
+        for opt in option["opts"]
+    }
+
+
+def command_name(argv):
+    """
+    :param argv: The arguments to rli
+    :return: The command after the global options, or None if there is none
+    """
+    args = iter(argv)
+    with_values = None
+
+    for arg in args:
+        if arg == "--":
+            return next(args, None)
+
+        if not arg.startswith("-"):
+            return arg
+
+        if with_values is None:
+            with_values = options_with_values()
+
+        if arg in with_values:
+            next(args, None)
+
+    return None
+
+
+def main():
+    argv = sys.argv[1:]
+
+    if command_name(argv) != "serve" and not os.environ.get(NO_DAEMON_ENV):
+        exit_code = forward(argv)
+
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    from rli.cli import cli
+
+    cli()
@@ -0,0 +1,55 @@
+import click
+import sys
+from rli.batch import BatchRunner
+from rli.cli import CONTEXT_SETTINGS
+
+# Commands that cannot be run as an operation of a batch.
+EXCLUDED_COMMANDS = ("batch", "serve")
+
+
+@click.command(
+    "batch",
+    context_settings=CONTEXT_SETTINGS,
+    help="Runs the rli operations in OPERATIONS, one JSON object per line like "
+    '{"id": "one", "argv": ["github", "create-repo", "--repo-name", "one"]}, in '
+    "one process. Writes one JSON result per operation as each one finishes. Use "
+    "- to read operations from stdin.",
+)
+@click.argument("operations", type=click.File("r"))
+@click.option(
+    "--parallelism",
+    "-p",
+    default=4,
+    type=click.IntRange(min=1),
+    help="The number of operations to run at the same time.",
+)
+@click.option(
+    "--output",
+    "-o",
+    default="-",
+    type=click.File("w"),
+    help="The file to write results to. Defaults to stdout. What operations "
+    "write to stdout is captured into their results.",
+)
+@click.pass_context
+def cli(ctx, operations, parallelism, output):
+    root = ctx.find_root()
+
+    def validate(argv):
+        if argv[0] in EXCLUDED_COMMANDS:
+            raise ValueError(f"'{argv[0]}' cannot be run in a batch.")
+
+        if root.command.get_command(root, argv[0]) is None:
+            raise ValueError(f"No such command '{argv[0]}'.")
+
+    def dispatch(argv):
+        command = root.command.get_command(root, argv[0])
+
+        try:
+            command.main(args=argv[1:], prog_name=f"rli {argv[0]}")
+        except SystemExit as e:
+            return e.code if isinstance(e.code, int) else 1
+
+        return 0
+
+    sys.exit(BatchRunner(dispatch, parallelism, validate).run(operations, output))
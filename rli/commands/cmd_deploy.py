@@ -0,0 +1,208 @@
+import click
+import logging
+import os
+import sqlite3
+import sys
+from datetime import datetime
+from rli.cli import CONTEXT_SETTINGS
+from rli.config import get_rli_config_or_exit
+from rli.constants import ExitCode
+from rli.deploy import RLIDeploy
+from rli.deploy_ledger import DeployLedger
+from rli.docker import RLIDocker
+from rli.exceptions import (
+    InvalidRLIConfiguration,
+    RLIDockerException,
+    RLISecretsException,
+)
+
+DEFAULT_COMPOSE_FILE = "docker-compose.yml"
+
+# Like docker-compose, a project is named after the folder of its compose file.
+PROJECT_HELP = "The name of the project. Defaults to the compose file's folder name."
+
+
+@click.group(name="deploy", help="Contains all deploy commands for RLI.")
+@click.pass_context
+def cli(ctx):
+    # Click group for deploy commands
+    pass
+
+
+@cli.command(
+    name="up",
+    context_settings=CONTEXT_SETTINGS,
+    help="Pulls the images, runs docker-compose up with the secrets the compose "
+    "file uses and records the deploy in the deploy ledger.",
+)
+@click.option(
+    "--compose-file",
+    "-f",
+    default=DEFAULT_COMPOSE_FILE,
+    type=click.Path(exists=True, dir_okay=False),
+    help="The docker-compose file to deploy.",
+)
+@click.option(
+    "--image",
+    "-i",
+    multiple=True,
+    help="An image the compose file uses, relative to the registry. Multiple can "
+    "be specified.",
+)
+@click.option(
+    "--secret",
+    "-s",
+    multiple=True,
+    help="A secret to pass to docker-compose even though the compose file does "
+    "not use it. Multiple can be specified.",
+)
+@click.option("--project", default=None, help=PROJECT_HELP)
+@click.pass_context
+def up(ctx, compose_file, image, secret, project):
+    rli_config = get_rli_config_or_exit()
+    project = project or _default_project(compose_file)
+    # The ledger records each image of a deploy once.
+    images = list(dict.fromkeys(image))
+
+    _check_secrets_config(rli_config)
+
+    try:
+        docker_config = rli_config.docker_config
+        docker = RLIDocker(
+            docker_config.login, docker_config.password, docker_config.registry
+        )
+        deploy = RLIDeploy(docker, DeployLedger()).up(
+            project, compose_file, images, rli_config.get_secrets, secret
+        )
+    except InvalidRLIConfiguration:
+        logging.error("Your Docker RLI configuration is incorrect.")
+        sys.exit(ExitCode.INVALID_RLI_CONFIG)
+    except RLIDockerException as e:
+        logging.error(e.message)
+        sys.exit(ExitCode.DOCKER_ERROR)
+    except RLISecretsException as e:
+        logging.error(f"Could not read the secrets: {e.message}")
+        sys.exit(ExitCode.SECRETS_ERROR)
+    except sqlite3.Error:
+        logging.error("There was an error while writing to the deploy ledger.")
+        sys.exit(ExitCode.UNEXPECTED_ERROR)
+
+    _exit_with(deploy)
+
+
+@cli.command(
+    name="rollback",
+    context_settings=CONTEXT_SETTINGS,
+    help="Restores the previous deploy from the images still present locally, "
+    "without pulling from the registry.",
+)
+@click.option("--project", default=None, help=PROJECT_HELP)
+@click.option(
+    "--compose-file",
+    "-f",
+    default=DEFAULT_COMPOSE_FILE,
+    type=click.Path(dir_okay=False),
+    help="The docker-compose file the project was deployed from, which names "
+    "the default project.",
+)
+@click.option(
+    "--to",
+    "deploy_id",
+    default=None,
+    type=int,
+    help="The id of the deploy to restore. Defaults to the previous deploy.",
+)
+@click.pass_context
+def rollback(ctx, project, compose_file, deploy_id):
+    rli_config = get_rli_config_or_exit()
+    project = project or _default_project(compose_file)
+
+    _check_secrets_config(rli_config)
+
+    try:
+        docker_config = rli_config.docker_config
+        docker = RLIDocker(
+            docker_config.login,
+            docker_config.password,
+            docker_config.registry,
+            login=False,
+        )
+        deploy = RLIDeploy(docker, DeployLedger()).rollback(
+            project, rli_config.get_secrets, deploy_id
+        )
+    except InvalidRLIConfiguration:
+        logging.error("Your Docker RLI configuration is incorrect.")
+        sys.exit(ExitCode.INVALID_RLI_CONFIG)
+    except RLIDockerException as e:
+        logging.error(e.message)
+        sys.exit(ExitCode.DOCKER_ERROR)
+    except RLISecretsException as e:
+        logging.error(f"Could not read the secrets: {e.message}")
+        sys.exit(ExitCode.SECRETS_ERROR)
+    except sqlite3.Error:
+        logging.error("There was an error while reading the deploy ledger.")
+        sys.exit(ExitCode.UNEXPECTED_ERROR)
+
+    _exit_with(deploy)
+
+
+@cli.command(
+    name="history",
+    context_settings=CONTEXT_SETTINGS,
+    help="Lists the latest deploys of a project from the deploy ledger.",
+)
+@click.option("--project", default=None, help=PROJECT_HELP)
+@click.option(
+    "--compose-file",
+    "-f",
+    default=DEFAULT_COMPOSE_FILE,
+    type=click.Path(dir_okay=False),
+    help="The docker-compose file the project was deployed from, which names "
+    "the default project.",
+)
+@click.option("--limit", default=20, type=int, help="The number of deploys listed.")
+@click.pass_context
+def history(ctx, project, compose_file, limit):
+    project = project or _default_project(compose_file)
+
+    try:
+        deploys = DeployLedger().history(project, limit)
+    except sqlite3.Error:
+        logging.error("There was an error while reading the deploy ledger.")
+        sys.exit(ExitCode.UNEXPECTED_ERROR)
+
+    for deploy in deploys:
+        created_at = datetime.fromtimestamp(deploy["created_at"]).isoformat(
+            sep=" ", timespec="seconds"
+        )
+        click.echo(
+            f"{deploy['id']}\t{created_at}\t{deploy['kind']}\t{deploy['status']}"
+        )
+
+        for image in deploy["images"]:
+            click.echo(f"\t{image['image']}\t{image['digest'] or image['image_id']}")
+
+    sys.exit(ExitCode.OK)
+
+
+def _default_project(compose_file):
+    return os.path.basename(os.path.dirname(os.path.abspath(compose_file)))
+
+
+def _check_secrets_config(rli_config):
+    # Resolving the provider up front tells a bad secrets configuration apart
+    # from a bad Docker configuration, which raise the same exception.
+    try:
+        rli_config.secret_provider
+    except InvalidRLIConfiguration as e:
+        logging.error(f"Your secrets RLI configuration is incorrect: {e.message}")
+        sys.exit(ExitCode.INVALID_RLI_CONFIG)
+
+
+def _exit_with(deploy):
+    if deploy["exit_code"] != 0:
+        logging.error(f"docker-compose failed, deploy {deploy['id']} was recorded.")
+        sys.exit(ExitCode.DOCKER_ERROR)
+
+    logging.info(f"Deploy {deploy['id']} of {deploy['project']} succeeded.")
+    sys.exit(ExitCode.OK)
@@ -0,0 +1,431 @@
+import click
+import logging
+import sqlite3
+import sys
+from contextlib import nullcontext
+from rli.cli import CONTEXT_SETTINGS
+from rli.constants import ExitCode
+from rli.container_logs import BUFFER_SIZE, LogFollower
+from rli.container_stats import CSV, NDJSON, SAMPLES, StatsDump, StatsSampler
+from rli.deploy_ledger import DeployLedger
+from rli.docker import RLIDocker
+from rli.docker_engine import DockerEngine
+from rli.exceptions import RLIDockerException
+from rli.image_prune import FAILED, REMOVED, ImagePruner
+from rli.utils.durations import parse_duration, parse_since
+
+
+@click.group(name="docker", help="Contains all docker commands for RLI.")
+@click.pass_context
+def cli(ctx):
+    # Click group for docker commands
+    pass
+
+
+@cli.command(
+    name="export",
+    context_settings=CONTEXT_SETTINGS,
+    help="Saves images to a gzip file for hosts without registry access. The "
+    "images are compressed on several threads while docker save runs, and "
+    "layers they share are stored once.",
+)
+@click.argument("images", nargs=-1)
+@click.option(
+    "--output",
+    "-o",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="The file to write.",
+)
+@click.option(
+    "--level",
+    default=6,
+    type=click.IntRange(min=1, max=9),
+    help="The compression level.",
+)
+@click.option(
+    "--threads",
+    default=None,
+    type=click.IntRange(min=1),
+    help="The number of compression threads. Defaults to the number of CPUs.",
+)
+@click.pass_context
+def export(ctx, images, output, level, threads):
+    if not images or not output:
+        logging.error("You must provide images and an output file!")
+        sys.exit(ExitCode.MISSING_ARG)
+
+    try:
+        stats = RLIDocker.local().save(images, output, level, threads)
+    except RLIDockerException as e:
+        logging.error(e.message)
+        sys.exit(ExitCode.DOCKER_ERROR)
+
+    ratio = stats["bytes_written"] / stats["bytes_read"] if stats["bytes_read"] else 0
+    logging.info(
+        "Exported %d images with %d unique of %d layers to %s, %d bytes "
+        "compressed to %d (%.0f%%).",
+        stats["images"],
+        stats["unique_layers"],
+        stats["layers"],
+        output,
+        stats["bytes_read"],
+        stats["bytes_written"],
+        ratio * 100,
+    )
+    sys.exit(ExitCode.OK)
+
+
+@cli.command(
+    name="import",
+    context_settings=CONTEXT_SETTINGS,
+    help="Loads images from a file written by rli docker export, or from any "
+    "docker save tarball, compressed or not.",
+)
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--threads",
+    default=None,
+    type=click.IntRange(min=1),
+    help="The number of decompression threads. Defaults to the number of CPUs.",
+)
+@click.pass_context
+def import_(ctx, path, threads):
+    try:
+        images = RLIDocker.local().load(path, threads)
+    except RLIDockerException as e:
+        logging.error(e.message)
+        sys.exit(ExitCode.DOCKER_ERROR)
+
+    for image in images:
+        click.echo(image)
+
+    sys.exit(ExitCode.OK)
+
+
+@cli.command(
+    name="logs",
+    context_settings=CONTEXT_SETTINGS,
+    help="Shows the logs of many containers at once, each line prefixed with "
+    "the container name. All streams are read by one process.",
+)
+@click.argument("containers", nargs=-1)
+@click.option(
+    "--project",
+    default=None,
+    help="Shows the logs of the containers of this compose project.",
+)
+@click.option("--follow", "-f", is_flag=True, help="Keeps following the logs.")
+@click.option(
+    "--since",
+    default=None,
+    help="Only shows logs after a duration ago, e.g. 10m, a unix timestamp or "
+    "an ISO 8601 date.",
+)
+@click.option(
+    "--tail",
+    default=None,
+    type=click.IntRange(min=0),
+    help="Only shows this many lines of each container's history.",
+)
+@click.option(
+    "--buffer-size",
+    default=BUFFER_SIZE,
+    type=click.IntRange(min=256),
+    help="The most bytes buffered for each container. Longer lines are split.",
+)
+@click.pass_context
+def logs(ctx, containers, project, follow, since, tail, buffer_size):
+    if not containers and not project:
+        logging.error("You must provide containers or a project!")
+        sys.exit(ExitCode.MISSING_ARG)
+
+    try:
+        since = parse_since(since) if since else None
+    except ValueError:
+        logging.error("'%s' is not a duration, timestamp or ISO 8601 date.", since)
+        sys.exit(ExitCode.MISSING_ARG)
+
+    try:
+        engine = DockerEngine()
+        found = _find_containers(engine, containers, project)
+
+        if not found:
+            logging.error("There are no running containers to show logs of.")
+            sys.exit(ExitCode.DOCKER_ERROR)
+
+        output = click.get_binary_stream("stdout")
+        LogFollower(engine, output, buffer_size).follow(found, follow, since, tail)
+    except RLIDockerException as e:
+        logging.error(e.message)
+        sys.exit(ExitCode.DOCKER_ERROR)
+    except KeyboardInterrupt:
+        pass
+
+    sys.exit(ExitCode.OK)
+
+
+@cli.command(
+    name="stats",
+    context_settings=CONTEXT_SETTINGS,
+    help="Samples the CPU and memory use of the running containers of the "
+    "current deploys, or of the given containers, from the engine's stats "
+    "streams. Prints the median, 95th percentile and maximum of the last "
+    "samples of each container.",
+)
+@click.argument("containers", nargs=-1)
+@click.option(
+    "--project",
+    default=None,
+    help="Samples the containers of this compose project.",
+)
+@click.option(
+    "--duration",
+    default=None,
+    help="How long to sample for, e.g. 5m. Defaults to until interrupted.",
+)
+@click.option(
+    "--interval",
+    default=1.0,
+    type=click.FloatRange(min=1.0),
+    help="The fewest seconds between two samples of a container.",
+)
+@click.option(
+    "--samples",
+    default=SAMPLES,
+    type=click.IntRange(min=1),
+    help="The number of samples of each container the percentiles are "
+    "computed from.",
+)
+@click.option(
+    "--every",
+    default=10.0,
+    type=click.FloatRange(min=1.0),
+    help="The seconds between two reports while sampling.",
+)
+@click.option(
+    "--output",
+    "-o",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="A file every sample is written to.",
+)
+@click.option(
+    "--format",
+    "format_",
+    default=None,
+    type=click.Choice([CSV, NDJSON]),
+    help="The format of the output file. Defaults to ndjson for .ndjson and "
+    ".jsonl files, and csv otherwise.",
+)
+@click.pass_context
+def stats(
+    ctx, containers, project, duration, interval, samples, every, output, format_
+):
+    try:
+        duration = parse_duration(duration) if duration else None
+    except ValueError:
+        logging.error("'%s' is not a duration.", duration)
+        sys.exit(ExitCode.MISSING_ARG)
+
+    if output and format_ is None:
+        format_ = NDJSON if output.endswith((".ndjson", ".jsonl")) else CSV
+
+    try:
+        sampler = StatsSampler(DockerEngine(), samples, interval)
+
+        if containers or project:
+            found = _find_containers(sampler.engine, containers, project)
+        else:
+            found = _deployed_containers(sampler.engine)
+
+        if not found:
+            logging.error("There are no running containers to sample.")
+            sys.exit(ExitCode.DOCKER_ERROR)
+
+        with open(output, "w", newline="") if output else nullcontext() as file:
+            dump = StatsDump(file, format_) if file else None
+
+            try:
+                sampler.sample(found, duration, dump, _print_summary, every)
+            except KeyboardInterrupt:
+                pass
+    except RLIDockerException as e:
+        logging.error(e.message)
+        sys.exit(ExitCode.DOCKER_ERROR)
+    except OSError as e:
+        logging.error("Could not write the samples to %s: %s", output, e.strerror)
+        sys.exit(ExitCode.MISSING_ARG)
+    except sqlite3.Error:
+        logging.error("There was an error while reading the deploy ledger.")
+        sys.exit(ExitCode.UNEXPECTED_ERROR)
+
+    _print_summary(sampler.summary())
+    sys.exit(ExitCode.OK)
+
+
+def _find_containers(engine, names, project):
+    """:return: The running containers, after logging the names that match none"""
+    found, missing = engine.find_containers(names, project)
+
+    for name in missing:
+        logging.warning("No running container has the name or ID %s.", name)
+
+    return found
+
+
+def _deployed_containers(engine):
+    """:return: The running containers of the images of the current deploys"""
+    image_ids = _deployed_image_ids()
+    return [c for c in engine.containers() if c["ImageID"] in image_ids]
+
+
+def _deployed_image_ids(previous=False):
+    """
+    :param previous: Includes the images of the deploys a rollback would
+    restore
+    :return: The IDs of the images of each project's current deploy
+    """
+    ledger = DeployLedger()
+
+    try:
+        deploys = []
+
+        for project in ledger.projects():
+            deploys.append(ledger.current(project))
+
+            if previous:
+                deploys.append(ledger.previous(project))
+
+        return {
+            image["image_id"]
+            for deploy in deploys
+            if deploy is not None
+            for image in deploy["images"]
+        }
+    finally:
+        ledger.close()
+
+
+def _print_summary(rows):
+    click.echo(
+        "CONTAINER\tSAMPLES\tCPU P50\tCPU P95\tCPU MAX\tMEM P50\tMEM P95\t"
+        "MEM MAX\tMEM LIMIT"
+    )
+
+    for row in rows:
+        click.echo(
+            "\t".join(
+                [
+                    row["container"],
+                    str(row["samples"]),
+                    *(
+                        _percent(row[f"cpu_percent_{key}"])
+                        for key in ("p50", "p95", "max")
+                    ),
+                    *(_bytes(row[f"memory_{key}"]) for key in ("p50", "p95", "max")),
+                    _bytes(row["memory_limit"]),
+                ]
+            )
+        )
+
+
+def _percent(value):
+    return "-" if value is None else f"{value:.1f}%"
+
+
+def _bytes(value):
+    if value is None:
+        return "-"
+
+    for unit in ("B", "KiB", "MiB"):
+        if abs(value) < 1024:
+            return f"{value:.1f}{unit}"
+
+        value /= 1024
+
+    return f"{value:.2f}GiB"
+
+
+@cli.command(
+    name="prune",
+    context_settings=CONTEXT_SETTINGS,
+    help="Removes old images, keeping the newest of each repository, the "
+    "images used by containers and the images of the current and previous "
+    "deploy of each project.",
+)
+@click.option(
+    "--keep",
+    default=3,
+    type=click.IntRange(min=0),
+    help="The number of newest images kept in each repository.",
+)
+@click.option(
+    "--older-than",
+    default=None,
+    help="Only removes images created more than this long ago, e.g. 7d.",
+)
+@click.option(
+    "--parallelism",
+    "-p",
+    default=4,
+    type=click.IntRange(min=1),
+    help="The number of images removed at once.",
+)
+@click.option("--dry-run", is_flag=True, help="Lists the images without removing them.")
+@click.pass_context
+def prune(ctx, keep, older_than, parallelism, dry_run):
+    try:
+        older_than = parse_duration(older_than) if older_than else None
+    except ValueError:
+        logging.error("'%s' is not a duration.", older_than)
+        sys.exit(ExitCode.MISSING_ARG)
+
+    try:
+        pruner = ImagePruner(DockerEngine(), parallelism)
+        images = pruner.plan(keep, older_than, _deployed_image_ids(previous=True))
+
+        if dry_run:
+            reclaimable = pruner.unique_size(images)
+        else:
+            # Images share layers, so what is reclaimed is measured on disk.
+            before = pruner.layers_size()
+            results = pruner.prune(images)
+            reclaimed = max(before - pruner.layers_size(), 0)
+    except RLIDockerException as e:
+        logging.error(e.message)
+        sys.exit(ExitCode.DOCKER_ERROR)
+    except sqlite3.Error:
+        logging.error("There was an error while reading the deploy ledger.")
+        sys.exit(ExitCode.UNEXPECTED_ERROR)
+
+    if dry_run:
+        for image in images:
+            click.echo(_image_line("remove", image["Id"], image["Size"]))
+
+        logging.info(
+            "Would remove %d images, reclaiming at least %s.",
+            len(images),
+            _bytes(reclaimable),
+        )
+        sys.exit(ExitCode.OK)
+    else:
+        for result in results:
+            click.echo(_image_line(result["status"], result["id"], result["size"]))
+
+            if result["error"]:
+                logging.error("Could not remove %s: %s", result["id"], result["error"])
+
+        removed = [result for result in results if result["status"] == REMOVED]
+        logging.info(
+            "Removed %d images, reclaiming %s.", len(removed), _bytes(reclaimed)
+        )
+
+        if any(result["status"] == FAILED for result in results):
+            sys.exit(ExitCode.DOCKER_ERROR)
+
+        sys.exit(ExitCode.OK)
+
+
+def _image_line(status, image_id, size):
+    return f"{status}\t{image_id}\t{_bytes(size)}"
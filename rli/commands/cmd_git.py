@@ -0,0 +1,107 @@
+import click
+import logging
+import os
+import sys
+from collections import Counter
+from rli.cli import CONTEXT_SETTINGS
+from rli.completion import record_repos
+from rli.config import get_rli_config_or_exit
+from rli.constants import ExitCode
+from rli.exceptions import InvalidRLIConfiguration
+from rli.git import FAILED, RLIGit
+from rli.github import RLIGithub
+from github import GithubException
+
+
+@click.group(name="git", help="Contains all git commands for RLI.")
+@click.pass_context
+def cli(ctx):
+    # Click group for git commands
+    pass
+
+
+@cli.command(
+    name="sync",
+    context_settings=CONTEXT_SETTINGS,
+    help="Clones or fetches every repo of your organization in parallel. Repos "
+    "that were not pushed to since the last sync are skipped.",
+)
+@click.option(
+    "--root",
+    default=".",
+    type=click.Path(file_okay=False),
+    help="The folder the repos are cloned into.",
+)
+@click.option(
+    "--reference",
+    default=None,
+    type=click.Path(file_okay=False),
+    help="A local repo whose objects are shared instead of downloaded again.",
+)
+@click.option(
+    "--depth",
+    default=None,
+    type=int,
+    help="Makes shallow clones with this many commits.",
+)
+@click.option(
+    "--filter",
+    "clone_filter",
+    default="blob:none",
+    help="The partial clone filter, or none for full clones. Ignored with --depth.",
+)
+@click.option("--bare", is_flag=True, help="Makes bare mirrors of the repos.")
+@click.option(
+    "--parallelism",
+    "-p",
+    default=8,
+    type=click.IntRange(min=1),
+    help="The number of repos synced at once.",
+)
+@click.pass_context
+def sync(ctx, root, reference, depth, clone_filter, bare, parallelism):
+    rli_config = get_rli_config_or_exit()
+
+    try:
+        github_config = rli_config.github_config
+        repos = RLIGithub.shared(github_config).list_repos()
+    except InvalidRLIConfiguration:
+        logging.error("Your Github RLI configuration is incorrect.")
+        sys.exit(ExitCode.INVALID_RLI_CONFIG)
+    except GithubException:
+        logging.error("There was an error while listing repos.")
+        sys.exit(ExitCode.GITHUB_ERROR)
+
+    try:
+        record_repos([repo.name for repo in repos])
+    except OSError:
+        logging.debug("Could not save the repo names for shell completion.")
+
+    git = RLIGit(
+        root,
+        reference=os.path.abspath(reference) if reference else None,
+        depth=depth,
+        clone_filter=None if clone_filter == "none" else clone_filter,
+        bare=bare,
+        parallelism=parallelism,
+        login=github_config.login,
+        password=github_config.password,
+    )
+    results = git.sync(
+        [
+            {
+                "name": repo.name,
+                "clone_url": repo.clone_url,
+                "pushed_at": repo.pushed_at.isoformat() if repo.pushed_at else None,
+            }
+            for repo in repos
+        ]
+    )
+
+    counts = Counter(result["action"] for result in results)
+    logging.info(
+        f"Cloned {counts['cloned']}, fetched {counts['fetched']}, skipped "
+        f"{counts['skipped']} and failed {counts['failed']} repos."
+    )
+
+    sys.exit(ExitCode.GIT_ERROR if counts[FAILED] else ExitCode.OK)
@@ -1,11 +1,26 @@
 import click
+import sqlite3
 import sys
 import logging
 from rli.cli import CONTEXT_SETTINGS
-from rli.github import RLIGithub
+from rli.completion import record_repos
+from rli.github import UPLOADED, RLIGithub, duplicate_asset_names
+from rli.actions import (
+    FAILED,
+    PASSING_CONCLUSIONS,
+    ArtifactDownloader,
+    RunWatcher,
+)
 from rli.config import get_rli_config_or_exit
 from rli.constants import ExitCode
-from rli.exceptions import InvalidRLIConfiguration
+from rli.exceptions import (
+    InvalidRLIConfiguration,
+    RLIGitException,
+    RLISecretsException,
+)
+from rli.git import PUSHED, RepoTemplate
+from rli.inventory import RepoInventory
+from rli.utils.durations import parse_timestamp
 from github import GithubException
 
 
@@ -21,17 +36,373 @@ def cli(cts):
     context_settings=CONTEXT_SETTINGS,
     help="Creates a repo with the given information",
 )
-@click.option("--repo-name", default=None)
+@click.option(
+    "--repo-name",
+    default=None,
+    multiple=True,
+    help="The name of the repo. Multiple can be specified.",
+)
 @click.option("--repo-description", default=None)
 @click.option("--private", default="false")
+@click.option(
+    "--template",
+    default=None,
+    type=click.Path(exists=True, file_okay=False),
+    help="A folder whose files become the first commit of every new repo. The "
+    "commit is built once and pushed to the repos in parallel.",
+)
+@click.option(
+    "--parallelism",
+    "-p",
+    default=8,
+    type=click.IntRange(min=1),
+    help="The number of template pushes run at once.",
+)
 @click.pass_context
-def create_repo(ctx, repo_name, repo_description, private):
-    repo = RLIGithub(get_rli_config_or_exit().github_config).create_repo(
-        repo_name, repo_description, private
+def create_repo(ctx, repo_name, repo_description, private, template, parallelism):
+    if not repo_name:
+        logging.error("You must provide a repo name!")
+        sys.exit(ExitCode.MISSING_ARG)
+
+    github_config = get_rli_config_or_exit().github_config
+    github = RLIGithub.shared(github_config)
+    repos = []
+
+    for name in repo_name:
+        if template:
+            repo = github.create_repo(name, repo_description, private, auto_init=False)
+        else:
+            repo = github.create_repo(name, repo_description, private)
+
+        if repo:
+            logging.info(f"Here is your new repo:\n{str(repo)}")
+            repos.append(repo)
+
+    pushed = True
+
+    if template and repos:
+        pushed = _push_template(template, repos, github_config, parallelism)
+
+    if len(repos) != len(repo_name):
+        sys.exit(ExitCode.GITHUB_ERROR)
+    elif not pushed:
+        sys.exit(ExitCode.GIT_ERROR)
+    else:
+        sys.exit(ExitCode.OK)
+
+
+@cli.command(
+    name="list-repos",
+    context_settings=CONTEXT_SETTINGS,
+    help="Lists the repos of your organization and remembers their names for "
+    "shell completion.",
+)
+@click.pass_context
+def list_repos(ctx):
+    try:
+        repos = RLIGithub.shared(get_rli_config_or_exit().github_config).list_repos()
+    except GithubException:
+        logging.error("There was an error while listing repos.")
+        sys.exit(ExitCode.GITHUB_ERROR)
+
+    names = [repo.name for repo in repos]
+
+    for name in sorted(names):
+        click.echo(name)
+
+    try:
+        record_repos(names)
+    except OSError:
+        logging.debug("Could not save the repo names for shell completion.")
+
+    sys.exit(ExitCode.OK)
+
+
+@cli.command(
+    name="find",
+    context_settings=CONTEXT_SETTINGS,
+    help="Finds repos of your organization by name in the local inventory. "
+    "Names that start with the query come first, then names that contain it, "
+    "then fuzzy matches.",
+)
+@click.argument("query")
+@click.option(
+    "--refresh",
+    is_flag=True,
+    help="Brings the inventory up to date first. Only repos updated since the "
+    "last refresh are fetched.",
+)
+@click.option(
+    "--full",
+    is_flag=True,
+    help="Rebuilds the inventory from every repo, dropping deleted ones.",
+)
+@click.option(
+    "--limit",
+    default=20,
+    type=click.IntRange(min=1),
+    help="The number of repos shown.",
+)
+@click.pass_context
+def find(ctx, query, refresh, full, limit):
+    inventory = RepoInventory(get_rli_config_or_exit().github_config)
+
+    try:
+        if refresh or full or inventory.refreshed_at() is None:
+            inventory.refresh(full=full)
+
+            try:
+                record_repos([repo["name"] for repo in inventory.all()])
+            except OSError:
+                logging.debug("Could not save the repo names for shell completion.")
+
+        repos = inventory.find(query, limit)
+    except GithubException:
+        logging.error("There was an error while refreshing the inventory.")
+        sys.exit(ExitCode.GITHUB_ERROR)
+    finally:
+        inventory.close()
+
+    for repo in repos:
+        click.echo(
+            f"{repo['name']}\t{repo['id']}\t{repo['visibility'] or ''}\t"
+            f"{repo['default_branch'] or ''}"
+        )
+
+    if not repos:
+        logging.info("No repos match '%s'.", query)
+
+    sys.exit(ExitCode.OK)
+
+
+@cli.command(
+    name="watch-runs",
+    context_settings=CONTEXT_SETTINGS,
+    help="Watches the latest workflow run of each repo until it completes and "
+    "exits with its conclusion. Polls that find nothing changed do not use "
+    "rate limit quota.",
+)
+@click.option(
+    "--repo-name",
+    default=None,
+    multiple=True,
+    help="The name of the repo. Multiple can be specified.",
+)
+@click.option(
+    "--run-id",
+    default=None,
+    type=int,
+    help="The run to watch instead of the latest one. Needs a single repo.",
+)
+@click.option("--branch", default=None, help="Only watches runs of this branch.")
+@click.option(
+    "--workflow",
+    default=None,
+    help="Only watches runs of this workflow file name or ID.",
+)
+@click.option(
+    "--interval",
+    default=5.0,
+    type=click.FloatRange(min=1),
+    help="The seconds between polls of a run that is in progress. Queued runs "
+    "and runs that do not change are polled less often.",
+)
+@click.pass_context
+def watch_runs(ctx, repo_name, run_id, branch, workflow, interval):
+    if not repo_name:
+        logging.error("You must provide a repo name!")
+        sys.exit(ExitCode.MISSING_ARG)
+
+    if run_id is not None and len(repo_name) > 1:
+        logging.error("--run-id can only be used with one repo.")
+        sys.exit(ExitCode.MISSING_ARG)
+
+    watcher = RunWatcher(
+        get_rli_config_or_exit().github_config,
+        interval=interval,
+        queued_interval=interval * 3,
     )
+    results = watcher.watch(repo_name, run_id, branch, workflow)
+
+    for result in results:
+        click.echo(
+            f"{result['name']}\t{result['conclusion'] or result['error']}\t"
+            f"{result['html_url'] or ''}"
+        )
 
-    if repo:
-        logging.info(f"Here is your new repo:\n{str(repo)}")
+    if any(result["error"] for result in results):
+        sys.exit(ExitCode.GITHUB_ERROR)
+    elif any(result["conclusion"] not in PASSING_CONCLUSIONS for result in results):
+        sys.exit(ExitCode.RUN_FAILED)
+    else:
+        sys.exit(ExitCode.OK)
+
+
+@cli.command(
+    name="download-artifacts",
+    context_settings=CONTEXT_SETTINGS,
+    help="Downloads the artifacts of a workflow run in parallel. Artifacts that "
+    "were already downloaded with the same size and digest are skipped.",
+)
+@click.option("--repo-name", default=None, help="The name of the repo.")
+@click.option(
+    "--run-id",
+    default=None,
+    type=int,
+    help="The run whose artifacts are downloaded. Defaults to the latest "
+    "completed run.",
+)
+@click.option("--branch", default=None, help="Uses the latest run of this branch.")
+@click.option(
+    "--name",
+    "-n",
+    multiple=True,
+    help="The artifact to download. Multiple can be specified. If none are "
+    "specified, all will be downloaded.",
+)
+@click.option(
+    "--path",
+    default=".",
+    type=click.Path(file_okay=False),
+    help="The folder the artifacts are downloaded into.",
+)
+@click.option(
+    "--extract",
+    is_flag=True,
+    help="Extracts each artifact into a folder while it is downloaded instead "
+    "of storing the zip archive.",
+)
+@click.option(
+    "--parallelism",
+    "-p",
+    default=4,
+    type=click.IntRange(min=1),
+    help="The number of artifacts downloaded at once.",
+)
+@click.pass_context
+def download_artifacts(
+    ctx, repo_name, run_id, branch, name, path, extract, parallelism
+):
+    if not repo_name:
+        logging.error("You must provide a repo name!")
+        sys.exit(ExitCode.MISSING_ARG)
+
+    downloader = ArtifactDownloader(get_rli_config_or_exit().github_config, parallelism)
+
+    try:
+        if run_id is None:
+            run_id = downloader.latest_run(repo_name, branch)
+
+        if run_id is None:
+            logging.error("%s has no completed runs.", repo_name)
+            sys.exit(ExitCode.GITHUB_ERROR)
+
+        artifacts = downloader.list_artifacts(repo_name, run_id)
+    except GithubException:
+        logging.error("There was an error while listing the artifacts.")
+        sys.exit(ExitCode.GITHUB_ERROR)
+
+    if name:
+        missing = sorted(set(name) - {artifact["name"] for artifact in artifacts})
+
+        if missing:
+            logging.error(
+                "Run %s has no artifacts named %s.", run_id, ", ".join(missing)
+            )
+            sys.exit(ExitCode.MISSING_ARG)
+
+        artifacts = [artifact for artifact in artifacts if artifact["name"] in name]
+
+    results = downloader.download(artifacts, path, extract)
+
+    for result in results:
+        click.echo(
+            f"{result['name']}\t{result['action']}\t{result['size']}\t"
+            f"{result['duration']:.3f}s"
+        )
+
+    if any(result["action"] == FAILED for result in results):
+        sys.exit(ExitCode.GITHUB_ERROR)
+    else:
+        sys.exit(ExitCode.OK)
+
+
+@cli.command(
+    name="release",
+    context_settings=CONTEXT_SETTINGS,
+    help="Creates a release and uploads the given files to it in parallel. "
+    "Files are streamed from disk and failed uploads are retried.",
+)
+@click.argument("assets", nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.option("--repo-name", default=None, help="The name of the repo.")
+@click.option("--tag", default=None, help="The tag of the release.")
+@click.option("--name", default=None, help="The name of the release.")
+@click.option("--notes", default="", help="The release notes.")
+@click.option(
+    "--target",
+    default=None,
+    help="The branch or commit the tag is created from if it does not exist.",
+)
+@click.option("--draft", is_flag=True, help="Creates a draft release.")
+@click.option("--prerelease", is_flag=True, help="Marks the release as a prerelease.")
+@click.option(
+    "--parallelism",
+    "-p",
+    default=4,
+    type=click.IntRange(min=1),
+    help="The number of files uploaded at once.",
+)
+@click.option(
+    "--retries",
+    default=3,
+    type=click.IntRange(min=0),
+    help="The number of times a failed upload is retried.",
+)
+@click.pass_context
+def release(
+    ctx,
+    assets,
+    repo_name,
+    tag,
+    name,
+    notes,
+    target,
+    draft,
+    prerelease,
+    parallelism,
+    retries,
+):
+    if not repo_name or not tag:
+        logging.error("You must provide a repo name and a tag!")
+        sys.exit(ExitCode.MISSING_ARG)
+
+    duplicates = duplicate_asset_names(assets)
+
+    if duplicates:
+        logging.error("Assets must have different names: %s", ", ".join(duplicates))
+        sys.exit(ExitCode.MISSING_ARG)
+
+    github = RLIGithub.shared(get_rli_config_or_exit().github_config)
+
+    try:
+        created = github.create_release(
+            repo_name, tag, name, notes, draft, prerelease, target
+        )
+    except GithubException:
+        logging.error("There was an error while creating the release.")
+        sys.exit(ExitCode.GITHUB_ERROR)
+
+    logging.info("Created release %s: %s", tag, created["html_url"])
+    results = github.upload_release_assets(created, assets, parallelism, retries)
+
+    for result in results:
+        click.echo(
+            f"{result['name']}\t{result['action']}\t{result['size']}\t"
+            f"{result['duration']:.3f}s\t{result['throughput'] / 1e6:.2f} MB/s\t"
+            f"{result['attempts']}"
+        )
+
+    if all(result["action"] == UPLOADED for result in results):
         sys.exit(ExitCode.OK)
     else:
         sys.exit(ExitCode.GITHUB_ERROR)
@@ -55,8 +426,14 @@ def create_repo(ctx, repo_name, repo_description, private):
     help="The secret to be added to the repo. Multiple can be specified. If "
     "none are specified, all will be added.",
 )
+@click.option(
+    "--changed-since",
+    default=None,
+    help="Only add secrets from the secret store that changed after this unix "
+    "timestamp or ISO 8601 date.",
+)
 @click.pass_context
-def add_secrets(ctx, repo_name, secret):
+def add_secrets(ctx, repo_name, secret, changed_since):
     if not repo_name:
         logging.error("You must provide a repo name!")
         sys.exit(ExitCode.MISSING_ARG)
@@ -64,8 +441,25 @@ def add_secrets(ctx, repo_name, secret):
     rli_config = get_rli_config_or_exit()
 
     try:
-        RLIGithub(rli_config.github_config).add_secrets(
-            repo_name, secret, rli_config.rli_secrets
+        if changed_since is not None:
+            secret, secrets = _changed_secrets(rli_config, secret, changed_since)
+        elif secret:
+            secrets = rli_config.get_secrets(secret)
+        else:
+            secrets = rli_config.rli_secrets
+    except InvalidRLIConfiguration as e:
+        logging.error("Your secrets RLI configuration is incorrect: %s", e.message)
+        sys.exit(ExitCode.INVALID_RLI_CONFIG)
+    except RLISecretsException as e:
+        logging.error("Could not read the secrets: %s", e.message)
+        sys.exit(ExitCode.SECRETS_ERROR)
+    except sqlite3.Error:
+        logging.error("There was an error while reading the secret store.")
+        sys.exit(ExitCode.SECRETS_ERROR)
+
+    try:
+        RLIGithub.shared(rli_config.github_config).add_secrets(
+            repo_name, secret, secrets
         )
     except InvalidRLIConfiguration:
         logging.error("Your Github RLI configuration is incorrect.")
@@ -79,3 +473,45 @@ def add_secrets(ctx, repo_name, secret):
 
     logging.info("Successfully added all secrets to your repo.")
     sys.exit(ExitCode.OK)
+
+
+def _changed_secrets(rli_config, secret, changed_since):
+    try:
+        timestamp = parse_timestamp(changed_since)
+    except ValueError:
+        logging.error("'%s' is not a timestamp or ISO 8601 date.", changed_since)
+        sys.exit(ExitCode.MISSING_ARG)
+
+    if rli_config.secrets_backend != "store":
+        logging.error("--changed-since needs the store secrets backend.")
+        sys.exit(ExitCode.INVALID_RLI_CONFIG)
+
+    secrets = rli_config.secret_store.changed_since(timestamp)
+
+    if secret:
+        secrets = {key: secrets[key] for key in secret if key in secrets}
+
+    if not secrets:
+        logging.info("No secrets changed since then.")
+        sys.exit(ExitCode.OK)
+
+    return tuple(secrets), secrets
+
+
+def _push_template(template, repos, github_config, parallelism):
+    try:
+        with RepoTemplate(
+            template, github_config.login, github_config.password, parallelism
+        ) as repo_template:
+            repo_template.build()
+            results = repo_template.push(
+                {
+                    repo.name: (repo.clone_url, repo.default_branch or "main")
+                    for repo in repos
+                }
+            )
+    except RLIGitException as e:
+        logging.error("Could not build the template commit: %s", e.message)
+        return False
+
+    return all(result["action"] == PUSHED for result in results)
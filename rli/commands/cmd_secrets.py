@@ -0,0 +1,128 @@
+import click
+import logging
+import sqlite3
+import sys
+from rli.cli import CONTEXT_SETTINGS
+from rli.config import get_rli_config_or_exit
+from rli.constants import ExitCode
+from rli.utils.durations import parse_timestamp
+
+
+@click.group(name="secrets", help="Contains all commands for the secret store.")
+@click.pass_context
+def cli(ctx):
+    # Click group for secret store commands
+    pass
+
+
+@cli.command(
+    name="import",
+    context_settings=CONTEXT_SETTINGS,
+    help="Imports a secrets file, ~/.rli/secrets.json by default, into the "
+    "secret store. Only secrets whose value changed get a new timestamp.",
+)
+@click.argument("path", required=False, type=click.Path(dir_okay=False))
+@click.option(
+    "--namespace",
+    default=None,
+    help="The namespace to import into. Defaults to the configured namespace.",
+)
+@click.pass_context
+def import_secrets(ctx, path, namespace):
+    rli_config = get_rli_config_or_exit()
+    store = _store(rli_config, namespace)
+    path = path or f"{rli_config.home_dir}/.rli/secrets.json"
+
+    try:
+        changed = store.import_json(path)
+    except OSError:
+        logging.error(f"Could not read {path}.")
+        sys.exit(ExitCode.MISSING_ARG)
+    except ValueError as e:
+        logging.error(f"Could not import {path}: {e}")
+        sys.exit(ExitCode.INVALID_RLI_CONFIG)
+    except sqlite3.Error:
+        logging.error("There was an error while writing to the secret store.")
+        sys.exit(ExitCode.UNEXPECTED_ERROR)
+
+    logging.info(
+        f"Imported {path} into namespace '{store.namespace}', {changed} secrets changed."
+    )
+    sys.exit(ExitCode.OK)
+
+
+@cli.command(
+    name="set",
+    context_settings=CONTEXT_SETTINGS,
+    help="Adds or updates a secret in the secret store.",
+)
+@click.argument("key")
+@click.option(
+    "--value",
+    prompt=True,
+    hide_input=True,
+    help="The value of the secret. Prompted for if not given.",
+)
+@click.option(
+    "--namespace",
+    default=None,
+    help="The namespace of the secret. Defaults to the configured namespace.",
+)
+@click.pass_context
+def set_secret(ctx, key, value, namespace):
+    store = _store(get_rli_config_or_exit(), namespace)
+
+    try:
+        changed = store.set(key, value)
+    except sqlite3.Error:
+        logging.error("There was an error while writing to the secret store.")
+        sys.exit(ExitCode.UNEXPECTED_ERROR)
+
+    if changed:
+        logging.info(f"Saved '{key}' in namespace '{store.namespace}'.")
+    else:
+        logging.info(f"'{key}' already has this value.")
+
+    sys.exit(ExitCode.OK)
+
+
+@cli.command(
+    name="list",
+    context_settings=CONTEXT_SETTINGS,
+    help="Lists the keys in the secret store.",
+)
+@click.option(
+    "--namespace",
+    default=None,
+    help="The namespace to list. Defaults to the configured namespace.",
+)
+@click.option(
+    "--changed-since",
+    default=None,
+    help="Only list secrets changed after this unix timestamp or ISO 8601 date.",
+)
+@click.pass_context
+def list_secrets(ctx, namespace, changed_since):
+    store = _store(get_rli_config_or_exit(), namespace)
+
+    try:
+        if changed_since is None:
+            keys = store.keys()
+        else:
+            keys = list(store.changed_since(parse_timestamp(changed_since)))
+    except ValueError:
+        logging.error(f"'{changed_since}' is not a timestamp or ISO 8601 date.")
+        sys.exit(ExitCode.MISSING_ARG)
+    except sqlite3.Error:
+        logging.error("There was an error while reading the secret store.")
+        sys.exit(ExitCode.UNEXPECTED_ERROR)
+
+    for key in keys:
+        click.echo(key)
+
+    sys.exit(ExitCode.OK)
+
+
+def _store(rli_config, namespace):
+    store = rli_config.secret_store
+    return store.namespaced(namespace) if namespace else store
@@ -0,0 +1,31 @@
+import click
+import logging
+import sys
+from rli.cli import CONTEXT_SETTINGS
+from rli.constants import ExitCode
+from rli.daemon import RLIDaemon
+
+
+@click.command(
+    "serve",
+    context_settings=CONTEXT_SETTINGS,
+    help="Runs the RLI daemon, which keeps RLI loaded so that other rli commands "
+    "start instantly.",
+)
+@click.option(
+    "--socket",
+    "socket_path",
+    default=None,
+    help="The unix socket to listen on. Defaults to ~/.rli/rli.sock.",
+)
+@click.pass_context
+def cli(ctx, socket_path):
+    try:
+        RLIDaemon(socket_path).serve_forever()
+    except KeyboardInterrupt:
+        logging.info("RLI daemon stopped.")
+    except OSError:
+        logging.exception("Could not start the RLI daemon.")
+        sys.exit(ExitCode.UNEXPECTED_ERROR)
+
+    sys.exit(ExitCode.OK)
@@ -0,0 +1,240 @@
+"""
+Shell completion for rli that answers from a cached index instead of importing
+rli.cli and the command modules. Enable it in bash with:
+
+    eval "$(rli-complete --script)"
+
+Only the standard library is imported on the completion path. The cache is
+refreshed by a detached `python -m rli.completion --refresh` process whenever it
+is older than the files it was built from.
+"""
+
+import json
+import os
+import sys
+import time
+
+REFRESH_INTERVAL = 300
+LOCK_TIMEOUT = 30
+
+# Options whose values are completed with repo names or secret keys.
+REPO_OPTIONS = ("--repo-name",)
+SECRET_OPTIONS = ("--secret", "-s")
+
+BASH_SCRIPT = """_rli_completion() {
+    local IFS=$'\\n'
+    COMPREPLY=( $(env COMP_WORDS="${COMP_WORDS[*]}" COMP_CWORD=$COMP_CWORD rli-complete) )
+}
+complete -o default -F _rli_completion rli
+"""
+
+
+def _rli_dir():
+    # Mirrors rli.utils.paths.rli_dir without importing the rli package.
+    return os.environ.get("RLI_DIR") or os.path.join(os.path.expanduser("~"), ".rli")
+
+
+def cache_path():
+    return os.path.join(_rli_dir(), "cache", "completion.json")
+
+
+def repos_path():
+    return os.path.join(_rli_dir(), "cache", "repos.json")
+
+
+def load_cache():
+    try:
+        with open(cache_path(), "r") as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+
+
+def is_stale(cache):
+    """
+    Checks if the cache is older than the refresh interval or than any of the
+    files it is built from. Command files are compared by the fingerprint of
+    the command index, as editing a file does not change its folder's mtime.
+    """
+    from rli.registry import registry
+
+    built_at = cache.get("built_at", 0)
+
+    if time.time() - built_at > REFRESH_INTERVAL:
+        return True
+
+    if cache.get("fingerprint") != registry.fingerprint():
+        return True
+
+    for path in (os.path.join(_rli_dir(), "secrets.json"), repos_path()):
+        try:
+            if os.stat(path).st_mtime > built_at:
+                return True
+        except OSError:
+            pass
+
+    return False
+
+
+def build_cache():
+    """
+    Builds the completion cache from the command index, the last org listing and
+    the key names in ~/.rli/secrets.json.
+
+    :return: The cache as a dict
+    """
+    from rli.registry import registry
+    from rli.utils.paths import write_atomic
+
+    cache = {
+        "built_at": time.time(),
+        "fingerprint": registry.fingerprint(),
+        "root": {"options": registry.options, "commands": registry.commands},
+        "repos": _load_json_list(repos_path()),
+        "secrets": sorted(_load_json_keys(os.path.join(_rli_dir(), "secrets.json"))),
+    }
+
+    write_atomic(cache_path(), json.dumps(cache).encode("utf-8"), mode=0o600)
+    return cache
+
+
+def record_repos(names):
+    """
+    Stores the repo names from an org listing for completion.
+
+    :param names: The names of the repos
+    :return: None
+    """
+    from rli.utils.paths import write_atomic
+
+    write_atomic(repos_path(), json.dumps(sorted(names)).encode("utf-8"))
+
+
+def refresh_in_background():
+    """Starts a detached process that rebuilds the cache, unless one is running."""
+    import subprocess
+
+    lock_path = cache_path() + ".lock"
+
+    try:
+        if time.time() - os.stat(lock_path).st_mtime < LOCK_TIMEOUT:
+            return
+        os.remove(lock_path)
+    except OSError:
+        pass
+
+    try:
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except OSError:
+        return
+
+    subprocess.Popen(
+        [sys.executable, "-m", "rli.completion", "--refresh"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def complete(cache, words, incomplete):
+    """
+    Gets the completions for a command line.
+
+    :param cache: The completion cache
+    :param words: The words before the one being completed, without rli itself
+    :param incomplete: The word being completed
+    :return: The matching completions
+    """
+    command = cache["root"]
+    expects_value = None
+
+    for word in words:
+        if expects_value is not None:
+            expects_value = None
+        elif word.startswith("-"):
+            option = _find_option(command, word)
+
+            if option and not option["is_flag"] and "=" not in word:
+                expects_value = word
+        elif word in command.get("commands", {}):
+            command = command["commands"][word]
+
+    if expects_value in REPO_OPTIONS:
+        candidates = cache["repos"]
+    elif expects_value in SECRET_OPTIONS:
+        candidates = cache["secrets"]
+    elif expects_value is not None:
+        candidates = []
+    elif incomplete.startswith("-"):
+        candidates = [
+            opt
+            for option in command["options"]
+            if not option["argument"]
+            for opt in option["opts"]
+        ] + ["--help"]
+    else:
+        candidates = sorted(command.get("commands", {}))
+
+    return [candidate for candidate in candidates if candidate.startswith(incomplete)]
+
+
+def _find_option(command, word):
+    word = word.split("=", 1)[0]
+
+    for option in command["options"]:
+        if word in option["opts"]:
+            return option
+
+    return None
+
+
+def _load_json_list(path):
+    try:
+        with open(path, "r") as json_file:
+            return json.load(json_file)
+    except (OSError, ValueError):
+        return []
+
+
+def _load_json_keys(path):
+    from rli.utils.json_scan import iter_keys
+
+    try:
+        return list(iter_keys(path))
+    except (OSError, ValueError):
+        return []
+
+
+def main():
+    if "--script" in sys.argv:
+        sys.stdout.write(BASH_SCRIPT)
+        return
+
+    if "--refresh" in sys.argv:
+        try:
+            build_cache()
+        finally:
+            try:
+                os.remove(cache_path() + ".lock")
+            except OSError:
+                pass
+        return
+
+    words = os.environ.get("COMP_WORDS", "").split()
+    cword = int(os.environ.get("COMP_CWORD", len(words)))
+    incomplete = words[cword] if cword < len(words) else ""
+
+    cache = load_cache()
+
+    if cache is None:
+        cache = build_cache()
+    elif is_stale(cache):
+        refresh_in_background()
+
+    sys.stdout.write("\n".join(complete(cache, words[1:cword], incomplete)))
+
+
+if __name__ == "__main__":
+    main()
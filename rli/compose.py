@@ -0,0 +1,148 @@
+import hashlib
+import os
+import re
+import threading
+from rli.exceptions import RLIDockerException
+
+# $$ is an escaped dollar sign. ${VAR:-default}, ${VAR-default}, ${VAR:+other}
+# and ${VAR+other} do not need VAR to be set, ${VAR}, $VAR, ${VAR:?error} and
+# ${VAR?error} do.
+INTERPOLATION = re.compile(
+    r"\$(?:"
+    r"(?P<escaped>\$)"
+    r"|\{(?P<braced>[A-Za-z_][A-Za-z0-9_]*)(?:(?P<operator>:?[-?+])[^}]*)?\}"
+    r"|(?P<named>[A-Za-z_][A-Za-z0-9_]*)"
+    r")"
+)
+OPTIONAL_OPERATORS = (":-", "-", ":+", "+")
+
+# docker-compose reads defaults for the variables from this file in the folder
+# of the compose file.
+ENV_FILE = ".env"
+ENV_LINE = re.compile(r"^\s*(?:export\s+)?(?P<name>[A-Za-z_][A-Za-z0-9_]*)\s*=")
+
+
+class ComposeFile:
+    """
+    A docker-compose file and the variables it interpolates. The variables are
+    parsed once per content hash of the file.
+    """
+
+    def __init__(self, path, compose_hash, required, optional, defaults=frozenset()):
+        self.path = path
+        self.hash = compose_hash
+        self.required = required
+        self.optional = optional
+        self.defaults = defaults
+
+    @property
+    def variables(self) -> frozenset:
+        return self.required | self.optional
+
+    @classmethod
+    def load(cls, path):
+        """
+        :param path: The path of the docker-compose file
+        :raises OSError: If the file can not be read
+        :return: A ComposeFile
+        """
+        with open(path, "rb") as compose_file:
+            content = compose_file.read()
+
+        digest = hashlib.sha256(content).hexdigest()
+
+        with _variables_lock:
+            variables = _variables.get(digest)
+
+        if variables is None:
+            variables = parse_variables(content.decode("utf-8"))
+
+            with _variables_lock:
+                if len(_variables) >= 64:
+                    _variables.clear()
+
+                _variables[digest] = variables
+
+        env_file = os.path.join(os.path.dirname(os.path.abspath(path)), ENV_FILE)
+        return cls(path, digest, *variables, read_env_names(env_file))
+
+    def load_secrets(self, load_secrets, extra_keys=()):
+        """
+        Loads the secrets for the variables of the file and checks that every
+        required variable is a secret, set in the environment or set in the
+        .env file next to the compose file.
+
+        :param load_secrets: A function that takes secret keys and returns a
+        dict of the secrets
+        :param extra_keys: Secrets to load even though the file does not use them
+        :raises RLIDockerException: If a required variable is not set
+        :return: A dict of the secrets
+        """
+        keys = sorted(self.variables | set(extra_keys))
+        secrets = load_secrets(keys) if keys else {}
+
+        missing = sorted(
+            name
+            for name in self.required
+            if name not in secrets
+            and name not in os.environ
+            and name not in self.defaults
+        )
+
+        if missing:
+            raise RLIDockerException(
+                f"{self.path} needs these variables, which are not secrets or set "
+                f"in the environment or {ENV_FILE}: {', '.join(missing)}."
+            )
+
+        return secrets
+
+
+def parse_variables(text):
+    """
+    Finds the variables a docker-compose file interpolates. Comment lines are
+    skipped.
+
+    :param text: The content of the file
+    :return: A tuple of the required and the optional variable names
+    """
+    required = set()
+    optional = set()
+
+    for line in text.splitlines():
+        if line.lstrip().startswith("#"):
+            continue
+
+        for match in INTERPOLATION.finditer(line):
+            if match["escaped"]:
+                continue
+
+            if match["named"]:
+                required.add(match["named"])
+            elif match["operator"] in OPTIONAL_OPERATORS:
+                optional.add(match["braced"])
+            else:
+                required.add(match["braced"])
+
+    return frozenset(required), frozenset(optional - required)
+
+
+def read_env_names(path):
+    """
+    :param path: The path of a .env file
+    :return: The names of the variables the file sets, or none if there is no
+    such file
+    """
+    try:
+        with open(path, "r") as env_file:
+            lines = env_file.read().splitlines()
+    except FileNotFoundError:
+        return frozenset()
+
+    return frozenset(
+        match["name"] for match in map(ENV_LINE.match, lines) if match is not None
+    )
+
+
+_variables = {}
+_variables_lock = threading.Lock()
@@ -1,9 +1,21 @@
-import json
 import os
 import sys
 import logging
+import threading
 from rli.exceptions import InvalidRLIConfiguration
-from rli.constants import ExitCode
+from rli.secret_providers import (
+    CachedProvider,
+    EnvironmentProvider,
+    JSONFileProvider,
+    SECRETS_TTL,
+    StoreProvider,
+    VaultProvider,
+)
+from rli.secret_store import SecretStore
+from rli.constants import ExitCode, GITHUB_URL
+from rli.utils.file_cache import json_file_cache
+
+SECRETS_BACKENDS = ("json", "env", "store", "vault")
 
 
 class DockerConfig:
@@ -45,6 +57,7 @@ class GithubConfig:
         self.organization = config.get("organization") or None
         self.login = config.get("login") or None
         self.password = config.get("password") or None
+        self.url = (config.get("url") or GITHUB_URL).rstrip("/")
 
         self.validate_config()
 
@@ -79,11 +92,88 @@ class RLIConfig:
         self.home_dir = os.path.expanduser("~")
 
         self.rli_config = self.load_rli_config()
-        self.rli_secrets = self.load_rli_secrets()
 
+        self._rli_secrets = None
+        self._secret_store = None
+        self._secret_provider = None
         self._github_config = None
         self._docker_config = None
 
+    @property
+    def rli_secrets(self) -> dict:
+        """All secrets of the configured backend, loaded on first use."""
+        if self._rli_secrets is None:
+            self._rli_secrets = self.load_rli_secrets()
+
+        return self._rli_secrets
+
+    @property
+    def secrets_config(self) -> dict:
+        return self.rli_config.get("secrets") or {}
+
+    @property
+    def secrets_backend(self) -> str:
+        """
+        Where secrets are read from, set by "secrets": {"backend": ...} in
+        ~/.rli/config.json. "json" reads ~/.rli/secrets.json, "env" reads
+        environment variables named "prefix" + key, "store" reads the indexed
+        store in ~/.rli/secrets.db and "vault" reads the HTTP vault at "url"
+        with "token".
+        """
+        backend = self.secrets_config.get("backend") or "json"
+
+        if backend not in SECRETS_BACKENDS:
+            raise InvalidRLIConfiguration(
+                f"Unknown secrets backend '{backend}'. Use one of "
+                f"{', '.join(SECRETS_BACKENDS)}."
+            )
+
+        return backend
+
+    @property
+    def secret_store(self) -> SecretStore:
+        """The indexed store in the namespace set by "secrets": {"namespace": ...}."""
+        if self._secret_store is None:
+            self._secret_store = SecretStore(
+                f"{self.home_dir}/.rli/secrets.db", self.secrets_config.get("namespace")
+            )
+
+        return self._secret_store
+
+    @property
+    def secret_provider(self) -> CachedProvider:
+        """
+        The provider of the configured backend behind the shared in-memory
+        cache. Secrets are cached for "ttl" seconds, 60 by default.
+        """
+        if self._secret_provider is None:
+            backend = self.secrets_backend
+            config = self.secrets_config
+
+            if backend == "env":
+                provider = EnvironmentProvider(config.get("prefix") or "")
+            elif backend == "store":
+                provider = StoreProvider(self.secret_store)
+            elif backend == "vault":
+                if not config.get("url"):
+                    raise InvalidRLIConfiguration(
+                        "The vault secrets backend needs a url."
+                    )
+
+                provider = VaultProvider(
+                    config["url"],
+                    config.get("token"),
+                    config.get("namespace") or "default",
+                )
+            else:
+                provider = JSONFileProvider(f"{self.home_dir}/.rli/secrets.json")
+
+            self._secret_provider = CachedProvider(
+                provider, ttl=config.get("ttl", SECRETS_TTL)
+            )
+
+        return self._secret_provider
+
     @property
     def github_config(self) -> GithubConfig:
         if self._github_config is None:
@@ -94,7 +184,7 @@ class RLIConfig:
                     "Github configuration was not provided in ~/.rli/config.json."
                 )
 
-            self._github_config = GithubConfig(github_config)
+            self._github_config = _validated(GithubConfig, github_config)
 
         return self._github_config
 
@@ -108,32 +198,37 @@ class RLIConfig:
                     "Docker configuration was not provided in ~/.rli/config.json."
                 )
 
-            self._docker_config = DockerConfig(docker_config)
+            self._docker_config = _validated(DockerConfig, docker_config)
 
         return self._docker_config
 
     def get_secret(self, key):
-        value = ""
-        try:
-            value = self.rli_secrets[key]
-        except KeyError:
-            pass
+        return self.get_secrets([key]).get(key, "")
 
-        return value
+    def get_secrets(self, keys) -> dict:
+        """
+        Loads only the given secrets, in one call to the backend for those that
+        are not cached. Use this rather than rli_secrets when the keys are
+        known, because there can be many secrets.
 
-    def load_rli_config(self):
-        config = {}
-        with open(f"{self.home_dir}/.rli/config.json", "r") as config:
-            config = json.load(config)
+        :param keys: The keys of the secrets
+        :return: A dict of the keys that were found and their values
+        """
+        secrets = self._rli_secrets
 
-        return config
+        if secrets is None:
+            secrets = self.load_rli_secrets(keys)
 
-    def load_rli_secrets(self):
-        secrets = {}
-        with open(f"{self.home_dir}/.rli/secrets.json", "r") as secrets:
-            secrets = json.load(secrets)
+        return {key: secrets[key] for key in keys if key in secrets}
+
+    def load_rli_config(self):
+        return json_file_cache.load(f"{self.home_dir}/.rli/config.json")
 
-        return secrets
+    def load_rli_secrets(self, keys=None):
+        if keys is None:
+            return self.secret_provider.get_all()
+
+        return self.secret_provider.get_many(keys)
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
@@ -145,6 +240,39 @@ class RLIConfig:
         return False
 
 
+_validated_configs = {}
+_validated_configs_lock = threading.Lock()
+
+
+def _validated(config_class, config):
+    """
+    Validates a section of ~/.rli/config.json once per parse of the file. The
+    parsed sections are shared through json_file_cache, so a section that has
+    not changed is the same object as last time.
+
+    :param config_class: GithubConfig or DockerConfig
+    :param config: The section of the config
+    :return: The validated config object
+    """
+    key = (config_class, id(config))
+
+    with _validated_configs_lock:
+        entry = _validated_configs.get(key)
+
+    if entry is not None and entry[0] is config:
+        return entry[1]
+
+    validated = config_class(config)
+
+    with _validated_configs_lock:
+        if len(_validated_configs) >= 32:
+            _validated_configs.clear()
+
+        _validated_configs[key] = (config, validated)
+
+    return validated
+
+
 def get_rli_config_or_exit() -> RLIConfig:
     config = None
     try:
@@ -1,3 +1,6 @@
+GITHUB_URL = "https://api.github.com"
+
+
 class ExitCode:
     OK = 0
     INVALID_RLI_CONFIG = 1
@@ -6,3 +9,6 @@ class ExitCode:
     GIT_ERROR = 4
     MISSING_ARG = 5
     UNEXPECTED_ERROR = 6
+    DOCKER_ERROR = 7
+    RUN_FAILED = 8
+    SECRETS_ERROR = 9
@@ -0,0 +1,162 @@
+import selectors
+import struct
+from urllib.parse import quote
+from rli.docker_engine import container_name
+
+# The multiplexed stream of a container without a TTY is made of frames, each
+# with a header of the stream type and the length of the payload.
+FRAME_HEADER = struct.Struct(">BxxxI")
+
+BUFFER_SIZE = 64 * 1024
+
+
+class LogFollower:
+    """
+    Follows the logs of many containers in one thread. Each container's log
+    stream is a non-blocking socket to the engine, and a selector waits for
+    any of them to have data. Lines are prefixed with the container name.
+
+    Each stream keeps at most buffer_size bytes of a line that has not ended
+    yet, so memory stays bounded by the number of containers. Longer lines are
+    written in pieces.
+    """
+
+    def __init__(self, engine, output, buffer_size=BUFFER_SIZE):
+        """
+        :param engine: A DockerEngine
+        :param output: A binary file object the lines are written to
+        :param buffer_size: The most bytes buffered for each stream
+        """
+        self.engine = engine
+        self.output = output
+        self.buffer_size = buffer_size
+
+    def follow(self, containers, follow=True, since=None, tail=None):
+        """
+        :param containers: The containers, as listed by the engine
+        :param follow: Keeps reading until the containers stop
+        :param since: Only shows logs after this unix timestamp
+        :param tail: Only shows this many lines of each container's history
+        :raises RLIDockerException: If the logs of a container can not be read
+        :return: The number of lines written
+        """
+        params = {"stdout": 1, "stderr": 1, "follow": int(follow)}
+
+        if since is not None:
+            params["since"] = f"{since:.9f}"
+
+        if tail is not None:
+            params["tail"] = tail
+
+        width = max((len(container_name(c)) for c in containers), default=0)
+        streams = []
+        selector = selectors.DefaultSelector()
+        lines = 0
+
+        try:
+            for container in containers:
+                tty = self.engine.inspect_container(container["Id"])["Config"]["Tty"]
+                connection, data = self.engine.open(
+                    "GET",
+                    f"/containers/{quote(container['Id'], safe='')}/logs",
+                    params,
+                )
+                stream = _LogStream(
+                    connection,
+                    container_name(container).ljust(width).encode("utf-8"),
+                    tty,
+                    self.buffer_size,
+                )
+                streams.append(stream)
+                connection.setblocking(False)
+                selector.register(connection, selectors.EVENT_READ, stream)
+                lines += self._write(stream.feed(data))
+
+            while selector.get_map():
+                for key, _ in selector.select():
+                    stream = key.data
+
+                    try:
+                        data = stream.connection.recv(self.buffer_size)
+                    except BlockingIOError:
+                        continue
+
+                    if data:
+                        lines += self._write(stream.feed(data))
+                    else:
+                        selector.unregister(stream.connection)
+                        lines += self._write(stream.close())
+        finally:
+            selector.close()
+
+            for stream in streams:
+                stream.connection.close()
+
+        return lines
+
+    def _write(self, lines):
+        if lines:
+            self.output.write(b"".join(lines))
+            self.output.flush()
+
+        return len(lines)
+
+
+class _LogStream:
+    def __init__(self, connection, prefix, tty, buffer_size):
+        self.connection = connection
+        self.prefix = prefix + b" | "
+        self.tty = tty
+        self.buffer_size = buffer_size
+        self._frames = bytearray()
+        self._line = bytearray()
+        self._payload_left = 0
+
+    def feed(self, data):
+        """:return: The complete, prefixed lines in the data"""
+        if self.tty:
+            return self._lines(data)
+
+        # Strip the frame headers, keeping at most one partial header around.
+        self._frames += data
+        payload = bytearray()
+
+        while self._frames:
+            if self._payload_left:
+                chunk = self._frames[: self._payload_left]
+                del self._frames[: len(chunk)]
+                self._payload_left -= len(chunk)
+                payload += chunk
+            elif len(self._frames) >= FRAME_HEADER.size:
+                _, self._payload_left = FRAME_HEADER.unpack_from(self._frames)
+                del self._frames[: FRAME_HEADER.size]
+            else:
+                break
+
+        return self._lines(payload)
+
+    def close(self):
+        """:return: The last line if it did not end with a newline"""
+        if not self._line:
+            return []
+
+        line = self.prefix + self._line + b"\n"
+        self._line = bytearray()
+        return [bytes(line)]
+
+    def _lines(self, data):
+        lines = []
+        self._line += data
+
+        while True:
+            end = self._line.find(b"\n", 0, self.buffer_size)
+
+            if end != -1:
+                lines.append(bytes(self.prefix + self._line[: end + 1]))
+                del self._line[: end + 1]
+            elif len(self._line) >= self.buffer_size:
+                line = self._line[: self.buffer_size]
+                lines.append(bytes(self.prefix + line + b"\n"))
+                del self._line[: self.buffer_size]
+            else:
+                return lines
@@ -0,0 +1,328 @@
+import csv
+import json
+import math
+import selectors
+import time
+from array import array
+from urllib.parse import quote
+from rli.docker_engine import container_name
+
+SAMPLES = 300
+PERCENTILES = (50, 95)
+
+CSV = "csv"
+NDJSON = "ndjson"
+FIELDS = ("time", "container", "cpu_percent", "memory", "memory_limit")
+
+READ_SIZE = 64 * 1024
+
+
+class RingBuffer:
+    """
+    Keeps the last size values in a preallocated array of doubles, so memory
+    does not grow however long the sampling runs.
+    """
+
+    def __init__(self, size=SAMPLES):
+        """
+        :param size: The number of values kept
+        """
+        self.size = size
+        self._values = array("d", bytes(8 * size))
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, value):
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self.size
+        self._count = min(self._count + 1, self.size)
+
+    def values(self) -> list:
+        """:return: The values kept, oldest first"""
+        if self._count < self.size:
+            return self._values[: self._count].tolist()
+
+        return (self._values[self._next :] + self._values[: self._next]).tolist()
+
+    def percentile(self, percent):
+        """
+        :param percent: The percentile, from 0 to 100
+        :return: The percentile of the values kept, interpolated between the
+        closest two, or None if there are none
+        """
+        return percentiles(self.values(), (percent,))[0]
+
+
+def percentiles(values, percents) -> list:
+    """
+    :param values: The values
+    :param percents: The percentiles, from 0 to 100
+    :return: Each percentile of the values, or None for each if there are none
+    """
+    if not values:
+        return [None] * len(percents)
+
+    values = sorted(values)
+    result = []
+
+    for percent in percents:
+        rank = (len(values) - 1) * percent / 100
+        low, high = math.floor(rank), math.ceil(rank)
+        result.append(values[low] + (values[high] - values[low]) * (rank - low))
+
+    return result
+
+
+class StatsSampler:
+    """
+    Samples the CPU and memory use of many containers from their stats streams
+    in one thread. The engine writes a sample of each container every second,
+    and a selector waits for any of the streams to have one. Samples that come
+    sooner than interval after the last one kept are skipped before they are
+    decoded, so decoding is the only cost that grows with the containers.
+
+    The last samples of each container are kept in ring buffers, so memory is
+    bounded by the number of containers.
+    """
+
+    def __init__(self, engine, samples=SAMPLES, interval=1.0, clock=time.monotonic):
+        """
+        :param engine: A DockerEngine
+        :param samples: The number of samples kept for each container
+        :param interval: The fewest seconds between two samples of a container
+        :param clock: A function returning the current time in seconds
+        """
+        self.engine = engine
+        self.samples = samples
+        self.interval = interval
+        self.clock = clock
+        self.series = {}
+
+    def sample(self, containers, duration=None, dump=None, report=None, every=10):
+        """
+        Samples until the duration passes or the containers stop. Samples kept
+        so far stay in series when this is interrupted.
+
+        :param containers: The containers, as listed by the engine
+        :param duration: The number of seconds to sample for. Defaults to until
+        the containers stop
+        :param dump: A StatsDump every sample is written to
+        :param report: A function called with the summary every few seconds
+        :param every: The number of seconds between two reports
+        :raises RLIDockerException: If the stats of a container can not be read
+        :return: The number of samples kept
+        """
+        start = self.clock()
+        deadline = None if duration is None else start + duration
+        next_report = start + every
+        streams = []
+        selector = selectors.DefaultSelector()
+        kept = 0
+
+        try:
+            for container in containers:
+                connection, data = self.engine.open(
+                    "GET",
+                    f"/containers/{quote(container['Id'], safe='')}/stats",
+                    {"stream": 1},
+                )
+                name = container_name(container)
+                series = self.series.setdefault(name, _Series(self.samples))
+                stream = _StatsStream(connection, name, series)
+                streams.append(stream)
+                connection.setblocking(False)
+                selector.register(connection, selectors.EVENT_READ, stream)
+                kept += self._feed(stream, data, dump)
+
+            while selector.get_map():
+                now = self.clock()
+
+                if deadline is not None and now >= deadline:
+                    break
+
+                if report is not None and now >= next_report:
+                    report(self.summary())
+                    next_report = now + every
+
+                timeouts = []
+
+                if report is not None:
+                    timeouts.append(next_report - now)
+
+                if deadline is not None:
+                    timeouts.append(deadline - now)
+
+                for key, _ in selector.select(min(timeouts, default=None)):
+                    stream = key.data
+
+                    try:
+                        data = stream.connection.recv(READ_SIZE)
+                    except BlockingIOError:
+                        continue
+
+                    if data:
+                        kept += self._feed(stream, data, dump)
+                    else:
+                        selector.unregister(stream.connection)
+        finally:
+            selector.close()
+
+            for stream in streams:
+                stream.connection.close()
+
+        return kept
+
+    def summary(self) -> list:
+        """
+        :return: A dict for each container with the number of samples kept, the
+        percentiles and maximum of its CPU and memory use, and its last memory
+        limit
+        """
+        rows = []
+
+        for name, series in sorted(self.series.items()):
+            row = {"container": name, "samples": len(series.memory)}
+
+            for metric in ("cpu_percent", "memory"):
+                values = getattr(series, metric).values()
+
+                for percent, value in zip(
+                    PERCENTILES, percentiles(values, PERCENTILES)
+                ):
+                    row[f"{metric}_p{percent}"] = value
+
+                row[f"{metric}_max"] = max(values, default=None)
+
+            row["memory_limit"] = series.memory_limit
+            rows.append(row)
+
+        return rows
+
+    def _feed(self, stream, data, dump):
+        kept = 0
+
+        for line in stream.feed(data):
+            now = self.clock()
+
+            # Skipping before decoding keeps the cost of a skipped sample low.
+            if stream.kept_at is not None and now - stream.kept_at < self.interval:
+                continue
+
+            sample = stream.series.add(json.loads(line))
+
+            if sample is not None:
+                stream.kept_at = now
+                kept += 1
+
+                if dump is not None:
+                    dump.write(dict(sample, container=stream.name))
+
+        return kept
+
+
+class StatsDump:
+    """Writes samples to a file as CSV or as one JSON object per line."""
+
+    def __init__(self, output, format=CSV):
+        """
+        :param output: A text file object
+        :param format: csv or ndjson
+        """
+        self.output = output
+        self.format = format
+        self._writer = None
+
+        if format == CSV:
+            self._writer = csv.DictWriter(output, FIELDS, extrasaction="ignore")
+            self._writer.writeheader()
+
+    def write(self, sample):
+        if self._writer is not None:
+            self._writer.writerow(sample)
+        else:
+            self.output.write(json.dumps({key: sample[key] for key in FIELDS}) + "\n")
+
+
+class _Series:
+    def __init__(self, size):
+        self.cpu_percent = RingBuffer(size)
+        self.memory = RingBuffer(size)
+        self.memory_limit = None
+        self._cpu = None
+
+    def add(self, stats):
+        """
+        :param stats: A sample from the engine
+        :return: The sample that was kept, or None if the container is stopped
+        """
+        memory_stats = stats.get("memory_stats") or {}
+
+        if "usage" not in memory_stats:
+            return None
+
+        # Like docker stats, the page cache that can be reclaimed is not use.
+        inner = memory_stats.get("stats") or {}
+        memory = memory_stats["usage"] - inner.get(
+            "inactive_file", inner.get("total_inactive_file", 0)
+        )
+        self.memory_limit = memory_stats.get("limit")
+        self.memory.append(memory)
+
+        # CPU is measured since the last sample kept, or since the one the
+        # engine read before this one for the first sample.
+        cpu = _cpu(stats["cpu_stats"])
+        cpu_percent = _cpu_percent(self._cpu or _cpu(stats.get("precpu_stats")), cpu)
+        self._cpu = cpu
+
+        if cpu_percent is not None:
+            self.cpu_percent.append(cpu_percent)
+
+        return {
+            "time": stats.get("read"),
+            "cpu_percent": cpu_percent,
+            "memory": memory,
+            "memory_limit": self.memory_limit,
+        }
+
+
+class _StatsStream:
+    def __init__(self, connection, name, series):
+        self.connection = connection
+        self.name = name
+        self.series = series
+        self.kept_at = None
+        self._line = bytearray()
+
+    def feed(self, data):
+        """:return: The complete lines in the data"""
+        self._line += data
+        *lines, rest = self._line.split(b"\n")
+        self._line = bytearray(rest)
+        return [line for line in lines if line.strip()]
+
+
+def _cpu(cpu_stats):
+    """:return: The usage, system usage and number of CPUs, or None"""
+    cpu_stats = cpu_stats or {}
+
+    if "system_cpu_usage" not in cpu_stats:
+        return None
+
+    usage = cpu_stats["cpu_usage"]
+    cpus = cpu_stats.get("online_cpus") or len(usage.get("percpu_usage") or ()) or 1
+    return usage["total_usage"], cpu_stats["system_cpu_usage"], cpus
+
+
+def _cpu_percent(before, after):
+    if before is None or after is None:
+        return None
+
+    usage, system = after[0] - before[0], after[1] - before[1]
+
+    if system <= 0 or usage < 0:
+        return None
+
+    return usage / system * after[2] * 100
@@ -0,0 +1,269 @@
+import array
+import importlib
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+from rli.cli import cli
+from rli.client import EXIT_CODE, HEADER, INTERRUPT, socket_path
+from rli.config import RLIConfig
+from rli.constants import ExitCode
+from rli.docker import RLIDocker
+from rli.exceptions import InvalidRLIConfiguration, RLIDockerException
+from rli.registry import registry
+from rli.utils import trace
+from rli.utils.logger import stop_logger
+
+MAX_FDS = 3
+
+# The seconds a client has to send its request.
+REQUEST_TIMEOUT = 10
+
+
+class RLIDaemon:
+    """
+    Serves rli commands over a unix socket. The command modules and their
+    dependencies are imported once, and every request runs in a process forked
+    from the warm daemon, so requests cannot leak state into each other.
+
+    HTTP connections are not opened ahead of time: a connection the daemon
+    opened would be shared by every forked request, and concurrent requests
+    would interleave their traffic on it.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or socket_path()
+        self.server = None
+        self.children = set()
+        self.config = None
+
+    def warm(self):
+        """
+        Imports every command module, parses and validates the RLI config and
+        logs into the Docker registry, so forked requests inherit all of it.
+        Requests still see changes to ~/.rli/config.json, because parsed files
+        are cached by their mtime.
+        """
+        for name in registry.names():
+            try:
+                importlib.import_module(registry.get(name)["module"])
+            except Exception:
+                logging.exception(f"Could not import the '{name}' command.")
+
+        try:
+            self.config = RLIConfig()
+        except (OSError, ValueError):
+            logging.debug("Could not load the RLI config to warm the daemon.")
+            return
+
+        try:
+            self.config.github_config
+        except InvalidRLIConfiguration:
+            logging.debug("The RLI config has no valid Github configuration.")
+
+        try:
+            docker_config = self.config.docker_config
+            RLIDocker(
+                docker_config.login, docker_config.password, docker_config.registry
+            )
+        except (InvalidRLIConfiguration, RLIDockerException):
+            logging.debug("Could not log into the Docker registry to warm the daemon.")
+
+    def serve_forever(self):
+        self.warm()
+        self.bind()
+        signal.signal(signal.SIGTERM, _stop)
+        logging.info(f"RLI daemon listening on {self.path}.")
+
+        try:
+            while True:
+                self.reap_children()
+
+                try:
+                    connection, _ = self.server.accept()
+                except socket.timeout:
+                    continue
+
+                self.handle_connection(connection)
+        finally:
+            self.close()
+
+    def bind(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o077)
+
+        try:
+            self.server.bind(self.path)
+        finally:
+            os.umask(old_umask)
+
+        self.server.listen(64)
+        self.server.settimeout(1)
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def handle_connection(self, connection):
+        # The request is read in the child, so a client that connects and
+        # sends nothing holds up neither the accept loop nor other requests.
+        pid = os.fork()
+
+        if pid == 0:
+            exit_code = ExitCode.UNEXPECTED_ERROR
+
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                self.server.close()
+                connection.settimeout(REQUEST_TIMEOUT)
+                request, fds = receive_request(connection)
+                connection.settimeout(None)
+                exit_code = run_request(connection, request, fds)
+            except (OSError, ValueError) as e:
+                # The listener thread of the logger is not inherited.
+                print(f"Received an invalid request: {e}", file=sys.stderr)
+            finally:
+                try:
+                    signal.signal(signal.SIGINT, signal.SIG_IGN)
+                    connection.sendall(EXIT_CODE.pack(exit_code))
+                finally:
+                    os._exit(0)
+
+        self.children.add(pid)
+        connection.close()
+
+    def reap_children(self):
+        for pid in list(self.children):
+            try:
+                finished, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                finished = pid
+
+            if finished:
+                self.children.discard(pid)
+
+
+def receive_request(connection):
+    """
+    Reads a request and the client's stdin, stdout and stderr from the socket.
+
+    :param connection: The client connection
+    :return: The request as a dict and the received file descriptors
+    """
+    fds = array.array("i")
+    data, ancillary, _, _ = connection.recvmsg(
+        65536, socket.CMSG_LEN(MAX_FDS * fds.itemsize)
+    )
+
+    for level, kind, payload in ancillary:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(payload[: len(payload) - len(payload) % fds.itemsize])
+
+    fds = list(fds)
+
+    if len(fds) != MAX_FDS:
+        for fd in fds:
+            os.close(fd)
+        raise ValueError("Expected the client's stdin, stdout and stderr.")
+
+    while len(data) < HEADER.size:
+        data += _recv_or_fail(connection)
+
+    (length,) = HEADER.unpack_from(data)
+
+    while len(data) < HEADER.size + length:
+        data += _recv_or_fail(connection)
+
+    return json.loads(data[HEADER.size : HEADER.size + length]), fds
+
+
+def run_request(connection, request, fds):
+    """
+    Runs the requested command in a forked child. Must not return to the
+    daemon's accept loop.
+
+    :return: The exit code of the command
+    """
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+
+    os.chdir(request["cwd"])
+    os.environ.clear()
+    os.environ.update(request["env"])
+
+    trace.tracer.path = os.environ.get(trace.TRACE_ENV)
+    threading.Thread(target=_watch_client, args=(connection,), daemon=True).start()
+
+    try:
+        cli.main(args=request["argv"], prog_name="rli")
+        exit_code = ExitCode.OK
+    except SystemExit as e:
+        exit_code = _exit_code(e.code)
+    except KeyboardInterrupt:
+        exit_code = ExitCode.UNEXPECTED_ERROR
+    except Exception as e:
+        print(e, file=sys.stderr)
+        exit_code = ExitCode.UNEXPECTED_ERROR
+    finally:
+        trace.tracer.write()
+        stop_logger()
+
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except OSError:
+                pass
+
+    return exit_code
+
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt
+
+
+def _watch_client(connection):
+    # The client sends an interrupt when it gets Ctrl-C, and closes the
+    # connection if it is killed. Either way the command is interrupted.
+    try:
+        connection.recv(1)
+    except OSError:
+        pass
+
+    os.kill(os.getpid(), signal.SIGINT)
+
+
+def _exit_code(code):
+    if code is None:
+        return ExitCode.OK
+
+    if isinstance(code, int):
+        return code
+
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _recv_or_fail(connection):
+    chunk = connection.recv(65536)
+
+    if not chunk:
+        raise ValueError("The client closed the connection mid request.")
+
+    return chunk
@@ -0,0 +1,138 @@
+import logging
+import os
+from rli.compose import ComposeFile
+from rli.deploy_ledger import FAILED, ROLLBACK, SUCCEEDED
+from rli.exceptions import RLIDockerException
+
+
+class RLIDeploy:
+    """Deploys docker-compose projects and records them in a DeployLedger."""
+
+    def __init__(self, docker, ledger):
+        self.docker = docker
+        self.ledger = ledger
+
+    def up(self, project, compose_file, images, load_secrets, secret_keys=()):
+        """
+        Pulls the images, runs docker-compose up and records the deploy with
+        the digests that were pulled. Only the secrets the compose file uses
+        are loaded and passed to docker-compose, and missing ones fail the
+        deploy before anything is pulled.
+
+        :param project: The name of the project
+        :param compose_file: The docker-compose file
+        :param images: The images to pull, relative to the registry
+        :param load_secrets: A function that takes secret keys and returns a
+        dict of the secrets
+        :param secret_keys: Secrets to pass even though the compose file does
+        not use them
+        :raises RLIDockerException: If a secret is missing or an image could
+        not be pulled
+        :return: The recorded deploy
+        """
+        compose = ComposeFile.load(compose_file)
+        secrets = compose.load_secrets(load_secrets, secret_keys)
+        pulled = []
+
+        for image in images:
+            full_name = self.docker.pull(image)
+
+            if full_name is None:
+                raise RLIDockerException(f"Could not pull {image}.")
+
+            pulled.append(self._resolve(full_name))
+
+        return self._compose_up(project, compose, pulled, secrets)
+
+    def rollback(self, project, load_secrets, deploy_id=None):
+        """
+        Restores an earlier deploy from images that are still present locally.
+        Each image tag is pinned back to the image ID it had, so nothing is
+        pulled from the registry.
+
+        :param project: The name of the project
+        :param load_secrets: A function that takes secret keys and returns a
+        dict of the secrets
+        :param deploy_id: The deploy to restore. Defaults to the one before the
+        current deploy
+        :raises RLIDockerException: If there is no deploy to restore, one of
+        its images is no longer present locally or a secret is missing
+        :return: The recorded rollback
+        """
+        if deploy_id is None:
+            target = self.ledger.previous(project)
+        else:
+            target = self.ledger.get(deploy_id)
+
+            if target is not None and target["project"] != project:
+                target = None
+
+        if target is None:
+            raise RLIDockerException(f"There is no earlier deploy of {project}.")
+
+        if not os.path.exists(target["compose_file"]):
+            raise RLIDockerException(f"{target['compose_file']} no longer exists.")
+
+        compose = ComposeFile.load(target["compose_file"])
+
+        if compose.hash != target["compose_hash"]:
+            logging.warning(
+                f"{compose.path} changed since deploy {target['id']}, using the "
+                "current version."
+            )
+
+        secrets = compose.load_secrets(load_secrets, target["secret_keys"])
+
+        if self.ledger.fingerprint(secrets) != target["secrets_fingerprint"]:
+            logging.warning(
+                f"The secrets changed since deploy {target['id']}, using the "
+                "current values."
+            )
+
+        missing = [
+            image["image"]
+            for image in target["images"]
+            if self.docker.inspect(image["image_id"]) is None
+        ]
+
+        if missing:
+            raise RLIDockerException(
+                f"These images of deploy {target['id']} are no longer present "
+                f"locally: {', '.join(missing)}."
+            )
+
+        for image in target["images"]:
+            if self.docker.tag(image["image_id"], image["image"]) is None:
+                raise RLIDockerException(f"Could not tag {image['image']}.")
+
+        return self._compose_up(
+            project,
+            compose,
+            target["images"],
+            secrets,
+            kind=ROLLBACK,
+            restored_id=target["id"],
+        )
+
+    def _resolve(self, image):
+        inspect = self.docker.inspect(image)
+
+        if inspect is None:
+            raise RLIDockerException(f"Could not inspect {image}.")
+
+        return {
+            "image": image,
+            "image_id": inspect["Id"],
+            "digest": self.docker.digest(image),
+        }
+
+    def _compose_up(self, project, compose, images, secrets, **kwargs):
+        code = self.docker.compose_up(compose.path, secrets)
+        status = SUCCEEDED if code == 0 else FAILED
+
+        deploy_id = self.ledger.record(
+            project, compose.path, compose.hash, secrets, images, status, **kwargs
+        )
+        deploy = self.ledger.get(deploy_id)
+        deploy["exit_code"] = code
+        return deploy
@@ -0,0 +1,263 @@
+import hashlib
+import hmac
+import json
+import os
+import secrets as random_secrets
+import sqlite3
+import threading
+import time
+from rli.utils.paths import rli_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS deploys (
+    id INTEGER PRIMARY KEY,
+    project TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    compose_file TEXT NOT NULL,
+    compose_hash TEXT NOT NULL,
+    secret_keys TEXT NOT NULL,
+    secrets_fingerprint TEXT NOT NULL,
+    restored_id INTEGER REFERENCES deploys (id),
+    created_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS deploys_project ON deploys (project, status, id);
+
+CREATE TABLE IF NOT EXISTS deploy_images (
+    deploy_id INTEGER NOT NULL REFERENCES deploys (id),
+    image TEXT NOT NULL,
+    image_id TEXT NOT NULL,
+    digest TEXT,
+    PRIMARY KEY (deploy_id, image)
+) WITHOUT ROWID;
+"""
+
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+DEPLOY = "deploy"
+ROLLBACK = "rollback"
+
+
+def ledger_path():
+    return os.path.join(rli_dir(), "deploys.db")
+
+
+class DeployLedger:
+    """
+    A record of every deploy in an SQLite database: the image IDs, digests and
+    tags that were deployed, a hash of the compose file and a fingerprint of
+    the secrets. Deploys are indexed by project, so finding the previous deploy
+    does not read the rest of the history.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or ledger_path()
+        self._connection = None
+        self._fingerprint_key = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            os.close(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600))
+
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+
+        return self._connection
+
+    def record(
+        self,
+        project,
+        compose_file,
+        compose_hash,
+        secrets,
+        images,
+        status,
+        kind=DEPLOY,
+        restored_id=None,
+    ) -> int:
+        """
+        Records a deploy. Only the keys and a keyed fingerprint of the secrets
+        are stored, never their values.
+
+        :param project: The name of the project
+        :param compose_file: The path of the docker-compose file
+        :param compose_hash: The sha256 of the docker-compose file
+        :param secrets: A dict of the secrets passed to docker-compose
+        :param images: A list of dicts with the image, image_id and digest
+        :param status: succeeded or failed
+        :param kind: deploy or rollback
+        :param restored_id: The deploy a rollback restored
+        :return: The id of the deploy
+        """
+        fingerprint = self.fingerprint(secrets)
+
+        with self._lock, self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO deploys (project, kind, status, compose_file, "
+                "compose_hash, secret_keys, secrets_fingerprint, restored_id, "
+                "created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    project,
+                    kind,
+                    status,
+                    os.path.abspath(compose_file),
+                    compose_hash,
+                    json.dumps(sorted(secrets)),
+                    fingerprint,
+                    restored_id,
+                    time.time(),
+                ),
+            )
+            self.connection.executemany(
+                "INSERT INTO deploy_images (deploy_id, image, image_id, digest) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    (
+                        cursor.lastrowid,
+                        image["image"],
+                        image["image_id"],
+                        image["digest"],
+                    )
+                    for image in images
+                ),
+            )
+
+        return cursor.lastrowid
+
+    def get(self, deploy_id):
+        """
+        :param deploy_id: The id of a deploy
+        :return: The deploy as a dict with its images, or None
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT * FROM deploys WHERE id = ?", (deploy_id,)
+            ).fetchone()
+
+            return None if row is None else self._with_images(row)
+
+    def history(self, project, limit=20) -> list:
+        """
+        :param project: The name of the project
+        :param limit: The number of deploys returned
+        :return: The latest deploys of the project, newest first
+        """
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT * FROM deploys WHERE project = ? ORDER BY id DESC LIMIT ?",
+                (project, limit),
+            ).fetchall()
+
+            return [self._with_images(row) for row in rows]
+
+    def projects(self) -> list:
+        """:return: The names of the projects with a succeeded deploy"""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT DISTINCT project FROM deploys WHERE status = ? "
+                "ORDER BY project",
+                (SUCCEEDED,),
+            ).fetchall()
+
+            return [row["project"] for row in rows]
+
+    def current(self, project):
+        """
+        :param project: The name of the project
+        :return: The latest succeeded deploy of the project, or None
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT * FROM deploys WHERE project = ? AND status = ? "
+                "ORDER BY id DESC LIMIT 1",
+                (project, SUCCEEDED),
+            ).fetchone()
+
+            return None if row is None else self._with_images(row)
+
+    def previous(self, project):
+        """
+        Finds the deploy a rollback should restore: the last succeeded deploy
+        before the current one. When the current deploy is itself a rollback,
+        the deploy before the one it restored is used, so repeated rollbacks
+        keep going back.
+
+        :param project: The name of the project
+        :return: The deploy as a dict with its images, or None
+        """
+        current = self.current(project)
+
+        if current is None:
+            return None
+
+        anchor = current["restored_id"] or current["id"]
+
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT * FROM deploys WHERE project = ? AND status = ? AND kind = ? "
+                "AND id < ? ORDER BY id DESC LIMIT 1",
+                (project, SUCCEEDED, DEPLOY, anchor),
+            ).fetchone()
+
+            return None if row is None else self._with_images(row)
+
+    def fingerprint(self, secrets) -> str:
+        """
+        Fingerprints a set of secrets with a key that is kept in the ledger, so
+        deploys with the same secrets can be recognized without storing a plain
+        hash of the values.
+
+        :param secrets: A dict of secrets
+        :return: The hex fingerprint
+        """
+        payload = json.dumps(sorted(secrets.items())).encode("utf-8")
+        return hmac.new(self._key(), payload, hashlib.sha256).hexdigest()
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+                self._fingerprint_key = None
+
+    def _key(self):
+        if self._fingerprint_key is None:
+            with self._lock, self.connection:
+                self.connection.execute(
+                    "INSERT OR IGNORE INTO meta (key, value) "
+                    "VALUES ('fingerprint_key', ?)",
+                    (random_secrets.token_hex(32),),
+                )
+                row = self.connection.execute(
+                    "SELECT value FROM meta WHERE key = 'fingerprint_key'"
+                ).fetchone()
+
+            self._fingerprint_key = bytes.fromhex(row[0])
+
+        return self._fingerprint_key
+
+    def _with_images(self, row):
+        deploy = dict(row)
+        deploy["secret_keys"] = json.loads(deploy["secret_keys"])
+        deploy["images"] = [
+            dict(image)
+            for image in self.connection.execute(
+                "SELECT image, image_id, digest FROM deploy_images "
+                "WHERE deploy_id = ? ORDER BY image",
+                (row["id"],),
+            )
+        ]
+        return deploy
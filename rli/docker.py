@@ -1,17 +1,58 @@
+import hashlib
+import json
 import logging
 import os
+import re
+import subprocess
+import tempfile
+import threading
+import zlib
 from rli.exceptions import RLIDockerException
+from rli.utils import block_gzip
 from rli.utils.bash import Bash
+from rli.utils.trace import tracer
+
+# Seconds that the results of read only docker queries are reused for.
+INSPECT_TTL = 60
+
+# A full or short image ID, which names no repository.
+IMAGE_ID = re.compile(r"^(sha256:)?[0-9a-f]{12,64}$")
 
 
 class RLIDocker:
-    def __init__(self, username, password, registry):
+    # The registries and users this process logged into, inherited by the
+    # requests an rli serve daemon forks, so they do not log in again.
+    logins = set()
+    logins_lock = threading.Lock()
+
+    def __init__(self, username, password, registry, login=True):
         self.username = username
         self.password = password
         self.registry = registry if registry[-1] == "/" else registry + "/"
-        self.login()
+
+        if login:
+            self.login()
+
+    @classmethod
+    def local(cls):
+        """
+        Creates an RLIDocker for commands that only use the local engine, such
+        as save and load, so no registry has to be configured.
+        :return: An RLIDocker that is not logged in
+        """
+        return cls(None, None, "/", login=False)
 
     def login(self):
+        key = (
+            self.registry,
+            self.username,
+            hashlib.sha256(self.password.encode("utf-8")).hexdigest(),
+        )
+
+        with RLIDocker.logins_lock:
+            if key in RLIDocker.logins:
+                return
+
         if (
             Bash.run_command(
                 [
@@ -24,12 +65,16 @@ class RLIDocker:
                     self.username,
                     "--password-stdin",
                     self.registry,
-                ]
+                ],
+                redact=(f'"{self.password}"',),
             ).returncode
             != 0
         ):
             raise RLIDockerException("Could not log into the provided Docker registry.")
 
+        with RLIDocker.logins_lock:
+            RLIDocker.logins.add(key)
+
     def pull(self, image):
         """
         Pulls a image from the registry passed in to the constructor. E.g.
@@ -38,7 +83,9 @@ class RLIDocker:
         :return: The full image name if successful, otherwise None
         """
         if (
-            Bash.run_command(["docker", "pull", f"{self.registry}{image}"]).returncode
+            _run_mutating(
+                ["docker", "pull", f"{self.registry}{image}"], image_repository(image)
+            )
             != 0
         ):
             return None
@@ -52,7 +99,14 @@ class RLIDocker:
         :param new_tag: The new tag
         :return: The new tag if the command is successful, otherwise None
         """
-        if Bash.run_command(["docker", "tag", current_tag, new_tag]).returncode != 0:
+        if (
+            _run_mutating(
+                ["docker", "tag", current_tag, new_tag],
+                image_repository(current_tag),
+                image_repository(new_tag),
+            )
+            != 0
+        ):
             return None
         else:
             return new_tag
@@ -66,9 +120,9 @@ class RLIDocker:
         :param secrets: A dict of the secrets
         :return: The exit code of the cli command
         """
-        return Bash.run_command(
-            args=["docker-compose", "-f", compose_file, "up", "-d"], env=secrets
-        ).returncode
+        return _run_mutating(
+            ["docker-compose", "-f", compose_file, "up", "-d"], env=secrets
+        )
 
     def run_image(self, image, secrets):
         """
@@ -85,4 +139,209 @@ class RLIDocker:
 
         args.append(image)
 
-        return Bash.run_command(args=args, env=secrets).returncode
+        return _run_mutating(args, image_repository(image), env=secrets)
+
+    def inspect(self, image):
+        """
+        Inspects a local image. The result is cached until the image is pulled,
+        tagged or run through this class.
+        :param image: The name of the image
+        :return: The inspect output as a dict if the image exists, otherwise None
+        """
+        result = Bash.run_cached_command(
+            ["docker", "image", "inspect", image], ttl=INSPECT_TTL
+        )
+
+        if result.returncode != 0:
+            return None
+
+        return json.loads(result.stdout)[0]
+
+    def digest(self, image):
+        """
+        Gets the repo digest of a local image, e.g.
+        some.registry.com/ubuntu@sha256:..., preferring the one of the image's
+        repository.
+        :param image: The name of the image
+        :return: The repo digest if there is one, otherwise None
+        """
+        inspect = self.inspect(image)
+
+        if not inspect or not inspect.get("RepoDigests"):
+            return None
+
+        repository = image_repository(image)
+
+        for digest in inspect["RepoDigests"]:
+            if image_repository(digest) == repository:
+                return digest
+
+        return inspect["RepoDigests"][0]
+
+    def save(self, images, path, level=6, threads=None):
+        """
+        Exports images to a gzip file. The output of docker save is compressed
+        in blocks on several threads while it is read, so there is no
+        uncompressed tarball on disk. The images are saved together, so layers
+        they share are stored once.
+        :param images: The names or IDs of the images
+        :param path: The file to write
+        :param level: The compression level, from 1 to 9
+        :param threads: The number of blocks compressed at once
+        :raises RLIDockerException: If docker save fails or the file can not be
+        written
+        :return: A dict with the number of images, layers and unique layers,
+        and the bytes read from docker and written to the file
+        """
+        layers = []
+
+        for image in images:
+            inspect = self.inspect(image)
+
+            if inspect is None:
+                raise RLIDockerException(f"Could not find the image {image}.")
+
+            layers += inspect.get("RootFS", {}).get("Layers", [])
+
+        partial = f"{path}.part"
+        args = ["docker", "save", *images]
+        logging.debug("Running the following command: %s", args)
+        process = None
+
+        try:
+            with open(partial, "wb") as target, tempfile.TemporaryFile() as errors:
+                with tracer.span("docker save", "subprocess", argv=args) as span:
+                    process = subprocess.Popen(
+                        args, stdout=subprocess.PIPE, stderr=errors
+                    )
+
+                    with process.stdout:
+                        read, written = block_gzip.compress(
+                            process.stdout, target, level, threads=threads
+                        )
+
+                    span["returncode"] = process.wait()
+
+                if process.returncode != 0:
+                    raise RLIDockerException(
+                        f"docker save failed: {_error_output(errors)}"
+                    )
+
+            os.replace(partial, path)
+        except OSError as e:
+            raise RLIDockerException(f"Could not save the images to {path}: {e}")
+        finally:
+            # docker save is still running if writing the file failed.
+            if process is not None and process.poll() is None:
+                process.kill()
+                process.wait()
+
+            if os.path.exists(partial):
+                os.remove(partial)
+
+        return {
+            "images": len(images),
+            "layers": len(layers),
+            "unique_layers": len(set(layers)),
+            "bytes_read": read,
+            "bytes_written": written,
+        }
+
+    def load(self, path, threads=None):
+        """
+        Imports images from a file written by save, or from any tarball of
+        docker save, compressed or not, by streaming it into docker load.
+        :param path: The file to read
+        :param threads: The number of blocks decompressed at once
+        :raises RLIDockerException: If the file is invalid or docker load fails
+        :return: The names or IDs of the loaded images
+        """
+        args = ["docker", "load"]
+        logging.debug("Running the following command: %s", args)
+        Bash.invalidate()
+
+        with open(path, "rb") as source, tempfile.TemporaryFile() as output:
+            with tracer.span("docker load", "subprocess", argv=args) as span:
+                process = subprocess.Popen(
+                    args,
+                    stdin=subprocess.PIPE,
+                    stdout=output,
+                    stderr=subprocess.STDOUT,
+                )
+                error = None
+
+                try:
+                    with process.stdin:
+                        block_gzip.decompress(source, process.stdin, threads)
+                except zlib.error as e:
+                    error = f"{path} is not a valid image archive: {e}"
+                    process.kill()
+                except BrokenPipeError:
+                    pass
+
+                span["returncode"] = process.wait()
+
+            Bash.invalidate()
+
+            if error is None and process.returncode != 0:
+                error = f"docker load failed: {_error_output(output)}"
+
+            if error is not None:
+                raise RLIDockerException(error)
+
+            output.seek(0)
+            return [
+                line.split(":", 1)[1].strip()
+                for line in output.read().decode("utf-8", "replace").splitlines()
+                if line.startswith(("Loaded image:", "Loaded image ID:"))
+            ]
+
+
+def _error_output(output):
+    output.seek(0)
+    lines = output.read().decode("utf-8", "replace").strip().splitlines()
+    return lines[-1] if lines else "no output"
+
+
+def _run_mutating(args, *tokens, env=None):
+    """
+    Runs a command that changes local images or containers. Cached queries
+    about them are dropped before the command runs and again after it ends,
+    so a query that ran at the same time, e.g. from another thread, does not
+    keep the old state cached.
+
+    :param args: The command to run
+    :param tokens: The image repositories the command changes. Every cached
+    query is dropped if none are given, or if one is None because the command
+    names an image by its ID
+    :param env: Extra environment variables for the command
+    :return: The exit code of the command
+    """
+    if None in tokens:
+        tokens = ()
+
+    Bash.invalidate(*tokens)
+
+    try:
+        return Bash.run_command(args=args, env=env).returncode
+    finally:
+        Bash.invalidate(*tokens)
+
+
+def image_repository(image):
+    """
+    Strips the tag and digest from an image name, e.g.
+    some.registry.com:5000/ubuntu:latest -> some.registry.com:5000/ubuntu
+    :param image: The name of the image
+    :return: The repository of the image, or None if it is an image ID
+    """
+    if IMAGE_ID.match(image):
+        return None
+
+    repository = image.split("@", 1)[0]
+    name = repository.rsplit("/", 1)[-1]
+
+    if ":" in name:
+        repository = repository[: repository.rindex(":")]
+
+    return repository
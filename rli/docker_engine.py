@@ -0,0 +1,240 @@
+import json
+import os
+import socket
+from urllib.parse import quote, urlencode
+from rli.exceptions import RLIDockerException
+from rli.utils.trace import tracer
+
+DEFAULT_SOCKET = "/var/run/docker.sock"
+
+# Compose labels its containers with the project they belong to.
+PROJECT_LABEL = "com.docker.compose.project"
+
+
+class DockerEngine:
+    """
+    A minimal client of the Docker Engine API on its unix socket, for what the
+    docker CLI can not do in one process: listing in one call and reading many
+    log or stats streams at once. Requests use HTTP/1.0, so responses are not
+    chunked and end when the engine closes the connection.
+    """
+
+    def __init__(self, socket_path=None):
+        """
+        :param socket_path: The engine's socket. Defaults to the one in
+        DOCKER_HOST, or /var/run/docker.sock
+        :raises RLIDockerException: If DOCKER_HOST is not a unix socket
+        """
+        self.socket_path = socket_path or _socket_from_env()
+
+    def get(self, path, params=None):
+        """
+        :param path: The path of the endpoint, e.g. /containers/json
+        :param params: The query parameters
+        :raises RLIDockerException: If the engine can not be reached or answers
+        with an error
+        :return: The decoded JSON response
+        """
+        return self.request("GET", path, params)
+
+    def request(self, method, path, params=None):
+        """
+        :param method: The HTTP method
+        :param path: The path of the endpoint
+        :param params: The query parameters
+        :raises RLIDockerException: If the engine can not be reached or answers
+        with an error
+        :return: The decoded JSON response, or None if it is empty
+        """
+        with tracer.span(f"{method} {path}", "http") as span:
+            connection, body = self.open(method, path, params)
+
+            try:
+                body += _read_all(connection)
+            finally:
+                connection.close()
+
+            span["bytes"] = len(body)
+
+        return json.loads(body) if body.strip() else None
+
+    def open(self, method, path, params=None):
+        """
+        Sends a request and reads the response headers, leaving the rest of the
+        body on the returned socket, e.g. to read a stream of logs.
+
+        :param method: The HTTP method
+        :param path: The path of the endpoint
+        :param params: The query parameters
+        :raises RLIDockerException: If the engine can not be reached or answers
+        with an error
+        :return: A tuple of the connected socket and the body bytes that were
+        read with the headers
+        """
+        target = path + (f"?{urlencode(params)}" if params else "")
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        try:
+            connection.connect(self.socket_path)
+            connection.sendall(
+                f"{method} {target} HTTP/1.0\r\nHost: docker\r\n\r\n".encode("ascii")
+            )
+            status, body = _read_status(connection)
+        except OSError as e:
+            connection.close()
+            raise RLIDockerException(
+                f"Could not reach the Docker engine at {self.socket_path}: {e}"
+            )
+
+        if status >= 400:
+            body += _read_all(connection)
+            connection.close()
+            raise RLIDockerException(
+                f"{method} {path} failed with {status}: {_message(body)}"
+            )
+
+        return connection, body
+
+    def containers(self, project=None, all=False) -> list:
+        """
+        Lists containers in one call.
+
+        :param project: Only lists containers of this compose project
+        :param all: Lists stopped containers too
+        :return: The containers, as returned by the engine
+        """
+        filters = {}
+
+        if project:
+            filters["label"] = [f"{PROJECT_LABEL}={project}"]
+
+        return self.get(
+            "/containers/json",
+            {"all": int(all), "filters": json.dumps(filters)},
+        )
+
+    def find_containers(self, names=(), project=None, all=False) -> tuple:
+        """
+        Finds containers by name or ID in one call. Like docker, a name that
+        is the name of a container means that container, and is only taken as
+        the start of an ID if no container has it as its name, so containers
+        named e.g. db or cafe are not confused with IDs.
+
+        :param names: The names or IDs. Lists every container if there are none
+        :param project: Only finds containers of this compose project
+        :param all: Finds stopped containers too
+        :return: A tuple of the containers that were found, in the engine's
+        order, and the names that match none
+        """
+        containers = self.containers(project, all)
+
+        if not names:
+            return containers, []
+
+        by_name = {
+            name.lstrip("/"): container["Id"]
+            for container in containers
+            for name in container["Names"]
+        }
+        found = set()
+        missing = []
+
+        for name in dict.fromkeys(names):
+            if name in by_name:
+                found.add(by_name[name])
+                continue
+
+            ids = {c["Id"] for c in containers if c["Id"].startswith(name)}
+
+            if ids:
+                found |= ids
+            else:
+                missing.append(name)
+
+        return [c for c in containers if c["Id"] in found], missing
+
+    def inspect_container(self, container_id):
+        return self.get(f"/containers/{quote(container_id, safe='')}/json")
+
+    def images(self) -> list:
+        """
+        Lists the images in one call, without intermediate images.
+
+        :return: The images, as returned by the engine
+        """
+        return self.get("/images/json")
+
+    def disk_usage(self) -> dict:
+        """
+        Measures the disk use of images. Unlike images, this has the size
+        each image shares with others, and the size of all layers, which counts
+        shared layers once.
+
+        :return: The usage, as returned by the engine
+        """
+        return self.get("/system/df", {"type": "image"})
+
+    def remove_image(self, name) -> list:
+        """
+        Removes a tag, and the image once it has no tags left, or an image
+        without tags by its ID. Images used by a container or tagged in more
+        than one repository are not removed by ID.
+
+        :param name: A tag or an image ID
+        :raises RLIDockerException: If the image can not be removed
+        :return: The tags that were removed and the images that were deleted
+        """
+        return self.request("DELETE", f"/images/{quote(name, safe='')}")
+
+
+def container_name(container):
+    """:return: The name of a container from the engine, without the slash"""
+    names = container.get("Names") or [container.get("Name") or container["Id"]]
+    return names[0].lstrip("/")
+
+
+def _socket_from_env():
+    host = os.environ.get("DOCKER_HOST")
+
+    if not host:
+        return DEFAULT_SOCKET
+
+    if not host.startswith("unix://"):
+        raise RLIDockerException(f"Only unix sockets are supported, not {host}.")
+
+    return host[len("unix://") :]
+
+
+def _read_status(connection):
+    """:return: The status code and the body bytes read after the headers"""
+    data = b""
+
+    while b"\r\n\r\n" not in data:
+        chunk = connection.recv(65536)
+
+        if not chunk:
+            raise OSError("The connection closed before the response headers.")
+
+        data += chunk
+
+    head, body = data.split(b"\r\n\r\n", 1)
+    return int(head.split(b" ", 2)[1]), body
+
+
+def _read_all(connection):
+    chunks = []
+
+    while True:
+        chunk = connection.recv(65536)
+
+        if not chunk:
+            return b"".join(chunks)
+
+        chunks.append(chunk)
+
+
+def _message(body):
+    try:
+        return json.loads(body)["message"]
+    except (ValueError, KeyError, TypeError):
+        return body.decode("utf-8", "replace").strip()
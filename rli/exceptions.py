@@ -18,3 +18,25 @@ class RLIDockerException(Exception):
             return f"RLIDockerException has been raised: {self.message}"
         else:
             return "RLIDockerException has been raised."
+
+
+class RLISecretsException(Exception):
+    def __init__(self, *args):
+        self.message = args[0] if args else None
+
+    def __str__(self):
+        if self.message:
+            return f"RLISecretsException has been raised: {self.message}"
+        else:
+            return "RLISecretsException has been raised."
+
+
+class RLIGitException(Exception):
+    def __init__(self, *args):
+        self.message = args[0] if args else None
+
+    def __str__(self):
+        if self.message:
+            return f"RLIGitException has been raised: {self.message}"
+        else:
+            return "RLIGitException has been raised."
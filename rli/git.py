@@ -0,0 +1,299 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from base64 import b64encode
+from concurrent.futures import ThreadPoolExecutor
+from rli.exceptions import RLIGitException
+from rli.utils.bash import Bash
+from rli.utils.paths import write_atomic
+
+STATE_FILE = ".rli-sync.json"
+
+CLONED = "cloned"
+FETCHED = "fetched"
+SKIPPED = "skipped"
+FAILED = "failed"
+PUSHED = "pushed"
+
+
+class RLIGit:
+    """
+    Keeps local clones of many repositories up to date. Repositories are
+    cloned or fetched in parallel, and a repository whose pushed_at has not
+    changed since the last sync is not fetched at all.
+    """
+
+    def __init__(
+        self,
+        root,
+        reference=None,
+        depth=None,
+        clone_filter="blob:none",
+        bare=False,
+        parallelism=8,
+        login=None,
+        password=None,
+    ):
+        """
+        :param root: The folder the repositories are cloned into
+        :param reference: A repository whose objects are borrowed instead of
+        downloaded again, see git clone --reference
+        :param depth: Makes shallow clones with this many commits
+        :param clone_filter: A partial clone filter, blob:none by default.
+        Ignored for shallow clones
+        :param bare: Makes bare mirrors instead of checking out a work tree
+        :param parallelism: The number of git processes run at once
+        :param login: The login used for https remotes
+        :param password: The password or token used for https remotes
+        """
+        self.root = root
+        self.reference = reference
+        self.depth = depth
+        self.clone_filter = None if depth else clone_filter
+        self.bare = bare
+        self.parallelism = parallelism
+        self.env = _auth_env(login, password)
+        self._state_lock = threading.Lock()
+
+    @property
+    def state_path(self):
+        return os.path.join(self.root, STATE_FILE)
+
+    def load_state(self) -> dict:
+        """:return: The pushed_at of every repository at its last sync"""
+        try:
+            with open(self.state_path, "r") as state_file:
+                return json.load(state_file)
+        except (OSError, ValueError):
+            return {}
+
+    def sync(self, repos) -> list:
+        """
+        Clones the repositories that are missing and fetches the ones that were
+        pushed to since the last sync.
+
+        :param repos: A list of dicts with the name, clone_url and pushed_at of
+        each repository
+        :return: A list of results with the name, action, duration and error
+        """
+        os.makedirs(self.root, exist_ok=True)
+        state = self.load_state()
+
+        with ThreadPoolExecutor(max_workers=self.parallelism) as executor:
+            results = list(
+                executor.map(lambda repo: self.sync_repo(repo, state), repos)
+            )
+
+        write_atomic(
+            self.state_path,
+            json.dumps(state, indent=2, sort_keys=True).encode("utf-8"),
+        )
+        return results
+
+    def sync_repo(self, repo, state):
+        """
+        Clones or fetches one repository and records its pushed_at in the state
+        if it succeeded.
+
+        :param repo: A dict with the name, clone_url and pushed_at
+        :param state: The state shared by the sync
+        :return: The result of the sync
+        """
+        name = repo["name"]
+        path = self.repo_path(name)
+        pushed_at = repo.get("pushed_at")
+        start = time.perf_counter()
+
+        exists = os.path.exists(path)
+
+        with self._state_lock:
+            unchanged = pushed_at is not None and state.get(name) == pushed_at
+
+        if exists and unchanged:
+            return _result(name, SKIPPED, start)
+
+        if exists:
+            action, args = FETCHED, self.fetch_args(path)
+        else:
+            action, args = CLONED, self.clone_args(repo["clone_url"], path)
+
+        result = Bash.run_captured_command(args, env=self.env)
+
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()
+            logging.error(f"Could not sync {name}: {error[-1] if error else ''}")
+            return _result(name, FAILED, start, "\n".join(error))
+
+        with self._state_lock:
+            state[name] = pushed_at
+
+        logging.debug("%s %s.", action.capitalize(), name)
+        return _result(name, action, start)
+
+    def repo_path(self, name):
+        return os.path.join(self.root, f"{name}.git" if self.bare else name)
+
+    def clone_args(self, url, path):
+        args = ["git", "clone", "--quiet"]
+
+        if self.bare:
+            args.append("--mirror")
+
+        if self.depth:
+            args += ["--depth", str(self.depth), "--no-single-branch"]
+        elif self.clone_filter:
+            args.append(f"--filter={self.clone_filter}")
+
+        if self.reference:
+            args += ["--reference-if-able", self.reference]
+
+        return args + ["--", url, path]
+
+    def fetch_args(self, path):
+        args = ["git", "-C", path, "fetch", "--quiet", "--prune"]
+
+        if self.depth:
+            args += ["--depth", str(self.depth)]
+
+        return args
+
+
+class RepoTemplate:
+    """
+    The initial commit of new repositories, built once from a template folder
+    in a temporary object store and pushed to each repository in parallel.
+    """
+
+    def __init__(self, path, login=None, password=None, parallelism=8):
+        """
+        :param path: The template folder. Files matched by its .gitignore are
+        left out
+        :param login: The login used for https remotes
+        :param password: The password or token used for https remotes
+        :param parallelism: The number of pushes run at once
+        """
+        self.path = os.path.abspath(path)
+        self.login = login
+        self.parallelism = parallelism
+        self.env = _auth_env(login, password)
+        self.git_dir = None
+        self.commit = None
+        self._identity = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def build(self, message="Initial commit", branch="main"):
+        """
+        Commits the template folder to a temporary bare repository.
+
+        :param message: The commit message
+        :param branch: The branch the commit is stored on
+        :raises RLIGitException: If git fails
+        :return: The id of the commit
+        """
+        self.git_dir = tempfile.mkdtemp(prefix="rli-template-")
+        git = ["git", f"--git-dir={self.git_dir}"]
+
+        self._git(["git", "init", "--quiet", "--bare", self.git_dir])
+
+        # Commit as the configured git user, or as the Github login if there is
+        # none.
+        if Bash.run_captured_command(git + ["var", "GIT_AUTHOR_IDENT"]).returncode:
+            name = self.login or "rli"
+            email = f"{name}@users.noreply.github.com"
+            self._identity = {
+                "GIT_AUTHOR_NAME": name,
+                "GIT_AUTHOR_EMAIL": email,
+                "GIT_COMMITTER_NAME": name,
+                "GIT_COMMITTER_EMAIL": email,
+            }
+
+        self._git(git + [f"--work-tree={self.path}", "add", "--all"])
+        tree = self._git(git + ["write-tree"])
+        self.commit = self._git(git + ["commit-tree", tree, "-m", message])
+        self._git(git + ["update-ref", f"refs/heads/{branch}", self.commit])
+
+        return self.commit
+
+    def push(self, targets) -> list:
+        """
+        Pushes the template commit to every target in parallel, one push per
+        repository.
+
+        :param targets: A dict of repository names to a tuple of the URL and
+        the branch to create
+        :return: A list of results with the name, action, duration and error
+        """
+        with ThreadPoolExecutor(max_workers=self.parallelism) as executor:
+            return list(executor.map(lambda item: self._push(*item), targets.items()))
+
+    def close(self):
+        if self.git_dir:
+            shutil.rmtree(self.git_dir, ignore_errors=True)
+            self.git_dir = None
+
+    def _push(self, name, target):
+        url, branch = target
+        start = time.perf_counter()
+
+        result = Bash.run_captured_command(
+            [
+                "git",
+                f"--git-dir={self.git_dir}",
+                "push",
+                "--quiet",
+                url,
+                f"{self.commit}:refs/heads/{branch}",
+            ],
+            env=self.env,
+        )
+
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()
+            logging.error(f"Could not push to {name}: {error[-1] if error else ''}")
+            return _result(name, FAILED, start, "\n".join(error))
+
+        return _result(name, PUSHED, start)
+
+    def _git(self, args):
+        result = Bash.run_captured_command(args, env=self._identity)
+
+        if result.returncode != 0:
+            raise RLIGitException(result.stderr.strip() or f"{args[1]} failed.")
+
+        return result.stdout.strip()
+
+
+def _auth_env(login, password):
+    """
+    Passes the credentials to git in the environment rather than the URL or
+    arguments, where other users could see them.
+    """
+    if not password:
+        return {"GIT_TERMINAL_PROMPT": "0"}
+
+    token = b64encode(f"{login}:{password}".encode("utf-8")).decode("utf-8")
+
+    return {
+        "GIT_TERMINAL_PROMPT": "0",
+        "GIT_CONFIG_COUNT": "1",
+        "GIT_CONFIG_KEY_0": "http.extraHeader",
+        "GIT_CONFIG_VALUE_0": f"Authorization: Basic {token}",
+    }
+
+
+def _result(name, action, start, error=None):
+    return {
+        "name": name,
+        "action": action,
+        "duration": round(time.perf_counter() - start, 3),
+        "error": error,
+    }
@@ -1,47 +1,114 @@
 from base64 import b64encode
-from github import Github, GithubException
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from github import Github, GithubException, UnknownObjectException
 from nacl import public, encoding
+from rli.constants import GITHUB_URL
+from rli.utils.trace import tracer
 import logging
+import mimetypes
+import os
 import requests
+import threading
+import time
 
+UPLOADED = "uploaded"
+FAILED = "failed"
 
-GITHUB_URL = "https://api.github.com"
+# Seconds before the first retry of an upload, doubled for each further retry.
+RETRY_DELAY = 1
+
+# PyGithub waits between requests by default, which a client shared by the
+# commands of a process turns into a delay of every command after the first.
+# GitHub's rate limits are handled by its retries instead.
+THROTTLE = {"seconds_between_requests": None, "seconds_between_writes": None}
 
 
 class RLIGithub:
+    # Clients shared by the commands of one process, e.g. the operations of
+    # rli batch, keyed by the account and credentials they use.
+    _shared = {}
+    _shared_lock = threading.Lock()
+
     def __init__(self, config):
         self.github = (
-            Github(config.login, config.password)
+            Github(config.login, config.password, base_url=config.url, **THROTTLE)
             if config.password
-            else Github(config.login)
+            else Github(config.login, base_url=config.url, **THROTTLE)
         )
         self.config = config
+        self._local = threading.local()
+
+    @classmethod
+    def shared(cls, config):
+        """
+        :param config: A GithubConfig
+        :return: The client of this process for the config's account and
+        credentials, created on first use
+        """
+        key = (config.url, config.organization, config.login, config.password)
 
-    def create_repo(self, repo_name, repo_description="", private="false"):
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(config)
+
+            return cls._shared[key]
+
+    def create_repo(
+        self, repo_name, repo_description="", private="false", auto_init=True
+    ):
         """Creates a Github repository for the user/org you specified in ~/.rli/config.json
 
         :param repo_name: The name of the repository
         :param repo_description: The description of the repository
         :param private: Whether or not the repo should be private. '"true"' or '"false"' are the options
+        :param auto_init: Whether or not Github should create an initial commit
         :return: None
         """
 
-        logging.debug(f"Creating repo '{repo_name}'.")
+        logging.debug("Creating repo '%s'.", repo_name)
         private = private == "true"
 
         try:
-            return self.github.get_user().create_repo(
-                repo_name,
-                description=repo_description,
-                private=private,
-                auto_init=True,
-            )
+            with tracer.span("POST /user/repos", "http", repo=repo_name):
+                return self.github.get_user().create_repo(
+                    repo_name,
+                    description=repo_description,
+                    private=private,
+                    auto_init=auto_init,
+                )
         except GithubException as e:
             if e.status == 422:
                 logging.error("Repository name is taken.")
             else:
                 logging.error("There was an exception when creating your repository.")
 
+    def list_repos(self):
+        """Lists the repositories of the user/org you specified in ~/.rli/config.json,
+        private ones included
+
+        :return: The repositories
+        """
+
+        owner = self.config.organization
+        logging.debug("Listing repos of '%s'.", owner)
+
+        # /users/{owner}/repos only lists public repos, so organizations are
+        # listed with /orgs/{org}/repos and the user's own account with
+        # /user/repos.
+        try:
+            with tracer.span("GET /orgs/{org}/repos", "http"):
+                return list(self.github.get_organization(owner).get_repos(type="all"))
+        except UnknownObjectException:
+            logging.debug("'%s' is not an organization.", owner)
+
+        if owner.lower() == (self.config.login or "").lower():
+            with tracer.span("GET /user/repos", "http"):
+                return list(self.github.get_user().get_repos(affiliation="owner"))
+
+        with tracer.span("GET /users/{owner}/repos", "http"):
+            return list(self.github.get_user(owner).get_repos())
+
     def add_secrets(self, repo_name, secrets_to_add, secrets):
         """Adds the given secrets to the repository.
 
@@ -51,7 +118,7 @@ class RLIGithub:
         :return: None
         """
 
-        logging.debug(f"Adding secrets to repo '{repo_name}'.")
+        logging.debug("Adding secrets to repo '%s'.", repo_name)
         public_key = self.get_public_key(repo_name)
         public_key_key = public_key.get("key", None)
         public_key_id = public_key.get("key_id", None)
@@ -71,11 +138,20 @@ class RLIGithub:
                 raise GithubException(response.status_code, response.json())
 
     def _put_encrypted_secret(self, repo, public_key_id, name, secret):
-        return requests.put(
-            url=f"{GITHUB_URL}/repos/{self.config.organization}/{repo}/actions/secrets/{name}",
-            auth=(self.config.login, self.config.password),
-            json={"encrypted_value": secret, "key_id": public_key_id},
-        )
+        with tracer.span(
+            "PUT /repos/{owner}/{repo}/actions/secrets/{name}",
+            "http",
+            repo=repo,
+            secret=name,
+        ) as span:
+            response = requests.put(
+                url=f"{self.config.url}/repos/{self.config.organization}/{repo}/actions/secrets/{name}",
+                auth=(self.config.login, self.config.password),
+                json={"encrypted_value": secret, "key_id": public_key_id},
+            )
+            span["status"] = response.status_code
+
+        return response
 
     def get_public_key(self, repo_name):
         """Gets the public key for the given repo.
@@ -85,16 +161,209 @@ class RLIGithub:
         :return: The key and key_id as a dict
         """
 
-        response = requests.get(
-            url=f"{GITHUB_URL}/repos/{self.config.organization}/{repo_name}/actions/secrets/public-key",
-            auth=(self.config.login, self.config.password),
-        )
+        with tracer.span(
+            "GET /repos/{owner}/{repo}/actions/secrets/public-key",
+            "http",
+            repo=repo_name,
+        ) as span:
+            response = requests.get(
+                url=f"{self.config.url}/repos/{self.config.organization}/{repo_name}/actions/secrets/public-key",
+                auth=(self.config.login, self.config.password),
+            )
+            span["status"] = response.status_code
 
         if response.ok:
             return response.json()
 
         raise GithubException(response.status_code, response.json())
 
+    def create_release(
+        self,
+        repo_name,
+        tag,
+        name=None,
+        body="",
+        draft=False,
+        prerelease=False,
+        target=None,
+    ):
+        """Creates a release of the repository.
+
+        :raises GithubException
+        :param repo_name: The repo to create the release in
+        :param tag: The tag of the release, created from target if it does not exist
+        :param name: The name of the release, the tag by default
+        :param body: The release notes
+        :param draft: Whether or not the release is a draft
+        :param prerelease: Whether or not the release is a prerelease
+        :param target: The branch or commit the tag is created from
+        :return: The release as a dict
+        """
+
+        logging.debug("Creating release '%s' of '%s'.", tag, repo_name)
+        payload = {
+            "tag_name": tag,
+            "name": name or tag,
+            "body": body,
+            "draft": draft,
+            "prerelease": prerelease,
+        }
+
+        if target:
+            payload["target_commitish"] = target
+
+        with tracer.span(
+            "POST /repos/{owner}/{repo}/releases", "http", repo=repo_name
+        ) as span:
+            response = self.session.post(
+                url=f"{self.config.url}/repos/{self.config.organization}/{repo_name}/releases",
+                json=payload,
+            )
+            span["status"] = response.status_code
+
+        if response.status_code != 201:
+            raise GithubException(response.status_code, response.json())
+
+        return response.json()
+
+    def upload_release_assets(
+        self, release, paths, parallelism=4, retries=3, retry_delay=RETRY_DELAY
+    ):
+        """Uploads files to a release in parallel.
+
+        :param release: The release, as returned by create_release
+        :param paths: The files to upload
+        :param parallelism: The number of files uploaded at once
+        :param retries: The number of times a failed upload is retried
+        :param retry_delay: The seconds before the first retry
+        :raises ValueError: If two files have the same name, as they would be
+        uploaded as the same asset
+        :return: A list of results with the name, action, size, duration,
+        throughput in bytes per second, attempts and error of each file
+        """
+
+        duplicates = duplicate_asset_names(paths)
+
+        if duplicates:
+            raise ValueError(f"Assets have the same name: {', '.join(duplicates)}")
+
+        with ThreadPoolExecutor(max_workers=parallelism) as executor:
+            return list(
+                executor.map(
+                    lambda path: self.upload_release_asset(
+                        release, path, retries, retry_delay
+                    ),
+                    paths,
+                )
+            )
+
+    def upload_release_asset(self, release, path, retries=3, retry_delay=RETRY_DELAY):
+        """Uploads a file to a release. The file is streamed from disk rather
+        than read into memory. Connection errors, rate limits and server errors
+        are retried, and an asset left behind by a failed attempt is deleted
+        before the next one. An asset with the same name that was there before
+        is kept, and the upload fails.
+
+        :param release: The release, as returned by create_release
+        :param path: The file to upload
+        :param retries: The number of times a failed upload is retried
+        :param retry_delay: The seconds before the first retry
+        :return: The result of the upload
+        """
+
+        name = os.path.basename(path)
+        size = os.path.getsize(path)
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        url = release["upload_url"].split("{")[0]
+        error = None
+
+        for attempt in range(1, retries + 2):
+            if attempt > 1:
+                time.sleep(retry_delay * 2 ** (attempt - 2))
+
+            start = time.perf_counter()
+
+            try:
+                with open(path, "rb") as asset, tracer.span(
+                    "POST /repos/{owner}/{repo}/releases/{id}/assets",
+                    "http",
+                    asset=name,
+                    bytes=size,
+                ) as span:
+                    response = self.session.post(
+                        url=url,
+                        params={"name": name},
+                        data=asset,
+                        headers={
+                            "Content-Type": content_type,
+                            "Content-Length": str(size),
+                        },
+                    )
+                    span["status"] = response.status_code
+            except requests.RequestException as e:
+                error = str(e)
+                logging.warning("Could not upload %s: %s", name, error)
+                continue
+
+            duration = time.perf_counter() - start
+
+            if response.status_code == 201:
+                return _upload_result(name, UPLOADED, size, duration, attempt)
+
+            error = f"{response.status_code} {response.text[:200]}"
+            logging.warning("Could not upload %s: %s", name, error)
+
+            if response.status_code == 422:
+                # Only an asset an earlier attempt left behind is deleted.
+                if attempt == 1 or not self._delete_release_asset(release, name):
+                    break
+            elif response.status_code != 429 and response.status_code < 500:
+                break
+
+        logging.error("Could not upload %s.", name)
+        return _upload_result(name, FAILED, size, 0, attempt, error)
+
+    def _delete_release_asset(self, release, name):
+        """Deletes the asset of the release with the given name.
+
+        :return: Whether an asset was deleted
+        """
+
+        assets_url = f"{release['url']}/assets"
+
+        with tracer.span("GET /repos/{owner}/{repo}/releases/{id}/assets", "http"):
+            response = self.session.get(url=assets_url, params={"per_page": 100})
+
+        if not response.ok:
+            return False
+
+        for asset in response.json():
+            if asset["name"] == name:
+                with tracer.span(
+                    "DELETE /repos/{owner}/{repo}/releases/assets/{id}", "http"
+                ):
+                    return self.session.delete(url=asset["url"]).ok
+
+        return False
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        A session for the REST calls PyGithub does not cover, with the API's
+        Accept header and the account's credentials. Each thread has its own,
+        so each reuses its own connections.
+        """
+        if not hasattr(self._local, "session"):
+            session = requests.Session()
+            session.headers["Accept"] = "application/vnd.github.v3+json"
+
+            if self.config.password:
+                session.auth = (self.config.login, self.config.password)
+
+            self._local.session = session
+
+        return self._local.session
+
     def _encrypt_secret(self, public_key, secret_value):
         """Encrypt a Unicode string using the public key."""
         public_key = public.PublicKey(
@@ -103,3 +372,24 @@ class RLIGithub:
         sealed_box = public.SealedBox(public_key)
         encrypted = sealed_box.encrypt(secret_value.encode("utf-8"))
         return b64encode(encrypted).decode("utf-8")
+
+
+def duplicate_asset_names(paths) -> list:
+    """
+    :param paths: The files to upload to a release
+    :return: The sorted file names that more than one of the files has
+    """
+    names = Counter(os.path.basename(path) for path in paths)
+    return sorted(name for name, count in names.items() if count > 1)
+
+
+def _upload_result(name, action, size, duration, attempts, error=None):
+    return {
+        "name": name,
+        "action": action,
+        "size": size,
+        "duration": round(duration, 3),
+        "throughput": round(size / duration) if duration else 0,
+        "attempts": attempts,
+        "error": error,
+    }
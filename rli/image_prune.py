@@ -0,0 +1,157 @@
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from rli.docker import image_repository
+from rli.exceptions import RLIDockerException
+
+REMOVED = "removed"
+UNTAGGED = "untagged"
+FAILED = "failed"
+
+NO_TAG = "<none>:<none>"
+NO_DIGEST = "<none>@<none>"
+
+
+class ImagePruner:
+    """
+    Removes old images by policy: the newest images of each repository are
+    kept, and so are images used by containers and images the caller protects,
+    such as those of the current and previous deploys. Images are listed in
+    one call to the engine.
+    """
+
+    def __init__(self, engine, parallelism=4):
+        """
+        :param engine: A DockerEngine
+        :param parallelism: The number of images removed at once
+        """
+        self.engine = engine
+        self.parallelism = parallelism
+
+    def plan(self, keep, older_than=None, protected=(), now=None) -> list:
+        """
+        Finds the images to remove. An image tagged in several repositories is
+        kept if it is one of the newest in any of them. Images pulled by digest
+        belong to the repositories of their digests. Images with neither tags
+        nor digests belong to no repository, so only their age and use keep
+        them.
+
+        :param keep: The number of newest images kept in each repository
+        :param older_than: Only removes images created more than this many
+        seconds ago
+        :param protected: The IDs of images that are never removed
+        :param now: The current unix timestamp
+        :raises RLIDockerException: If the engine can not be reached
+        :return: The images to remove, as returned by the engine, newest first
+        """
+        now = time.time() if now is None else now
+        kept = set(protected)
+        kept.update(c["ImageID"] for c in self.engine.containers(all=True))
+        repositories = defaultdict(list)
+        images = self.engine.images()
+
+        for image in images:
+            references = _tags(image) + _digests(image)
+
+            for repository in {image_repository(name) for name in references}:
+                repositories[repository].append(image)
+
+        for repository_images in repositories.values():
+            repository_images.sort(key=_newest_first)
+            kept.update(image["Id"] for image in repository_images[:keep])
+
+        if older_than is not None:
+            kept.update(
+                image["Id"] for image in images if image["Created"] > now - older_than
+            )
+
+        return sorted(
+            (image for image in images if image["Id"] not in kept), key=_newest_first
+        )
+
+    def prune(self, images) -> list:
+        """
+        Removes images in batches of parallelism, newest first, so an image
+        built on top of another one is removed in an earlier batch than the
+        image it depends on.
+
+        :param images: The images to remove, as returned by plan
+        :return: A dict for each image with its ID, tags, size, status and
+        error
+        """
+        results = []
+
+        with ThreadPoolExecutor(max_workers=self.parallelism) as executor:
+            for start in range(0, len(images), self.parallelism):
+                batch = images[start : start + self.parallelism]
+                results.extend(executor.map(self.remove, batch))
+
+        return results
+
+    def layers_size(self) -> int:
+        """
+        :return: The bytes the layers of all images take on disk, counting
+        layers that images share once. What a prune reclaims is the difference
+        before and after it
+        """
+        return self.engine.disk_usage()["LayersSize"]
+
+    def unique_size(self, images) -> int:
+        """
+        :param images: Images, as returned by the engine
+        :return: The bytes of the layers no other image has. Removing the
+        images reclaims at least this much, and more if some of their layers
+        are only shared with each other
+        """
+        usage = {
+            image["Id"]: image for image in self.engine.disk_usage()["Images"] or []
+        }
+        return sum(
+            usage[image["Id"]]["Size"] - max(usage[image["Id"]]["SharedSize"], 0)
+            for image in images
+            if image["Id"] in usage
+        )
+
+    def remove(self, image) -> dict:
+        """
+        Removes each tag of an image, which deletes it with the last one. An
+        image pulled by digest has its digests removed instead, and one with
+        neither is removed by ID.
+
+        :param image: An image, as returned by the engine
+        :return: A dict with its ID, tags, size, status and error. The status is
+        untagged if the engine kept the image, e.g. for an image another one
+        depends on
+        """
+        tags = _tags(image)
+        result = {
+            "id": image["Id"],
+            "tags": tags,
+            "size": image["Size"],
+            "status": FAILED,
+            "error": None,
+        }
+        deleted = False
+
+        try:
+            for name in tags or _digests(image) or [image["Id"]]:
+                response = self.engine.remove_image(name) or []
+                deleted = deleted or any("Deleted" in item for item in response)
+        except RLIDockerException as e:
+            result["error"] = e.message
+            return result
+
+        result["status"] = REMOVED if deleted else UNTAGGED
+        return result
+
+
+def _tags(image):
+    return [tag for tag in image.get("RepoTags") or [] if tag != NO_TAG]
+
+
+def _digests(image):
+    return [digest for digest in image.get("RepoDigests") or [] if digest != NO_DIGEST]
+
+
+def _newest_first(image):
+    return -image["Created"], image["Id"]
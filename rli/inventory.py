@@ -0,0 +1,360 @@
+import difflib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import requests
+from github import GithubException
+from rli.github import RLIGithub
+from rli.utils.paths import rli_dir
+from rli.utils.trace import tracer
+
+PER_PAGE = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    id INTEGER PRIMARY KEY,
+    organization TEXT NOT NULL,
+    name TEXT NOT NULL COLLATE NOCASE,
+    full_name TEXT NOT NULL,
+    private INTEGER NOT NULL,
+    visibility TEXT,
+    archived INTEGER NOT NULL,
+    default_branch TEXT,
+    clone_url TEXT,
+    updated_at TEXT,
+    pushed_at TEXT,
+    seen_at REAL NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS repos_name ON repos (organization, name);
+
+CREATE TABLE IF NOT EXISTS refreshes (
+    organization TEXT PRIMARY KEY,
+    etag TEXT,
+    updated_at TEXT,
+    refreshed_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+COLUMNS = (
+    "id",
+    "name",
+    "full_name",
+    "private",
+    "visibility",
+    "archived",
+    "default_branch",
+    "clone_url",
+    "updated_at",
+    "pushed_at",
+)
+
+
+def inventory_path():
+    return os.path.join(rli_dir(), "inventory.db")
+
+
+class RepoInventory:
+    """
+    A local index of the repositories of an organization in SQLite, so repo
+    names can be looked up and resolved to IDs without calling Github.
+
+    Refreshes list the repositories sorted by when they were last updated,
+    newest first. The first page is requested with the ETag of the last
+    refresh, so an unchanged organization costs one 304 response, and the scan
+    stops at the first repository that was not updated since the last refresh.
+    """
+
+    def __init__(self, config, path=None):
+        """
+        :param config: The GithubConfig of the organization
+        :param path: The database file, ~/.rli/inventory.db by default
+        """
+        self.config = config
+        self.organization = config.organization
+        self.path = path or inventory_path()
+        self.github = RLIGithub.shared(config)
+        self._connection = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        return self.github.session
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+
+        return self._connection
+
+    def refresh(self, full=False) -> int:
+        """
+        Brings the inventory up to date with Github.
+
+        :param full: Lists every repository and drops the ones that no longer
+        exist, instead of stopping at the first unchanged one
+        :raises GithubException: If Github answers with an error
+        :return: The number of repositories that were added or updated
+        """
+        with self._lock:
+            last = self.connection.execute(
+                "SELECT etag, updated_at FROM refreshes WHERE organization = ?",
+                (self.organization,),
+            ).fetchone()
+
+        etag, high_water = (None, None) if last is None or full else tuple(last)
+        started_at = time.time()
+        endpoints = self._endpoints()
+        url, params, route = endpoints.pop(0)
+        first_etag = None
+        newest = high_water
+        changed = 0
+
+        while url:
+            try:
+                response = self._get(
+                    url, params, etag if first_etag is None else None, route
+                )
+            except GithubException as e:
+                # Only organizations have /orgs/{org}/repos.
+                if e.status != 404 or first_etag is not None or not endpoints:
+                    raise
+
+                url, params, route = endpoints.pop(0)
+                continue
+
+            if response.status_code == 304:
+                logging.debug("The repos of %s did not change.", self.organization)
+                break
+
+            if first_etag is None:
+                first_etag = response.headers.get("ETag") or ""
+
+            repos = response.json()
+            fresh = [
+                repo
+                for repo in repos
+                if high_water is None or repo["updated_at"] > high_water
+            ]
+
+            if fresh:
+                newest = max([newest or ""] + [repo["updated_at"] for repo in fresh])
+
+            changed += self._upsert(repos if full else fresh, started_at)
+
+            if len(fresh) < len(repos):
+                break
+
+            url = response.links.get("next", {}).get("url")
+            params = None
+
+        with self._lock, self.connection:
+            if full:
+                self.connection.execute(
+                    "DELETE FROM repos WHERE organization = ? AND seen_at < ?",
+                    (self.organization, started_at),
+                )
+
+            self.connection.execute(
+                "INSERT OR REPLACE INTO refreshes "
+                "(organization, etag, updated_at, refreshed_at) VALUES (?, ?, ?, ?)",
+                (
+                    self.organization,
+                    first_etag if first_etag is not None else etag,
+                    newest,
+                    time.time(),
+                ),
+            )
+
+        return changed
+
+    def refreshed_at(self):
+        """:return: The unix timestamp of the last refresh, or None"""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT refreshed_at FROM refreshes WHERE organization = ?",
+                (self.organization,),
+            ).fetchone()
+
+        return None if row is None else row[0]
+
+    def get(self, name):
+        """
+        :param name: The name of a repository, in any case
+        :return: The repository as a dict, or None
+        """
+        with self._lock:
+            row = self.connection.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM repos "
+                "WHERE organization = ? AND name = ?",
+                (self.organization, name),
+            ).fetchone()
+
+        return None if row is None else _repo(row)
+
+    def resolve(self, name):
+        """
+        :param name: The name of a repository, in any case
+        :return: The ID of the repository, or None
+        """
+        repo = self.get(name)
+        return None if repo is None else repo["id"]
+
+    def all(self) -> list:
+        with self._lock:
+            rows = self.connection.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM repos WHERE organization = ? "
+                "ORDER BY name",
+                (self.organization,),
+            ).fetchall()
+
+        return [_repo(row) for row in rows]
+
+    def find(self, query, limit=20) -> list:
+        """
+        Finds repositories by name. Names that start with the query come first,
+        then names that contain it, then names that contain its characters in
+        order, ranked by similarity. Matching ignores case.
+
+        :param query: A part of a repository name
+        :param limit: The number of repositories returned
+        :return: A list of repositories as dicts
+        """
+        escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+        with self._lock:
+            prefixed = self.connection.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM repos WHERE organization = ? "
+                "AND name LIKE ? ESCAPE '\\' ORDER BY name LIMIT ?",
+                (self.organization, f"{escaped}%", limit),
+            ).fetchall()
+
+        found = [_repo(row) for row in prefixed]
+
+        if len(found) >= limit:
+            return found
+
+        seen = {repo["id"] for repo in found}
+        lowered = query.lower()
+        contained = []
+        fuzzy = []
+
+        for repo in self.all():
+            name = repo["name"].lower()
+
+            if repo["id"] in seen:
+                continue
+
+            if lowered in name:
+                contained.append(repo)
+            elif _is_subsequence(lowered, name):
+                ratio = difflib.SequenceMatcher(None, lowered, name).ratio()
+                fuzzy.append((-ratio, repo["name"], repo))
+
+        fuzzy.sort(key=lambda item: item[:2])
+        found += contained + [repo for _, _, repo in fuzzy]
+        return found[:limit]
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _endpoints(self):
+        """
+        /users/{owner}/repos only lists public repos, so organizations are
+        listed with /orgs/{org}/repos, and other accounts with /user/repos if
+        they are the user's own.
+
+        :return: The URL, query parameters and route of each list of repos to
+        try, in order
+        """
+        params = {"sort": "updated", "direction": "desc", "per_page": PER_PAGE}
+        endpoints = [
+            (
+                f"{self.config.url}/orgs/{self.organization}/repos",
+                dict(params, type="all"),
+                "GET /orgs/{org}/repos",
+            )
+        ]
+
+        if self.organization.lower() == (self.config.login or "").lower():
+            endpoints.append(
+                (
+                    f"{self.config.url}/user/repos",
+                    dict(params, affiliation="owner"),
+                    "GET /user/repos",
+                )
+            )
+        else:
+            endpoints.append(
+                (
+                    f"{self.config.url}/users/{self.organization}/repos",
+                    params,
+                    "GET /users/{owner}/repos",
+                )
+            )
+
+        return endpoints
+
+    def _get(self, url, params, etag, route):
+        headers = {"If-None-Match": etag} if etag else {}
+
+        with tracer.span(route, "http") as span:
+            response = self.session.get(url, params=params, headers=headers)
+            span["status"] = response.status_code
+
+        if response.status_code != 304 and not response.ok:
+            raise GithubException(response.status_code, response.json())
+
+        return response
+
+    def _upsert(self, repos, seen_at):
+        with self._lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO repos (id, organization, name, full_name, "
+                "private, visibility, archived, default_branch, clone_url, "
+                "updated_at, pushed_at, seen_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        repo["id"],
+                        self.organization,
+                        repo["name"],
+                        repo.get("full_name") or repo["name"],
+                        int(bool(repo.get("private"))),
+                        repo.get("visibility"),
+                        int(bool(repo.get("archived"))),
+                        repo.get("default_branch"),
+                        repo.get("clone_url"),
+                        repo.get("updated_at"),
+                        repo.get("pushed_at"),
+                        seen_at,
+                    )
+                    for repo in repos
+                ),
+            )
+
+        return len(repos)
+
+
+def _repo(row):
+    repo = dict(row)
+    repo["private"] = bool(repo["private"])
+    repo["archived"] = bool(repo["archived"])
+    return repo
+
+
+def _is_subsequence(query, name):
+    characters = iter(name)
+    return all(character in characters for character in query)
@@ -0,0 +1,206 @@
+import ast
+import json
+import logging
+import os
+from rli.utils.paths import cache_dir, write_atomic
+
+COMMANDS_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), "commands"))
+ROOT_MODULE = os.path.abspath(os.path.join(os.path.dirname(__file__), "cli.py"))
+INDEX_VERSION = 2
+
+
+class CommandRegistry:
+    """
+    An index of the commands in rli/commands and of the options of rli itself
+    that is built by parsing rli/cli.py and the cmd_*.py files instead of
+    importing them. The index is stored in the cache folder and rebuilt
+    whenever one of those files is added, removed or modified.
+    """
+
+    def __init__(self, folder=COMMANDS_FOLDER, index_path=None, root=ROOT_MODULE):
+        self.folder = folder
+        self.index_path = index_path or os.path.join(cache_dir(), "commands.json")
+        self.root = root
+        self._index = None
+
+    @property
+    def index(self) -> dict:
+        if self._index is None:
+            self._index = self.load()
+
+        return self._index
+
+    @property
+    def commands(self) -> dict:
+        return self.index["commands"]
+
+    @property
+    def options(self) -> list:
+        """The options of rli itself, which come before the command."""
+        return self.index["options"]
+
+    def names(self):
+        return sorted(self.commands)
+
+    def get(self, name):
+        """
+        Gets the indexed information of a command.
+
+        :param name: The name of the command, e.g. github
+        :return: A dict with the module, help, options and sub commands of the
+        command, or None if there is no such command
+        """
+        return self.commands.get(name)
+
+    def load(self):
+        """
+        Loads the index from the cache folder, rebuilding it if it is missing
+        or out of date.
+
+        :return: The index, with the options of rli and the commands keyed by
+        name
+        """
+        fingerprint = self.fingerprint()
+
+        try:
+            with open(self.index_path, "r") as index_file:
+                index = json.load(index_file)
+
+            if (
+                index.get("version") == INDEX_VERSION
+                and index.get("fingerprint") == fingerprint
+            ):
+                return index
+        except (OSError, ValueError):
+            pass
+
+        index = dict(self.build(), version=INDEX_VERSION, fingerprint=fingerprint)
+
+        try:
+            write_atomic(self.index_path, json.dumps(index).encode("utf-8"))
+        except OSError:
+            logging.debug("Could not write the command index to %s.", self.index_path)
+
+        return index
+
+    def fingerprint(self):
+        """The name, modification time and size of rli/cli.py and every command file."""
+        fingerprint = []
+
+        for path in [self.root] + [
+            os.path.join(self.folder, filename) for filename in self.command_files()
+        ]:
+            stat = os.stat(path)
+            fingerprint.append([os.path.basename(path), stat.st_mtime_ns, stat.st_size])
+
+        return fingerprint
+
+    def command_files(self):
+        return sorted(
+            filename
+            for filename in os.listdir(self.folder)
+            if filename.endswith(".py") and filename.startswith("cmd_")
+        )
+
+    def build(self):
+        """Parses rli/cli.py and every command file into the index."""
+        with open(self.root, "r") as root_file:
+            root = parse_command_module(ast.parse(root_file.read(), self.root))
+
+        commands = {}
+
+        for filename in self.command_files():
+            name = filename[4:-3]
+
+            with open(os.path.join(self.folder, filename), "r") as command_file:
+                tree = ast.parse(command_file.read(), filename)
+
+            command = parse_command_module(tree)
+
+            if command is not None:
+                command["module"] = f"rli.commands.cmd_{name}"
+                commands[name] = command
+
+        return {"options": root["options"], "commands": commands}
+
+
+def parse_command_module(tree):
+    """
+    Finds the click command or group named cli in a parsed command module, along
+    with the commands added to it with @cli.command.
+
+    :param tree: The parsed module
+    :return: The command as a dict, or None if the module has no cli command
+    """
+    command = None
+    sub_commands = {}
+
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef):
+            continue
+
+        for decorator in node.decorator_list:
+            kind = _decorator_name(decorator)
+
+            if node.name == "cli" and kind in ("click.command", "click.group"):
+                command = _parse_command(node, decorator)
+                command["group"] = kind == "click.group"
+            elif kind in ("cli.command", "cli.group"):
+                sub_command = _parse_command(node, decorator)
+                sub_commands[sub_command.pop("name")] = sub_command
+
+    if command is None:
+        return None
+
+    command.pop("name")
+    command["commands"] = sub_commands
+    return command
+
+
+def _parse_command(node, decorator):
+    args = [_literal(arg) for arg in decorator.args]
+    kwargs = {keyword.arg: _literal(keyword.value) for keyword in decorator.keywords}
+    name = kwargs.get("name") or (args[0] if args else None)
+
+    return {
+        "name": name or node.name.replace("_", "-"),
+        "help": kwargs.get("help") or ast.get_docstring(node),
+        "options": [
+            _parse_option(decorator)
+            for decorator in node.decorator_list
+            if _decorator_name(decorator) in ("click.option", "click.argument")
+        ],
+    }
+
+
+def _parse_option(decorator):
+    kwargs = {keyword.arg: _literal(keyword.value) for keyword in decorator.keywords}
+    decls = [_literal(arg) for arg in decorator.args]
+
+    return {
+        "opts": [decl for decl in decls if isinstance(decl, str)],
+        "argument": _decorator_name(decorator) == "click.argument",
+        "help": kwargs.get("help"),
+        "multiple": bool(kwargs.get("multiple")),
+        "is_flag": bool(kwargs.get("is_flag")),
+    }
+
+
+def _decorator_name(decorator):
+    if isinstance(decorator, ast.Call):
+        decorator = decorator.func
+
+    if isinstance(decorator, ast.Attribute) and isinstance(decorator.value, ast.Name):
+        return f"{decorator.value.id}.{decorator.attr}"
+
+    return None
+
+
+def _literal(node):
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        return None
+
+
+registry = CommandRegistry()
@@ -0,0 +1,212 @@
+import json
+import logging
+import os
+import requests
+import sqlite3
+from abc import ABC, abstractmethod
+from rli.exceptions import RLISecretsException
+from rli.utils.cache import TTLCache
+from rli.utils.json_scan import load_keys
+from rli.utils.trace import tracer
+
+SECRETS_TTL = 60
+
+# The number of keys asked for in one request to a vault.
+VAULT_BATCH_SIZE = 500
+
+
+class SecretProvider(ABC):
+    """
+    A source of secrets. Providers implement get_many so that one that can
+    batch fetches every requested secret in one call.
+    """
+
+    # Identifies the provider's secrets in the shared cache.
+    cache_key = None
+
+    def get(self, key, default=None):
+        return self.get_many([key]).get(key, default)
+
+    @abstractmethod
+    def get_many(self, keys) -> dict:
+        """
+        :param keys: The keys of the secrets
+        :return: A dict of the keys that were found and their values
+        """
+
+    @abstractmethod
+    def get_all(self) -> dict:
+        """:return: A dict of every secret"""
+
+
+class JSONFileProvider(SecretProvider):
+    """Reads a JSON object of secrets, ~/.rli/secrets.json by default."""
+
+    def __init__(self, path):
+        self.path = path
+        self.cache_key = ("json", os.path.abspath(path))
+
+    def get_many(self, keys) -> dict:
+        return load_keys(self.path, keys)
+
+    def get_all(self) -> dict:
+        with open(self.path, "r") as secrets_file:
+            return json.load(secrets_file)
+
+
+class EnvironmentProvider(SecretProvider):
+    """Reads secrets from environment variables named prefix + key."""
+
+    def __init__(self, prefix=""):
+        self.prefix = prefix
+        self.cache_key = ("env", prefix)
+
+    def get_many(self, keys) -> dict:
+        return {
+            key: os.environ[self.prefix + key]
+            for key in keys
+            if self.prefix + key in os.environ
+        }
+
+    def get_all(self) -> dict:
+        return {
+            name[len(self.prefix) :]: value
+            for name, value in os.environ.items()
+            if name.startswith(self.prefix)
+        }
+
+
+class StoreProvider(SecretProvider):
+    """Reads secrets from a namespace of the indexed SecretStore."""
+
+    def __init__(self, store):
+        self.store = store
+        self.cache_key = ("store", os.path.abspath(store.path), store.namespace)
+
+    def get_many(self, keys) -> dict:
+        try:
+            return self.store.get_many(keys)
+        except sqlite3.Error as e:
+            raise RLISecretsException(f"Could not read the secret store: {e}")
+
+    def get_all(self) -> dict:
+        try:
+            return self.store.items()
+        except sqlite3.Error as e:
+            raise RLISecretsException(f"Could not read the secret store: {e}")
+
+
+class VaultProvider(SecretProvider):
+    """
+    Reads secrets from an HTTP vault. Secrets are fetched in batches with
+    POST {url}/v1/secrets/{namespace}/batch and a body of {"keys": [...]}, and
+    all of a namespace with GET {url}/v1/secrets/{namespace}. Both answer with
+    {"secrets": {key: value}}.
+    """
+
+    def __init__(self, url, token=None, namespace="default", timeout=10):
+        self.url = url.rstrip("/")
+        self.token = token
+        self.namespace = namespace
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.cache_key = ("vault", self.url, namespace)
+
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def get_many(self, keys) -> dict:
+        keys = list(dict.fromkeys(keys))
+        secrets = {}
+
+        for start in range(0, len(keys), VAULT_BATCH_SIZE):
+            secrets.update(
+                self._request(
+                    "POST",
+                    "/v1/secrets/{namespace}/batch",
+                    json={"keys": keys[start : start + VAULT_BATCH_SIZE]},
+                )
+            )
+
+        return secrets
+
+    def get_all(self) -> dict:
+        return self._request("GET", "/v1/secrets/{namespace}")
+
+    def _request(self, method, path, **kwargs):
+        with tracer.span(f"{method} {path}", "http", namespace=self.namespace) as span:
+            try:
+                response = self.session.request(
+                    method,
+                    self.url + path.format(namespace=self.namespace),
+                    timeout=self.timeout,
+                    **kwargs,
+                )
+            except requests.RequestException as e:
+                raise RLISecretsException(f"Could not reach the vault: {e}")
+
+            span["status"] = response.status_code
+
+        if not response.ok:
+            raise RLISecretsException(
+                f"The vault answered {response.status_code} to {method} {path}."
+            )
+
+        try:
+            return response.json()["secrets"]
+        except (ValueError, KeyError, TypeError):
+            raise RLISecretsException("The vault sent an invalid response.")
+
+
+class CachedProvider(SecretProvider):
+    """
+    Keeps the secrets a provider returned in memory for a time to live, so
+    repeated lookups in a deploy or batch do not go back to the provider. Keys
+    the provider did not have are cached too. get_all is never cached.
+    """
+
+    def __init__(self, provider, cache=None, ttl=SECRETS_TTL):
+        self.provider = provider
+        self.cache = secrets_cache if cache is None else cache
+        self.ttl = ttl
+        self.cache_key = provider.cache_key
+
+    def get_many(self, keys) -> dict:
+        secrets = {}
+        missing = []
+
+        for key in dict.fromkeys(keys):
+            value = self.cache.get((self.cache_key, key), _MISSING)
+
+            if value is _MISSING:
+                missing.append(key)
+            elif value is not _ABSENT:
+                secrets[key] = value
+
+        if missing:
+            logging.debug(
+                "Fetching %s secrets from %s.", len(missing), self.cache_key[0]
+            )
+            fetched = self.provider.get_many(missing)
+
+            for key in missing:
+                value = fetched.get(key, _ABSENT)
+                self.cache.set((self.cache_key, key), value, self.ttl)
+
+                if value is not _ABSENT:
+                    secrets[key] = value
+
+        return secrets
+
+    def get_all(self) -> dict:
+        return self.provider.get_all()
+
+    def invalidate(self):
+        """Drops this provider's cached secrets."""
+        self.cache.invalidate_where(lambda key: key[0] == self.cache_key)
+
+
+_MISSING = object()
+_ABSENT = object()
+
+secrets_cache = TTLCache(max_size=4096, ttl=SECRETS_TTL)
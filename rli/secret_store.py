@@ -0,0 +1,190 @@
+import os
+import sqlite3
+import threading
+import time
+from rli.utils.json_scan import iter_items
+
+DEFAULT_NAMESPACE = "default"
+
+# SQLite limits the number of parameters in one statement.
+MAX_PARAMETERS = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS secrets (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS secrets_updated_at ON secrets (namespace, updated_at);
+"""
+
+UPSERT = """
+INSERT INTO secrets (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)
+ON CONFLICT (namespace, key) DO UPDATE
+SET value = excluded.value, updated_at = excluded.updated_at
+WHERE value != excluded.value
+"""
+
+
+class SecretStore:
+    """
+    Secrets kept in an SQLite database, indexed by namespace and key so a
+    lookup does not read the other secrets. Each secret records when its value
+    last changed, so sync commands can push only what changed since their last
+    run. The database file is readable only by its owner.
+    """
+
+    def __init__(self, path, namespace=DEFAULT_NAMESPACE):
+        self.path = path
+        self.namespace = namespace or DEFAULT_NAMESPACE
+        self._connection = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+            # Create the file with restricted permissions before SQLite opens it.
+            os.close(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600))
+
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+
+        return self._connection
+
+    def namespaced(self, namespace):
+        """
+        :param namespace: The namespace of the new store
+        :return: A store over the same database in another namespace
+        """
+        return SecretStore(self.path, namespace)
+
+    def get(self, key, default=None):
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT value FROM secrets WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+
+        return default if row is None else row[0]
+
+    def get_many(self, keys) -> dict:
+        """
+        :param keys: The keys of the secrets
+        :return: A dict of the keys that were found and their values
+        """
+        keys = list(dict.fromkeys(keys))
+        secrets = {}
+
+        with self._lock:
+            for start in range(0, len(keys), MAX_PARAMETERS):
+                chunk = keys[start : start + MAX_PARAMETERS]
+                rows = self.connection.execute(
+                    "SELECT key, value FROM secrets WHERE namespace = ? AND key IN "
+                    f"({', '.join('?' * len(chunk))})",
+                    (self.namespace, *chunk),
+                )
+                secrets.update(rows)
+
+        return secrets
+
+    def items(self) -> dict:
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT key, value FROM secrets WHERE namespace = ? ORDER BY key",
+                (self.namespace,),
+            )
+            return dict(rows)
+
+    def keys(self) -> list:
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT key FROM secrets WHERE namespace = ? ORDER BY key",
+                (self.namespace,),
+            )
+            return [key for key, in rows]
+
+    def changed_since(self, timestamp) -> dict:
+        """
+        :param timestamp: A unix timestamp
+        :return: A dict of the secrets whose value changed after the timestamp
+        """
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT key, value FROM secrets WHERE namespace = ? AND updated_at > ? "
+                "ORDER BY updated_at",
+                (self.namespace, timestamp),
+            )
+            return dict(rows)
+
+    def updated_at(self, key):
+        """
+        :param key: The key of a secret
+        :return: The unix timestamp of the last change to the secret or None
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT updated_at FROM secrets WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+
+        return None if row is None else row[0]
+
+    def set(self, key, value):
+        return self.set_many({key: value}.items())
+
+    def set_many(self, items) -> int:
+        """
+        Adds or updates secrets in one transaction. A secret whose value did not
+        change keeps its timestamp.
+
+        :param items: An iterable of (key, value) tuples
+        :return: The number of secrets that were added or changed
+        """
+        now = time.time()
+
+        with self._lock, self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany(
+                UPSERT,
+                ((self.namespace, key, _text(key, value), now) for key, value in items),
+            )
+            return self.connection.total_changes - before
+
+    def delete(self, key) -> bool:
+        with self._lock, self.connection:
+            cursor = self.connection.execute(
+                "DELETE FROM secrets WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            )
+            return cursor.rowcount > 0
+
+    def import_json(self, path) -> int:
+        """
+        Imports a secrets.json file. The file is streamed, so it is never fully
+        loaded.
+
+        :param path: The path of a JSON object of secrets
+        :raises ValueError: If the file is not a JSON object of strings
+        :return: The number of secrets that were added or changed
+        """
+        return self.set_many(iter_items(path))
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def _text(key, value):
+    if not isinstance(value, str):
+        raise ValueError(f"The value of the secret '{key}' is not a string.")
+
+    return value
@@ -1,18 +1,163 @@
 import subprocess
 import logging
 import os
+from rli.utils.cache import TTLCache
+from rli.utils.trace import tracer
+
+# Environment variables from the parent process that change what a cached
+# docker query would return.
+CACHE_KEY_ENV = (
+    "DOCKER_HOST",
+    "DOCKER_CONTEXT",
+    "DOCKER_CONFIG",
+    "DOCKER_CERT_PATH",
+    "DOCKER_TLS_VERIFY",
+)
 
 
 class Bash:
+    cache = TTLCache(max_size=256, ttl=60)
+
+    @staticmethod
+    def run_command(args, env=None, redact=()) -> subprocess.CompletedProcess:
+        """
+        Runs a command, discarding its output. The environment is copied, so it
+        can run from several threads.
+
+        :param args: The command to run
+        :param env: Extra environment variables for the command
+        :param redact: Values such as passwords that are masked in traces
+        :return: The completed process
+        """
+        logging.debug("Running the following command: %s", args)
+
+        new_env = dict(os.environ)
+
+        if env:
+            new_env.update(env)
+
+        with Bash._span(args, env, redact) as span:
+            result = subprocess.run(
+                args=args,
+                env=new_env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.STDOUT,
+            )
+            span["returncode"] = result.returncode
+
+        return result
+
+    @staticmethod
+    def run_cached_command(args, env=None, ttl=None) -> subprocess.CompletedProcess:
+        """
+        Runs a read only command and captures its stdout. Successful results
+        are reused for identical commands until they expire or are invalidated.
+
+        :param args: The command to run
+        :param env: Extra environment variables for the command
+        :param ttl: The number of seconds the result is valid for. Defaults to
+        the ttl of Bash.cache
+        :return: The completed process with stdout as a string
+        """
+        key = Bash._cache_key(args, env)
+        result = Bash.cache.get(key)
+
+        if result is not None:
+            logging.debug("Using the cached result of: %s", args)
+            return result
+
+        logging.debug("Running the following command: %s", args)
+
+        new_env = dict(os.environ)
+
+        if env:
+            new_env.update(env)
+
+        with Bash._span(args, env, ()) as span:
+            result = subprocess.run(
+                args=args,
+                env=new_env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                universal_newlines=True,
+            )
+            span["returncode"] = result.returncode
+
+        if result.returncode == 0:
+            Bash.cache.set(key, result, ttl)
+
+        return result
+
     @staticmethod
-    def run_command(args, env=None) -> subprocess.CompletedProcess:
-        logging.debug(f"Running the following command: {args}")
+    def run_captured_command(args, env=None, cwd=None) -> subprocess.CompletedProcess:
+        """
+        Runs a command and captures its stdout and stderr.
+
+        :param args: The command to run
+        :param env: Extra environment variables for the command
+        :param cwd: The folder to run the command in
+        :return: The completed process with stdout and stderr as strings
+        """
+        logging.debug("Running the following command: %s", args)
 
-        new_env = os.environ
+        new_env = dict(os.environ)
 
         if env:
             new_env.update(env)
 
-        return subprocess.run(
-            args=args, env=new_env, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT
+        with Bash._span(args, env, ()) as span:
+            result = subprocess.run(
+                args=args,
+                env=new_env,
+                cwd=cwd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                universal_newlines=True,
+            )
+            span["returncode"] = result.returncode
+
+        return result
+
+    @staticmethod
+    def invalidate(*tokens):
+        """
+        Drops cached results of commands that mention any of the tokens in
+        their arguments. Drops every cached result if no tokens are given.
+
+        :param tokens: Strings such as image names to look for
+        :return: None
+        """
+        if not tokens:
+            Bash.cache.clear()
+            return
+
+        Bash.cache.invalidate_where(
+            lambda key: any(token in arg for token in tokens for arg in key[0])
         )
+
+    @staticmethod
+    def _cache_key(args, env):
+        env = env or {}
+        return (
+            tuple(args),
+            tuple(sorted(env.items())),
+            tuple(os.environ.get(name) for name in CACHE_KEY_ENV),
+        )
+
+    @staticmethod
+    def _span(args, env, redact):
+        if not tracer.enabled:
+            return tracer.span(None, "subprocess")
+
+        hidden = set(redact) | set((env or {}).values())
+        argv = []
+
+        for arg in args:
+            if arg in hidden:
+                arg = "***"
+            elif "=" in arg and not arg.startswith("-"):
+                arg = arg.split("=", 1)[0] + "=***"
+
+            argv.append(arg)
+
+        return tracer.span(" ".join(argv[:2]), "subprocess", argv=argv)
@@ -0,0 +1,191 @@
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+BLOCK_SIZE = 4 * 1024 * 1024
+
+GZIP_MAGIC = b"\x1f\x8b"
+FEXTRA = 0x04
+# A gzip header with an extra field holding the size of the whole member, so a
+# reader can find the next member without inflating this one, like BGZF.
+HEADER = struct.Struct("<2sBBIBBH2sHI")
+SUBFIELD_ID = b"RL"
+TRAILER = struct.Struct("<II")
+
+
+def compress(source, target, level=6, block_size=BLOCK_SIZE, threads=None):
+    """
+    Compresses a stream into gzip members of one block each, compressing
+    several blocks at once. zlib releases the GIL, so the blocks are compressed
+    in parallel. The output is a multi-member gzip file any gzip reader can
+    read, and decompress inflates its members in parallel too.
+
+    At most two blocks per thread are in memory at once.
+
+    :param source: A binary file object to read from
+    :param target: A binary file object to write to
+    :param level: The compression level, from 1 to 9
+    :param block_size: The number of bytes compressed into each member
+    :param threads: The number of blocks compressed at once. Defaults to the
+    number of CPUs
+    :return: A tuple of the number of bytes read and written
+    """
+    threads = threads or os.cpu_count() or 1
+    read = written = 0
+    pending = deque()
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        while True:
+            block = _read_block(source, block_size)
+
+            if block:
+                read += len(block)
+                pending.append(executor.submit(_compress_block, block, level))
+
+            while pending and (len(pending) > threads * 2 or not block):
+                written += _write(target, pending.popleft().result())
+
+            if not block:
+                return read, written
+
+
+def decompress(source, target, threads=None):
+    """
+    Decompresses a gzip stream. Members written by compress are inflated in
+    parallel. Other gzip streams are inflated in one thread, and streams that
+    are not compressed are copied as they are.
+
+    :param source: A binary file object to read from
+    :param target: A binary file object to write to
+    :param threads: The number of members inflated at once. Defaults to the
+    number of CPUs
+    :return: A tuple of the number of bytes read and written
+    """
+    threads = threads or os.cpu_count() or 1
+    read = written = 0
+    pending = deque()
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        while True:
+            header = _read_block(source, HEADER.size)
+
+            if not header:
+                break
+
+            size = _member_size(header)
+
+            if size is None:
+                if read:
+                    raise zlib.error("A member of the stream is not a block.")
+
+                return _decompress_stream(header, source, target)
+
+            member = header + _read_block(source, size - len(header))
+
+            if len(member) != size:
+                raise zlib.error("The stream is truncated.")
+
+            read += size
+            pending.append(executor.submit(_decompress_block, member))
+
+            while len(pending) > threads * 2:
+                written += _write(target, pending.popleft().result())
+
+        while pending:
+            written += _write(target, pending.popleft().result())
+
+    return read, written
+
+
+def _compress_block(block, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    deflated = compressor.compress(block) + compressor.flush()
+    size = HEADER.size + len(deflated) + TRAILER.size
+    header = HEADER.pack(GZIP_MAGIC, 8, FEXTRA, 0, 0, 255, 8, SUBFIELD_ID, 4, size)
+    trailer = TRAILER.pack(zlib.crc32(block), len(block) & 0xFFFFFFFF)
+    return header + deflated + trailer
+
+
+def _decompress_block(member):
+    block = zlib.decompress(member[HEADER.size : -TRAILER.size], -zlib.MAX_WBITS)
+    crc, size = TRAILER.unpack(member[-TRAILER.size :])
+
+    if crc != zlib.crc32(block) or size != len(block) & 0xFFFFFFFF:
+        raise zlib.error("A block does not match its checksum.")
+
+    return block
+
+
+def _member_size(header):
+    """:return: The size of the member if the header is one of ours, or None"""
+    if len(header) < HEADER.size:
+        return None
+
+    magic, method, flags, _, _, _, xlen, subfield, length, size = HEADER.unpack(header)
+
+    if (
+        magic != GZIP_MAGIC
+        or method != 8
+        or flags != FEXTRA
+        or xlen != 8
+        or subfield != SUBFIELD_ID
+        or length != 4
+    ):
+        return None
+
+    return size
+
+
+def _decompress_stream(head, source, target):
+    """Inflates any gzip stream, member after member, or copies it."""
+    read = written = 0
+    data = head
+    inflater = (
+        zlib.decompressobj(zlib.MAX_WBITS | 16) if head[:2] == GZIP_MAGIC else None
+    )
+
+    while data:
+        read += len(data)
+
+        if inflater is None:
+            output = data
+        else:
+            output = inflater.decompress(data)
+
+            # A new member starts after the end of the previous one.
+            while inflater.eof and inflater.unused_data:
+                rest = inflater.unused_data
+                inflater = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                output += inflater.decompress(rest)
+
+        target.write(output)
+        written += len(output)
+        data = source.read(BLOCK_SIZE)
+
+    if inflater is not None and not inflater.eof:
+        raise zlib.error("The stream is truncated.")
+
+    return read, written
+
+
+def _read_block(source, size):
+    """Reads size bytes unless the stream ends first, even from a pipe."""
+    chunks = []
+
+    while size > 0:
+        chunk = source.read(size)
+
+        if not chunk:
+            break
+
+        chunks.append(chunk)
+        size -= len(chunk)
+
+    return b"".join(chunks)
+
+
+def _write(target, data):
+    target.write(data)
+    return len(data)
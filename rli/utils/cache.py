@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """A thread safe LRU cache whose entries expire after a time to live."""
+
+    def __init__(self, max_size=256, ttl=60):
+        """
+        :param max_size: The number of entries kept before the least recently
+        used one is evicted
+        :param ttl: The default number of seconds an entry is valid for
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Gets the value stored for the key if it has not expired.
+
+        :param key: The key of the entry
+        :param default: The value returned when there is no valid entry
+        :return: The cached value or the default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return default
+
+            value, expires_at = entry
+
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Stores the value for the key, evicting the least recently used entries
+        if the cache is full.
+
+        :param key: The key of the entry
+        :param value: The value to store
+        :param ttl: The number of seconds the entry is valid for. Defaults to
+        the ttl of the cache
+        :return: None
+        """
+        ttl = self.ttl if ttl is None else ttl
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """Removes the entry for the key if there is one."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        """
+        Removes every entry whose key matches the predicate.
+
+        :param predicate: A function that takes a key and returns True if the
+        entry should be removed
+        :return: The number of entries removed
+        """
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+
+            for key in keys:
+                del self._entries[key]
+
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+_MISSING = object()
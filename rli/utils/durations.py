@@ -0,0 +1,45 @@
+import re
+import time
+from datetime import datetime
+
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+DURATION = re.compile(r"^(?:\d+(?:\.\d+)?[smhdw])+$")
+PART = re.compile(r"(\d+(?:\.\d+)?)([smhdw])")
+
+
+def parse_duration(value) -> float:
+    """
+    :param value: A duration such as 30s, 10m, 1h30m, 2d or 1w
+    :raises ValueError: If the value is not a duration
+    :return: The number of seconds
+    """
+    if not DURATION.match(value):
+        raise ValueError(f"'{value}' is not a duration.")
+
+    return sum(float(number) * UNITS[unit] for number, unit in PART.findall(value))
+
+
+def parse_timestamp(value) -> float:
+    """
+    :param value: A unix timestamp or an ISO 8601 date, in local time unless it
+        has an offset
+    :raises ValueError: If the value is neither
+    :return: The unix timestamp
+    """
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def parse_since(value, now=None) -> float:
+    """
+    :param value: A duration before now, a unix timestamp or an ISO 8601 date
+    :param now: The current unix timestamp
+    :raises ValueError: If the value is none of them
+    :return: The unix timestamp
+    """
+    try:
+        return (time.time() if now is None else now) - parse_duration(value)
+    except ValueError:
+        return parse_timestamp(value)
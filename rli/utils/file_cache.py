@@ -0,0 +1,104 @@
+import hashlib
+import json
+import logging
+import marshal
+import os
+import sys
+import threading
+from rli.utils.paths import cache_dir, write_atomic
+
+COMPILED_VERSION = 1
+
+
+class JSONFileCache:
+    """
+    A process wide cache of parsed JSON files. Entries are keyed by the file's
+    mtime, size and inode, so an edited file is parsed again on its next load.
+
+    Parsed files are also stored in the cache folder in marshal format, which
+    loads faster than JSON, so a new process only pays for parsing once per
+    change to the file. The compiled files are readable only by their owner
+    because they can contain secrets.
+
+    The returned values are shared and must not be modified.
+    """
+
+    def __init__(self, folder=None):
+        self.folder = folder
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def load(self, path):
+        """
+        Loads a JSON file from memory, the compiled cache or the file itself.
+
+        :param path: The path of the JSON file
+        :raises FileNotFoundError: If the file does not exist
+        :return: The parsed JSON
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return _parse(path)
+
+        fingerprint = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+        with self._lock:
+            entry = self._entries.get(path)
+
+        if entry is not None and entry[0] == fingerprint:
+            return entry[1]
+
+        data = self._load_compiled(path, fingerprint)
+
+        if data is None:
+            data = _parse(path)
+            self._store_compiled(path, fingerprint, data)
+
+        with self._lock:
+            self._entries[path] = (fingerprint, data)
+
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def compiled_path(self, path):
+        name = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+        return os.path.join(self.folder or cache_dir(), "json", f"{name}.marshal")
+
+    def _load_compiled(self, path, fingerprint):
+        try:
+            with open(self.compiled_path(path), "rb") as compiled:
+                header, data = marshal.load(compiled)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        if header != _header(path, fingerprint):
+            return None
+
+        return data
+
+    def _store_compiled(self, path, fingerprint, data):
+        try:
+            write_atomic(
+                self.compiled_path(path),
+                marshal.dumps((_header(path, fingerprint), data)),
+                mode=0o600,
+            )
+        except (OSError, ValueError):
+            logging.debug("Could not store the compiled form of %s.", path)
+
+
+def _header(path, fingerprint):
+    # marshal's format can change between Python versions.
+    return (COMPILED_VERSION, sys.version_info[:2], os.path.abspath(path), fingerprint)
+
+
+def _parse(path):
+    with open(path, "r") as json_file:
+        return json.load(json_file)
+
+
+json_file_cache = JSONFileCache()
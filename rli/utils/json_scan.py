@@ -0,0 +1,172 @@
+import json
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+
+_decoder = json.JSONDecoder()
+
+
+def iter_items(path, keys=None, chunk_size=CHUNK_SIZE):
+    """
+    Reads the top level key value pairs of a JSON object file one at a time,
+    without building the whole object. The file is read in chunks, so memory
+    use is bounded by the largest value rather than the size of the file.
+
+    When keys are given only those pairs are yielded and the scan stops once
+    all of them were found, so a later duplicate of a key is not seen.
+
+    :param path: The path of a file that contains a JSON object
+    :param keys: The keys to yield. Defaults to every key
+    :param chunk_size: The number of characters read at a time
+    :raises ValueError: If the file does not contain a JSON object
+    :return: A generator of (key, value) tuples
+    """
+    wanted = None if keys is None else set(keys)
+
+    if wanted is not None and not wanted:
+        return
+
+    with open(path, "r") as json_file:
+        reader = _Reader(json_file, chunk_size)
+
+        reader.expect("{")
+
+        if reader.peek() == "}":
+            return
+
+        while True:
+            key = reader.read_key()
+            reader.expect(":")
+
+            if wanted is None or key in wanted:
+                yield key, reader.read_value()
+
+                if wanted is not None:
+                    wanted.discard(key)
+
+                    if not wanted:
+                        return
+            else:
+                reader.read_value()
+
+            separator = reader.next_token()
+
+            if separator == "}":
+                return
+
+            if separator != ",":
+                raise reader.error("Expecting ',' delimiter")
+
+
+def iter_keys(path, chunk_size=CHUNK_SIZE):
+    """
+    Reads the top level keys of a JSON object file without keeping the values.
+
+    :param path: The path of a file that contains a JSON object
+    :param chunk_size: The number of characters read at a time
+    :raises ValueError: If the file does not contain a JSON object
+    :return: A generator of keys
+    """
+    for key, _ in iter_items(path, chunk_size=chunk_size):
+        yield key
+
+
+def load_keys(path, keys, chunk_size=CHUNK_SIZE):
+    """
+    Loads only the given keys of a JSON object file.
+
+    :param path: The path of a file that contains a JSON object
+    :param keys: The keys to load
+    :param chunk_size: The number of characters read at a time
+    :raises ValueError: If the file does not contain a JSON object
+    :return: A dict of the keys that were found and their values
+    """
+    return dict(iter_items(path, keys, chunk_size))
+
+
+class _Reader:
+    """A buffer over a text file that hands out JSON tokens and values."""
+
+    def __init__(self, file, chunk_size):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def fill(self):
+        if self.eof:
+            return False
+
+        chunk = self.file.read(self.chunk_size)
+
+        if not chunk:
+            self.eof = True
+            return False
+
+        if self.position > self.chunk_size:
+            self.buffer = self.buffer[self.position :]
+            self.position = 0
+
+        self.buffer += chunk
+        return True
+
+    def peek(self):
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in WHITESPACE
+            ):
+                self.position += 1
+
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+
+            if not self.fill():
+                return ""
+
+    def next_token(self):
+        token = self.peek()
+        self.position += len(token)
+        return token
+
+    def expect(self, token):
+        if self.next_token() != token:
+            raise self.error(f"Expecting '{token}'")
+
+    def read_key(self):
+        if self.peek() != '"':
+            raise self.error("Expecting property name enclosed in double quotes")
+
+        while True:
+            try:
+                key, end = json.decoder.scanstring(self.buffer, self.position + 1)
+            except ValueError:
+                if self.fill():
+                    continue
+                raise
+
+            self.position = end
+            return key
+
+    def read_value(self):
+        self.peek()
+
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.position)
+            except ValueError:
+                if self.fill():
+                    continue
+                raise
+
+            # A number or literal at the end of the buffer may continue in the
+            # next chunk, so it is only complete once something follows it.
+            if end < len(self.buffer) or not self.fill():
+                self.position = end
+                return value
+
+    def error(self, message):
+        return json.JSONDecodeError(
+            message, self.buffer, min(self.position, len(self.buffer))
+        )
@@ -0,0 +1,135 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import sys
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+TEXT_FORMAT = "%(asctime)s | %(name)s | %(levelname)s - %(message)s"
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats every record as one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "logger": record.name,
+            "level": record.levelname,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(entry)
+
+
+class _QueueHandler(QueueHandler):
+    """
+    Merges the arguments into the message before queueing, as they may change
+    before the listener writes the record, but keeps the exception for the
+    listener's formatter, which QueueHandler would fold into the message.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        return record
+
+
+class _Logging:
+    def __init__(self, stream):
+        self.pid = os.getpid()
+        self.queue = queue.SimpleQueue()
+        self.queue_handler = _QueueHandler(self.queue)
+        self.stream_handler = logging.StreamHandler(stream)
+        self.listener = QueueListener(
+            self.queue, self.stream_handler, respect_handler_level=True
+        )
+
+
+_logging = None
+
+
+def setup_logger(verbose=False, log_format="text", stream=None):
+    """
+    Sends log records through a queue to a listener thread that writes them to
+    stdout, so threads that log never wait on the stream. The queue and
+    listener are installed once per process. Later calls only change the level
+    and format, so running commands in-process repeatedly does not duplicate
+    output.
+
+    :param verbose: Logs debug messages if True, otherwise info and above
+    :param log_format: text or json
+    :param stream: The stream to write to. Defaults to stdout
+    :return: None
+    """
+    global _logging
+
+    root = logging.getLogger()
+
+    # A forked process does not inherit the listener thread.
+    if _logging is None or _logging.pid != os.getpid():
+        if _logging is not None:
+            root.removeHandler(_logging.queue_handler)
+
+        _logging = _Logging(stream or sys.stdout)
+        _logging.listener.start()
+        root.addHandler(_logging.queue_handler)
+
+    _logging.stream_handler.setFormatter(
+        JSONFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT)
+    )
+    root.setLevel(logging.DEBUG if verbose else logging.INFO)
+
+
+@contextmanager
+def log_to(stream):
+    """
+    Writes log records to another stream until the block exits, e.g. to keep
+    them out of results written to stdout. Records logged before the block are
+    written to the previous stream first.
+
+    :param stream: The stream to write to
+    """
+    if _logging is None or _logging.pid != os.getpid():
+        yield
+        return
+
+    handler = _logging.stream_handler
+    previous = handler.stream
+    _drain()
+    handler.setStream(stream)
+
+    try:
+        yield
+    finally:
+        _drain()
+        handler.setStream(previous)
+
+
+def _drain():
+    """Waits for the listener to write the queued records."""
+    _logging.listener.stop()
+    _logging.listener.start()
+
+
+def stop_logger():
+    """Writes out queued records and stops the listener thread."""
+    global _logging
+
+    if _logging is None or _logging.pid != os.getpid():
+        return
+
+    logging.getLogger().removeHandler(_logging.queue_handler)
+    _logging.listener.stop()
+    _logging = None
+
+
+atexit.register(stop_logger)
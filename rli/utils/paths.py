@@ -0,0 +1,43 @@
+import os
+import tempfile
+
+RLI_DIR_ENV = "RLI_DIR"
+
+
+def rli_dir():
+    """The folder RLI keeps its configuration and state in, ~/.rli by default."""
+    return os.environ.get(RLI_DIR_ENV) or os.path.join(os.path.expanduser("~"), ".rli")
+
+
+def cache_dir():
+    """The folder for files RLI can rebuild at any time."""
+    return os.path.join(rli_dir(), "cache")
+
+
+def write_atomic(path, data, mode=0o644):
+    """
+    Writes the bytes to the path through a temporary file so readers never see
+    a partially written file.
+
+    :param path: The file to write
+    :param data: The bytes to write
+    :param mode: The permissions of the file
+    :return: None
+    """
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    # A unique name, so threads and processes writing the same path at once
+    # each replace it with a whole file.
+    fd, temp_path = tempfile.mkstemp(
+        prefix=f"{os.path.basename(path)}.", suffix=".tmp", dir=folder
+    )
+
+    try:
+        with os.fdopen(fd, "wb") as temp_file:
+            os.fchmod(temp_file.fileno(), mode)
+            temp_file.write(data)
+
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
@@ -0,0 +1,81 @@
+import cProfile
+import io
+import logging
+import pstats
+import sys
+import tracemalloc
+from contextlib import contextmanager
+
+PROFILE_MODES = ("cpu", "mem")
+
+
+@contextmanager
+def profile(mode, output=None, top=20, stream=None):
+    """
+    Profiles the block and writes a summary of the top entries to stderr.
+
+    cpu profiles with cProfile and saves the stats to output, which can be
+    opened with pstats or snakeviz. mem traces allocations with tracemalloc and
+    reports the peak traced memory and the lines that allocated the most.
+
+    :param mode: cpu or mem
+    :param output: The file the cpu stats are saved to
+    :param top: The number of entries in the summary
+    :param stream: The stream the summary is written to. Defaults to stderr
+    """
+    stream = stream or sys.stderr
+
+    if mode == "cpu":
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        try:
+            yield
+        finally:
+            profiler.disable()
+            _report_cpu(profiler, output, top, stream)
+    elif mode == "mem":
+        tracemalloc.start(10)
+
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            _report_memory(snapshot, peak, top, stream)
+    else:
+        raise ValueError(f"Unknown profile mode '{mode}'.")
+
+
+def _report_cpu(profiler, output, top, stream):
+    if output:
+        try:
+            profiler.dump_stats(output)
+            stream.write(f"CPU profile saved to {output}\n")
+        except OSError:
+            logging.error(f"Could not save the CPU profile to {output}.")
+
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(top)
+    stream.write(summary.getvalue())
+
+
+def _report_memory(snapshot, peak, top, stream):
+    snapshot = snapshot.filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        )
+    )
+    stats = snapshot.statistics("lineno")
+
+    stream.write(f"Peak traced memory: {peak / 1024:.1f} KiB\n")
+    stream.write(f"Top {top} allocation sites:\n")
+
+    for stat in stats[:top]:
+        frame = stat.traceback[0]
+        stream.write(
+            f"  {frame.filename}:{frame.lineno}: {stat.size / 1024:.1f} KiB "
+            f"in {stat.count} blocks\n"
+        )
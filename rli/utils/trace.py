@@ -0,0 +1,104 @@
+import atexit
+import json
+import logging
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+
+TRACE_ENV = "RLI_TRACE"
+
+
+class Tracer:
+    """
+    Records spans of subprocess and HTTP activity and writes them as a Chrome
+    trace-event file, which can be opened in chrome://tracing or Perfetto.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.events = []
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    @contextmanager
+    def span(self, name, category, **args):
+        """
+        Records the wall time of the block as a complete event. The yielded
+        dict can be used to add arguments, e.g. a status code, to the event.
+
+        Subprocess spans also record the CPU time and max RSS of waited-for
+        children. RUSAGE_CHILDREN is process wide, so overlapping subprocess
+        spans can see each other's CPU time.
+
+        :param name: The name of the span
+        :param category: The category of the span, e.g. subprocess or http
+        :param args: Arguments shown with the span in the trace viewer
+        """
+        if not self.enabled:
+            yield args
+            return
+
+        usage_before = _children_usage() if category == "subprocess" else None
+        start = time.perf_counter()
+
+        try:
+            yield args
+        finally:
+            end = time.perf_counter()
+
+            if usage_before is not None:
+                usage_after = _children_usage()
+                args["child_user_cpu_ms"] = round(
+                    (usage_after.ru_utime - usage_before.ru_utime) * 1000, 3
+                )
+                args["child_system_cpu_ms"] = round(
+                    (usage_after.ru_stime - usage_before.ru_stime) * 1000, 3
+                )
+                args["child_max_rss_kb"] = usage_after.ru_maxrss
+
+            self._add_event(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": round((start - self._start) * 1e6, 3),
+                    "dur": round((end - start) * 1e6, 3),
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": args,
+                }
+            )
+
+    def write(self):
+        """Writes the recorded events to the trace file."""
+        if not self.enabled or not self.events:
+            return
+
+        with self._lock:
+            events = list(self.events)
+
+        try:
+            with open(self.path, "w") as trace_file:
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file)
+        except OSError:
+            logging.error(f"Could not write the trace to {self.path}.")
+
+    def _add_event(self, event):
+        with self._lock:
+            self.events.append(event)
+
+
+def _children_usage():
+    return resource.getrusage(resource.RUSAGE_CHILDREN)
+
+
+tracer = Tracer(os.environ.get(TRACE_ENV))
+
+if tracer.enabled:
+    atexit.register(tracer.write)
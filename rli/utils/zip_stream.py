@@ -0,0 +1,240 @@
+import os
+import struct
+import zipfile
+import zlib
+
+LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+LOCAL_HEADER_SIGNATURE = 0x04034B50
+DESCRIPTOR_SIGNATURE = 0x08074B50
+# The central directory, or the end of it for an archive without entries.
+DIRECTORY_SIGNATURES = (0x02014B50, 0x06054B50)
+ZIP64_EXTRA = 0x0001
+
+# Bounds the memory a highly compressed entry can take while it is inflated.
+MAX_INFLATE = 1024 * 1024
+
+_HEADER, _NAME, _DATA, _DESCRIPTOR, _DONE = range(5)
+
+
+class ZipStreamExtractor:
+    """
+    Extracts a zip archive while it is downloaded, from the local file headers
+    in front of each entry, so the archive is never stored. Data is fed in
+    chunks of any size and memory stays bounded by the chunk size.
+
+    Deflated entries and stored entries with known sizes are supported. The
+    central directory at the end is not needed and is ignored.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: The folder the entries are extracted into
+        """
+        self.path = os.path.abspath(path)
+        self.names = []
+        self._buffer = bytearray()
+        self._state = _HEADER
+        self._header = None
+        self._file = None
+
+    def feed(self, data):
+        """
+        :param data: The next bytes of the archive
+        :raises zipfile.BadZipFile: If the archive is invalid or an entry can
+        not be extracted from a stream
+        """
+        if self._state == _DONE:
+            return
+
+        self._buffer += data
+
+        while self._step():
+            pass
+
+    def close(self):
+        """
+        :raises zipfile.BadZipFile: If the archive ended in the middle of an
+        entry
+        """
+        self._close_file()
+
+        if self._state != _DONE and (self._state != _HEADER or self._buffer):
+            raise zipfile.BadZipFile("The archive is truncated.")
+
+    def _step(self):
+        """:return: Whether there may be more to do with the buffered data"""
+        if self._state == _HEADER:
+            return self._read_header()
+        elif self._state == _NAME:
+            return self._read_name()
+        elif self._state == _DATA:
+            return self._read_data()
+        elif self._state == _DESCRIPTOR:
+            return self._read_descriptor()
+
+        return False
+
+    def _read_header(self):
+        if len(self._buffer) < 4:
+            return False
+
+        (signature,) = struct.unpack_from("<I", self._buffer)
+
+        if signature in DIRECTORY_SIGNATURES:
+            self._state = _DONE
+            self._buffer = bytearray()
+            return False
+
+        if signature != LOCAL_HEADER_SIGNATURE:
+            raise zipfile.BadZipFile("Bad local file header.")
+
+        if len(self._buffer) < LOCAL_HEADER.size:
+            return False
+
+        fields = LOCAL_HEADER.unpack_from(self._buffer)
+        del self._buffer[: LOCAL_HEADER.size]
+
+        self._header = {
+            "flags": fields[2],
+            "method": fields[3],
+            "crc": fields[6],
+            "compressed_size": fields[7],
+            "name_length": fields[9],
+            "extra_length": fields[10],
+        }
+        self._state = _NAME
+        return True
+
+    def _read_name(self):
+        header = self._header
+        length = header["name_length"] + header["extra_length"]
+
+        if len(self._buffer) < length:
+            return False
+
+        raw_name = bytes(self._buffer[: header["name_length"]])
+        extra = bytes(self._buffer[header["name_length"] : length])
+        del self._buffer[:length]
+
+        name = raw_name.decode("utf-8" if header["flags"] & 0x800 else "cp437")
+        header["zip64"] = False
+
+        for field_id, data in _extra_fields(extra):
+            if field_id == ZIP64_EXTRA:
+                header["zip64"] = True
+
+                if header["compressed_size"] == 0xFFFFFFFF and len(data) >= 16:
+                    header["compressed_size"] = struct.unpack_from("<Q", data, 8)[0]
+
+        if header["method"] not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            raise zipfile.BadZipFile(f"{name} uses an unsupported compression.")
+
+        streamed = header["flags"] & 0x08
+
+        if header["method"] == zipfile.ZIP_STORED and streamed:
+            raise zipfile.BadZipFile(f"{name} is stored without a size.")
+
+        target = self._target(name)
+        self.names.append(name)
+
+        if name.endswith("/"):
+            os.makedirs(target, exist_ok=True)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            self._file = open(target, "wb")
+
+        header["crc_actual"] = 0
+        header["remaining"] = header["compressed_size"]
+        header["inflater"] = (
+            zlib.decompressobj(-15)
+            if header["method"] == zipfile.ZIP_DEFLATED
+            else None
+        )
+        self._state = _DATA
+        return True
+
+    def _read_data(self):
+        header = self._header
+        inflater = header["inflater"]
+
+        if inflater is None:
+            data = bytes(self._buffer[: header["remaining"]])
+            del self._buffer[: len(data)]
+            header["remaining"] -= len(data)
+            self._write(data)
+
+            if header["remaining"]:
+                return False
+        else:
+            data = bytes(self._buffer)
+            self._buffer = bytearray()
+
+            while data and not inflater.eof:
+                self._write(inflater.decompress(data, MAX_INFLATE))
+                data = inflater.unconsumed_tail
+
+            if not inflater.eof:
+                return False
+
+            self._buffer = bytearray(inflater.unused_data) + self._buffer
+
+        self._close_file()
+
+        if header["flags"] & 0x08:
+            self._state = _DESCRIPTOR
+        else:
+            self._check_crc(header["crc"])
+            self._state = _HEADER
+
+        return True
+
+    def _read_descriptor(self):
+        sizes = 16 if self._header["zip64"] else 8
+        offset = 0
+
+        if len(self._buffer) < 4:
+            return False
+
+        if struct.unpack_from("<I", self._buffer)[0] == DESCRIPTOR_SIGNATURE:
+            offset = 4
+
+        if len(self._buffer) < offset + 4 + sizes:
+            return False
+
+        self._check_crc(struct.unpack_from("<I", self._buffer, offset)[0])
+        del self._buffer[: offset + 4 + sizes]
+        self._state = _HEADER
+        return True
+
+    def _write(self, data):
+        if data:
+            self._header["crc_actual"] = zlib.crc32(data, self._header["crc_actual"])
+
+            if self._file is not None:
+                self._file.write(data)
+
+    def _check_crc(self, expected):
+        if self._header["crc_actual"] != expected:
+            raise zipfile.BadZipFile(f"Bad CRC for {self.names[-1]}.")
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _target(self, name):
+        target = os.path.abspath(os.path.join(self.path, name))
+
+        if os.path.isabs(name) or not target.startswith(self.path + os.sep):
+            raise zipfile.BadZipFile(f"{name} is outside of the archive.")
+
+        return target
+
+
+def _extra_fields(extra):
+    offset = 0
+
+    while offset + 4 <= len(extra):
+        field_id, length = struct.unpack_from("<HH", extra, offset)
+        yield field_id, extra[offset + 4 : offset + 4 + length]
+        offset += 4 + length
@@ -7,12 +7,13 @@ setup(
     author="LukeShay",
     author_email="shay.luke17@gmail.com",
     description="cli",
-    packages=["rli", "rli.commands"],
+    packages=["rli", "rli.commands", "rli.utils"],
     include_package_data=True,
     platforms="any",
     entry_points="""
         [console_scripts]
-        rli=rli.cli:cli
+        rli=rli.client:main
+        rli-complete=rli.completion:main
     """,
     install_requires=["requests", "pynacl", "click"],
 )
@@ -0,0 +1,14 @@
+"""
+Local stand-ins for the services rli talks to, so tests and benchmarks run
+without the network and benchmarks measure rli rather than the network.
+"""
+
+from standins.docker import (
+    FAKE_DOCKER,
+    MiB,
+    DockerEngineStandIn,
+    stats_sample,
+    write_fake_docker,
+)
+from standins.github import GithubStandIn
+from standins.vault import VaultStandIn
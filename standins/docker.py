@@ -0,0 +1,301 @@
+import hashlib
+import json
+import os
+import re
+import socketserver
+import stat
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+MiB = 1024 * 1024
+
+# save writes FAKE_DOCKER_SAVE and load copies its input to FAKE_DOCKER_LOAD.
+FAKE_DOCKER = """#!/bin/sh
+case "$1" in
+    version) echo '{"Client": {"Version": "fake"}, "Server": {"Version": "fake"}}' ;;
+    image) echo '[{"Id": "sha256:fake", "RepoDigests": ["fake@sha256:0"],
+        "RootFS": {"Layers": ["sha256:base", "sha256:'"$3"'"]}}]' ;;
+    save) cat "${FAKE_DOCKER_SAVE:-/dev/null}" || exit 1 ;;
+    load)
+        cat > "${FAKE_DOCKER_LOAD:-/dev/null}"
+        echo "Loaded image: fake:latest" ;;
+esac
+exit 0
+"""
+
+
+class DockerEngineStandIn:
+    """
+    A threaded HTTP server on a unix socket that answers the Docker Engine API
+    calls made by DockerEngine. Logs and stats are written in small pieces, so
+    readers see frames split across reads, unless split_writes is False.
+    """
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        self.containers = {}
+        # The log lines of each container, as (stream, bytes) tuples.
+        self.logs = {}
+        # The stats samples of each container, written one per line.
+        self.stats = {}
+        self.images = {}
+        # The layers of each image, as (digest, size) tuples.
+        self.layers = {}
+        self.requests = []
+        self.split_writes = True
+        self.server = socketserver.ThreadingUnixStreamServer(
+            socket_path, self._handler()
+        )
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def container(self, name, image="app:latest", project=None, tty=False):
+        container_id = hashlib.sha256(name.encode("utf-8")).hexdigest()
+        self.containers[container_id] = {
+            "Id": container_id,
+            "Names": [f"/{name}"],
+            "Image": image,
+            "ImageID": f"sha256:{hashlib.sha256(image.encode('utf-8')).hexdigest()}",
+            "Labels": {"com.docker.compose.project": project} if project else {},
+            "State": "running",
+            "Tty": tty,
+        }
+        self.logs[container_id] = []
+        self.stats[container_id] = []
+        return self.containers[container_id]
+
+    def image(self, *tags, created=0, size=0, digests=(), layers=None):
+        """
+        Adds an image with the ID containers of its first tag get, or of its
+        first digest if it has no tags.
+
+        :param layers: The (digest, size) tuples of its layers. Defaults to one
+        layer of size that no other image has
+        """
+        name = (tags or digests)[0]
+        image_id = f"sha256:{hashlib.sha256(name.encode('utf-8')).hexdigest()}"
+        self.layers[image_id] = layers or [(image_id, size)]
+        self.images[image_id] = {
+            "Id": image_id,
+            "RepoTags": list(tags),
+            "RepoDigests": list(digests),
+            "Created": created,
+            "Size": sum(size for _, size in self.layers[image_id]),
+            "SharedSize": -1,
+        }
+        return self.images[image_id]
+
+    def disk_usage(self):
+        """Answers GET /system/df for the images, with their shared sizes."""
+        layers = {layer for image_id in self.images for layer in self.layers[image_id]}
+        images = []
+
+        for image_id, image in self.images.items():
+            shared = sum(
+                size
+                for layer, size in self.layers[image_id]
+                if any(
+                    (layer, size) in self.layers[other]
+                    for other in self.images
+                    if other != image_id
+                )
+            )
+            images.append(dict(image, SharedSize=shared))
+
+        return {"LayersSize": sum(size for _, size in layers), "Images": images}
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                query = dict(parse_qsl(url.query))
+                stand_in.requests.append((url.path, query))
+                match = re.match(r"^/containers/([^/]+)/(json|logs|stats)$", url.path)
+
+                if url.path == "/containers/json":
+                    self.reply(200, stand_in.list_containers(query))
+                elif url.path == "/images/json":
+                    self.reply(200, list(stand_in.images.values()))
+                elif url.path == "/system/df":
+                    self.reply(200, stand_in.disk_usage())
+                elif match and match[1] in stand_in.containers:
+                    container = stand_in.containers[match[1]]
+
+                    if match[2] == "json":
+                        self.reply(200, stand_in.inspect(container))
+                    elif match[2] == "stats":
+                        self.reply_stats(container, query.get("stream") != "0")
+                    else:
+                        self.reply_logs(container)
+                else:
+                    self.reply(404, {"message": "No such container"})
+
+            def reply_logs(self, container):
+                self.send_response(200)
+                self.end_headers()
+
+                for stream, line in stand_in.logs[container["Id"]]:
+                    data = line
+
+                    if not container["Tty"]:
+                        data = struct.pack(">BxxxI", stream, len(line)) + line
+
+                    self.write_in_pieces(data, 5)
+
+            def do_DELETE(self):
+                url = urlsplit(self.path)
+                stand_in.requests.append((url.path, dict(parse_qsl(url.query))))
+                match = re.match(r"^/images/(.+)$", url.path)
+                status, body = stand_in.remove_image(unquote(match[1]))
+                self.reply(status, body)
+
+            def reply_stats(self, container, stream):
+                samples = stand_in.stats[container["Id"]]
+                self.send_response(200)
+                self.end_headers()
+
+                for sample in samples if stream else samples[:1]:
+                    data = json.dumps(sample).encode("utf-8") + b"\n"
+
+                    self.write_in_pieces(data, 64)
+
+            def write_in_pieces(self, data, size):
+                if not stand_in.split_writes:
+                    size = len(data)
+
+                for i in range(0, len(data), size):
+                    self.wfile.write(data[i : i + size])
+                    self.wfile.flush()
+
+            def reply(self, status, body):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def address_string(self):
+                return "docker"
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def list_containers(self, query):
+        filters = json.loads(query.get("filters") or "{}")
+        containers = list(self.containers.values())
+
+        if query.get("all") != "1":
+            containers = [c for c in containers if c["State"] == "running"]
+
+        for label in filters.get("label", []):
+            key, value = label.split("=", 1)
+            containers = [c for c in containers if c["Labels"].get(key) == value]
+
+        return containers
+
+    def remove_image(self, name):
+        """
+        :return: The status and body the engine answers a removal with. Like
+        the engine, the digests of an image go with its last tag
+        """
+        for image in list(self.images.values()):
+            used = any(c["ImageID"] == image["Id"] for c in self.containers.values())
+            references = image["RepoTags"] + image["RepoDigests"]
+
+            if name in references:
+                references.remove(name)
+                body = [{"Untagged": name}]
+
+                if name in image["RepoTags"] and len(image["RepoTags"]) == 1:
+                    body += [{"Untagged": digest} for digest in image["RepoDigests"]]
+                    references = []
+            elif name != image["Id"]:
+                continue
+            elif len(image["RepoTags"] or image["RepoDigests"]) > 1:
+                return 409, {"message": "image is referenced in many repositories"}
+            elif used:
+                return 409, {"message": "image is being used by a container"}
+            else:
+                body = [{"Untagged": reference} for reference in references]
+                references = []
+
+            image["RepoTags"] = [r for r in references if "@" not in r]
+            image["RepoDigests"] = [r for r in references if "@" in r]
+
+            if not references and not used:
+                del self.images[image["Id"]]
+                body.append({"Deleted": image["Id"]})
+
+            return 200, body
+
+        return 404, {"message": f"No such image: {name}"}
+
+    def inspect(self, container):
+        return {
+            "Id": container["Id"],
+            "Name": container["Names"][0],
+            "Image": container["ImageID"],
+            "Config": {"Image": container["Image"], "Tty": container["Tty"]},
+            "State": {"Running": container["State"] == "running"},
+        }
+
+
+def stats_sample(second, cpu_usage, memory, cpus=2):
+    """
+    A sample of the stats endpoint, read at the given second of a minute.
+
+    :param cpu_usage: The CPU time used since the second before
+    :param memory: The memory used, without the page cache
+    """
+    return {
+        "read": f"2026-01-01T00:00:{second:02d}Z",
+        "cpu_stats": {
+            "cpu_usage": {"total_usage": cpu_usage},
+            "system_cpu_usage": second * 1000,
+            "online_cpus": cpus,
+        },
+        "precpu_stats": {
+            "cpu_usage": {"total_usage": 0},
+            "system_cpu_usage": (second - 1) * 1000,
+            "online_cpus": cpus,
+        },
+        "memory_stats": {
+            "usage": memory + MiB,
+            "limit": 512 * MiB,
+            "stats": {"inactive_file": MiB},
+        },
+    }
+
+
+def write_fake_docker(bin_dir):
+    """
+    Writes docker and docker-compose scripts that exit successfully without
+    doing anything.
+
+    :param bin_dir: The folder to write them to, which should be put on PATH
+    :return: None
+    """
+    os.makedirs(bin_dir, exist_ok=True)
+
+    for name in ("docker", "docker-compose"):
+        path = os.path.join(bin_dir, name)
+
+        with open(path, "w") as script:
+            script.write(FAKE_DOCKER)
+
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
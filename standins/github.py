@@ -0,0 +1,390 @@
+import hashlib
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from nacl import encoding, public
+
+
+class GithubStandIn:
+    """
+    A threaded HTTP server that answers the GitHub API calls made by RLIGithub
+    and PyGithub for add-secrets, create-repo and list-repos, the Actions calls
+    made by the run watcher and artifact downloads, and release uploads.
+    Listings and runs carry ETags and are answered with 304 when they did not
+    change.
+    """
+
+    def __init__(self):
+        self.public_key = (
+            public.PrivateKey.generate()
+            .public_key.encode(encoding.Base64Encoder())
+            .decode("utf-8")
+        )
+        self.requests = 0
+        self.not_modified = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.repos = [
+            self.repo(f"repo-{i}", f"2020-01-01T00:00:{i:02d}Z") for i in range(30)
+        ]
+        # Whether the owner is a user, which has no GET /orgs/{org}/repos.
+        self.user_account = False
+        # The workflow runs of each repo, newest first, and the jobs of each run.
+        self.runs = {}
+        self.jobs = {}
+        # The artifacts of each run, and the zip archive of each artifact.
+        self.artifacts = {}
+        self.archives = {}
+        # Releases and their assets by ID. An upload of an asset named in
+        # upload_failures fails that many times, leaving a starter asset behind
+        # like GitHub does.
+        self.releases = {}
+        self.assets = {}
+        self.upload_failures = {}
+        self._ids = iter(range(1, 1 << 31))
+        self._ids_lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def list_repos(self, query, private=True):
+        """
+        Answers the lists of repos like GitHub: sorted by the sort parameter,
+        paginated with page and per_page.
+
+        :param private: Whether private repos are listed, which they are not
+        by GET /users/{owner}/repos
+        :return: The repos of the page and whether there is a next page
+        """
+        repos = [repo for repo in self.repos if private or not repo["private"]]
+
+        if query.get("sort") == "updated":
+            repos.sort(
+                key=lambda repo: repo["updated_at"],
+                reverse=query.get("direction", "desc") == "desc",
+            )
+
+        per_page = int(query.get("per_page", 30))
+        start = (int(query.get("page", 1)) - 1) * per_page
+        return repos[start : start + per_page], start + per_page < len(repos)
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately, and Nagle's algorithm
+            # would hold the body back on a kept-alive connection until the
+            # client acknowledges the headers.
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                stand_in.requests += 1
+
+                if self.path.endswith("/actions/secrets/public-key"):
+                    self.reply(200, {"key": stand_in.public_key, "key_id": "1"})
+                elif re.match(r"^/orgs/[^/]+/repos", self.path):
+                    if stand_in.user_account:
+                        self.reply(404, {"message": "Not Found"})
+                    else:
+                        self.reply_repos()
+                elif re.match(r"^/user/repos", self.path):
+                    self.reply_repos()
+                elif re.match(r"^/users/[^/]+/repos", self.path):
+                    self.reply_repos(private=False)
+                elif re.match(r"^/repos/[^/]+/[^/]+/actions/artifacts/", self.path):
+                    self.redirect_archive()
+                elif re.match(r"^/repos/[^/]+/[^/]+/actions/", self.path):
+                    self.reply_actions()
+                elif re.match(r"^/repos/[^/]+/[^/]+/releases/\d+/assets", self.path):
+                    release_id = int(self.path.split("/")[5])
+                    self.reply(200, stand_in.release_assets(release_id))
+                elif self.path.startswith("/archives/"):
+                    self.reply_archive()
+                elif re.match(r"^/users/[^/]+$", self.path):
+                    self.reply(200, {"login": "bench", "url": self.path})
+                elif re.match(r"^/orgs/[^/]+$", self.path):
+                    if stand_in.user_account:
+                        self.reply(404, {"message": "Not Found"})
+                    else:
+                        self.reply(200, {"login": "bench", "url": self.path})
+                else:
+                    self.reply(404, {"message": "Not Found"})
+
+            def do_DELETE(self):
+                stand_in.requests += 1
+                match = re.match(
+                    r"^/repos/[^/]+/[^/]+/releases/assets/(\d+)$", self.path
+                )
+
+                if match and stand_in.assets.pop(int(match[1]), None):
+                    self.reply(204, None)
+                else:
+                    self.reply(404, {"message": "Not Found"})
+
+            def do_PUT(self):
+                stand_in.requests += 1
+                self.read_body()
+                self.reply(204, None)
+
+            def do_POST(self):
+                stand_in.requests += 1
+
+                if self.path.startswith("/uploads/"):
+                    self.upload_asset()
+                    return
+
+                body = self.read_body()
+
+                if self.path == "/user/repos":
+                    self.reply(201, stand_in.repo(body.get("name", "repo")))
+                elif re.match(r"^/repos/[^/]+/[^/]+/releases$", self.path):
+                    self.reply(201, stand_in.release(self.path, body))
+                else:
+                    self.reply(404, {"message": "Not Found"})
+
+            def upload_asset(self):
+                url = urlsplit(self.path)
+                name = dict(parse_qsl(url.query))["name"]
+                release_id = int(url.path.split("/")[6])
+                remaining = int(self.headers.get("Content-Length") or 0)
+                digest = hashlib.sha256()
+                size = 0
+
+                while remaining:
+                    chunk = self.rfile.read(min(remaining, 65536))
+                    digest.update(chunk)
+                    size += len(chunk)
+                    remaining -= len(chunk)
+
+                with stand_in._ids_lock:
+                    if any(
+                        asset["name"] == name
+                        for asset in stand_in.release_assets(release_id)
+                    ):
+                        self.reply(422, {"errors": [{"code": "already_exists"}]})
+                        return
+
+                    failures = stand_in.upload_failures.get(name, 0)
+                    state = "starter" if failures else "uploaded"
+                    asset = stand_in.asset(release_id, name, size, state)
+                    asset["digest"] = f"sha256:{digest.hexdigest()}"
+
+                    if failures:
+                        stand_in.upload_failures[name] = failures - 1
+
+                if failures:
+                    self.reply(502, {"message": "Bad Gateway"})
+                else:
+                    self.reply(201, asset)
+
+            def read_body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def reply_repos(self, private=True):
+                url = urlsplit(self.path)
+                query = dict(parse_qsl(url.query))
+                repos, has_next = stand_in.list_repos(query, private)
+                headers = {}
+
+                if has_next:
+                    query["page"] = str(int(query.get("page", 1)) + 1)
+                    headers["Link"] = (
+                        f'<{stand_in.url}{url.path}?{urlencode(query)}>; rel="next"'
+                    )
+
+                self.reply_conditional(repos, headers)
+
+            def reply_actions(self):
+                url = urlsplit(self.path)
+                query = dict(parse_qsl(url.query))
+                match = re.match(
+                    r"^/repos/[^/]+/(?P<repo>[^/]+)/actions/"
+                    r"(?:workflows/[^/]+/)?runs(?:/(?P<run>\d+))?"
+                    r"(?P<list>/jobs|/artifacts)?$",
+                    url.path,
+                )
+
+                if match is None:
+                    self.reply(404, {"message": "Not Found"})
+                    return
+
+                runs = stand_in.runs.get(match["repo"], [])
+
+                if match["run"] is None:
+                    if "branch" in query:
+                        runs = [r for r in runs if r["head_branch"] == query["branch"]]
+
+                    if "status" in query:
+                        runs = [r for r in runs if r["status"] == query["status"]]
+
+                    runs = runs[: int(query.get("per_page", 30))]
+                    body = {"total_count": len(runs), "workflow_runs": runs}
+                    self.reply_conditional(body)
+                    return
+
+                run = next((r for r in runs if r["id"] == int(match["run"])), None)
+
+                if run is None:
+                    self.reply(404, {"message": "Not Found"})
+                elif match["list"] == "/jobs":
+                    jobs = stand_in.jobs.get(run["id"], [])
+                    self.reply_conditional({"total_count": len(jobs), "jobs": jobs})
+                elif match["list"] == "/artifacts":
+                    artifacts = stand_in.artifacts.get(run["id"], [])
+                    self.reply_conditional(
+                        {"total_count": len(artifacts), "artifacts": artifacts}
+                    )
+                else:
+                    self.reply_conditional(run)
+
+            def redirect_archive(self):
+                # Like GitHub, archives are downloaded from a redirect.
+                artifact_id = re.match(r".*/artifacts/(\d+)/zip$", self.path)[1]
+                self.send_response(302)
+                self.send_header("Location", f"{stand_in.url}/archives/{artifact_id}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def reply_archive(self):
+                data = stand_in.archives.get(int(self.path.rsplit("/", 1)[1]))
+
+                if data is None:
+                    self.reply(404, {"message": "Not Found"})
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/zip")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def reply_conditional(self, body, headers=None):
+                etag = (
+                    '"%s"'
+                    % hashlib.sha1(
+                        json.dumps(body, sort_keys=True).encode("utf-8")
+                    ).hexdigest()
+                )
+
+                if self.headers.get("If-None-Match") == etag:
+                    stand_in.not_modified += 1
+                    self.reply(304, None, {"ETag": etag})
+                else:
+                    self.reply(200, body, {"ETag": etag, **(headers or {})})
+
+            def reply(self, status, body, headers=None):
+                data = b"" if body is None else json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def repo(self, name, updated_at="2020-01-01T00:00:00Z", private=False):
+        return {
+            "id": int(hashlib.sha1(name.encode("utf-8")).hexdigest()[:8], 16),
+            "name": name,
+            "full_name": f"bench/{name}",
+            "private": private,
+            "visibility": "private" if private else "public",
+            "archived": False,
+            "default_branch": "master",
+            "url": f"{self.url}/repos/bench/{name}",
+            "clone_url": f"{self.url}/bench/{name}.git",
+            "updated_at": updated_at,
+            "pushed_at": updated_at,
+        }
+
+    def run(self, run_id, status="queued", conclusion=None, branch="master"):
+        return {
+            "id": run_id,
+            "name": "CI",
+            "head_branch": branch,
+            "status": status,
+            "conclusion": conclusion,
+            "html_url": f"{self.url}/bench/actions/runs/{run_id}",
+        }
+
+    def artifact(self, run_id, artifact_id, name, data):
+        """
+        Adds an artifact with the zip archive data to a run.
+
+        :return: The artifact
+        """
+        artifact = {
+            "id": artifact_id,
+            "name": name,
+            "size_in_bytes": len(data),
+            "expired": False,
+            "digest": f"sha256:{hashlib.sha256(data).hexdigest()}",
+            "archive_download_url": (
+                f"{self.url}/repos/bench/repo/actions/artifacts/{artifact_id}/zip"
+            ),
+        }
+        self.artifacts.setdefault(run_id, []).append(artifact)
+        self.archives[artifact_id] = data
+        return artifact
+
+    def release(self, path, body):
+        release_id = self.next_id()
+        url = f"{self.url}{path}/{release_id}"
+        self.releases[release_id] = {
+            "id": release_id,
+            "url": url,
+            "html_url": url,
+            "upload_url": (
+                f"{self.url}/uploads{path}/{release_id}/assets{{?name,label}}"
+            ),
+            "tag_name": body["tag_name"],
+            "name": body.get("name"),
+            "draft": body.get("draft", False),
+            "prerelease": body.get("prerelease", False),
+        }
+        return self.releases[release_id]
+
+    def release_assets(self, release_id):
+        return [
+            asset for asset in self.assets.values() if asset["release_id"] == release_id
+        ]
+
+    def asset(self, release_id, name, size, state="uploaded"):
+        asset_id = self.next_id()
+        self.assets[asset_id] = {
+            "id": asset_id,
+            "release_id": release_id,
+            "name": name,
+            "size": size,
+            "state": state,
+            "url": f"{self.url}/repos/bench/repo/releases/assets/{asset_id}",
+        }
+        return self.assets[asset_id]
+
+    def next_id(self):
+        return next(self._ids)
+
+    def job(self, job_id, name, status="queued", conclusion=None):
+        return {"id": job_id, "name": name, "status": status, "conclusion": conclusion}
@@ -0,0 +1,96 @@
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class VaultStandIn:
+    """
+    A threaded HTTP server that answers the batch and list calls of
+    VaultProvider from a dict of secrets per namespace.
+    """
+
+    def __init__(self, secrets, token=None):
+        self.secrets = secrets
+        self.token = token
+        self.requests = 0
+        self.not_modified = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately, and Nagle's algorithm
+            # would hold the body back on a kept-alive connection until the
+            # client acknowledges the headers.
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                stand_in.requests += 1
+                match = re.match(r"^/v1/secrets/([^/]+)$", self.path)
+
+                if not self.authorized():
+                    self.reply(403, {"message": "Forbidden"})
+                elif match:
+                    self.reply(200, {"secrets": stand_in.secrets.get(match[1], {})})
+                else:
+                    self.reply(404, {"message": "Not Found"})
+
+            def do_POST(self):
+                stand_in.requests += 1
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                match = re.match(r"^/v1/secrets/([^/]+)/batch$", self.path)
+
+                if not self.authorized():
+                    self.reply(403, {"message": "Forbidden"})
+                elif match:
+                    namespace = stand_in.secrets.get(match[1], {})
+                    self.reply(
+                        200,
+                        {
+                            "secrets": {
+                                key: namespace[key]
+                                for key in body.get("keys", [])
+                                if key in namespace
+                            }
+                        },
+                    )
+                else:
+                    self.reply(404, {"message": "Not Found"})
+
+            def authorized(self):
+                return (
+                    stand_in.token is None
+                    or self.headers.get("Authorization") == f"Bearer {stand_in.token}"
+                )
+
+            def reply(self, status, body):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,112 @@
+from rli import cli
+from rli.commands import cmd_deploy
+from rli.constants import ExitCode
+from rli.exceptions import InvalidRLIConfiguration, RLISecretsException
+from tempfile import TemporaryDirectory
+from tests.helper import make_test_context
+from unittest import TestCase
+from unittest.mock import patch, Mock
+import os
+
+
+class CmdDeployTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.folder = os.path.join(self.temp_dir.name, "shop")
+        os.makedirs(self.folder)
+        self.compose_file = os.path.join(self.folder, "docker-compose.yml")
+
+        with open(self.compose_file, "w") as compose_file:
+            compose_file.write("services: {}\n")
+
+        self.mock_deploy = Mock()
+        self.deploy = self.mock_deploy.return_value
+        self.deploy.up.return_value = {"id": 1, "project": "shop", "exit_code": 0}
+        self.mock_ledger = Mock()
+
+        self.rli_config = Mock()
+        self.mock_logging_error = Mock()
+
+        for patcher in (
+            patch.object(
+                cmd_deploy, "get_rli_config_or_exit", Mock(return_value=self.rli_config)
+            ),
+            patch.object(cmd_deploy.logging, "error", self.mock_logging_error),
+            patch.object(cmd_deploy, "RLIDocker", Mock()),
+            patch.object(cmd_deploy, "RLIDeploy", self.mock_deploy),
+            patch.object(cmd_deploy, "DeployLedger", self.mock_ledger),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @patch("sys.exit")
+    def test_up_deduplicates_images(self, mock_sys_exit):
+        with make_test_context(
+            ["deploy", "up", "-f", self.compose_file, "-i", "api", "-i", "web"]
+            + ["-i", "api"]
+        ) as ctx:
+            cli.cli.invoke(ctx)
+
+        args = self.deploy.up.call_args[0]
+        self.assertEqual("shop", args[0])
+        self.assertEqual(["api", "web"], args[2])
+        mock_sys_exit.assert_called_once_with(ExitCode.OK)
+
+    @patch("sys.exit")
+    def test_up_invalid_secrets_configuration(self, mock_sys_exit):
+        type(self.rli_config).secret_provider = property(
+            Mock(side_effect=InvalidRLIConfiguration("Unknown secrets backend 'x'."))
+        )
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(["deploy", "up", "-f", self.compose_file]) as ctx:
+                cli.cli.invoke(ctx)
+
+        self.deploy.up.assert_not_called()
+        self.mock_logging_error.assert_called_once_with(
+            "Your secrets RLI configuration is incorrect: "
+            "Unknown secrets backend 'x'."
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.INVALID_RLI_CONFIG)
+
+    @patch("sys.exit")
+    def test_up_secrets_exception(self, mock_sys_exit):
+        self.deploy.up.side_effect = RLISecretsException("Vault returned 403.")
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(["deploy", "up", "-f", self.compose_file]) as ctx:
+                cli.cli.invoke(ctx)
+
+        self.mock_logging_error.assert_called_once_with(
+            "Could not read the secrets: Vault returned 403."
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.SECRETS_ERROR)
+
+    @patch("sys.exit")
+    def test_rollback_secrets_exception(self, mock_sys_exit):
+        self.deploy.rollback.side_effect = RLISecretsException("Vault returned 403.")
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(
+                ["deploy", "rollback", "-f", self.compose_file]
+            ) as ctx:
+                cli.cli.invoke(ctx)
+
+        self.mock_logging_error.assert_called_once_with(
+            "Could not read the secrets: Vault returned 403."
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.SECRETS_ERROR)
+
+    @patch("sys.exit")
+    def test_history_defaults_to_the_project_of_up(self, mock_sys_exit):
+        self.mock_ledger.return_value.history.return_value = []
+
+        with make_test_context(["deploy", "history", "-f", self.compose_file]) as ctx:
+            cli.cli.invoke(ctx)
+
+        self.mock_ledger.return_value.history.assert_called_once_with("shop", 20)
+        mock_sys_exit.assert_called_once_with(ExitCode.OK)
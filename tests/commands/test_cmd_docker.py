@@ -0,0 +1,410 @@
+from rli import cli
+from rli.commands import cmd_docker
+from rli.constants import ExitCode
+from rli.exceptions import RLIDockerException
+from tempfile import TemporaryDirectory
+from tests.helper import make_test_context
+from unittest import TestCase
+from unittest.mock import patch, Mock
+import os
+
+
+class CmdDockerTest(TestCase):
+    def setUp(self):
+        self.mock_rli_docker = Mock()
+        self.docker = self.mock_rli_docker.local.return_value
+        self.mock_engine = Mock()
+        self.engine = self.mock_engine.return_value
+        self.mock_logging_error = Mock()
+
+        for patcher in (
+            patch.object(cmd_docker, "RLIDocker", self.mock_rli_docker),
+            patch.object(cmd_docker, "DockerEngine", self.mock_engine),
+            patch.object(cmd_docker.logging, "error", self.mock_logging_error),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @patch("sys.exit")
+    def test_export(self, mock_sys_exit):
+        self.docker.save.return_value = {
+            "images": 2,
+            "layers": 4,
+            "unique_layers": 3,
+            "bytes_read": 100,
+            "bytes_written": 40,
+        }
+
+        with make_test_context(
+            ["docker", "export", "api", "web", "-o", "images.tar.gz", "--level", "3"]
+        ) as ctx:
+            cli.cli.invoke(ctx)
+
+        self.docker.save.assert_called_once_with(
+            ("api", "web"), "images.tar.gz", 3, None
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.OK)
+
+    @patch("sys.exit")
+    def test_export_without_output(self, mock_sys_exit):
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(["docker", "export", "api"]) as ctx:
+                cli.cli.invoke(ctx)
+
+        self.docker.save.assert_not_called()
+        mock_sys_exit.assert_called_once_with(ExitCode.MISSING_ARG)
+
+    @patch("sys.exit")
+    def test_export_failure(self, mock_sys_exit):
+        self.docker.save.side_effect = RLIDockerException("docker save failed")
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(
+                ["docker", "export", "api", "-o", "images.tar.gz"]
+            ) as ctx:
+                cli.cli.invoke(ctx)
+
+        self.mock_logging_error.assert_called_once_with("docker save failed")
+        mock_sys_exit.assert_called_once_with(ExitCode.DOCKER_ERROR)
+
+    @patch("sys.exit")
+    def test_import(self, mock_sys_exit):
+        self.docker.load.return_value = ["api:latest"]
+
+        with make_test_context(
+            ["docker", "import", "setup.py", "--threads", "2"]
+        ) as ctx:
+            cli.cli.invoke(ctx)
+
+        self.docker.load.assert_called_once_with("setup.py", 2)
+        mock_sys_exit.assert_called_once_with(ExitCode.OK)
+
+    @patch("sys.exit")
+    def test_import_failure(self, mock_sys_exit):
+        self.docker.load.side_effect = RLIDockerException("docker load failed")
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(["docker", "import", "setup.py"]) as ctx:
+                cli.cli.invoke(ctx)
+
+        mock_sys_exit.assert_called_once_with(ExitCode.DOCKER_ERROR)
+
+    @patch.object(cmd_docker, "parse_since", return_value=1000.0)
+    @patch.object(cmd_docker, "LogFollower")
+    @patch("sys.exit")
+    def test_logs(self, mock_sys_exit, mock_follower, mock_parse_since):
+        self.engine.find_containers.return_value = [{"Id": "1"}], []
+
+        with make_test_context(
+            ["docker", "logs", "--project", "shop", "-f", "--since", "10m"]
+        ) as ctx:
+            cli.cli.invoke(ctx)
+
+        mock_parse_since.assert_called_once_with("10m")
+        self.engine.find_containers.assert_called_once_with((), "shop")
+        mock_follower.return_value.follow.assert_called_once_with(
+            [{"Id": "1"}], True, 1000.0, None
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.OK)
+
+    @patch("sys.exit")
+    def test_logs_without_containers(self, mock_sys_exit):
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(["docker", "logs"]) as ctx:
+                cli.cli.invoke(ctx)
+
+        mock_sys_exit.assert_called_once_with(ExitCode.MISSING_ARG)
+
+    @patch("sys.exit")
+    def test_logs_invalid_since(self, mock_sys_exit):
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(["docker", "logs", "api", "--since", "x"]) as ctx:
+                cli.cli.invoke(ctx)
+
+        mock_sys_exit.assert_called_once_with(ExitCode.MISSING_ARG)
+
+    @patch.object(cmd_docker.logging, "warning")
+    @patch("sys.exit")
+    def test_logs_no_running_containers(self, mock_sys_exit, mock_warning):
+        self.engine.find_containers.return_value = [], ["api"]
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(["docker", "logs", "api"]) as ctx:
+                cli.cli.invoke(ctx)
+
+        self.engine.find_containers.assert_called_once_with(("api",), None)
+        mock_warning.assert_called_once_with(
+            "No running container has the name or ID %s.", "api"
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.DOCKER_ERROR)
+
+    @patch("sys.exit")
+    def test_logs_engine_error(self, mock_sys_exit):
+        self.engine.find_containers.side_effect = RLIDockerException("unreachable")
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(["docker", "logs", "api"]) as ctx:
+                cli.cli.invoke(ctx)
+
+        self.mock_logging_error.assert_called_once_with("unreachable")
+        mock_sys_exit.assert_called_once_with(ExitCode.DOCKER_ERROR)
+
+    @patch.object(cmd_docker, "StatsSampler")
+    @patch("sys.exit")
+    def test_stats(self, mock_sys_exit, mock_sampler):
+        sampler = mock_sampler.return_value
+        sampler.engine = self.engine
+        sampler.summary.return_value = []
+        self.engine.find_containers.return_value = [{"Id": "1"}], []
+
+        with make_test_context(
+            ["docker", "stats", "api", "--duration", "1m", "--samples", "60"]
+        ) as ctx:
+            cli.cli.invoke(ctx)
+
+        mock_sampler.assert_called_once_with(self.engine, 60, 1.0)
+        self.engine.find_containers.assert_called_once_with(("api",), None)
+        sampler.sample.assert_called_once_with(
+            [{"Id": "1"}], 60.0, None, cmd_docker._print_summary, 10.0
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.OK)
+
+    @patch.object(cmd_docker, "StatsSampler")
+    @patch("sys.exit")
+    def test_stats_output(self, mock_sys_exit, mock_sampler):
+        sampler = mock_sampler.return_value
+        sampler.engine = self.engine
+        sampler.summary.return_value = []
+        self.engine.find_containers.return_value = [{"Id": "1"}], []
+
+        with TemporaryDirectory() as temp_dir:
+            output = os.path.join(temp_dir, "stats.jsonl")
+
+            with make_test_context(
+                ["docker", "stats", "--project", "shop", "-o", output]
+            ) as ctx:
+                cli.cli.invoke(ctx)
+
+        dump = sampler.sample.call_args[0][2]
+        self.assertEqual("ndjson", dump.format)
+        mock_sys_exit.assert_called_once_with(ExitCode.OK)
+
+    @patch.object(cmd_docker, "DeployLedger")
+    @patch.object(cmd_docker, "StatsSampler")
+    @patch("sys.exit")
+    def test_stats_of_deployed_containers(
+        self, mock_sys_exit, mock_sampler, mock_ledger
+    ):
+        sampler = mock_sampler.return_value
+        sampler.engine = self.engine
+        sampler.summary.return_value = []
+        ledger = mock_ledger.return_value
+        ledger.projects.return_value = ["shop"]
+        ledger.current.return_value = {"images": [{"image_id": "sha256:app"}]}
+        self.engine.containers.return_value = [
+            {"Id": "1", "ImageID": "sha256:app"},
+            {"Id": "2", "ImageID": "sha256:other"},
+        ]
+
+        with make_test_context(["docker", "stats"]) as ctx:
+            cli.cli.invoke(ctx)
+
+        self.assertEqual(
+            [{"Id": "1", "ImageID": "sha256:app"}], sampler.sample.call_args[0][0]
+        )
+        ledger.close.assert_called_once_with()
+        mock_sys_exit.assert_called_once_with(ExitCode.OK)
+
+    @patch("sys.exit")
+    def test_stats_invalid_duration(self, mock_sys_exit):
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(["docker", "stats", "--duration", "x"]) as ctx:
+                cli.cli.invoke(ctx)
+
+        mock_sys_exit.assert_called_once_with(ExitCode.MISSING_ARG)
+
+    @patch("sys.exit")
+    def test_stats_engine_error(self, mock_sys_exit):
+        self.engine.find_containers.side_effect = RLIDockerException("unreachable")
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(["docker", "stats", "api"]) as ctx:
+                cli.cli.invoke(ctx)
+
+        self.mock_logging_error.assert_called_once_with("unreachable")
+        mock_sys_exit.assert_called_once_with(ExitCode.DOCKER_ERROR)
+
+    @patch("sys.exit")
+    def test_stats_unsupported_docker_host(self, mock_sys_exit):
+        self.mock_engine.side_effect = RLIDockerException(
+            "Only unix sockets are supported, not tcp://."
+        )
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(["docker", "stats", "api"]) as ctx:
+                cli.cli.invoke(ctx)
+
+        self.mock_logging_error.assert_called_once_with(
+            "Only unix sockets are supported, not tcp://."
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.DOCKER_ERROR)
+
+    @patch.object(cmd_docker, "StatsSampler")
+    @patch("sys.exit")
+    def test_stats_output_not_writable(self, mock_sys_exit, mock_sampler):
+        mock_sampler.return_value.engine = self.engine
+        self.engine.find_containers.return_value = [{"Id": "1"}], []
+        mock_sys_exit.side_effect = SystemExit
+
+        with TemporaryDirectory() as temp_dir:
+            output = os.path.join(temp_dir, "missing", "stats.csv")
+
+            with self.assertRaises(SystemExit):
+                with make_test_context(["docker", "stats", "api", "-o", output]) as ctx:
+                    cli.cli.invoke(ctx)
+
+        mock_sampler.return_value.sample.assert_not_called()
+        self.mock_logging_error.assert_called_once_with(
+            "Could not write the samples to %s: %s",
+            output,
+            "No such file or directory",
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.MISSING_ARG)
+
+    @patch.object(cmd_docker.logging, "info")
+    @patch.object(cmd_docker, "_deployed_image_ids", return_value={"sha256:prev"})
+    @patch.object(cmd_docker, "ImagePruner")
+    @patch("sys.exit")
+    def test_prune(
+        self, mock_sys_exit, mock_pruner, mock_deployed_image_ids, mock_info
+    ):
+        pruner = mock_pruner.return_value
+        pruner.layers_size.side_effect = [5000, 2952]
+        pruner.plan.return_value = [{"Id": "sha256:old", "Size": 10}]
+        pruner.prune.return_value = [
+            {
+                "id": "sha256:old",
+                "tags": ["app:sha-1"],
+                "size": 10,
+                "status": "removed",
+                "error": None,
+            }
+        ]
+
+        with make_test_context(
+            ["docker", "prune", "--keep", "2", "--older-than", "1d", "-p", "8"]
+        ) as ctx:
+            cli.cli.invoke(ctx)
+
+        mock_pruner.assert_called_once_with(self.engine, 8)
+        mock_deployed_image_ids.assert_called_once_with(previous=True)
+        pruner.plan.assert_called_once_with(2, 86400.0, {"sha256:prev"})
+        pruner.prune.assert_called_once_with([{"Id": "sha256:old", "Size": 10}])
+        mock_info.assert_called_once_with(
+            "Removed %d images, reclaiming %s.", 1, "2.0KiB"
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.OK)
+
+    @patch.object(cmd_docker.logging, "info")
+    @patch.object(cmd_docker, "_deployed_image_ids", return_value=set())
+    @patch.object(cmd_docker, "ImagePruner")
+    @patch("sys.exit")
+    def test_prune_dry_run(self, mock_sys_exit, mock_pruner, _, mock_info):
+        pruner = mock_pruner.return_value
+        pruner.plan.return_value = [{"Id": "sha256:old", "Size": 10}]
+        pruner.unique_size.return_value = 4
+
+        with make_test_context(["docker", "prune", "--dry-run"]) as ctx:
+            cli.cli.invoke(ctx)
+
+        pruner.plan.assert_called_once_with(3, None, set())
+        pruner.prune.assert_not_called()
+        mock_info.assert_called_once_with(
+            "Would remove %d images, reclaiming at least %s.", 1, "4.0B"
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.OK)
+
+    @patch.object(cmd_docker, "_deployed_image_ids", return_value=set())
+    @patch.object(cmd_docker, "ImagePruner")
+    @patch("sys.exit")
+    def test_prune_failure(self, mock_sys_exit, mock_pruner, _):
+        pruner = mock_pruner.return_value
+        pruner.layers_size.return_value = 0
+        pruner.prune.return_value = [
+            {
+                "id": "sha256:old",
+                "tags": [],
+                "size": 10,
+                "status": "failed",
+                "error": "conflict",
+            }
+        ]
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(["docker", "prune"]) as ctx:
+                cli.cli.invoke(ctx)
+
+        self.mock_logging_error.assert_called_once_with(
+            "Could not remove %s: %s", "sha256:old", "conflict"
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.DOCKER_ERROR)
+
+    @patch("sys.exit")
+    def test_prune_unsupported_docker_host(self, mock_sys_exit):
+        self.mock_engine.side_effect = RLIDockerException(
+            "Only unix sockets are supported, not tcp://."
+        )
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(["docker", "prune"]) as ctx:
+                cli.cli.invoke(ctx)
+
+        self.mock_logging_error.assert_called_once_with(
+            "Only unix sockets are supported, not tcp://."
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.DOCKER_ERROR)
+
+    @patch("sys.exit")
+    def test_prune_invalid_older_than(self, mock_sys_exit):
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(["docker", "prune", "--older-than", "x"]) as ctx:
+                cli.cli.invoke(ctx)
+
+        mock_sys_exit.assert_called_once_with(ExitCode.MISSING_ARG)
+
+    @patch.object(cmd_docker, "DeployLedger")
+    def test_deployed_image_ids(self, mock_ledger):
+        ledger = mock_ledger.return_value
+        ledger.projects.return_value = ["shop", "new"]
+        ledger.current.side_effect = lambda project: {
+            "images": [{"image_id": f"sha256:{project}-current"}]
+        }
+        ledger.previous.side_effect = lambda project: (
+            {"images": [{"image_id": "sha256:shop-previous"}]}
+            if project == "shop"
+            else None
+        )
+
+        self.assertEqual(
+            {"sha256:shop-current", "sha256:new-current", "sha256:shop-previous"},
+            cmd_docker._deployed_image_ids(previous=True),
+        )
+        ledger.close.assert_called_once_with()
@@ -0,0 +1,102 @@
+from datetime import datetime
+from rli import cli
+from rli.commands import cmd_git
+from rli.config import GithubConfig
+from rli.constants import ExitCode
+from rli.git import CLONED, FAILED, SKIPPED
+from rli.github import RLIGithub
+from tests.helper import make_test_context
+from standins import GithubStandIn
+from unittest import TestCase
+from unittest.mock import patch, Mock
+
+
+class CmdGitTest(TestCase):
+    def setUp(self):
+        self.mock_rli_config = Mock()
+        self.mock_rli_config.return_value.github_config.login = "login"
+        self.mock_rli_config.return_value.github_config.password = "password"
+
+        repo = Mock()
+        repo.name = "repo"
+        repo.clone_url = "https://github.com/org/repo.git"
+        repo.pushed_at = datetime(2020, 1, 2, 3, 4, 5)
+
+        self.mock_rli_github = Mock()
+        self.mock_rli_github.shared.return_value.list_repos.return_value = [repo]
+        self.mock_rli_git = Mock()
+
+        for patcher in (
+            patch.object(cmd_git, "get_rli_config_or_exit", self.mock_rli_config),
+            patch.object(cmd_git, "RLIGithub", self.mock_rli_github),
+            patch.object(cmd_git, "RLIGit", self.mock_rli_git),
+            patch.object(cmd_git, "record_repos", Mock()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @patch("sys.exit")
+    def test_sync(self, mock_sys_exit):
+        self.mock_rli_git.return_value.sync.return_value = [
+            {"name": "repo", "action": CLONED}
+        ]
+
+        with make_test_context(["git", "sync", "--root", "mirrors", "-p", "4"]) as ctx:
+            cli.cli.invoke(ctx)
+
+        self.mock_rli_git.assert_called_once_with(
+            "mirrors",
+            reference=None,
+            depth=None,
+            clone_filter="blob:none",
+            bare=False,
+            parallelism=4,
+            login="login",
+            password="password",
+        )
+        self.mock_rli_git.return_value.sync.assert_called_once_with(
+            [
+                {
+                    "name": "repo",
+                    "clone_url": "https://github.com/org/repo.git",
+                    "pushed_at": "2020-01-02T03:04:05",
+                }
+            ]
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.OK)
+
+    @patch("sys.exit")
+    def test_sync_failure(self, mock_sys_exit):
+        self.mock_rli_git.return_value.sync.return_value = [
+            {"name": "repo", "action": FAILED},
+            {"name": "other", "action": SKIPPED},
+        ]
+
+        with make_test_context(["git", "sync", "--filter", "none"]) as ctx:
+            cli.cli.invoke(ctx)
+
+        self.assertIsNone(self.mock_rli_git.call_args.kwargs["clone_filter"])
+        mock_sys_exit.assert_called_once_with(ExitCode.GIT_ERROR)
+
+    @patch("sys.exit")
+    def test_sync_private_repos(self, mock_sys_exit):
+        github = GithubStandIn().start()
+        self.addCleanup(github.stop)
+        github.repos = [github.repo("public"), github.repo("private", private=True)]
+        self.mock_rli_config.return_value.github_config = GithubConfig(
+            {
+                "organization": "bench",
+                "login": "login",
+                "password": "password",
+                "url": github.url,
+            }
+        )
+        self.mock_rli_github.shared.side_effect = RLIGithub.shared
+        self.mock_rli_git.return_value.sync.return_value = []
+
+        with make_test_context(["git", "sync"]) as ctx:
+            cli.cli.invoke(ctx)
+
+        (repos,), _ = self.mock_rli_git.return_value.sync.call_args
+        self.assertEqual(["public", "private"], [repo["name"] for repo in repos])
+        mock_sys_exit.assert_called_once_with(ExitCode.OK)
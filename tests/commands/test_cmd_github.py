@@ -1,9 +1,10 @@
+import sqlite3
 from github import GithubException
 from rli import cli
 from rli import github
 from rli.commands import cmd_github
 from rli.constants import ExitCode
-from rli.exceptions import InvalidRLIConfiguration
+from rli.exceptions import InvalidRLIConfiguration, RLISecretsException
 from tests.helper import make_test_context
 from unittest import TestCase
 from unittest.mock import patch, Mock
@@ -23,10 +24,14 @@ class CmdGithubTest(TestCase):
         self.mock_logging_info = Mock()
         self.mock_logging_error = Mock()
 
-        github.Github = self.mock_github
-        cmd_github.get_rli_config_or_exit = self.mock_rli_config
-        cmd_github.logging.info = self.mock_logging_info
-        cmd_github.logging.error = self.mock_logging_error
+        for patcher in (
+            patch.object(github, "Github", self.mock_github),
+            patch.object(cmd_github, "get_rli_config_or_exit", self.mock_rli_config),
+            patch.object(cmd_github.logging, "info", self.mock_logging_info),
+            patch.object(cmd_github.logging, "error", self.mock_logging_error),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
 
     @patch("rli.github.RLIGithub.create_repo")
     @patch("sys.exit")
@@ -77,6 +82,85 @@ class CmdGithubTest(TestCase):
             mock_sys_exit.assert_called_with(ExitCode.GITHUB_ERROR)
             mock_create_repo.assert_called_with(self.repo_name, self.repo_desc, "true")
 
+    @patch("rli.commands.cmd_github.RepoTemplate")
+    @patch("rli.github.RLIGithub.create_repo")
+    @patch("sys.exit")
+    def test_create_repo_template(
+        self, mock_sys_exit, mock_create_repo, mock_repo_template
+    ):
+        repos = {}
+
+        def create_repo(name, *args, **kwargs):
+            repos[name] = Mock(clone_url=f"https://github.com/org/{name}.git")
+            repos[name].name = name
+            repos[name].default_branch = "main"
+            return repos[name]
+
+        mock_create_repo.side_effect = create_repo
+        template = mock_repo_template.return_value.__enter__.return_value
+        template.push.return_value = [
+            {"name": "one", "action": "pushed"},
+            {"name": "two", "action": "pushed"},
+        ]
+
+        with make_test_context(
+            [
+                "github",
+                "create-repo",
+                "--repo-name",
+                "one",
+                "--repo-name",
+                "two",
+                "--template",
+                ".",
+            ]
+        ) as ctx:
+            cli.cli.invoke(ctx)
+
+        mock_create_repo.assert_any_call("one", None, "false", auto_init=False)
+        mock_create_repo.assert_any_call("two", None, "false", auto_init=False)
+        template.build.assert_called_once_with()
+        template.push.assert_called_once_with(
+            {
+                "one": ("https://github.com/org/one.git", "main"),
+                "two": ("https://github.com/org/two.git", "main"),
+            }
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.OK)
+
+    @patch("rli.commands.cmd_github.RepoTemplate")
+    @patch("rli.github.RLIGithub.create_repo")
+    @patch("sys.exit")
+    def test_create_repo_template_push_failure(
+        self, mock_sys_exit, mock_create_repo, mock_repo_template
+    ):
+        template = mock_repo_template.return_value.__enter__.return_value
+        template.push.return_value = [{"name": "one", "action": "failed"}]
+
+        with make_test_context(
+            ["github", "create-repo", "--repo-name", "one", "--template", "."]
+        ) as ctx:
+            cli.cli.invoke(ctx)
+
+        mock_sys_exit.assert_called_once_with(ExitCode.GIT_ERROR)
+
+    @patch("rli.commands.cmd_github.record_repos")
+    @patch("rli.github.RLIGithub.list_repos")
+    @patch("sys.exit")
+    def test_list_repos(self, mock_sys_exit, mock_list_repos, mock_record_repos):
+        repo_one = Mock()
+        repo_one.name = "repo-one"
+        repo_two = Mock()
+        repo_two.name = "repo-two"
+        mock_list_repos.return_value = [repo_two, repo_one]
+
+        with make_test_context(["github", "list-repos"]) as ctx:
+            cli.cli.invoke(ctx)
+
+            self.mock_rli_config.assert_called_once()
+            mock_record_repos.assert_called_once_with(["repo-two", "repo-one"])
+            mock_sys_exit.assert_called_once_with(ExitCode.OK)
+
     @patch("rli.github.RLIGithub.add_secrets")
     @patch("sys.exit")
     def test_add_secrets(self, mock_sys_exit, mock_add_secrets):
@@ -97,13 +181,69 @@ class CmdGithubTest(TestCase):
 
             self.mock_rli_config.assert_called_once()
             mock_add_secrets.assert_called_once_with(
-                self.repo_name, self.secrets, self.mock_rli_config().rli_secrets
+                self.repo_name,
+                self.secrets,
+                self.mock_rli_config().get_secrets(self.secrets),
             )
             self.mock_logging_info.assert_called_once_with(
                 "Successfully added all secrets to your repo."
             )
             mock_sys_exit.assert_called_once_with(ExitCode.OK)
 
+    @patch("rli.github.RLIGithub.add_secrets")
+    @patch("sys.exit")
+    def test_add_secrets_changed_since(self, mock_sys_exit, mock_add_secrets):
+        rli_config = self.mock_rli_config()
+        rli_config.secrets_backend = "store"
+        rli_config.secret_store.changed_since.return_value = {
+            "SECRET_TWO": "two",
+            "SECRET_THREE": "three",
+        }
+
+        with make_test_context(
+            [
+                "github",
+                "add-secrets",
+                "--repo-name",
+                self.repo_name,
+                "--changed-since",
+                "1600000000",
+            ]
+        ) as ctx:
+            cli.cli.invoke(ctx)
+
+            rli_config.secret_store.changed_since.assert_called_once_with(1600000000.0)
+            mock_add_secrets.assert_called_once_with(
+                self.repo_name,
+                ("SECRET_TWO", "SECRET_THREE"),
+                {"SECRET_TWO": "two", "SECRET_THREE": "three"},
+            )
+            mock_sys_exit.assert_called_once_with(ExitCode.OK)
+
+    @patch("rli.github.RLIGithub.add_secrets")
+    @patch("sys.exit")
+    def test_add_secrets_changed_since_json_backend(
+        self, mock_sys_exit, mock_add_secrets
+    ):
+        self.mock_rli_config().secrets_backend = "json"
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(
+                [
+                    "github",
+                    "add-secrets",
+                    "--repo-name",
+                    self.repo_name,
+                    "--changed-since",
+                    "1600000000",
+                ]
+            ) as ctx:
+                cli.cli.invoke(ctx)
+
+        mock_add_secrets.assert_not_called()
+        mock_sys_exit.assert_called_once_with(ExitCode.INVALID_RLI_CONFIG)
+
     @patch("rli.github.RLIGithub.add_secrets")
     @patch("sys.exit")
     def test_add_secrets_no_repo(self, mock_sys_exit, mock_add_secrets):
@@ -153,7 +293,9 @@ class CmdGithubTest(TestCase):
 
         self.mock_rli_config.assert_called_once()
         mock_add_secrets.assert_called_once_with(
-            self.repo_name, self.secrets, self.mock_rli_config().rli_secrets
+            self.repo_name,
+            self.secrets,
+            self.mock_rli_config().get_secrets(self.secrets),
         )
         self.mock_logging_info.assert_not_called()
         self.mock_logging_error.assert_called_once_with(
@@ -161,6 +303,76 @@ class CmdGithubTest(TestCase):
         )
         mock_sys_exit.assert_called_once_with(ExitCode.INVALID_RLI_CONFIG)
 
+    @patch("rli.github.RLIGithub.add_secrets")
+    @patch("sys.exit")
+    def test_add_secrets_invalid_secrets_configuration(
+        self, mock_sys_exit, mock_add_secrets
+    ):
+        self.mock_rli_config().get_secrets.side_effect = InvalidRLIConfiguration(
+            "Unknown secrets backend 'nope'."
+        )
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(
+                ["github", "add-secrets", "--repo-name", self.repo_name, "-s", "A"]
+            ) as ctx:
+                cli.cli.invoke(ctx)
+
+        mock_add_secrets.assert_not_called()
+        self.mock_logging_error.assert_called_once_with(
+            "Your secrets RLI configuration is incorrect: %s",
+            "Unknown secrets backend 'nope'.",
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.INVALID_RLI_CONFIG)
+
+    @patch("rli.github.RLIGithub.add_secrets")
+    @patch("sys.exit")
+    def test_add_secrets_secrets_exception(self, mock_sys_exit, mock_add_secrets):
+        self.mock_rli_config().get_secrets.side_effect = RLISecretsException(
+            "Vault returned 403."
+        )
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(
+                ["github", "add-secrets", "--repo-name", self.repo_name, "-s", "A"]
+            ) as ctx:
+                cli.cli.invoke(ctx)
+
+        mock_add_secrets.assert_not_called()
+        self.mock_logging_error.assert_called_once_with(
+            "Could not read the secrets: %s", "Vault returned 403."
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.SECRETS_ERROR)
+
+    @patch("rli.github.RLIGithub.add_secrets")
+    @patch("sys.exit")
+    def test_add_secrets_secret_store_error(self, mock_sys_exit, mock_add_secrets):
+        rli_config = self.mock_rli_config()
+        rli_config.secrets_backend = "store"
+        rli_config.secret_store.changed_since.side_effect = sqlite3.OperationalError
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(
+                [
+                    "github",
+                    "add-secrets",
+                    "--repo-name",
+                    self.repo_name,
+                    "--changed-since",
+                    "1600000000",
+                ]
+            ) as ctx:
+                cli.cli.invoke(ctx)
+
+        mock_add_secrets.assert_not_called()
+        self.mock_logging_error.assert_called_once_with(
+            "There was an error while reading the secret store."
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.SECRETS_ERROR)
+
     @patch("rli.github.RLIGithub.add_secrets")
     @patch("sys.exit")
     def test_add_secrets_github_exception(self, mock_sys_exit, mock_add_secrets):
@@ -184,7 +396,9 @@ class CmdGithubTest(TestCase):
 
         self.mock_rli_config.assert_called_once()
         mock_add_secrets.assert_called_once_with(
-            self.repo_name, self.secrets, self.mock_rli_config().rli_secrets
+            self.repo_name,
+            self.secrets,
+            self.mock_rli_config().get_secrets(self.secrets),
         )
         self.mock_logging_info.assert_not_called()
         self.mock_logging_error.assert_called_once_with(
@@ -215,10 +429,306 @@ class CmdGithubTest(TestCase):
 
         self.mock_rli_config.assert_called_once()
         mock_add_secrets.assert_called_once_with(
-            self.repo_name, self.secrets, self.mock_rli_config().rli_secrets
+            self.repo_name,
+            self.secrets,
+            self.mock_rli_config().get_secrets(self.secrets),
         )
         self.mock_logging_info.assert_not_called()
         self.mock_logging_error.assert_called_once_with(
             "There was an unexpected error while adding secrets."
         )
         mock_sys_exit.assert_called_once_with(ExitCode.UNEXPECTED_ERROR)
+
+    @patch.object(cmd_github, "record_repos")
+    @patch.object(cmd_github, "RepoInventory")
+    @patch("sys.exit")
+    def test_find(self, mock_sys_exit, mock_inventory, mock_record_repos):
+        inventory = mock_inventory.return_value
+        inventory.refreshed_at.return_value = None
+        inventory.all.return_value = [{"name": "api"}, {"name": "web"}]
+        inventory.find.return_value = [
+            {"name": "api", "id": 1, "visibility": "public", "default_branch": "main"}
+        ]
+
+        with make_test_context(["github", "find", "ap", "--limit", "5"]) as ctx:
+            cli.cli.invoke(ctx)
+
+        inventory.refresh.assert_called_once_with(full=False)
+        mock_record_repos.assert_called_once_with(["api", "web"])
+        inventory.find.assert_called_once_with("ap", 5)
+        inventory.close.assert_called_once_with()
+        mock_sys_exit.assert_called_once_with(ExitCode.OK)
+
+    @patch.object(cmd_github, "RepoInventory")
+    @patch("sys.exit")
+    def test_find_without_refresh(self, mock_sys_exit, mock_inventory):
+        inventory = mock_inventory.return_value
+        inventory.refreshed_at.return_value = 1.0
+        inventory.find.return_value = []
+
+        with make_test_context(["github", "find", "zzz"]) as ctx:
+            cli.cli.invoke(ctx)
+
+        inventory.refresh.assert_not_called()
+        self.mock_logging_info.assert_called_once_with("No repos match '%s'.", "zzz")
+        mock_sys_exit.assert_called_once_with(ExitCode.OK)
+
+    @patch.object(cmd_github, "RepoInventory")
+    @patch("sys.exit")
+    def test_find_refresh_error(self, mock_sys_exit, mock_inventory):
+        mock_inventory.return_value.refresh.side_effect = GithubException(500, None)
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(["github", "find", "api", "--full"]) as ctx:
+                cli.cli.invoke(ctx)
+
+        mock_inventory.return_value.refresh.assert_called_once_with(full=True)
+        mock_inventory.return_value.close.assert_called_once_with()
+        mock_sys_exit.assert_called_once_with(ExitCode.GITHUB_ERROR)
+
+    @patch.object(cmd_github, "RunWatcher")
+    @patch("sys.exit")
+    def test_watch_runs(self, mock_sys_exit, mock_run_watcher):
+        mock_run_watcher.return_value.watch.return_value = [
+            {"name": "api", "conclusion": "success", "error": None, "html_url": "u"},
+            {"name": "web", "conclusion": "skipped", "error": None, "html_url": "u"},
+        ]
+
+        with make_test_context(
+            ["github", "watch-runs", "--repo-name", "api", "--repo-name", "web"]
+        ) as ctx:
+            cli.cli.invoke(ctx)
+
+        mock_run_watcher.return_value.watch.assert_called_once_with(
+            ("api", "web"), None, None, None
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.OK)
+
+    @patch.object(cmd_github, "RunWatcher")
+    @patch("sys.exit")
+    def test_watch_runs_failure(self, mock_sys_exit, mock_run_watcher):
+        mock_run_watcher.return_value.watch.return_value = [
+            {"name": "api", "conclusion": "failure", "error": None, "html_url": "u"}
+        ]
+
+        with make_test_context(
+            ["github", "watch-runs", "--repo-name", "api", "--run-id", "3"]
+        ) as ctx:
+            cli.cli.invoke(ctx)
+
+        mock_run_watcher.return_value.watch.assert_called_once_with(
+            ("api",), 3, None, None
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.RUN_FAILED)
+
+    @patch.object(cmd_github, "RunWatcher")
+    @patch("sys.exit")
+    def test_watch_runs_error(self, mock_sys_exit, mock_run_watcher):
+        mock_run_watcher.return_value.watch.return_value = [
+            {"name": "api", "conclusion": None, "error": "404", "html_url": None}
+        ]
+
+        with make_test_context(["github", "watch-runs", "--repo-name", "api"]) as ctx:
+            cli.cli.invoke(ctx)
+
+        mock_sys_exit.assert_called_once_with(ExitCode.GITHUB_ERROR)
+
+    @patch("sys.exit")
+    def test_watch_runs_run_id_with_many_repos(self, mock_sys_exit):
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(
+                [
+                    "github",
+                    "watch-runs",
+                    "--repo-name",
+                    "api",
+                    "--repo-name",
+                    "web",
+                    "--run-id",
+                    "3",
+                ]
+            ) as ctx:
+                cli.cli.invoke(ctx)
+
+        mock_sys_exit.assert_called_once_with(ExitCode.MISSING_ARG)
+
+    @patch.object(cmd_github, "ArtifactDownloader")
+    @patch("sys.exit")
+    def test_download_artifacts(self, mock_sys_exit, mock_downloader):
+        downloader = mock_downloader.return_value
+        downloader.latest_run.return_value = 7
+        downloader.list_artifacts.return_value = [{"name": "dist"}, {"name": "docs"}]
+        downloader.download.return_value = [
+            {"name": "dist", "action": "downloaded", "size": 3, "duration": 0.1}
+        ]
+
+        with make_test_context(
+            [
+                "github",
+                "download-artifacts",
+                "--repo-name",
+                "api",
+                "-n",
+                "dist",
+                "--path",
+                "out",
+                "--extract",
+            ]
+        ) as ctx:
+            cli.cli.invoke(ctx)
+
+        downloader.latest_run.assert_called_once_with("api", None)
+        downloader.list_artifacts.assert_called_once_with("api", 7)
+        downloader.download.assert_called_once_with([{"name": "dist"}], "out", True)
+        mock_sys_exit.assert_called_once_with(ExitCode.OK)
+
+    @patch.object(cmd_github, "ArtifactDownloader")
+    @patch("sys.exit")
+    def test_download_artifacts_failure(self, mock_sys_exit, mock_downloader):
+        downloader = mock_downloader.return_value
+        downloader.list_artifacts.return_value = [{"name": "dist"}]
+        downloader.download.return_value = [
+            {"name": "dist", "action": "failed", "size": 0, "duration": 0.1}
+        ]
+
+        with make_test_context(
+            ["github", "download-artifacts", "--repo-name", "api", "--run-id", "3"]
+        ) as ctx:
+            cli.cli.invoke(ctx)
+
+        downloader.latest_run.assert_not_called()
+        downloader.download.assert_called_once_with([{"name": "dist"}], ".", False)
+        mock_sys_exit.assert_called_once_with(ExitCode.GITHUB_ERROR)
+
+    @patch.object(cmd_github, "ArtifactDownloader")
+    @patch("sys.exit")
+    def test_download_artifacts_missing_name(self, mock_sys_exit, mock_downloader):
+        mock_downloader.return_value.list_artifacts.return_value = [{"name": "dist"}]
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(
+                [
+                    "github",
+                    "download-artifacts",
+                    "--repo-name",
+                    "api",
+                    "--run-id",
+                    "3",
+                    "-n",
+                    "docs",
+                ]
+            ) as ctx:
+                cli.cli.invoke(ctx)
+
+        self.mock_logging_error.assert_called_once_with(
+            "Run %s has no artifacts named %s.", 3, "docs"
+        )
+        mock_sys_exit.assert_called_once_with(ExitCode.MISSING_ARG)
+
+    @patch("rli.github.RLIGithub.upload_release_assets")
+    @patch("rli.github.RLIGithub.create_release")
+    @patch("sys.exit")
+    def test_release(self, mock_sys_exit, mock_create_release, mock_upload):
+        mock_create_release.return_value = {"html_url": "url"}
+        mock_upload.return_value = [
+            {
+                "name": "setup.py",
+                "action": "uploaded",
+                "size": 10,
+                "duration": 0.5,
+                "throughput": 20,
+                "attempts": 1,
+            }
+        ]
+
+        with make_test_context(
+            [
+                "github",
+                "release",
+                "--repo-name",
+                "api",
+                "--tag",
+                "v1.0.0",
+                "--notes",
+                "notes",
+                "--draft",
+                "-p",
+                "2",
+                "setup.py",
+            ]
+        ) as ctx:
+            cli.cli.invoke(ctx)
+
+        mock_create_release.assert_called_once_with(
+            "api", "v1.0.0", None, "notes", True, False, None
+        )
+        mock_upload.assert_called_once_with({"html_url": "url"}, ("setup.py",), 2, 3)
+        mock_sys_exit.assert_called_once_with(ExitCode.OK)
+
+    @patch("rli.github.RLIGithub.upload_release_assets")
+    @patch("rli.github.RLIGithub.create_release")
+    @patch("sys.exit")
+    def test_release_upload_failure(
+        self, mock_sys_exit, mock_create_release, mock_upload
+    ):
+        mock_create_release.return_value = {"html_url": "url"}
+        mock_upload.return_value = [
+            {
+                "name": "setup.py",
+                "action": "failed",
+                "size": 10,
+                "duration": 0,
+                "throughput": 0,
+                "attempts": 4,
+            }
+        ]
+
+        with make_test_context(
+            ["github", "release", "--repo-name", "api", "--tag", "v1", "setup.py"]
+        ) as ctx:
+            cli.cli.invoke(ctx)
+
+        mock_sys_exit.assert_called_once_with(ExitCode.GITHUB_ERROR)
+
+    @patch("rli.github.RLIGithub.create_release")
+    @patch("sys.exit")
+    def test_release_duplicate_names(self, mock_sys_exit, mock_create_release):
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(
+                [
+                    "github",
+                    "release",
+                    "--repo-name",
+                    "api",
+                    "--tag",
+                    "v1",
+                    "setup.py",
+                    "./setup.py",
+                ]
+            ) as ctx:
+                cli.cli.invoke(ctx)
+
+        mock_create_release.assert_not_called()
+        mock_sys_exit.assert_called_once_with(ExitCode.MISSING_ARG)
+
+    @patch("rli.github.RLIGithub.upload_release_assets")
+    @patch("rli.github.RLIGithub.create_release")
+    @patch("sys.exit")
+    def test_release_failure(self, mock_sys_exit, mock_create_release, mock_upload):
+        mock_create_release.side_effect = GithubException(422, None)
+        mock_sys_exit.side_effect = SystemExit
+
+        with self.assertRaises(SystemExit):
+            with make_test_context(
+                ["github", "release", "--repo-name", "api", "--tag", "v1"]
+            ) as ctx:
+                cli.cli.invoke(ctx)
+
+        mock_upload.assert_not_called()
+        mock_sys_exit.assert_called_once_with(ExitCode.GITHUB_ERROR)
@@ -0,0 +1,85 @@
+from rli import cli
+from rli.commands import cmd_secrets
+from rli.constants import ExitCode
+from rli.secret_store import SecretStore
+from tempfile import TemporaryDirectory
+from tests.helper import make_test_context
+from unittest import TestCase
+from unittest.mock import patch, Mock
+import json
+import os
+
+
+class CmdSecretsTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+        self.store = SecretStore(os.path.join(self.temp_dir.name, "secrets.db"))
+        self.addCleanup(self.store.close)
+
+        self.mock_rli_config = Mock()
+        self.mock_rli_config.return_value.home_dir = self.temp_dir.name
+        self.mock_rli_config.return_value.secret_store = self.store
+
+        self.mock_echo = Mock()
+
+        for patcher in (
+            patch.object(cmd_secrets, "get_rli_config_or_exit", self.mock_rli_config),
+            patch.object(cmd_secrets.click, "echo", self.mock_echo),
+            patch("sys.exit", side_effect=SystemExit),
+        ):
+            self.mock_sys_exit = patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def invoke(self, args):
+        with self.assertRaises(SystemExit):
+            with make_test_context(["secrets", *args]) as ctx:
+                cli.cli.invoke(ctx)
+
+    def test_import(self):
+        path = os.path.join(self.temp_dir.name, "secrets.json")
+
+        with open(path, "w") as json_file:
+            json.dump({"SECRET_ONE": "one"}, json_file)
+
+        self.invoke(["import", path, "--namespace", "production"])
+
+        self.mock_sys_exit.assert_called_with(ExitCode.OK)
+        self.assertEqual("one", self.store.namespaced("production").get("SECRET_ONE"))
+        self.assertIsNone(self.store.get("SECRET_ONE"))
+
+    def test_import_missing_file(self):
+        self.invoke(["import"])
+
+        self.mock_sys_exit.assert_called_with(ExitCode.MISSING_ARG)
+
+    def test_set(self):
+        self.invoke(["set", "SECRET_ONE", "--value", "one"])
+
+        self.mock_sys_exit.assert_called_with(ExitCode.OK)
+        self.assertEqual("one", self.store.get("SECRET_ONE"))
+
+    def test_list(self):
+        self.store.set_many({"SECRET_TWO": "two", "SECRET_ONE": "one"}.items())
+
+        self.invoke(["list"])
+
+        self.assertEqual(
+            ["SECRET_ONE", "SECRET_TWO"],
+            [call.args[0] for call in self.mock_echo.call_args_list],
+        )
+        self.mock_sys_exit.assert_called_with(ExitCode.OK)
+
+    def test_list_changed_since(self):
+        self.store.set("SECRET_ONE", "one")
+
+        self.invoke(["list", "--changed-since", "4102444800"])
+
+        self.mock_echo.assert_not_called()
+        self.mock_sys_exit.assert_called_with(ExitCode.OK)
+
+    def test_list_invalid_changed_since(self):
+        self.invoke(["list", "--changed-since", "yesterday"])
+
+        self.mock_sys_exit.assert_called_with(ExitCode.MISSING_ARG)
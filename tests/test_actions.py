@@ -0,0 +1,234 @@
+from standins import GithubStandIn
+from rli.actions import (
+    DOWNLOADED,
+    FAILED,
+    MANIFEST_FILE,
+    SKIPPED,
+    ArtifactDownloader,
+    RunWatcher,
+)
+from rli.config import GithubConfig
+from rli.github import RLIGithub
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+import io
+import json
+import os
+import zipfile
+
+
+def make_config(url):
+    return GithubConfig(
+        {
+            "organization": "bench",
+            "login": "login",
+            "password": "password",
+            "url": url,
+        }
+    )
+
+
+def make_zip(files):
+    output = io.BytesIO()
+
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+
+    return output.getvalue()
+
+
+class RunWatcherTest(TestCase):
+    def setUp(self):
+        self.github = GithubStandIn().start()
+        self.addCleanup(self.github.stop)
+
+        self.now = 0.0
+        self.sleeps = []
+        # Called with the number of sleeps so far, to change runs between polls.
+        self.on_sleep = lambda count: None
+
+        self.watcher = RunWatcher(
+            make_config(self.github.url),
+            interval=5,
+            queued_interval=15,
+            max_interval=60,
+            clock=lambda: self.now,
+            sleep=self.sleep,
+        )
+
+    def sleep(self, seconds):
+        self.now += seconds
+        self.sleeps.append(seconds)
+        self.on_sleep(len(self.sleeps))
+
+    def test_watch_until_completed(self):
+        self.github.runs["api"] = [self.github.run(2), self.github.run(1)]
+        self.github.jobs[2] = [self.github.job(20, "build")]
+
+        def on_sleep(count):
+            if count == 3:
+                self.github.runs["api"][0]["status"] = "in_progress"
+                self.github.jobs[2][0]["status"] = "in_progress"
+            elif count == 6:
+                self.github.runs["api"][0].update(
+                    status="completed", conclusion="failure"
+                )
+
+        self.on_sleep = on_sleep
+
+        results = self.watcher.watch(["api"])
+
+        self.assertEqual(1, len(results))
+        self.assertEqual(2, results[0]["run_id"])
+        self.assertEqual("completed", results[0]["status"])
+        self.assertEqual("failure", results[0]["conclusion"])
+        self.assertIsNone(results[0]["error"])
+        # Queued polls back off from the queued interval, in progress polls
+        # start again from the interval.
+        self.assertEqual([15, 22.5, 33.75, 5, 7.5, 11.25], self.sleeps)
+        # The run and the jobs were 304s in the four polls where nothing
+        # changed, and the jobs in the last poll.
+        self.assertEqual(9, self.github.not_modified)
+
+    def test_watch_many_repos(self):
+        for i, name in enumerate(("api", "web")):
+            self.github.runs[name] = [self.github.run(i + 1, "in_progress")]
+
+        def on_sleep(count):
+            for run in (self.github.runs["api"][0], self.github.runs["web"][0]):
+                run.update(status="completed", conclusion="success")
+
+        self.on_sleep = on_sleep
+
+        results = self.watcher.watch(["api", "web"])
+
+        self.assertEqual(["success", "success"], [r["conclusion"] for r in results])
+        self.assertEqual([5], self.sleeps)
+
+    def test_watch_run_id(self):
+        self.github.runs["api"] = [
+            self.github.run(2),
+            self.github.run(1, "completed", "success"),
+        ]
+
+        results = self.watcher.watch(["api"], run_id=1)
+
+        self.assertEqual("success", results[0]["conclusion"])
+        self.assertEqual([], self.sleeps)
+
+    def test_watch_branch(self):
+        self.github.runs["api"] = [
+            self.github.run(2, branch="feature"),
+            self.github.run(1, "completed", "success"),
+        ]
+
+        results = self.watcher.watch(["api"], branch="master")
+
+        self.assertEqual(1, results[0]["run_id"])
+
+    def test_watch_missing_run(self):
+        results = self.watcher.watch(["api"], run_id=404)
+
+        self.assertEqual("404", results[0]["error"])
+        self.assertIsNone(results[0]["conclusion"])
+
+
+class ArtifactDownloaderTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = os.path.join(self.temp_dir.name, "artifacts")
+
+        self.github = GithubStandIn().start()
+        self.addCleanup(self.github.stop)
+
+        self.github.runs["api"] = [
+            self.github.run(2),
+            self.github.run(1, "completed", "success"),
+        ]
+        self.archives = {
+            "dist": make_zip({"app.txt": b"app " * 50000, "lib/lib.txt": b"lib"}),
+            "coverage": make_zip({"index.html": b"<html></html>"}),
+        }
+
+        for i, (name, data) in enumerate(self.archives.items()):
+            self.github.artifact(1, 10 + i, name, data)
+
+        self.downloader = ArtifactDownloader(
+            make_config(self.github.url), parallelism=2, chunk_size=4096
+        )
+
+    def download(self, extract=False):
+        artifacts = self.downloader.list_artifacts("api", 1)
+        return {
+            result["name"]: result
+            for result in self.downloader.download(artifacts, self.path, extract)
+        }
+
+    def test_uses_the_shared_session(self):
+        session = RLIGithub.shared(make_config(self.github.url)).session
+
+        self.assertIs(session, self.downloader.session)
+        self.assertIs(session, RunWatcher(make_config(self.github.url)).session)
+
+    def test_latest_run(self):
+        self.assertEqual(1, self.downloader.latest_run("api"))
+        self.assertIsNone(self.downloader.latest_run("api", branch="feature"))
+
+    def test_download(self):
+        results = self.download()
+
+        for name, data in self.archives.items():
+            self.assertEqual(DOWNLOADED, results[name]["action"])
+            self.assertEqual(len(data), results[name]["size"])
+
+            with open(os.path.join(self.path, f"{name}.zip"), "rb") as archive:
+                self.assertEqual(data, archive.read())
+
+        with open(os.path.join(self.path, MANIFEST_FILE)) as manifest:
+            self.assertEqual({"coverage", "dist"}, set(json.load(manifest)))
+
+    def test_download_again(self):
+        self.download()
+        requests = self.github.requests
+
+        results = self.download()
+
+        self.assertEqual({SKIPPED}, {result["action"] for result in results.values()})
+        # Only the artifacts were listed.
+        self.assertEqual(requests + 1, self.github.requests)
+
+    def test_download_changed(self):
+        self.download()
+        os.truncate(os.path.join(self.path, "dist.zip"), 10)
+
+        results = self.download()
+
+        self.assertEqual(DOWNLOADED, results["dist"]["action"])
+        self.assertEqual(SKIPPED, results["coverage"]["action"])
+        self.assertEqual(
+            len(self.archives["dist"]), os.path.getsize(f"{self.path}/dist.zip")
+        )
+
+    def test_download_extract(self):
+        results = self.download(extract=True)
+
+        self.assertEqual(DOWNLOADED, results["dist"]["action"])
+
+        with open(os.path.join(self.path, "dist", "lib", "lib.txt"), "rb") as lib:
+            self.assertEqual(b"lib", lib.read())
+
+        self.assertFalse(os.path.exists(os.path.join(self.path, "dist.zip")))
+        self.assertEqual(SKIPPED, self.download(extract=True)["dist"]["action"])
+        # Switching to archives downloads them again.
+        self.assertEqual(DOWNLOADED, self.download()["dist"]["action"])
+
+    def test_download_digest_mismatch(self):
+        self.github.archives[10] = self.archives["coverage"]
+
+        results = self.download(extract=True)
+
+        self.assertEqual(FAILED, results["dist"]["action"])
+        self.assertEqual(DOWNLOADED, results["coverage"]["action"])
+        self.assertEqual([MANIFEST_FILE, "coverage"], sorted(os.listdir(self.path)))
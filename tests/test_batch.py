@@ -0,0 +1,143 @@
+from rli.batch import BatchRunner
+from rli.constants import ExitCode
+from unittest import TestCase
+from unittest.mock import Mock, patch
+import click
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+
+
+class BatchRunnerTest(TestCase):
+    def setUp(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def dispatch(self, argv):
+        with self.lock:
+            self.calls.append(argv)
+
+        if argv[0] == "fail":
+            return ExitCode.GITHUB_ERROR
+
+        if argv[0] == "raise":
+            raise RuntimeError("boom")
+
+        return ExitCode.OK
+
+    def run_batch(self, lines, parallelism=2):
+        output = io.StringIO()
+        exit_code = BatchRunner(self.dispatch, parallelism).run(lines, output)
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+
+        return exit_code, {result["id"]: result for result in results}
+
+    def test_run(self):
+        exit_code, results = self.run_batch(
+            [
+                '{"id": "one", "argv": ["github", "create-repo", "--repo-name", "one"]}\n',
+                "\n",
+                '["smoke"]\n',
+            ]
+        )
+
+        self.assertEqual(ExitCode.OK, exit_code)
+        self.assertEqual(2, len(results))
+        self.assertEqual(ExitCode.OK, results["one"]["exit_code"])
+        self.assertEqual(["smoke"], results[3]["argv"])
+        self.assertIn("duration", results[3])
+        self.assertIn(["github", "create-repo", "--repo-name", "one"], self.calls)
+
+    def test_run_failures(self):
+        exit_code, results = self.run_batch(
+            ['{"argv": ["fail"]}', "not json", '{"argv": []}', '["raise"]'],
+            parallelism=1,
+        )
+
+        self.assertEqual(ExitCode.GITHUB_ERROR, exit_code)
+        self.assertEqual(ExitCode.GITHUB_ERROR, results[1]["exit_code"])
+        self.assertEqual(ExitCode.MISSING_ARG, results[2]["exit_code"])
+        self.assertIn("error", results[2])
+        self.assertEqual(ExitCode.MISSING_ARG, results[3]["exit_code"])
+        self.assertEqual(ExitCode.UNEXPECTED_ERROR, results[4]["exit_code"])
+        self.assertEqual("boom", results[4]["error"])
+
+    def test_run_many(self):
+        exit_code, results = self.run_batch(
+            [json.dumps({"id": i, "argv": ["smoke"]}) for i in range(50)],
+            parallelism=8,
+        )
+
+        self.assertEqual(ExitCode.OK, exit_code)
+        self.assertEqual(set(range(50)), set(results))
+
+    def test_run_captures_output(self):
+        def dispatch(argv):
+            click.echo(f"echo {argv[0]}")
+            print(f"print {argv[0]}")
+            return ExitCode.OK
+
+        output = io.StringIO()
+
+        with patch.object(sys, "stdout", output):
+            BatchRunner(dispatch, 4).run(
+                [json.dumps([str(i)]) for i in range(20)], output
+            )
+
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+
+        self.assertEqual(20, len(results))
+
+        for result in results:
+            name = result["argv"][0]
+            self.assertEqual(f"echo {name}\nprint {name}\n", result["output"])
+
+    def test_run_validates_before_dispatch(self):
+        def validate(argv):
+            if argv[0] == "unknown":
+                raise ValueError("No such command 'unknown'.")
+
+        def dispatch(argv):
+            raise ValueError("raised by the command")
+
+        output = io.StringIO()
+        BatchRunner(dispatch, 1, validate).run(['["unknown"]', '["known"]'], output)
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+
+        self.assertEqual(
+            [ExitCode.MISSING_ARG, ExitCode.UNEXPECTED_ERROR],
+            [result["exit_code"] for result in results],
+        )
+        self.assertEqual(["known"], results[1]["argv"])
+
+    def test_run_releases_slots_when_writing_fails(self):
+        output = Mock()
+        output.write.side_effect = OSError("disk full")
+        done = threading.Event()
+
+        def run():
+            BatchRunner(self.dispatch, 1).run(['["smoke"]'] * 10, output)
+            done.set()
+
+        threading.Thread(target=run, daemon=True).start()
+
+        self.assertTrue(done.wait(10))
+        self.assertEqual(10, len(self.calls))
+
+    def test_results_on_stdout_are_json(self):
+        # The logger is set up in the process, so the batch runs in a new one.
+        completed = subprocess.run(
+            [sys.executable, "-c", "from rli import cli; cli.cli()", "batch", "-"],
+            input='["smoke"]\n{"id": "two", "argv": ["smoke"]}\n',
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            check=True,
+        )
+
+        results = [json.loads(line) for line in completed.stdout.splitlines()]
+        self.assertCountEqual([1, "two"], [result["id"] for result in results])
+        self.assertEqual(2, completed.stderr.count("RLI is working properly."))
@@ -0,0 +1,26 @@
+from rli import cli
+from rli.client import command_name, options_with_values
+from unittest import TestCase
+
+
+class ClientTest(TestCase):
+    def test_command_name(self):
+        self.assertEqual("serve", command_name(["serve"]))
+        self.assertEqual("serve", command_name(["-v", "serve"]))
+        self.assertEqual("serve", command_name(["--home", "/tmp", "serve"]))
+        self.assertEqual("serve", command_name(["--profile=cpu", "serve"]))
+        self.assertEqual("github", command_name(["--", "github", "serve"]))
+        self.assertEqual("/tmp", command_name(["--home=/tmp", "/tmp"]))
+        self.assertIsNone(command_name(["--log-format", "json"]))
+        self.assertIsNone(command_name([]))
+
+    def test_options_with_values_match_the_cli(self):
+        self.assertEqual(
+            sorted(options_with_values()),
+            sorted(
+                name
+                for param in cli.cli.params
+                if not getattr(param, "is_flag", False)
+                for name in param.opts
+            ),
+        )
@@ -0,0 +1,88 @@
+from rli import completion
+from rli.registry import registry
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+import json
+import os
+import time
+
+
+class CompletionTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.env = patch.dict(os.environ, {"RLI_DIR": self.temp_dir.name})
+        self.env.start()
+
+        with open(os.path.join(self.temp_dir.name, "secrets.json"), "w") as secrets:
+            json.dump(
+                {"SECRET_ONE": "value-1", "SECRET_TWO": "value-2", "OTHER": "value-3"},
+                secrets,
+            )
+
+        completion.record_repos(["rli-v2", "rest-api", "website"])
+        self.cache = completion.build_cache()
+
+    def tearDown(self):
+        self.env.stop()
+        self.temp_dir.cleanup()
+
+    def test_build_cache_only_keeps_secret_keys(self):
+        self.assertEqual(["OTHER", "SECRET_ONE", "SECRET_TWO"], self.cache["secrets"])
+        self.assertEqual(self.cache, completion.load_cache())
+        self.assertNotIn("value-1", json.dumps(self.cache))
+
+    def test_complete_commands(self):
+        self.assertEqual(["git", "github"], completion.complete(self.cache, [], "g"))
+        self.assertEqual(["github"], completion.complete(self.cache, [], "gith"))
+        self.assertEqual(
+            ["add-secrets"], completion.complete(self.cache, ["github"], "ad")
+        )
+        self.assertIn(
+            "--verbose", completion.complete(self.cache, ["--home", "/tmp"], "--")
+        )
+
+    def test_complete_options(self):
+        self.assertEqual(
+            ["--repo-name"],
+            completion.complete(self.cache, ["github", "add-secrets"], "--r"),
+        )
+
+    def test_complete_repo_names(self):
+        self.assertEqual(
+            ["rest-api", "rli-v2"],
+            completion.complete(
+                self.cache, ["-v", "github", "add-secrets", "--repo-name"], "r"
+            ),
+        )
+
+    def test_complete_secret_keys(self):
+        self.assertEqual(
+            ["SECRET_ONE", "SECRET_TWO"],
+            completion.complete(
+                self.cache,
+                ["github", "add-secrets", "--repo-name", "rli-v2", "-s"],
+                "SEC",
+            ),
+        )
+
+    def test_is_stale(self):
+        self.assertFalse(completion.is_stale(self.cache))
+
+        self.cache["built_at"] = time.time() - completion.REFRESH_INTERVAL - 1
+
+        self.assertTrue(completion.is_stale(self.cache))
+
+    def test_is_stale_when_a_command_file_changes(self):
+        fingerprint = [list(entry) for entry in self.cache["fingerprint"]]
+        fingerprint[-1][1] += 1
+
+        with patch.object(registry, "fingerprint", return_value=fingerprint):
+            self.assertTrue(completion.is_stale(self.cache))
+
+    @patch("subprocess.Popen")
+    def test_refresh_in_background_runs_once(self, mock_popen):
+        completion.refresh_in_background()
+        completion.refresh_in_background()
+
+        mock_popen.assert_called_once()
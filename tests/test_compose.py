@@ -0,0 +1,108 @@
+from rli import compose
+from rli.compose import ComposeFile, parse_variables
+from rli.exceptions import RLIDockerException
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch, Mock
+import os
+
+
+class ComposeTest(TestCase):
+    def test_parse_variables(self):
+        required, optional = parse_variables(
+            "services:\n"
+            "  app:\n"
+            "    image: $REGISTRY/app:${TAG:-latest}\n"
+            "    # - COMMENTED=$COMMENTED\n"
+            "    environment:\n"
+            "      - TOKEN=${TOKEN}\n"
+            "      - CHECKED=${CHECKED:?must be set}\n"
+            "      - PRICE=$$5\n"
+            "      - ALT=${ALT+set}\n"
+            "      - BOTH=${REGISTRY-default}\n"
+        )
+
+        self.assertEqual({"REGISTRY", "TOKEN", "CHECKED"}, required)
+        self.assertEqual({"TAG", "ALT"}, optional)
+
+    def test_compose_file_from_test_files(self):
+        compose_file = ComposeFile.load(
+            os.path.join(
+                os.path.dirname(__file__),
+                "..",
+                "test_files",
+                "deploy",
+                "docker-compose.yml",
+            )
+        )
+
+        self.assertEqual(
+            {
+                "REST_API_JWT_SECRET",
+                "REST_API_REFRESH_SECRET",
+                "DIGITAL_OCEAN_ACCESS_KEY",
+                "DIGITAL_OCEAN_SECRET_KEY",
+                "GOOGLE_RECAPTCHA_TOKEN",
+                "REST_API_DB_USERNAME",
+                "REST_API_DB_URL",
+                "REST_API_DB_PASSWORD",
+            },
+            compose_file.required,
+        )
+        self.assertEqual(frozenset(), compose_file.optional)
+
+
+class ComposeFileTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = os.path.join(self.temp_dir.name, "docker-compose.yml")
+        self.write("environment:\n  - TOKEN=$COMPOSE_TEST_TOKEN\n")
+
+    def write(self, text):
+        with open(self.path, "w") as compose_file:
+            compose_file.write(text)
+
+    def test_load_is_cached_by_hash(self):
+        first = ComposeFile.load(self.path)
+
+        with patch.object(compose, "parse_variables") as mock_parse_variables:
+            second = ComposeFile.load(self.path)
+
+        mock_parse_variables.assert_not_called()
+        self.assertEqual(first.hash, second.hash)
+        self.assertEqual({"COMPOSE_TEST_TOKEN"}, second.required)
+
+        self.write("environment:\n  - TOKEN=$COMPOSE_TEST_OTHER\n")
+
+        self.assertEqual({"COMPOSE_TEST_OTHER"}, ComposeFile.load(self.path).required)
+
+    def test_load_secrets(self):
+        load_secrets = Mock(return_value={"COMPOSE_TEST_TOKEN": "token"})
+
+        self.assertEqual(
+            {"COMPOSE_TEST_TOKEN": "token"},
+            ComposeFile.load(self.path).load_secrets(load_secrets),
+        )
+        load_secrets.assert_called_once_with(["COMPOSE_TEST_TOKEN"])
+
+    def test_load_secrets_from_environment(self):
+        with patch.dict(os.environ, {"COMPOSE_TEST_TOKEN": "token"}):
+            self.assertEqual(
+                {}, ComposeFile.load(self.path).load_secrets(Mock(return_value={}))
+            )
+
+    def test_load_secrets_missing(self):
+        with self.assertRaises(RLIDockerException) as context:
+            ComposeFile.load(self.path).load_secrets(Mock(return_value={}))
+
+        self.assertIn("COMPOSE_TEST_TOKEN", str(context.exception))
+
+    def test_load_secrets_from_env_file(self):
+        with open(os.path.join(self.temp_dir.name, ".env"), "w") as env_file:
+            env_file.write("# defaults\nexport COMPOSE_TEST_TOKEN=token\nOTHER = 1\n")
+
+        compose_file = ComposeFile.load(self.path)
+
+        self.assertEqual({"COMPOSE_TEST_TOKEN", "OTHER"}, compose_file.defaults)
+        self.assertEqual({}, compose_file.load_secrets(Mock(return_value={})))
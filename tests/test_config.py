@@ -6,6 +6,13 @@ from rli.config import (
     get_rli_config_or_exit,
 )
 from rli.exceptions import InvalidRLIConfiguration
+from rli.secret_providers import (
+    EnvironmentProvider,
+    JSONFileProvider,
+    StoreProvider,
+    VaultProvider,
+    secrets_cache,
+)
 from rli.constants import ExitCode
 from unittest.mock import patch, Mock
 from unittest import TestCase
@@ -117,6 +124,13 @@ class GithubConfigTest(TestCase):
         self.assertEqual(self.valid_config["login"], github_config.login)
         self.assertEqual(self.valid_config["password"], github_config.password)
 
+    def test_url_config(self):
+        self.assertEqual("https://api.github.com", GithubConfig(self.valid_config).url)
+
+        self.valid_config["url"] = "http://localhost:8080/"
+
+        self.assertEqual("http://localhost:8080", GithubConfig(self.valid_config).url)
+
     def test_no_password_config(self):
         github_config = GithubConfig(self.no_password_config)
 
@@ -230,6 +244,94 @@ class RLIConfigTest(TestCase):
 
         self.assertEqual("", rli_config.get_secret("THIS IS NOT SPECIFIED"))
 
+    @patch("rli.config.RLIConfig.load_rli_config")
+    def test_secret_providers(self, mock_load_rli_config):
+        backends = {
+            "json": JSONFileProvider,
+            "env": EnvironmentProvider,
+            "store": StoreProvider,
+            "vault": VaultProvider,
+        }
+
+        for backend, provider_class in backends.items():
+            with self.subTest(backend=backend):
+                mock_load_rli_config.return_value = {
+                    **self.valid_config,
+                    "secrets": {"backend": backend, "url": "http://localhost"},
+                }
+
+                rli_config = RLIConfig()
+
+                self.assertEqual(backend, rli_config.secrets_backend)
+                self.assertIsInstance(
+                    rli_config.secret_provider.provider, provider_class
+                )
+
+    @patch("rli.config.RLIConfig.load_rli_config")
+    def test_get_secrets_from_provider(self, mock_load_rli_config):
+        mock_load_rli_config.return_value = self.valid_config
+
+        rli_config = RLIConfig()
+        rli_config._secret_provider = Mock()
+        rli_config._secret_provider.get_many.return_value = {"SECRET_ONE": "one"}
+
+        self.assertEqual("one", rli_config.get_secret("SECRET_ONE"))
+        rli_config._secret_provider.get_many.assert_called_once_with(["SECRET_ONE"])
+
+    @patch("rli.config.RLIConfig.load_rli_config")
+    def test_vault_without_url(self, mock_load_rli_config):
+        mock_load_rli_config.return_value = {"secrets": {"backend": "vault"}}
+
+        with self.assertRaises(InvalidRLIConfiguration):
+            RLIConfig().secret_provider
+
+    @patch("rli.config.RLIConfig.load_rli_config")
+    def test_secret_store_namespace(self, mock_load_rli_config):
+        mock_load_rli_config.return_value = {
+            **self.valid_config,
+            "secrets": {"namespace": "production"},
+        }
+
+        rli_config = RLIConfig()
+
+        self.assertEqual("json", rli_config.secrets_backend)
+        self.assertEqual("production", rli_config.secret_store.namespace)
+        self.assertEqual(
+            f"{rli_config.home_dir}/.rli/secrets.db", rli_config.secret_store.path
+        )
+
+    @patch("rli.config.RLIConfig.load_rli_config")
+    def test_unknown_secrets_backend(self, mock_load_rli_config):
+        mock_load_rli_config.return_value = {"secrets": {"backend": "vault"}}
+
+        with self.assertRaises(InvalidRLIConfiguration):
+            RLIConfig().get_secret("SECRET_ONE")
+
+    @patch("rli.secret_providers.load_keys")
+    @patch("rli.config.RLIConfig.load_rli_config")
+    def test_get_secrets(self, mock_load_rli_config, mock_load_keys):
+        mock_load_rli_config.return_value = self.valid_config
+        secrets_cache.clear()
+        self.addCleanup(secrets_cache.clear)
+        mock_load_keys.return_value = {"SECRET_ONE": "secret one"}
+
+        rli_config = RLIConfig()
+
+        self.assertEqual(
+            {"SECRET_ONE": "secret one"},
+            rli_config.get_secrets(("SECRET_ONE", "SECRET_THREE")),
+        )
+        mock_load_keys.assert_called_once_with(
+            f"{rli_config.home_dir}/.rli/secrets.json", ["SECRET_ONE", "SECRET_THREE"]
+        )
+
+        rli_config._rli_secrets = self.secrets
+
+        self.assertEqual(
+            {"SECRET_TWO": "secret two"}, rli_config.get_secrets(("SECRET_TWO",))
+        )
+        mock_load_keys.assert_called_once()
+
     @patch("json.load")
     @patch("builtins.open", new_callable=mock.mock_open)
     def test_no_github_config(self, mock_open, mock_load):
@@ -0,0 +1,83 @@
+from standins import DockerEngineStandIn
+from rli.container_logs import LogFollower
+from rli.docker_engine import DockerEngine
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+import io
+import os
+
+
+class LogFollowerTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        socket_path = os.path.join(self.temp_dir.name, "docker.sock")
+
+        self.stand_in = DockerEngineStandIn(socket_path).start()
+        self.addCleanup(self.stand_in.stop)
+
+        self.api = self.stand_in.container("api")
+        self.worker = self.stand_in.container("worker", tty=True)
+        self.stand_in.logs[self.api["Id"]] = [
+            (1, b"starting\n"),
+            (2, b"warning: slow\nready\n"),
+            (1, b"no newline"),
+        ]
+        self.stand_in.logs[self.worker["Id"]] = [(1, b"job 1\r\njob 2\n")]
+
+        self.output = io.BytesIO()
+        self.engine = DockerEngine(socket_path)
+
+    def lines(self):
+        return sorted(self.output.getvalue().split(b"\n")[:-1])
+
+    def test_follow(self):
+        follower = LogFollower(self.engine, self.output)
+
+        self.assertEqual(6, follower.follow([self.api, self.worker]))
+        self.assertEqual(
+            [
+                b"api    | no newline",
+                b"api    | ready",
+                b"api    | starting",
+                b"api    | warning: slow",
+                b"worker | job 1\r",
+                b"worker | job 2",
+            ],
+            self.lines(),
+        )
+
+    def test_follow_order_within_a_container(self):
+        LogFollower(self.engine, self.output).follow([self.api])
+
+        self.assertEqual(
+            b"api | starting\napi | warning: slow\napi | ready\napi | no newline\n",
+            self.output.getvalue(),
+        )
+
+    def test_buffer_size(self):
+        self.stand_in.logs[self.api["Id"]] = [(1, b"x" * 20 + b"\n")]
+
+        LogFollower(self.engine, self.output, buffer_size=8).follow([self.api])
+
+        self.assertEqual(
+            [b"api | xxxx", b"api | xxxxxxxx", b"api | xxxxxxxx"], self.lines()
+        )
+
+    def test_params(self):
+        LogFollower(self.engine, self.output).follow(
+            [self.api], follow=False, since=1600000000.5, tail=10
+        )
+
+        path, query = self.stand_in.requests[-1]
+        self.assertEqual(f"/containers/{self.api['Id']}/logs", path)
+        self.assertEqual(
+            {
+                "stdout": "1",
+                "stderr": "1",
+                "follow": "0",
+                "since": "1600000000.500000000",
+                "tail": "10",
+            },
+            query,
+        )
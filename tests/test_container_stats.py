@@ -0,0 +1,135 @@
+from standins import MiB, DockerEngineStandIn, stats_sample
+from rli.container_stats import RingBuffer, StatsDump, StatsSampler, percentiles
+from rli.docker_engine import DockerEngine
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+import io
+import json
+import os
+
+
+class RingBufferTest(TestCase):
+    def test_append(self):
+        ring = RingBuffer(3)
+
+        self.assertEqual([], ring.values())
+        self.assertIsNone(ring.percentile(50))
+
+        for value in range(1, 6):
+            ring.append(value)
+
+        self.assertEqual(3, len(ring))
+        self.assertEqual([3.0, 4.0, 5.0], ring.values())
+        self.assertEqual(4.0, ring.percentile(50))
+
+    def test_percentiles(self):
+        self.assertEqual(
+            [1.0, 5.5, 9.55, 10.0],
+            [
+                round(value, 2)
+                for value in percentiles(range(10, 0, -1), (0, 50, 95, 100))
+            ],
+        )
+        self.assertEqual([None, None], percentiles([], (50, 95)))
+
+
+class StatsSamplerTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        socket_path = os.path.join(self.temp_dir.name, "docker.sock")
+
+        self.stand_in = DockerEngineStandIn(socket_path).start()
+        self.addCleanup(self.stand_in.stop)
+
+        self.api = self.stand_in.container("api")
+        self.worker = self.stand_in.container("worker")
+        # The api uses 100 more units of CPU and 10 more MiB every second.
+        self.stand_in.stats[self.api["Id"]] = [
+            stats_sample(second, second * 100, second * 10 * MiB)
+            for second in range(1, 6)
+        ]
+        self.stand_in.stats[self.worker["Id"]] = [
+            stats_sample(1, 0, 5 * MiB),
+            {"read": "2026-01-01T00:00:02Z", "cpu_stats": {}, "memory_stats": {}},
+        ]
+
+        self.engine = DockerEngine(socket_path)
+
+    def test_sample(self):
+        sampler = StatsSampler(self.engine, samples=4, interval=0)
+
+        self.assertEqual(6, sampler.sample([self.api, self.worker]))
+
+        api, worker = sampler.summary()
+        self.assertEqual("api", api["container"])
+        self.assertEqual(4, api["samples"])
+        self.assertEqual(20.0, api["cpu_percent_p50"])
+        self.assertEqual(20.0, api["cpu_percent_max"])
+        self.assertEqual(35 * MiB, api["memory_p50"])
+        self.assertEqual(50 * MiB, api["memory_max"])
+        self.assertEqual(512 * MiB, api["memory_limit"])
+
+        self.assertEqual("worker", worker["container"])
+        self.assertEqual(1, worker["samples"])
+        self.assertEqual(0.0, worker["cpu_percent_p95"])
+        self.assertEqual(5 * MiB, worker["memory_p95"])
+        self.assertIn(
+            ("/containers/" + self.api["Id"] + "/stats", {"stream": "1"}),
+            self.stand_in.requests,
+        )
+
+    def test_interval_skips_samples(self):
+        sampler = StatsSampler(self.engine, interval=3600)
+
+        self.assertEqual(1, sampler.sample([self.api]))
+        self.assertEqual([10 * MiB], sampler.series["api"].memory.values())
+
+    def test_report(self):
+        sampler = StatsSampler(self.engine, interval=0)
+        reports = []
+
+        sampler.sample([self.api], report=reports.append, every=0)
+
+        self.assertTrue(reports)
+        self.assertEqual(["api"], [row["container"] for row in reports[-1]])
+
+    def test_dump(self):
+        output = io.StringIO()
+        sampler = StatsSampler(self.engine, interval=0)
+
+        sampler.sample([self.worker], dump=StatsDump(output, "ndjson"))
+
+        self.assertEqual(
+            [
+                {
+                    "time": "2026-01-01T00:00:01Z",
+                    "container": "worker",
+                    "cpu_percent": 0.0,
+                    "memory": 5 * MiB,
+                    "memory_limit": 512 * MiB,
+                }
+            ],
+            [json.loads(line) for line in output.getvalue().splitlines()],
+        )
+
+    def test_csv_dump(self):
+        output = io.StringIO()
+        dump = StatsDump(output)
+
+        dump.write(
+            {
+                "time": "2026-01-01T00:00:01Z",
+                "container": "api",
+                "cpu_percent": None,
+                "memory": 10,
+                "memory_limit": 20,
+                "ignored": True,
+            }
+        )
+
+        self.assertEqual(
+            "time,container,cpu_percent,memory,memory_limit\r\n"
+            "2026-01-01T00:00:01Z,api,,10,20\r\n",
+            output.getvalue(),
+        )
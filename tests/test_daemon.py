@@ -0,0 +1,79 @@
+from rli import daemon
+from rli.client import forward
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+from rli.constants import ExitCode
+import os
+import socket
+import subprocess
+import sys
+import time
+
+DAEMON = "import sys; from rli.daemon import RLIDaemon; RLIDaemon(sys.argv[1]).serve_forever()"
+
+
+class RLIDaemonTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "rli.sock")
+        self.daemon = subprocess.Popen(
+            [sys.executable, "-c", DAEMON, self.path],
+            env=dict(os.environ, RLI_DIR=self.temp_dir.name),
+        )
+
+        deadline = time.time() + 10
+        while not os.path.exists(self.path) and time.time() < deadline:
+            time.sleep(0.05)
+
+    def tearDown(self):
+        self.daemon.terminate()
+        self.daemon.wait()
+        self.temp_dir.cleanup()
+
+    def test_forward(self):
+        self.assertEqual(ExitCode.OK, forward(["smoke"], self.path))
+        self.assertEqual(ExitCode.OK, forward(["smoke"], self.path))
+
+    def test_forward_while_a_client_stalls(self):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stalled:
+            stalled.connect(self.path)
+
+            self.assertEqual(ExitCode.OK, forward(["smoke"], self.path))
+
+    def test_forward_usage_error(self):
+        self.assertEqual(2, forward(["github", "not-a-command"], self.path))
+
+    def test_forward_without_daemon(self):
+        self.assertIsNone(
+            forward(["smoke"], os.path.join(self.temp_dir.name, "missing.sock"))
+        )
+
+
+class RLIDaemonWarmTest(TestCase):
+    @patch.object(daemon, "registry")
+    @patch.object(daemon, "RLIDocker")
+    @patch.object(daemon, "RLIConfig")
+    def test_warm(self, mock_config, mock_docker, mock_registry):
+        mock_registry.names.return_value = []
+        docker_config = mock_config.return_value.docker_config
+        rli_daemon = daemon.RLIDaemon("rli.sock")
+
+        rli_daemon.warm()
+
+        self.assertIs(mock_config.return_value, rli_daemon.config)
+        mock_docker.assert_called_once_with(
+            docker_config.login, docker_config.password, docker_config.registry
+        )
+
+    @patch.object(daemon, "registry")
+    @patch.object(daemon, "RLIDocker")
+    @patch.object(daemon, "RLIConfig", side_effect=FileNotFoundError)
+    def test_warm_without_config(self, mock_config, mock_docker, mock_registry):
+        mock_registry.names.return_value = []
+        rli_daemon = daemon.RLIDaemon("rli.sock")
+
+        rli_daemon.warm()
+
+        self.assertIsNone(rli_daemon.config)
+        mock_docker.assert_not_called()
@@ -0,0 +1,146 @@
+from rli.deploy import RLIDeploy
+from rli.deploy_ledger import DeployLedger, FAILED, ROLLBACK, SUCCEEDED
+from rli.exceptions import RLIDockerException
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import Mock
+import os
+
+
+class RLIDeployTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+        self.ledger = DeployLedger(os.path.join(self.temp_dir.name, "deploys.db"))
+        self.addCleanup(self.ledger.close)
+
+        self.compose_file = os.path.join(self.temp_dir.name, "docker-compose.yml")
+
+        with open(self.compose_file, "w") as compose_file:
+            compose_file.write(
+                "services:\n"
+                "  app:\n"
+                "    image: registry/app:latest\n"
+                "    environment:\n"
+                "      - APP_SECRET=$APP_SECRET\n"
+                "      - LOG_LEVEL=${APP_LOG_LEVEL:-info}\n"
+            )
+
+        self.local_images = {}
+        self.docker = Mock()
+        self.docker.pull.side_effect = lambda image: f"registry/{image}"
+        self.docker.inspect.side_effect = self.local_images.get
+        self.docker.digest.side_effect = lambda image: f"{image}@digest"
+        self.docker.tag.side_effect = lambda current, new: new
+        self.docker.compose_up.return_value = 0
+
+        self.deploy = RLIDeploy(self.docker, self.ledger)
+
+    def up(self, image_id):
+        self.local_images["registry/app:latest"] = {"Id": image_id}
+        self.local_images[image_id] = {"Id": image_id}
+
+        return self.deploy.up(
+            "project", self.compose_file, ["app:latest"], self.load_secrets
+        )
+
+    def load_secrets(self, keys):
+        return {key: "one" for key in keys if key == "APP_SECRET"}
+
+    def test_up(self):
+        deploy = self.up("sha256:one")
+
+        self.assertEqual(SUCCEEDED, deploy["status"])
+        self.assertEqual(0, deploy["exit_code"])
+        self.assertEqual(
+            [
+                {
+                    "image": "registry/app:latest",
+                    "image_id": "sha256:one",
+                    "digest": "registry/app:latest@digest",
+                }
+            ],
+            deploy["images"],
+        )
+        self.docker.compose_up.assert_called_once_with(
+            self.compose_file, {"APP_SECRET": "one"}
+        )
+
+    def test_up_extra_secret_keys(self):
+        load_secrets = Mock(return_value={"APP_SECRET": "one", "EXTRA": "extra"})
+
+        deploy = self.deploy.up(
+            "project", self.compose_file, [], load_secrets, ("EXTRA",)
+        )
+
+        load_secrets.assert_called_once_with(["APP_LOG_LEVEL", "APP_SECRET", "EXTRA"])
+        self.assertEqual(["APP_SECRET", "EXTRA"], deploy["secret_keys"])
+
+    def test_up_missing_secret(self):
+        with self.assertRaises(RLIDockerException) as context:
+            self.deploy.up(
+                "project", self.compose_file, ["app:latest"], Mock(return_value={})
+            )
+
+        self.assertIn("APP_SECRET", str(context.exception))
+        self.docker.pull.assert_not_called()
+        self.docker.compose_up.assert_not_called()
+
+    def test_up_failure(self):
+        self.docker.compose_up.return_value = 1
+
+        self.assertEqual(FAILED, self.up("sha256:one")["status"])
+
+    def test_up_pull_failure(self):
+        self.docker.pull.side_effect = None
+        self.docker.pull.return_value = None
+
+        with self.assertRaises(RLIDockerException):
+            self.up("sha256:one")
+
+        self.assertEqual([], self.ledger.history("project"))
+
+    def test_rollback(self):
+        first = self.up("sha256:one")
+        self.up("sha256:two")
+        self.docker.pull.reset_mock()
+
+        load_secrets = Mock(side_effect=self.load_secrets)
+        deploy = self.deploy.rollback("project", load_secrets)
+
+        self.docker.pull.assert_not_called()
+        self.docker.tag.assert_called_with("sha256:one", "registry/app:latest")
+        load_secrets.assert_called_once_with(["APP_LOG_LEVEL", "APP_SECRET"])
+        self.assertEqual(ROLLBACK, deploy["kind"])
+        self.assertEqual(first["id"], deploy["restored_id"])
+        self.assertEqual(first["images"], deploy["images"])
+
+    def test_rollback_image_not_local(self):
+        self.up("sha256:one")
+        self.up("sha256:two")
+        del self.local_images["sha256:one"]
+
+        with self.assertRaises(RLIDockerException) as context:
+            self.deploy.rollback("project", self.load_secrets)
+
+        self.assertIn("registry/app:latest", str(context.exception))
+        self.docker.tag.assert_not_called()
+
+    def test_rollback_without_previous_deploy(self):
+        self.up("sha256:one")
+
+        with self.assertRaises(RLIDockerException):
+            self.deploy.rollback("project", self.load_secrets)
+
+    def test_rollback_to(self):
+        first = self.up("sha256:one")
+        self.up("sha256:two")
+        self.up("sha256:three")
+
+        deploy = self.deploy.rollback("project", self.load_secrets, first["id"])
+
+        self.assertEqual(first["id"], deploy["restored_id"])
+
+        with self.assertRaises(RLIDockerException):
+            self.deploy.rollback("other", self.load_secrets, first["id"])
@@ -0,0 +1,103 @@
+from rli.deploy_ledger import DeployLedger, FAILED, ROLLBACK, SUCCEEDED
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+import os
+
+
+class DeployLedgerTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+        self.ledger = DeployLedger(os.path.join(self.temp_dir.name, "deploys.db"))
+        self.addCleanup(self.ledger.close)
+
+        self.compose_file = os.path.join(self.temp_dir.name, "docker-compose.yml")
+        self.secrets = {"SECRET_ONE": "one"}
+
+    def record(self, image_id, status=SUCCEEDED, **kwargs):
+        return self.ledger.record(
+            "project",
+            self.compose_file,
+            "hash",
+            self.secrets,
+            [
+                {
+                    "image": "registry/app:latest",
+                    "image_id": image_id,
+                    "digest": f"registry/app@{image_id}",
+                }
+            ],
+            status,
+            **kwargs,
+        )
+
+    def test_record(self):
+        deploy_id = self.record("sha256:one")
+
+        deploy = self.ledger.get(deploy_id)
+
+        self.assertEqual("project", deploy["project"])
+        self.assertEqual(["SECRET_ONE"], deploy["secret_keys"])
+        self.assertEqual(
+            self.ledger.fingerprint(self.secrets), deploy["secrets_fingerprint"]
+        )
+        self.assertNotIn("one", deploy["secrets_fingerprint"])
+        self.assertEqual(
+            [
+                {
+                    "image": "registry/app:latest",
+                    "image_id": "sha256:one",
+                    "digest": "registry/app@sha256:one",
+                }
+            ],
+            deploy["images"],
+        )
+        self.assertIsNone(self.ledger.get(deploy_id + 1))
+
+    def test_previous(self):
+        self.assertIsNone(self.ledger.previous("project"))
+
+        first = self.record("sha256:one")
+        self.assertIsNone(self.ledger.previous("project"))
+
+        second = self.record("sha256:two")
+        self.record("sha256:three", status=FAILED)
+
+        self.assertEqual(second, self.ledger.current("project")["id"])
+        self.assertEqual(first, self.ledger.previous("project")["id"])
+
+    def test_previous_after_rollback(self):
+        first = self.record("sha256:one")
+        second = self.record("sha256:two")
+        third = self.record("sha256:three")
+
+        self.record("sha256:two", kind=ROLLBACK, restored_id=second)
+
+        self.assertEqual(first, self.ledger.previous("project")["id"])
+        self.assertEqual(
+            [third + 1, third, second, first],
+            [deploy["id"] for deploy in self.ledger.history("project")],
+        )
+        self.assertEqual([], self.ledger.history("other"))
+
+    def test_projects(self):
+        self.assertEqual([], self.ledger.projects())
+
+        self.record("sha256:one")
+        self.ledger.record(
+            "failing", self.compose_file, "hash", self.secrets, [], FAILED
+        )
+
+        self.assertEqual(["project"], self.ledger.projects())
+
+    def test_fingerprint(self):
+        fingerprint = self.ledger.fingerprint(self.secrets)
+
+        self.assertEqual(fingerprint, self.ledger.fingerprint(dict(self.secrets)))
+        self.assertNotEqual(fingerprint, self.ledger.fingerprint({"SECRET_ONE": "1"}))
+
+        reopened = DeployLedger(self.ledger.path)
+        self.addCleanup(reopened.close)
+
+        self.assertEqual(fingerprint, reopened.fingerprint(self.secrets))
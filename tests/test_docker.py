@@ -1,8 +1,12 @@
-from rli.docker import RLIDocker
+from standins import write_fake_docker
+from rli.docker import RLIDocker, image_repository
+from tempfile import TemporaryDirectory
 from unittest import TestCase
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 from rli.exceptions import RLIDockerException
 from rli.utils import bash
+from rli.utils.bash import Bash
+import gzip
 import subprocess
 import os
 
@@ -26,7 +30,12 @@ class RLIDockerTest(TestCase):
         self.mock_subprocess_run = Mock()
         self.mock_subprocess_run.return_value = self.mock_subprocess_run_return
 
-        bash.subprocess.run = self.mock_subprocess_run
+        patcher = patch.object(bash.subprocess, "run", self.mock_subprocess_run)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        Bash.cache.clear()
+        RLIDocker.logins.clear()
+        self.addCleanup(RLIDocker.logins.clear)
 
     def set_subprocess_returncode(self, code):
         self.mock_subprocess_run_return.returncode = code
@@ -258,3 +267,229 @@ class RLIDockerTest(TestCase):
             stderr=subprocess.STDOUT,
         )
         self.assertEqual(1, run_image)
+
+    def test_inspect_is_cached_until_pull(self):
+        rli_docker = self.construct_rli_docker()
+
+        self.mock_subprocess_run_return.stdout = (
+            '[{"RepoDigests": ["some.registry/some-image-name@sha256:abc"]}]'
+        )
+
+        self.assertEqual(
+            "some.registry/some-image-name@sha256:abc", rli_docker.digest(self.image)
+        )
+        self.assertEqual(
+            "some.registry/some-image-name@sha256:abc", rli_docker.digest(self.image)
+        )
+
+        self.mock_subprocess_run.assert_called_with(
+            args=["docker", "image", "inspect", self.image],
+            env=dict(os.environ),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+        )
+        self.assertEqual(2, self.mock_subprocess_run.call_count)
+
+        rli_docker.pull(self.image)
+        rli_docker.inspect(self.image)
+
+        self.assertEqual(4, self.mock_subprocess_run.call_count)
+
+    def test_inspect_during_pull_is_not_cached(self):
+        rli_docker = self.construct_rli_docker()
+        self.mock_subprocess_run_return.stdout = '[{"Id": "sha256:old"}]'
+        run = self.mock_subprocess_run.side_effect
+
+        def pull_while_inspecting(args, **kwargs):
+            # An inspect from another thread while the pull runs.
+            if args[:2] == ["docker", "pull"]:
+                rli_docker.inspect(self.image)
+
+            return self.mock_subprocess_run_return
+
+        self.mock_subprocess_run.side_effect = pull_while_inspecting
+        rli_docker.pull(self.image)
+        self.mock_subprocess_run.side_effect = run
+        calls = self.mock_subprocess_run.call_count
+
+        rli_docker.inspect(self.image)
+
+        self.assertEqual(calls + 1, self.mock_subprocess_run.call_count)
+
+    def test_login_once(self):
+        self.construct_rli_docker()
+        RLIDocker(self.username, self.password, self.registry)
+
+        self.assertEqual(1, self.mock_subprocess_run.call_count)
+
+        RLIDocker(self.username, "other password", self.registry)
+
+        self.assertEqual(2, self.mock_subprocess_run.call_count)
+
+    def test_failed_login_is_retried(self):
+        self.set_subprocess_returncode(1)
+
+        for _ in range(2):
+            with self.assertRaises(RLIDockerException):
+                RLIDocker(self.username, self.password, self.registry)
+
+        self.assertEqual(2, self.mock_subprocess_run.call_count)
+
+    def test_construct_without_login(self):
+        RLIDocker(self.username, self.password, self.registry, login=False)
+
+        self.mock_subprocess_run.assert_not_called()
+
+    def test_digest_of_image_repository(self):
+        rli_docker = self.construct_rli_docker()
+
+        self.mock_subprocess_run_return.stdout = (
+            '[{"RepoDigests": ["other.registry/mirror@sha256:abc", '
+            '"some.registry/some-image-name@sha256:abc"]}]'
+        )
+
+        self.assertEqual(
+            "some.registry/some-image-name@sha256:abc",
+            rli_docker.digest("some.registry/some-image-name:latest"),
+        )
+
+    def test_unsuccessful_inspect(self):
+        rli_docker = self.construct_rli_docker()
+
+        self.set_subprocess_returncode(1)
+
+        self.assertIsNone(rli_docker.inspect(self.image))
+        self.assertIsNone(rli_docker.digest(self.image))
+
+    def test_image_repository(self):
+        self.assertEqual("ubuntu", image_repository("ubuntu"))
+        self.assertEqual("ubuntu", image_repository("ubuntu:latest"))
+        self.assertEqual(
+            "some.registry:5000/ubuntu",
+            image_repository("some.registry:5000/ubuntu:latest"),
+        )
+        self.assertEqual(
+            "some.registry:5000/ubuntu",
+            image_repository("some.registry:5000/ubuntu@sha256:abc"),
+        )
+        self.assertIsNone(image_repository("sha256:" + "a" * 64))
+        self.assertIsNone(image_repository("0123456789ab"))
+
+    def test_run_image_by_id_drops_every_cached_query(self):
+        rli_docker = self.construct_rli_docker()
+        self.mock_subprocess_run_return.stdout = "[{}]"
+
+        rli_docker.inspect(self.image)
+        call_count = self.mock_subprocess_run.call_count
+
+        rli_docker.run_image("sha256:" + "a" * 64, {})
+        rli_docker.inspect(self.image)
+
+        self.assertEqual(call_count + 2, self.mock_subprocess_run.call_count)
+
+
+class RLIDockerSaveTest(TestCase):
+    """Saves and loads through the fake docker script of the benchmarks."""
+
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+        bin_dir = os.path.join(self.temp_dir.name, "bin")
+        write_fake_docker(bin_dir)
+
+        self.tarball = os.path.join(self.temp_dir.name, "images.tar")
+        self.loaded = os.path.join(self.temp_dir.name, "loaded.tar")
+        self.archive = os.path.join(self.temp_dir.name, "images.tar.gz")
+        self.data = os.urandom(100000) + b"layer" * 400000
+
+        with open(self.tarball, "wb") as tarball:
+            tarball.write(self.data)
+
+        patcher = patch.dict(
+            os.environ,
+            {
+                "PATH": bin_dir + os.pathsep + os.environ["PATH"],
+                "FAKE_DOCKER_SAVE": self.tarball,
+                "FAKE_DOCKER_LOAD": self.loaded,
+            },
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        Bash.cache.clear()
+        self.addCleanup(Bash.cache.clear)
+
+        self.docker = RLIDocker.local()
+
+    def read(self, path):
+        with open(path, "rb") as data:
+            return data.read()
+
+    def test_save(self):
+        stats = self.docker.save(["api", "web"], self.archive, threads=2)
+
+        self.assertEqual(
+            {
+                "images": 2,
+                "layers": 4,
+                "unique_layers": 3,
+                "bytes_read": len(self.data),
+                "bytes_written": os.path.getsize(self.archive),
+            },
+            stats,
+        )
+        self.assertEqual(self.data, gzip.decompress(self.read(self.archive)))
+        self.assertFalse(os.path.exists(f"{self.archive}.part"))
+
+    def test_save_failure(self):
+        os.environ["FAKE_DOCKER_SAVE"] = os.path.join(self.temp_dir.name, "missing")
+
+        with self.assertRaises(RLIDockerException):
+            self.docker.save(["api"], self.archive)
+
+        self.assertFalse(os.path.exists(self.archive))
+        self.assertFalse(os.path.exists(f"{self.archive}.part"))
+
+    def test_save_to_missing_directory(self):
+        with self.assertRaises(RLIDockerException):
+            self.docker.save(["api"], os.path.join(self.temp_dir.name, "no", "file"))
+
+    def test_save_write_failure(self):
+        processes = []
+        popen = subprocess.Popen
+
+        def record(*args, **kwargs):
+            processes.append(popen(*args, **kwargs))
+            return processes[-1]
+
+        with patch("rli.docker.subprocess.Popen", side_effect=record), patch(
+            "rli.docker.block_gzip.compress", side_effect=OSError(28, "No space left")
+        ):
+            with self.assertRaises(RLIDockerException):
+                self.docker.save(["api"], self.archive)
+
+        self.assertIsNotNone(processes[0].returncode)
+        self.assertFalse(os.path.exists(f"{self.archive}.part"))
+
+    def test_load(self):
+        self.docker.save(["api"], self.archive)
+
+        self.assertEqual(["fake:latest"], self.docker.load(self.archive, threads=2))
+        self.assertEqual(self.data, self.read(self.loaded))
+
+    def test_load_gzip_and_tarball(self):
+        with open(self.archive, "wb") as archive:
+            archive.write(gzip.compress(self.data))
+
+        for path in (self.archive, self.tarball):
+            with self.subTest(path=path):
+                self.assertEqual(["fake:latest"], self.docker.load(path))
+                self.assertEqual(self.data, self.read(self.loaded))
+
+    def test_load_invalid(self):
+        with open(self.archive, "wb") as archive:
+            archive.write(gzip.compress(self.data)[:1000])
+
+        with self.assertRaises(RLIDockerException):
+            self.docker.load(self.archive)
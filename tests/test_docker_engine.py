@@ -0,0 +1,92 @@
+from standins import DockerEngineStandIn
+from rli.docker_engine import DockerEngine, container_name
+from rli.exceptions import RLIDockerException
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+import os
+
+
+class DockerEngineTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.socket_path = os.path.join(self.temp_dir.name, "docker.sock")
+
+        self.stand_in = DockerEngineStandIn(self.socket_path).start()
+        self.addCleanup(self.stand_in.stop)
+
+        self.api = self.stand_in.container("api", project="shop")
+        self.web = self.stand_in.container("web", project="shop")
+        self.db = self.stand_in.container("db")
+        self.engine = DockerEngine(self.socket_path)
+
+    def test_socket_from_env(self):
+        with patch.dict(os.environ, {"DOCKER_HOST": f"unix://{self.socket_path}"}):
+            self.assertEqual(self.socket_path, DockerEngine().socket_path)
+
+        with patch.dict(os.environ, {"DOCKER_HOST": "tcp://127.0.0.1:2375"}):
+            with self.assertRaises(RLIDockerException):
+                DockerEngine()
+
+    def test_containers(self):
+        self.assertEqual(3, len(self.engine.containers()))
+        self.assertEqual(
+            ["api", "web"],
+            sorted(map(container_name, self.engine.containers(project="shop"))),
+        )
+
+    def test_find_containers(self):
+        found, missing = self.engine.find_containers(["api", self.db["Id"][:12], "x"])
+
+        self.assertEqual(["api", "db"], sorted(map(container_name, found)))
+        self.assertEqual(["x"], missing)
+        self.assertEqual(
+            (self.engine.containers(project="shop"), []),
+            self.engine.find_containers(project="shop"),
+        )
+
+    def test_find_containers_by_name_before_id(self):
+        cafe = self.stand_in.container("cafe")
+        # A container whose ID starts with the name of another one.
+        del self.stand_in.containers[self.web["Id"]]
+        self.web["Id"] = "cafe" + self.web["Id"][4:]
+        self.stand_in.containers[self.web["Id"]] = self.web
+
+        self.assertEqual(([cafe], []), self.engine.find_containers(["cafe"]))
+        self.assertEqual(
+            ([self.web], []), self.engine.find_containers([self.web["Id"][:6]])
+        )
+
+    def test_containers_running(self):
+        self.db["State"] = "exited"
+
+        self.assertEqual(2, len(self.engine.containers()))
+        self.assertEqual(3, len(self.engine.containers(all=True)))
+
+    def test_inspect_container(self):
+        self.assertEqual("/api", self.engine.inspect_container(self.api["Id"])["Name"])
+
+    def test_remove_image(self):
+        image = self.stand_in.image("registry/app:sha-1", "registry/app:latest")
+
+        self.assertEqual([image], self.engine.images())
+        self.assertEqual(
+            [{"Untagged": "registry/app:sha-1"}],
+            self.engine.remove_image("registry/app:sha-1"),
+        )
+        self.assertEqual(
+            [{"Untagged": "registry/app:latest"}, {"Deleted": image["Id"]}],
+            self.engine.remove_image(image["Id"]),
+        )
+        self.assertEqual([], self.engine.images())
+
+    def test_error(self):
+        with self.assertRaises(RLIDockerException) as raised:
+            self.engine.inspect_container("missing")
+
+        self.assertIn("No such container", raised.exception.message)
+
+    def test_unreachable(self):
+        with self.assertRaises(RLIDockerException):
+            DockerEngine(os.path.join(self.temp_dir.name, "missing.sock")).get("/")
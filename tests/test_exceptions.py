@@ -2,6 +2,8 @@ import unittest
 from rli.exceptions import (
     InvalidRLIConfiguration,
     RLIDockerException,
+    RLIGitException,
+    RLISecretsException,
 )
 
 
@@ -38,3 +40,33 @@ class ExceptionsTest(unittest.TestCase):
         self.assertEqual(
             f"RLIDockerException has been raised: {message}", str(context.exception)
         )
+
+    def test_RLISecretsException_no_message(self):
+        with self.assertRaises(RLISecretsException) as context:
+            raise RLISecretsException()
+
+        self.assertEqual("RLISecretsException has been raised.", str(context.exception))
+
+    def test_RLISecretsException_message(self):
+        message = "This is the message."
+        with self.assertRaises(RLISecretsException) as context:
+            raise RLISecretsException(message)
+
+        self.assertEqual(
+            f"RLISecretsException has been raised: {message}", str(context.exception)
+        )
+
+    def test_RLIGitException_no_message(self):
+        with self.assertRaises(RLIGitException) as context:
+            raise RLIGitException()
+
+        self.assertEqual("RLIGitException has been raised.", str(context.exception))
+
+    def test_RLIGitException_message(self):
+        message = "This is the message."
+        with self.assertRaises(RLIGitException) as context:
+            raise RLIGitException(message)
+
+        self.assertEqual(
+            f"RLIGitException has been raised: {message}", str(context.exception)
+        )
@@ -1,9 +1,14 @@
+import hashlib
+import os
+import threading
 import unittest
+from standins import GithubStandIn
 from rli.github import RLIGithub, GITHUB_URL
 from rli import github
 from rli.config import GithubConfig
 from unittest.mock import Mock, patch
 from github import GithubException
+from tempfile import TemporaryDirectory
 from tests.helper import MockResponse
 
 
@@ -51,6 +56,36 @@ class MyTestCase(unittest.TestCase):
 
         self.rli_github = RLIGithub(self.valid_github_config)
 
+    def test_shared(self):
+        shared = RLIGithub.shared(self.valid_github_config)
+        other = GithubConfig(
+            {"organization": "some_org", "login": "other_login", "password": "x"}
+        )
+
+        self.assertIs(shared, RLIGithub.shared(self.valid_github_config))
+        self.assertIsNot(shared, RLIGithub.shared(other))
+
+    @patch("rli.github.Github")
+    def test_not_throttled(self, mock_github):
+        RLIGithub(self.valid_github_config)
+
+        self.assertIsNone(mock_github.call_args.kwargs["seconds_between_requests"])
+        self.assertIsNone(mock_github.call_args.kwargs["seconds_between_writes"])
+
+    def test_session(self):
+        session = self.rli_github.session
+        sessions = []
+        thread = threading.Thread(
+            target=lambda: sessions.append(self.rli_github.session)
+        )
+        thread.start()
+        thread.join()
+
+        self.assertIs(session, self.rli_github.session)
+        self.assertIsNot(session, sessions[0])
+        self.assertEqual("application/vnd.github.v3+json", session.headers["Accept"])
+        self.assertEqual(("some_login", "some_password"), session.auth)
+
     @patch("github.Github.get_user")
     def test_valid_creation(self, mock_get_user):
         mock_get_user.return_value = self.mock_get_user
@@ -89,6 +124,40 @@ class MyTestCase(unittest.TestCase):
             "There was an exception when creating your repository."
         )
 
+    @patch("github.Github.get_organization")
+    def test_list_repos(self, mock_get_organization):
+        mock_get_organization.return_value.get_repos.return_value = iter(["one", "two"])
+
+        self.assertEqual(["one", "two"], self.rli_github.list_repos())
+        mock_get_organization.assert_called_once_with(
+            self.valid_github_config.organization
+        )
+        mock_get_organization.return_value.get_repos.assert_called_once_with(type="all")
+
+    def test_list_repos_of_users(self):
+        github_stand_in = GithubStandIn().start()
+        self.addCleanup(github_stand_in.stop)
+        github_stand_in.user_account = True
+        github_stand_in.repos = [
+            github_stand_in.repo("public"),
+            github_stand_in.repo("private", private=True),
+        ]
+
+        for login, names in (("bench", ["public", "private"]), ("other", ["public"])):
+            with self.subTest(login=login):
+                rli_github = RLIGithub(
+                    GithubConfig(
+                        {
+                            "organization": "bench",
+                            "login": login,
+                            "password": "password",
+                            "url": github_stand_in.url,
+                        }
+                    )
+                )
+
+                self.assertEqual(names, [repo.name for repo in rli_github.list_repos()])
+
     def test_encrypt_secret(self):
         encrypted = self.rli_github._encrypt_secret(
             "1PjwOt4yg9yZsEQLUOCPqZRigVMPA4g+6cuGc2ssS1c=", "SOME_SECRET_VALUE"
@@ -170,3 +239,118 @@ class MyTestCase(unittest.TestCase):
         )
         self.mock_requests_put.assert_called_once()
         self.assertEqual(400, context.exception.status)
+
+
+class ReleaseTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+        self.stand_in = GithubStandIn().start()
+        self.addCleanup(self.stand_in.stop)
+
+        self.rli_github = RLIGithub(
+            GithubConfig(
+                {
+                    "organization": "bench",
+                    "login": "login",
+                    "password": "password",
+                    "url": self.stand_in.url,
+                }
+            )
+        )
+        self.paths = []
+
+        for name, size in (("app.tar.gz", 300000), ("checksums.txt", 10)):
+            path = os.path.join(self.temp_dir.name, name)
+
+            with open(path, "wb") as asset:
+                asset.write(os.urandom(size))
+
+            self.paths.append(path)
+
+    def digest(self, path):
+        with open(path, "rb") as asset:
+            return f"sha256:{hashlib.sha256(asset.read()).hexdigest()}"
+
+    def test_create_release(self):
+        release = self.rli_github.create_release(
+            "repo", "v1.0.0", body="notes", prerelease=True
+        )
+
+        self.assertEqual("v1.0.0", release["tag_name"])
+        self.assertEqual("v1.0.0", release["name"])
+        self.assertTrue(release["prerelease"])
+
+    def test_upload_release_assets(self):
+        release = self.rli_github.create_release("repo", "v1.0.0")
+
+        results = self.rli_github.upload_release_assets(release, self.paths)
+
+        self.assertEqual([github.UPLOADED] * 2, [r["action"] for r in results])
+        self.assertEqual([300000, 10], [r["size"] for r in results])
+        self.assertEqual([1, 1], [r["attempts"] for r in results])
+        self.assertEqual(
+            {os.path.basename(path): self.digest(path) for path in self.paths},
+            {
+                asset["name"]: asset["digest"]
+                for asset in self.stand_in.release_assets(release["id"])
+            },
+        )
+
+    def test_upload_release_asset_retry(self):
+        release = self.rli_github.create_release("repo", "v1.0.0")
+        self.stand_in.upload_failures["app.tar.gz"] = 1
+
+        result = self.rli_github.upload_release_asset(
+            release, self.paths[0], retry_delay=0
+        )
+
+        # The 502 left a starter asset, so the second attempt was a 422 and
+        # the third one uploaded after deleting it.
+        self.assertEqual(github.UPLOADED, result["action"])
+        self.assertEqual(3, result["attempts"])
+        assets = self.stand_in.release_assets(release["id"])
+        self.assertEqual(["uploaded"], [asset["state"] for asset in assets])
+        self.assertEqual(self.digest(self.paths[0]), assets[0]["digest"])
+
+    def test_upload_release_asset_failure(self):
+        release = self.rli_github.create_release("repo", "v1.0.0")
+        self.stand_in.upload_failures["app.tar.gz"] = 10
+
+        result = self.rli_github.upload_release_asset(
+            release, self.paths[0], retries=1, retry_delay=0
+        )
+
+        self.assertEqual(github.FAILED, result["action"])
+        self.assertEqual(2, result["attempts"])
+        self.assertTrue(result["error"].startswith("422"))
+
+    def test_upload_release_asset_keeps_existing_asset(self):
+        release = self.rli_github.create_release("repo", "v1.0.0")
+        existing = self.stand_in.asset(release["id"], "app.tar.gz", 1)
+
+        result = self.rli_github.upload_release_asset(
+            release, self.paths[0], retry_delay=0
+        )
+
+        self.assertEqual(github.FAILED, result["action"])
+        self.assertEqual(1, result["attempts"])
+        self.assertEqual([existing], self.stand_in.release_assets(release["id"]))
+
+    def test_upload_release_assets_with_the_same_name(self):
+        release = self.rli_github.create_release("repo", "v1.0.0")
+        other = os.path.join(self.temp_dir.name, "other")
+        os.mkdir(other)
+        path = os.path.join(other, "app.tar.gz")
+
+        with open(path, "wb") as asset:
+            asset.write(b"other")
+
+        with self.assertRaises(ValueError):
+            self.rli_github.upload_release_assets(release, self.paths + [path])
+
+        self.assertEqual([], self.stand_in.release_assets(release["id"]))
+        self.assertEqual(
+            ["app.tar.gz"], github.duplicate_asset_names(self.paths + [path])
+        )
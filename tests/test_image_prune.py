@@ -0,0 +1,121 @@
+from standins import DockerEngineStandIn
+from rli.docker_engine import DockerEngine
+from rli.image_prune import FAILED, REMOVED, UNTAGGED, ImagePruner
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+import os
+
+DAY = 86400
+
+
+class ImagePrunerTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        socket_path = os.path.join(self.temp_dir.name, "docker.sock")
+
+        self.stand_in = DockerEngineStandIn(socket_path).start()
+        self.addCleanup(self.stand_in.stop)
+
+        # One app image a day for five days, the newest tagged latest too.
+        self.apps = [
+            self.stand_in.image(f"registry/app:sha-{day}", created=day * DAY, size=100)
+            for day in range(1, 6)
+        ]
+        self.apps[-1]["RepoTags"].append("registry/app:latest")
+        self.worker = self.stand_in.image("registry/worker:sha-1", created=DAY, size=10)
+        self.dangling = self.stand_in.image("<none>:<none>", created=0, size=1)
+
+        self.pruner = ImagePruner(DockerEngine(socket_path), parallelism=2)
+
+    def ids(self, images):
+        return [image["Id"] for image in images]
+
+    def test_plan(self):
+        self.assertEqual(
+            self.ids([self.apps[2], self.apps[1], self.apps[0], self.dangling]),
+            self.ids(self.pruner.plan(keep=2, now=6 * DAY)),
+        )
+
+    def test_plan_keeps_used_and_protected_images(self):
+        self.stand_in.container("api", image="registry/app:sha-1")["State"] = "exited"
+
+        self.assertEqual(
+            self.ids([self.apps[2], self.dangling]),
+            self.ids(
+                self.pruner.plan(keep=2, protected=[self.apps[1]["Id"]], now=6 * DAY)
+            ),
+        )
+
+    def test_plan_older_than(self):
+        self.assertCountEqual(
+            self.ids([self.apps[0], self.worker, self.dangling]),
+            self.ids(self.pruner.plan(keep=0, older_than=4.5 * DAY, now=6 * DAY)),
+        )
+
+    def test_plan_image_in_many_repositories(self):
+        self.apps[0]["RepoTags"].append("mirror/app:sha-1")
+
+        self.assertNotIn(
+            self.apps[0]["Id"], self.ids(self.pruner.plan(keep=1, now=6 * DAY))
+        )
+
+    def test_plan_groups_images_pulled_by_digest(self):
+        pulled = [
+            self.stand_in.image(digests=[f"registry/base@sha256:{day}"], created=day)
+            for day in range(1, 4)
+        ]
+
+        planned = self.ids(self.pruner.plan(keep=1, now=6 * DAY))
+
+        self.assertNotIn(pulled[2]["Id"], planned)
+        self.assertIn(pulled[1]["Id"], planned)
+        self.assertIn(pulled[0]["Id"], planned)
+
+    def test_remove_image_pulled_by_digest(self):
+        pulled = self.stand_in.image(digests=["registry/base@sha256:1"])
+
+        self.assertEqual(REMOVED, self.pruner.remove(pulled)["status"])
+        self.assertNotIn(pulled["Id"], self.stand_in.images)
+
+    def test_sizes_count_shared_layers_once(self):
+        old = self.stand_in.image(
+            "registry/api:sha-1", layers=[("base", 1000), ("api-1", 10)]
+        )
+        self.stand_in.image(
+            "registry/api:sha-2", layers=[("base", 1000), ("api-2", 20)]
+        )
+        before = self.pruner.layers_size()
+
+        self.assertEqual(10, self.pruner.unique_size([old]))
+        self.assertEqual(1010, old["Size"])
+
+        self.pruner.prune([old])
+
+        self.assertEqual(10, before - self.pruner.layers_size())
+
+    def test_prune(self):
+        results = self.pruner.prune(self.pruner.plan(keep=1, now=6 * DAY))
+
+        self.assertEqual([REMOVED] * 5, [result["status"] for result in results])
+        self.assertEqual(401, sum(result["size"] for result in results))
+        self.assertEqual(
+            ["registry/app:latest", "registry/app:sha-5", "registry/worker:sha-1"],
+            sorted(
+                tag
+                for image in self.stand_in.images.values()
+                for tag in image["RepoTags"]
+            ),
+        )
+
+    def test_remove(self):
+        self.stand_in.container("api", image="registry/worker:sha-1")
+        missing = {"Id": "sha256:missing", "RepoTags": [], "Size": 1}
+
+        untagged = self.pruner.remove(self.worker)
+        failed = self.pruner.remove(missing)
+
+        self.assertEqual(UNTAGGED, untagged["status"])
+        self.assertEqual(["registry/worker:sha-1"], untagged["tags"])
+        self.assertEqual(FAILED, failed["status"])
+        self.assertIn("No such image", failed["error"])
@@ -0,0 +1,131 @@
+from standins import GithubStandIn
+from github import GithubException
+from rli.config import GithubConfig
+from rli.inventory import RepoInventory
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+import os
+
+
+class RepoInventoryTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+        self.github = GithubStandIn().start()
+        self.addCleanup(self.github.stop)
+
+        self.inventory = RepoInventory(
+            GithubConfig(
+                {
+                    "organization": "bench",
+                    "login": "login",
+                    "password": "password",
+                    "url": self.github.url,
+                }
+            ),
+            os.path.join(self.temp_dir.name, "inventory.db"),
+        )
+        self.addCleanup(self.inventory.close)
+
+    def test_refresh(self):
+        self.assertIsNone(self.inventory.refreshed_at())
+        self.assertEqual(30, self.inventory.refresh())
+        self.assertIsNotNone(self.inventory.refreshed_at())
+
+        repo = self.inventory.get("REPO-7")
+        self.assertEqual(self.github.repo("repo-7")["id"], repo["id"])
+        self.assertEqual("public", repo["visibility"])
+        self.assertEqual("master", repo["default_branch"])
+        self.assertFalse(repo["private"])
+
+    def test_refresh_unchanged(self):
+        self.inventory.refresh()
+        requests = self.github.requests
+
+        self.assertEqual(0, self.inventory.refresh())
+        self.assertEqual(requests + 1, self.github.requests)
+
+    def test_refresh_stops_at_unchanged_repos(self):
+        self.github.repos = [
+            self.github.repo(f"repo-{i}", f"2020-01-01T00:{i // 60:02d}:{i % 60:02d}Z")
+            for i in range(250)
+        ]
+        self.inventory.refresh()
+        self.assertEqual(3, self.github.requests)
+
+        self.github.repos.append(self.github.repo("new", "2021-01-01T00:00:00Z"))
+        self.github.repos[0]["updated_at"] = "2021-01-01T00:00:01Z"
+
+        self.assertEqual(2, self.inventory.refresh())
+        self.assertEqual(4, self.github.requests)
+        self.assertEqual(251, len(self.inventory.all()))
+        self.assertEqual(
+            "2021-01-01T00:00:01Z", self.inventory.get("repo-0")["updated_at"]
+        )
+
+    def test_full_refresh_drops_deleted_repos(self):
+        self.inventory.refresh()
+        del self.github.repos[3]
+
+        self.assertEqual(29, self.inventory.refresh(full=True))
+        self.assertIsNone(self.inventory.get("repo-3"))
+        self.assertEqual(29, len(self.inventory.all()))
+
+    def test_refresh_lists_private_repos(self):
+        self.github.repos.append(self.github.repo("secret", private=True))
+
+        self.assertEqual(31, self.inventory.refresh())
+        self.assertTrue(self.inventory.get("secret")["private"])
+        self.assertEqual("private", self.inventory.get("secret")["visibility"])
+
+    def test_refresh_user_account(self):
+        self.github.user_account = True
+        self.github.repos.append(self.github.repo("secret", private=True))
+
+        self.assertEqual(30, self.inventory.refresh())
+        self.assertIsNone(self.inventory.get("secret"))
+
+        self.inventory.config.login = "bench"
+
+        self.assertEqual(31, self.inventory.refresh(full=True))
+        self.assertTrue(self.inventory.get("secret")["private"])
+
+    def test_refresh_error(self):
+        self.inventory.organization = "missing"
+        self.inventory.config.url = f"{self.github.url}/nowhere"
+
+        with self.assertRaises(GithubException):
+            self.inventory.refresh()
+
+    def test_find(self):
+        self.github.repos = [
+            self.github.repo(name)
+            for name in ("api", "api-gateway", "web-api", "payments", "app_ui")
+        ]
+        self.inventory.refresh()
+
+        self.assertEqual(
+            ["api", "api-gateway", "web-api", "app_ui"],
+            [repo["name"] for repo in self.inventory.find("API")],
+        )
+        self.assertEqual(
+            ["payments"], [repo["name"] for repo in self.inventory.find("pmts")]
+        )
+        self.assertEqual(
+            ["app_ui"], [repo["name"] for repo in self.inventory.find("p_")]
+        )
+        self.assertEqual(
+            ["api"], [repo["name"] for repo in self.inventory.find("a", 1)]
+        )
+        self.assertEqual([], self.inventory.find("zzz"))
+
+    def test_resolve(self):
+        self.inventory.refresh()
+        requests = self.github.requests
+
+        self.assertEqual(
+            self.github.repo("repo-1")["id"], self.inventory.resolve("repo-1")
+        )
+        self.assertIsNone(self.inventory.resolve("missing"))
+        self.assertEqual(requests, self.github.requests)
@@ -0,0 +1,118 @@
+from rli.registry import CommandRegistry
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+import os
+import subprocess
+import sys
+
+COMMAND_FILE = '''
+import click
+
+
+@click.group(name="thing", help="Thing commands.")
+def cli():
+    pass
+
+
+@cli.command(name="do-it", help="Does it.")
+@click.option("--name", "-n", multiple=True, help="The name.")
+@click.option("--force", is_flag=True)
+def do_it(name, force):
+    pass
+
+
+@cli.command()
+@click.argument("path")
+def show_all(path):
+    """Shows everything."""
+'''
+
+
+class CommandRegistryTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.folder = os.path.join(self.temp_dir.name, "commands")
+        self.index_path = os.path.join(self.temp_dir.name, "cache", "commands.json")
+        os.makedirs(self.folder)
+
+        self.write_command("cmd_thing.py", COMMAND_FILE)
+        self.write_command("helpers.py", "raise ImportError")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_command(self, filename, source):
+        with open(os.path.join(self.folder, filename), "w") as command_file:
+            command_file.write(source)
+
+    def test_build(self):
+        registry = CommandRegistry(self.folder, self.index_path)
+
+        self.assertEqual(["thing"], registry.names())
+
+        thing = registry.get("thing")
+
+        self.assertEqual("Thing commands.", thing["help"])
+        self.assertEqual("rli.commands.cmd_thing", thing["module"])
+        self.assertTrue(thing["group"])
+        self.assertEqual(["do-it", "show-all"], sorted(thing["commands"]))
+        self.assertEqual(
+            [
+                {
+                    "opts": ["--name", "-n"],
+                    "argument": False,
+                    "help": "The name.",
+                    "multiple": True,
+                    "is_flag": False,
+                },
+                {
+                    "opts": ["--force"],
+                    "argument": False,
+                    "help": None,
+                    "multiple": False,
+                    "is_flag": True,
+                },
+            ],
+            thing["commands"]["do-it"]["options"],
+        )
+        self.assertEqual("Shows everything.", thing["commands"]["show-all"]["help"])
+        self.assertTrue(thing["commands"]["show-all"]["options"][0]["argument"])
+        self.assertIn(["--home"], [option["opts"] for option in registry.options])
+        self.assertTrue(os.path.exists(self.index_path))
+
+    def test_rebuilds_when_files_change(self):
+        self.assertEqual(
+            ["thing"], CommandRegistry(self.folder, self.index_path).names()
+        )
+
+        self.write_command(
+            "cmd_other.py",
+            'import click\n\n\n@click.command("other")\ndef cli():\n    pass\n',
+        )
+
+        registry = CommandRegistry(self.folder, self.index_path)
+
+        self.assertEqual(["other", "thing"], registry.names())
+        self.assertFalse(registry.get("other")["group"])
+
+    def test_load_does_not_import_commands(self):
+        # A fresh interpreter, so commands other tests imported do not count.
+        script = (
+            "import sys\n"
+            "from rli.registry import CommandRegistry\n"
+            f"registry = CommandRegistry(index_path={self.index_path!r})\n"
+            "print(registry.get('github')['commands'])\n"
+            "print(sorted(m for m in sys.modules if m.startswith('rli.commands.')))\n"
+        )
+
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        commands, imported = result.stdout.splitlines()
+
+        self.assertIn("add-secrets", commands)
+        self.assertEqual("[]", imported)
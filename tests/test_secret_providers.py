@@ -0,0 +1,124 @@
+from standins import VaultStandIn
+from rli.exceptions import RLISecretsException
+from rli.secret_providers import (
+    CachedProvider,
+    EnvironmentProvider,
+    JSONFileProvider,
+    SecretProvider,
+    StoreProvider,
+    VaultProvider,
+)
+from rli.secret_store import SecretStore
+from rli.utils.cache import TTLCache
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch, Mock
+import json
+import os
+import sqlite3
+
+
+class SecretProvidersTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.secrets = {"SECRET_ONE": "one", "SECRET_TWO": "two"}
+
+    def test_provider_must_implement_get_many_and_get_all(self):
+        class GetOnly(SecretProvider):
+            def get_many(self, keys):
+                return {}
+
+        with self.assertRaises(TypeError):
+            SecretProvider()
+
+        with self.assertRaises(TypeError):
+            GetOnly()
+
+    def test_json_file_provider(self):
+        path = os.path.join(self.temp_dir.name, "secrets.json")
+
+        with open(path, "w") as json_file:
+            json.dump(self.secrets, json_file)
+
+        provider = JSONFileProvider(path)
+
+        self.assertEqual(
+            {"SECRET_TWO": "two"}, provider.get_many(["SECRET_TWO", "MISSING"])
+        )
+        self.assertEqual(self.secrets, provider.get_all())
+        self.assertEqual("one", provider.get("SECRET_ONE"))
+
+    @patch.dict(os.environ, {"APP_SECRET_ONE": "one", "SECRET_TWO": "two"})
+    def test_environment_provider(self):
+        provider = EnvironmentProvider("APP_")
+
+        self.assertEqual(
+            {"SECRET_ONE": "one"}, provider.get_many(["SECRET_ONE", "SECRET_TWO"])
+        )
+        self.assertEqual({"SECRET_ONE": "one"}, provider.get_all())
+
+    def test_store_provider(self):
+        store = SecretStore(os.path.join(self.temp_dir.name, "secrets.db"))
+        self.addCleanup(store.close)
+        store.set_many(self.secrets.items())
+
+        provider = StoreProvider(store)
+
+        self.assertEqual({"SECRET_ONE": "one"}, provider.get_many(["SECRET_ONE"]))
+        self.assertEqual(self.secrets, provider.get_all())
+
+    def test_store_provider_error(self):
+        store = Mock(path="secrets.db", namespace="default")
+        store.get_many.side_effect = sqlite3.OperationalError("database is locked")
+        store.items.side_effect = sqlite3.OperationalError("database is locked")
+        provider = StoreProvider(store)
+
+        with self.assertRaises(RLISecretsException):
+            provider.get_many(["SECRET_ONE"])
+
+        with self.assertRaises(RLISecretsException):
+            provider.get_all()
+
+    def test_vault_provider(self):
+        vault = VaultStandIn({"production": self.secrets}, token="token").start()
+        self.addCleanup(vault.stop)
+
+        provider = VaultProvider(vault.url, "token", "production")
+
+        self.assertEqual(
+            self.secrets, provider.get_many(["SECRET_ONE", "SECRET_TWO", "MISSING"])
+        )
+        self.assertEqual(1, vault.requests)
+        self.assertEqual(self.secrets, provider.get_all())
+
+        with self.assertRaises(RLISecretsException):
+            VaultProvider(vault.url, "wrong", "production").get_many(["SECRET_ONE"])
+
+    def test_cached_provider(self):
+        provider = Mock()
+        provider.cache_key = ("mock",)
+        provider.get_many.return_value = {"SECRET_ONE": "one"}
+
+        cached = CachedProvider(provider, TTLCache())
+
+        self.assertEqual(
+            {"SECRET_ONE": "one"}, cached.get_many(["SECRET_ONE", "MISSING"])
+        )
+        self.assertEqual(
+            {"SECRET_ONE": "one"}, cached.get_many(["MISSING", "SECRET_ONE"])
+        )
+        provider.get_many.assert_called_once_with(["SECRET_ONE", "MISSING"])
+
+        provider.get_many.return_value = {"SECRET_TWO": "two"}
+
+        self.assertEqual(
+            {"SECRET_ONE": "one", "SECRET_TWO": "two"},
+            cached.get_many(["SECRET_ONE", "SECRET_TWO"]),
+        )
+        provider.get_many.assert_called_with(["SECRET_TWO"])
+
+        cached.invalidate()
+        cached.get_many(["SECRET_ONE"])
+
+        provider.get_many.assert_called_with(["SECRET_ONE"])
@@ -0,0 +1,94 @@
+from rli.secret_store import SecretStore
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+import json
+import os
+import stat
+
+
+class SecretStoreTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "secrets.db")
+        self.store = SecretStore(self.path)
+        self.addCleanup(self.store.close)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_get_and_set(self):
+        self.assertEqual(1, self.store.set("SECRET_ONE", "value one"))
+
+        self.assertEqual("value one", self.store.get("SECRET_ONE"))
+        self.assertIsNone(self.store.get("SECRET_TWO"))
+        self.assertEqual("", self.store.get("SECRET_TWO", ""))
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(self.path).st_mode) & 0o777)
+
+    def test_get_many(self):
+        self.store.set_many((f"SECRET_{i}", f"value-{i}") for i in range(1200))
+
+        secrets = self.store.get_many(
+            [f"SECRET_{i}" for i in range(0, 1200, 2)] + ["MISSING", "SECRET_0"]
+        )
+
+        self.assertEqual(600, len(secrets))
+        self.assertEqual("value-1198", secrets["SECRET_1198"])
+        self.assertNotIn("MISSING", secrets)
+
+    def test_namespaces(self):
+        production = self.store.namespaced("production")
+        self.addCleanup(production.close)
+
+        self.store.set("SECRET_ONE", "default value")
+        production.set("SECRET_ONE", "production value")
+
+        self.assertEqual("default value", self.store.get("SECRET_ONE"))
+        self.assertEqual("production value", production.get("SECRET_ONE"))
+        self.assertEqual(["SECRET_ONE"], production.keys())
+
+    @patch("rli.secret_store.time.time")
+    def test_changed_since(self, mock_time):
+        mock_time.return_value = 100.0
+        self.store.set_many({"SECRET_ONE": "one", "SECRET_TWO": "two"}.items())
+
+        mock_time.return_value = 200.0
+        changed = self.store.set_many(
+            {"SECRET_ONE": "one", "SECRET_TWO": "new two"}.items()
+        )
+
+        self.assertEqual(1, changed)
+        self.assertEqual(100.0, self.store.updated_at("SECRET_ONE"))
+        self.assertEqual({"SECRET_TWO": "new two"}, self.store.changed_since(150))
+        self.assertEqual(
+            {"SECRET_ONE": "one", "SECRET_TWO": "new two"},
+            self.store.changed_since(0),
+        )
+
+    def test_import_json(self):
+        json_path = os.path.join(self.temp_dir.name, "secrets.json")
+
+        with open(json_path, "w") as json_file:
+            json.dump({"SECRET_ONE": "one", "SECRET_TWO": "two"}, json_file)
+
+        self.assertEqual(2, self.store.import_json(json_path))
+        self.assertEqual(0, self.store.import_json(json_path))
+        self.assertEqual({"SECRET_ONE": "one", "SECRET_TWO": "two"}, self.store.items())
+
+    def test_import_json_not_strings(self):
+        json_path = os.path.join(self.temp_dir.name, "secrets.json")
+
+        with open(json_path, "w") as json_file:
+            json.dump({"SECRET_ONE": "one", "SECRET_TWO": 2}, json_file)
+
+        with self.assertRaises(ValueError):
+            self.store.import_json(json_path)
+
+        self.assertEqual({}, self.store.items())
+
+    def test_delete(self):
+        self.store.set("SECRET_ONE", "one")
+
+        self.assertTrue(self.store.delete("SECRET_ONE"))
+        self.assertFalse(self.store.delete("SECRET_ONE"))
+        self.assertEqual([], self.store.keys())
@@ -0,0 +1,84 @@
+from rli.utils.bash import Bash
+from unittest import TestCase
+from unittest.mock import patch, Mock
+import os
+import subprocess
+
+
+class BashTest(TestCase):
+    def setUp(self):
+        Bash.cache.clear()
+
+        self.mock_completed_process = Mock()
+        self.mock_completed_process.returncode = 0
+        self.mock_completed_process.stdout = "[]"
+
+    def tearDown(self):
+        Bash.cache.clear()
+
+    @patch("rli.utils.bash.subprocess.run")
+    def test_run_command_does_not_change_environ(self, mock_run):
+        mock_run.return_value = self.mock_completed_process
+
+        Bash.run_command(["docker", "login"], env={"RLI_TEST_SECRET": "secret"})
+
+        self.assertNotIn("RLI_TEST_SECRET", os.environ)
+        self.assertEqual("secret", mock_run.call_args[1]["env"]["RLI_TEST_SECRET"])
+
+    @patch("rli.utils.bash.subprocess.run")
+    def test_run_cached_command_reuses_result(self, mock_run):
+        mock_run.return_value = self.mock_completed_process
+
+        first = Bash.run_cached_command(["docker", "image", "inspect", "ubuntu"])
+        second = Bash.run_cached_command(["docker", "image", "inspect", "ubuntu"])
+
+        self.assertIs(first, second)
+        mock_run.assert_called_once()
+        self.assertEqual(subprocess.PIPE, mock_run.call_args[1]["stdout"])
+
+    @patch("rli.utils.bash.subprocess.run")
+    def test_run_cached_command_keys_on_env(self, mock_run):
+        mock_run.return_value = self.mock_completed_process
+
+        Bash.run_cached_command(["docker", "version"], env={"A": "1"})
+        Bash.run_cached_command(["docker", "version"], env={"A": "2"})
+
+        self.assertEqual(2, mock_run.call_count)
+
+    @patch("rli.utils.bash.subprocess.run")
+    def test_run_cached_command_does_not_cache_failures(self, mock_run):
+        self.mock_completed_process.returncode = 1
+        mock_run.return_value = self.mock_completed_process
+
+        Bash.run_cached_command(["docker", "image", "inspect", "ubuntu"])
+        Bash.run_cached_command(["docker", "image", "inspect", "ubuntu"])
+
+        self.assertEqual(2, mock_run.call_count)
+
+    @patch("rli.utils.bash.subprocess.run")
+    def test_invalidate(self, mock_run):
+        mock_run.return_value = self.mock_completed_process
+
+        Bash.run_cached_command(["docker", "image", "inspect", "ubuntu:latest"])
+        Bash.run_cached_command(["docker", "image", "inspect", "alpine:latest"])
+
+        Bash.invalidate("ubuntu")
+
+        self.assertEqual(1, len(Bash.cache))
+
+        Bash.invalidate()
+
+        self.assertEqual(0, len(Bash.cache))
+
+    def test_run_captured_command(self):
+        with patch.dict("os.environ", {}):
+            result = Bash.run_captured_command(
+                ["sh", "-c", 'echo "$RLI_TEST_VALUE"; echo error >&2'],
+                env={"RLI_TEST_VALUE": "value"},
+            )
+
+            self.assertNotIn("RLI_TEST_VALUE", os.environ)
+
+        self.assertEqual(0, result.returncode)
+        self.assertEqual("value\n", result.stdout)
+        self.assertEqual("error\n", result.stderr)
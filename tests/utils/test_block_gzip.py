@@ -0,0 +1,58 @@
+from rli.utils.block_gzip import compress, decompress
+from unittest import TestCase
+import gzip
+import io
+import os
+import zlib
+
+
+class BlockGzipTest(TestCase):
+    def setUp(self):
+        self.data = os.urandom(50000) + b"layer" * 100000
+
+    def compress(self, data, **kwargs):
+        target = io.BytesIO()
+        read, written = compress(io.BytesIO(data), target, **kwargs)
+
+        self.assertEqual(len(data), read)
+        self.assertEqual(len(target.getvalue()), written)
+        return target.getvalue()
+
+    def decompress(self, data, **kwargs):
+        target = io.BytesIO()
+        decompress(io.BytesIO(data), target, **kwargs)
+        return target.getvalue()
+
+    def test_compress(self):
+        for block_size in (1000, 65536, 1 << 20):
+            with self.subTest(block_size=block_size):
+                compressed = self.compress(self.data, block_size=block_size, threads=3)
+
+                self.assertLess(len(compressed), len(self.data))
+                self.assertEqual(self.data, gzip.decompress(compressed))
+                self.assertEqual(self.data, self.decompress(compressed, threads=3))
+
+    def test_empty(self):
+        self.assertEqual(b"", self.compress(b""))
+        self.assertEqual(b"", self.decompress(b""))
+
+    def test_decompress_gzip(self):
+        compressed = gzip.compress(self.data[:1000]) + gzip.compress(self.data)
+
+        self.assertEqual(self.data[:1000] + self.data, self.decompress(compressed))
+
+    def test_decompress_uncompressed(self):
+        self.assertEqual(self.data, self.decompress(self.data))
+
+    def test_decompress_truncated(self):
+        compressed = self.compress(self.data, block_size=65536)
+
+        with self.assertRaises(zlib.error):
+            self.decompress(compressed[:-10])
+
+    def test_decompress_corrupted(self):
+        compressed = bytearray(self.compress(self.data, block_size=65536))
+        compressed[-5] ^= 0xFF
+
+        with self.assertRaises(zlib.error):
+            self.decompress(bytes(compressed))
@@ -0,0 +1,57 @@
+from rli.utils.cache import TTLCache
+from unittest import TestCase
+from unittest.mock import patch
+
+
+class TTLCacheTest(TestCase):
+    def setUp(self):
+        self.cache = TTLCache(max_size=2, ttl=10)
+
+    def test_get_set(self):
+        self.cache.set("one", 1)
+
+        self.assertEqual(1, self.cache.get("one"))
+        self.assertIn("one", self.cache)
+        self.assertIsNone(self.cache.get("two"))
+        self.assertEqual("default", self.cache.get("two", "default"))
+
+    @patch("rli.utils.cache.time.monotonic")
+    def test_expiry(self, mock_monotonic):
+        mock_monotonic.return_value = 100
+        self.cache.set("one", 1)
+        self.cache.set("two", 2, ttl=30)
+
+        mock_monotonic.return_value = 110
+
+        self.assertIsNone(self.cache.get("one"))
+        self.assertEqual(2, self.cache.get("two"))
+        self.assertEqual(1, len(self.cache))
+
+    def test_lru_eviction(self):
+        self.cache.set("one", 1)
+        self.cache.set("two", 2)
+        self.cache.get("one")
+        self.cache.set("three", 3)
+
+        self.assertEqual(1, self.cache.get("one"))
+        self.assertIsNone(self.cache.get("two"))
+        self.assertEqual(3, self.cache.get("three"))
+
+    def test_invalidate(self):
+        self.cache.set("one", 1)
+        self.cache.set("two", 2)
+
+        self.cache.invalidate("one")
+
+        self.assertNotIn("one", self.cache)
+        self.assertIn("two", self.cache)
+
+    def test_invalidate_where(self):
+        self.cache.set(("docker", "image"), 1)
+        self.cache.set(("docker", "version"), 2)
+
+        removed = self.cache.invalidate_where(lambda key: "image" in key)
+
+        self.assertEqual(1, removed)
+        self.assertNotIn(("docker", "image"), self.cache)
+        self.assertIn(("docker", "version"), self.cache)
@@ -0,0 +1,29 @@
+from rli.utils.durations import parse_duration, parse_since, parse_timestamp
+from unittest import TestCase
+
+
+class DurationsTest(TestCase):
+    def test_parse_duration(self):
+        self.assertEqual(30, parse_duration("30s"))
+        self.assertEqual(5400, parse_duration("1h30m"))
+        self.assertEqual(86400 * 7 + 43200, parse_duration("1w0.5d"))
+
+        for value in ("", "10", "10x", "m", "1h 2m"):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    parse_duration(value)
+
+    def test_parse_timestamp(self):
+        self.assertEqual(1600000000.5, parse_timestamp("1600000000.5"))
+        self.assertEqual(0.0, parse_timestamp("1970-01-01T00:00:00+00:00"))
+
+        with self.assertRaises(ValueError):
+            parse_timestamp("yesterday")
+
+    def test_parse_since(self):
+        self.assertEqual(1000 - 600, parse_since("10m", now=1000))
+        self.assertEqual(1234.5, parse_since("1234.5"))
+        self.assertEqual(0, parse_since("1970-01-01T00:00:00+00:00"))
+
+        with self.assertRaises(ValueError):
+            parse_since("yesterday")
@@ -0,0 +1,62 @@
+from rli.utils.file_cache import JSONFileCache
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+import json
+import os
+import stat
+
+
+class JSONFileCacheTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.folder = os.path.join(self.temp_dir.name, "cache")
+        self.path = os.path.join(self.temp_dir.name, "config.json")
+        self.write({"github": {"login": "some_login"}})
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, data):
+        with open(self.path, "w") as json_file:
+            json.dump(data, json_file)
+
+    def test_load_is_cached_in_memory(self):
+        cache = JSONFileCache(self.folder)
+
+        first = cache.load(self.path)
+
+        with patch("builtins.open") as mock_open:
+            second = cache.load(self.path)
+
+        mock_open.assert_not_called()
+        self.assertIs(first, second)
+        self.assertEqual({"github": {"login": "some_login"}}, first)
+
+    def test_load_after_change(self):
+        cache = JSONFileCache(self.folder)
+        cache.load(self.path)
+
+        self.write({"github": {"login": "other_login", "organization": "org"}})
+
+        self.assertEqual(
+            {"github": {"login": "other_login", "organization": "org"}},
+            cache.load(self.path),
+        )
+
+    def test_load_compiled(self):
+        JSONFileCache(self.folder).load(self.path)
+        cache = JSONFileCache(self.folder)
+
+        with patch("json.load") as mock_json_load:
+            data = cache.load(self.path)
+
+        mock_json_load.assert_not_called()
+        self.assertEqual({"github": {"login": "some_login"}}, data)
+        self.assertEqual(
+            0o600, stat.S_IMODE(os.stat(cache.compiled_path(self.path)).st_mode)
+        )
+
+    def test_load_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            JSONFileCache(self.folder).load(os.path.join(self.folder, "missing.json"))
@@ -0,0 +1,65 @@
+from rli.utils.json_scan import iter_items, iter_keys, load_keys
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+import json
+import os
+
+
+class JSONScanTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "secrets.json")
+        self.data = {
+            "SECRET_ONE": "value one",
+            'ESCAPED "KEY"': "line\nbreak é",
+            "NUMBER": 123456789,
+            "NESTED": {"list": [1, 2.5, None, True, "}"]},
+            "LAST": False,
+        }
+
+        with open(self.path, "w") as json_file:
+            json.dump(self.data, json_file, indent=2)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_iter_items(self):
+        for chunk_size in (1, 2, 7, 4096):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(
+                    self.data, dict(iter_items(self.path, chunk_size=chunk_size))
+                )
+
+    def test_iter_keys(self):
+        self.assertEqual(list(self.data), list(iter_keys(self.path, chunk_size=3)))
+
+    def test_load_keys(self):
+        self.assertEqual(
+            {"NUMBER": 123456789, "LAST": False},
+            load_keys(self.path, ["LAST", "NUMBER", "MISSING"], chunk_size=5),
+        )
+        self.assertEqual({}, load_keys(self.path, []))
+
+    def test_load_keys_stops_when_found(self):
+        with open(self.path, "w") as json_file:
+            json_file.write('{"SECRET_ONE": "value one", "BROKEN": ')
+
+        self.assertEqual(
+            {"SECRET_ONE": "value one"}, load_keys(self.path, ["SECRET_ONE"])
+        )
+
+        with self.assertRaises(ValueError):
+            load_keys(self.path, ["BROKEN"])
+
+    def test_empty_object(self):
+        with open(self.path, "w") as json_file:
+            json_file.write(" {\n} ")
+
+        self.assertEqual([], list(iter_items(self.path)))
+
+    def test_not_an_object(self):
+        with open(self.path, "w") as json_file:
+            json_file.write('["SECRET_ONE"]')
+
+        with self.assertRaises(ValueError):
+            list(iter_items(self.path))
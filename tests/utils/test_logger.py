@@ -0,0 +1,108 @@
+from rli.utils import logger
+from rli.utils.logger import log_to, setup_logger, stop_logger
+from unittest import TestCase
+import io
+import json
+import logging
+import logging.handlers
+
+
+class LoggerTest(TestCase):
+    def setUp(self):
+        stop_logger()
+        self.stream = io.StringIO()
+
+    def tearDown(self):
+        stop_logger()
+
+    def test_installs_once(self):
+        setup_logger(stream=self.stream)
+        setup_logger(stream=self.stream)
+
+        logging.getLogger("rli.test").info("Only once %s", "please")
+        stop_logger()
+
+        self.assertEqual(1, self.stream.getvalue().count("Only once please"))
+
+    def test_levels(self):
+        setup_logger(stream=self.stream)
+
+        self.assertEqual(logging.INFO, logging.getLogger().level)
+        logging.getLogger("rli.test").debug("Hidden")
+
+        setup_logger(verbose=True, stream=self.stream)
+
+        self.assertEqual(logging.DEBUG, logging.getLogger().level)
+        logging.getLogger("rli.test").debug("Shown")
+        stop_logger()
+
+        self.assertNotIn("Hidden", self.stream.getvalue())
+        self.assertIn("Shown", self.stream.getvalue())
+
+    def test_json_format(self):
+        setup_logger(log_format="json", stream=self.stream)
+
+        logging.getLogger("rli.test").error("Something %s", "failed")
+        stop_logger()
+
+        entry = json.loads(self.stream.getvalue())
+
+        self.assertEqual("Something failed", entry["message"])
+        self.assertEqual("ERROR", entry["level"])
+        self.assertEqual("rli.test", entry["logger"])
+
+    def test_json_format_exception(self):
+        setup_logger(log_format="json", stream=self.stream)
+
+        try:
+            raise ValueError("bad value")
+        except ValueError:
+            logging.getLogger("rli.test").exception("Could not %s", "parse")
+
+        stop_logger()
+
+        entry = json.loads(self.stream.getvalue())
+
+        self.assertEqual("Could not parse", entry["message"])
+        self.assertIn("ValueError: bad value", entry["exception"])
+
+    def test_text_format_exception(self):
+        setup_logger(stream=self.stream)
+
+        try:
+            raise ValueError("bad value")
+        except ValueError:
+            logging.getLogger("rli.test").exception("Could not parse")
+
+        stop_logger()
+
+        self.assertEqual(1, self.stream.getvalue().count("ValueError: bad value"))
+
+    def test_log_to(self):
+        other = io.StringIO()
+        setup_logger(stream=self.stream)
+
+        logging.getLogger("rli.test").info("Before")
+
+        with log_to(other):
+            logging.getLogger("rli.test").info("During")
+
+        logging.getLogger("rli.test").info("After")
+        stop_logger()
+
+        self.assertIn("Before", self.stream.getvalue())
+        self.assertIn("After", self.stream.getvalue())
+        self.assertNotIn("During", self.stream.getvalue())
+        self.assertIn("During", other.getvalue())
+
+    def test_stop_logger(self):
+        setup_logger(stream=self.stream)
+        stop_logger()
+
+        self.assertIsNone(logger._logging)
+        self.assertFalse(
+            any(
+                isinstance(handler, logging.handlers.QueueHandler)
+                for handler in logging.getLogger().handlers
+            )
+        )
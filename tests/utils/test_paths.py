@@ -0,0 +1,33 @@
+from concurrent.futures import ThreadPoolExecutor
+from rli.utils.paths import write_atomic
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+import os
+import stat
+
+
+class PathsTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = os.path.join(self.temp_dir.name, "cache", "index.json")
+
+    def test_write_atomic(self):
+        write_atomic(self.path, b"data", mode=0o600)
+
+        with open(self.path, "rb") as written:
+            self.assertEqual(b"data", written.read())
+
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(self.path).st_mode))
+        self.assertEqual(["index.json"], os.listdir(os.path.dirname(self.path)))
+
+    def test_write_atomic_from_threads(self):
+        contents = [bytes([i]) * 100000 for i in range(8)]
+
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(lambda data: write_atomic(self.path, data), contents))
+
+        with open(self.path, "rb") as written:
+            self.assertIn(written.read(), contents)
+
+        self.assertEqual(["index.json"], os.listdir(os.path.dirname(self.path)))
@@ -0,0 +1,54 @@
+from rli.utils.profiler import profile
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+import io
+import os
+import pstats
+
+
+def work():
+    return [str(number) for number in range(10000)]
+
+
+class ProfileTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.stream = io.StringIO()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_cpu(self):
+        output = os.path.join(self.temp_dir.name, "rli-test.pstats")
+
+        with profile("cpu", output, 5, self.stream):
+            work()
+
+        self.assertIn("Ordered by: cumulative time", self.stream.getvalue())
+        self.assertTrue(
+            any("work" in function for _, _, function in pstats.Stats(output).stats)
+        )
+
+    def test_cpu_reports_on_exit(self):
+        output = os.path.join(self.temp_dir.name, "rli-test.pstats")
+
+        with self.assertRaises(SystemExit):
+            with profile("cpu", output, 5, self.stream):
+                raise SystemExit(0)
+
+        self.assertTrue(os.path.exists(output))
+
+    def test_mem(self):
+        with profile("mem", top=3, stream=self.stream):
+            data = work()
+
+        report = self.stream.getvalue()
+
+        self.assertIn("Peak traced memory", report)
+        self.assertIn("test_profiler.py", report)
+        self.assertEqual(10000, len(data))
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            with profile("disk"):
+                pass
@@ -0,0 +1,68 @@
+from rli.utils.bash import Bash
+from rli.utils.trace import Tracer
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch, Mock
+import json
+import os
+
+
+class TracerTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "trace.json")
+        self.tracer = Tracer(self.path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_disabled(self):
+        tracer = Tracer()
+
+        with tracer.span("name", "http") as span:
+            span["status"] = 200
+
+        tracer.write()
+
+        self.assertFalse(tracer.enabled)
+        self.assertEqual([], tracer.events)
+
+    def test_write(self):
+        with self.tracer.span("GET /", "http", repo="some-repo") as span:
+            span["status"] = 200
+
+        with self.tracer.span("docker pull", "subprocess"):
+            pass
+
+        self.tracer.write()
+
+        with open(self.path) as trace_file:
+            events = json.load(trace_file)["traceEvents"]
+
+        self.assertEqual(2, len(events))
+        self.assertEqual("GET /", events[0]["name"])
+        self.assertEqual("X", events[0]["ph"])
+        self.assertEqual({"repo": "some-repo", "status": 200}, events[0]["args"])
+        self.assertIn("child_user_cpu_ms", events[1]["args"])
+        self.assertIn("child_max_rss_kb", events[1]["args"])
+
+    @patch("rli.utils.bash.subprocess.run")
+    def test_bash_spans_are_redacted(self, mock_run):
+        mock_run.return_value = Mock(returncode=0)
+
+        with patch("rli.utils.bash.tracer", self.tracer):
+            Bash.run_command(
+                ["docker", "run", "-e", "KEY=value", "image"], env={"KEY": "value"}
+            )
+            Bash.run_command(
+                ["echo", '"password"', "|", "docker"], redact=['"password"']
+            )
+
+        self.assertEqual(
+            ["docker", "run", "-e", "KEY=***", "image"],
+            self.tracer.events[0]["args"]["argv"],
+        )
+        self.assertEqual(0, self.tracer.events[0]["args"]["returncode"])
+        self.assertEqual(
+            ["echo", "***", "|", "docker"], self.tracer.events[1]["args"]["argv"]
+        )
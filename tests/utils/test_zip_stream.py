@@ -0,0 +1,108 @@
+from rli.utils.zip_stream import ZipStreamExtractor
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+import io
+import os
+import zipfile
+
+
+class _Unseekable(io.RawIOBase):
+    """Makes zipfile write data descriptors, like a streaming zip writer."""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.data += data
+        return len(data)
+
+
+def make_zip(method=zipfile.ZIP_DEFLATED, streamed=False):
+    output = _Unseekable() if streamed else io.BytesIO()
+
+    with zipfile.ZipFile(output, "w", method) as archive:
+        archive.writestr("dist/app.txt", b"hello " * 10000)
+        archive.writestr("dist/empty/", b"")
+        archive.writestr("empty.txt", b"")
+
+        with archive.open("large.bin", "w", force_zip64=True) as large:
+            large.write(os.urandom(200000))
+
+    return bytes(output.data) if streamed else output.getvalue()
+
+
+class ZipStreamExtractorTest(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def extract(self, data, chunk_size):
+        extractor = ZipStreamExtractor(self.temp_dir.name)
+
+        for i in range(0, len(data), chunk_size):
+            extractor.feed(data[i : i + chunk_size])
+
+        extractor.close()
+        return extractor
+
+    def assert_extracted(self, data):
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            for name in archive.namelist():
+                path = os.path.join(self.temp_dir.name, name)
+
+                if name.endswith("/"):
+                    self.assertTrue(os.path.isdir(path))
+                else:
+                    with open(path, "rb") as extracted:
+                        self.assertEqual(archive.read(name), extracted.read())
+
+    def test_extract(self):
+        for method, streamed in (
+            (zipfile.ZIP_DEFLATED, False),
+            (zipfile.ZIP_DEFLATED, True),
+            (zipfile.ZIP_STORED, False),
+        ):
+            data = make_zip(method, streamed)
+
+            for chunk_size in (1, 777, len(data)):
+                with self.subTest(method=method, streamed=streamed, size=chunk_size):
+                    extractor = self.extract(data, chunk_size)
+
+                    self.assertEqual(
+                        ["dist/app.txt", "dist/empty/", "empty.txt", "large.bin"],
+                        extractor.names,
+                    )
+                    self.assert_extracted(data)
+
+    def test_stored_without_size(self):
+        with self.assertRaises(zipfile.BadZipFile):
+            self.extract(make_zip(zipfile.ZIP_STORED, streamed=True), 4096)
+
+    def test_truncated(self):
+        data = make_zip()
+
+        with self.assertRaises(zipfile.BadZipFile):
+            self.extract(data[: len(data) // 2], 4096)
+
+    def test_corrupted(self):
+        data = bytearray(make_zip(zipfile.ZIP_STORED))
+        data[100] ^= 0xFF
+
+        with self.assertRaises(zipfile.BadZipFile):
+            self.extract(bytes(data), 4096)
+
+    def test_outside_of_folder(self):
+        output = io.BytesIO()
+
+        with zipfile.ZipFile(output, "w") as archive:
+            archive.writestr("../escaped.txt", b"data")
+
+        with self.assertRaises(zipfile.BadZipFile):
+            self.extract(output.getvalue(), 4096)
+
+        self.assertFalse(
+            os.path.exists(os.path.join(self.temp_dir.name, "..", "escaped.txt"))
+        )